@@ -74,7 +74,7 @@ def _cli_event_scope(command: Optional[str] = None, args_dict: Optional[dict] =
 from agency_code_agent.agency_code_agent import (  # noqa: E402 - must import after warning suppression
     create_agency_code_agent,
 )
-from agency_memory import Memory, create_firestore_store, EnhancedMemoryStore, create_enhanced_memory_store  # noqa: E402 - must import after warning suppression
+from agency_memory import Memory, create_firestore_store, create_memory_store, EnhancedMemoryStore, create_enhanced_memory_store  # noqa: E402 - must import after warning suppression
 from auditor_agent import create_auditor_agent  # noqa: E402 - must import after warning suppression
 from planner_agent.planner_agent import (  # noqa: E402 - must import after warning suppression
     create_planner_agent,
@@ -104,6 +104,15 @@ model = os.getenv("AGENCY_MODEL", "gpt-5")
 # This allows memory sharing between agents with both tag-based and semantic search capabilities
 use_firestore = os.getenv("FRESH_USE_FIRESTORE", "").lower() == "true"
 use_enhanced_memory = os.getenv("USE_ENHANCED_MEMORY", "true").lower() == "true"
+# AGENCY_MEMORY_SNAPSHOT names a snapshot file the enhanced store warm-restores from
+# at startup and rewrites every AGENCY_MEMORY_SNAPSHOT_INTERVAL seconds while it changes
+memory_snapshot_path = os.getenv("AGENCY_MEMORY_SNAPSHOT") or None
+memory_snapshot_interval = float(os.getenv("AGENCY_MEMORY_SNAPSHOT_INTERVAL", "300"))
+# Stored memories are embedded and checked for learning triggers on background
+# workers so hook-driven writes return immediately (0 workers keeps it inline)
+memory_learning_workers = int(os.getenv("AGENCY_MEMORY_LEARNING_WORKERS", "1"))
+memory_learning_queue = int(os.getenv("AGENCY_MEMORY_LEARNING_QUEUE", "10000"))
+memory_learning_backpressure = os.getenv("AGENCY_MEMORY_LEARNING_BACKPRESSURE", "block")
 
 if use_enhanced_memory:
     # Use enhanced memory store with VectorStore integration
@@ -111,15 +120,30 @@ if use_enhanced_memory:
         firestore_store = create_firestore_store()
         # Note: Enhanced memory store doesn't directly support Firestore yet
         # For now, use enhanced memory with automatic VectorStore population
-        enhanced_store = create_enhanced_memory_store(embedding_provider="sentence-transformers")
+        enhanced_store = create_enhanced_memory_store(
+            embedding_provider="sentence-transformers",
+            snapshot_path=memory_snapshot_path,
+            snapshot_interval_seconds=memory_snapshot_interval,
+            learning_workers=memory_learning_workers,
+            learning_queue_size=memory_learning_queue,
+            learning_backpressure=memory_learning_backpressure,
+        )
         shared_memory = Memory(store=enhanced_store)
     else:
         # Use enhanced memory store with in-memory backend
-        enhanced_store = create_enhanced_memory_store(embedding_provider="sentence-transformers")
+        enhanced_store = create_enhanced_memory_store(
+            embedding_provider="sentence-transformers",
+            snapshot_path=memory_snapshot_path,
+            snapshot_interval_seconds=memory_snapshot_interval,
+            learning_workers=memory_learning_workers,
+            learning_queue_size=memory_learning_queue,
+            learning_backpressure=memory_learning_backpressure,
+        )
         shared_memory = Memory(store=enhanced_store)
 else:
-    # Use traditional memory for backward compatibility
-    memory_store = create_firestore_store() if use_firestore else None
+    # Use traditional memory for backward compatibility; AGENCY_MEMORY_BACKEND=sqlite
+    # selects the durable local store
+    memory_store = create_memory_store()
     shared_memory = Memory(store=memory_store)
 
 shared_context = create_agent_context(memory=shared_memory)
@@ -2,7 +2,7 @@
 """
 Agency Memory Module
 
-Lightweight memory system with in-memory store and Firestore fallback.
+Lightweight memory system with in-memory store, SQLite and Firestore backends.
 Provides store, search, and learning consolidation functionality.
 """
 
@@ -10,7 +10,14 @@ from .memory import Memory, MemoryStore, InMemoryStore, create_session_transcrip
 
 from .firestore_store import FirestoreStore, create_firestore_store
 
-from .learning import consolidate_learnings as _consolidate_learnings, generate_learning_report
+from .sqlite_store import SQLiteStore, create_sqlite_store, create_memory_store
+
+from .learning import (
+    consolidate_learnings as _consolidate_learnings,
+    generate_learning_report,
+    IncrementalConsolidator,
+    LearningAggregates,
+)
 
 def consolidate_learnings(source):
     """Consolidate learnings from various inputs.
@@ -20,6 +27,9 @@ def consolidate_learnings(source):
     - Memory or MemoryStore instances (with get_all())
     - Bound get_all method (via __self__)
     - Memory wrapper objects exposing _store.get_all()
+
+    Stores with a change log (EnhancedMemoryStore) are consolidated
+    incrementally, processing only memories changed since the last call.
     """
     from .learning import consolidate_learnings as _consolidate
 
@@ -27,7 +37,13 @@ def consolidate_learnings(source):
     if isinstance(source, (list, tuple)):
         return _consolidate(list(source))
 
-    # 2) Objects exposing get_all()
+    # 2) Stores with a change log, directly or behind a Memory wrapper,
+    #    consolidate incrementally from their last run
+    store = getattr(source, '_store', source)
+    if hasattr(store, 'changes_since') and hasattr(store, 'consolidate_learnings'):
+        return store.consolidate_learnings()
+
+    # 3) Objects exposing get_all()
     if hasattr(source, 'get_all'):
         try:
             memories = source.get_all()
@@ -37,7 +53,7 @@ def consolidate_learnings(source):
             import logging
             logging.debug(f"Method get_all() failed: {e}")
 
-    # 3) Memory wrapper exposing _store.get_all()
+    # 4) Memory wrapper exposing _store.get_all()
     if hasattr(source, '_store') and hasattr(getattr(source, '_store'), 'get_all'):
         try:
             memories = source._store.get_all()  # mypy: disable-error-code="attr-defined"
@@ -47,7 +63,7 @@ def consolidate_learnings(source):
             import logging
             logging.debug(f"Method get_all() failed: {e}")
 
-    # 4) Bound method case (e.g., memory.get_all)
+    # 5) Bound method case (e.g., memory.get_all)
     if hasattr(source, '__self__'):
         store_obj = getattr(source, '__self__')
         if hasattr(store_obj, 'get_all'):
@@ -64,8 +80,16 @@ from .swarm_memory import SwarmMemory, SwarmMemoryStore, MemoryPriority
 
 from .vector_store import VectorStore, SimilarityResult, EnhancedSwarmMemoryStore
 
+from .vector_index import EmbeddingMatrix, IVFIndex
+
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+
 from .enhanced_memory_store import EnhancedMemoryStore, create_enhanced_memory_store
 
+from .snapshot import SnapshotError, SnapshotScheduler
+
+from .learning_pipeline import LearningPipeline
+
 __version__ = "1.0.0"
 
 __all__ = [
@@ -76,12 +100,21 @@ __all__ = [
     # Enhanced memory with VectorStore integration
     "EnhancedMemoryStore",
     "create_enhanced_memory_store",
+    "SnapshotError",
+    "SnapshotScheduler",
+    "LearningPipeline",
     # Firestore backend
     "FirestoreStore",
     "create_firestore_store",
+    # SQLite backend
+    "SQLiteStore",
+    "create_sqlite_store",
+    "create_memory_store",
     # Learning and analysis
     "consolidate_learnings",
     "generate_learning_report",
+    "IncrementalConsolidator",
+    "LearningAggregates",
     # Session management
     "create_session_transcript",
     # Swarm memory features
@@ -92,4 +125,8 @@ __all__ = [
     "VectorStore",
     "SimilarityResult",
     "EnhancedSwarmMemoryStore",
+    "EmbeddingMatrix",
+    "IVFIndex",
+    "EmbeddingCache",
+    "get_embedding_cache",
 ]
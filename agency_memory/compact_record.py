@@ -0,0 +1,206 @@
+"""
+Compact internal record layouts for the in-memory stores.
+
+Stores used to keep each memory as a Pydantic MemoryRecord or a free-form
+dict, paying for a per-record __dict__, repeated key strings, ISO timestamp
+strings and private copies of every tag. The records here use __slots__,
+interned tags and agent ids, epoch-float timestamps and shared enum
+members; stores convert them to MemoryRecord (or dicts) only at their API
+boundaries.
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, cast
+
+from shared.models.memory import MemoryMetadata, MemoryPriority, MemoryRecord
+from shared.type_definitions.json import JSONValue
+
+
+# Compared against on every store; never handed out, so never mutated
+_DEFAULT_METADATA = MemoryMetadata()
+
+
+def intern_tags(tags: Iterable[Any]) -> Tuple[str, ...]:
+    """Unique string tags in order, interned so equal tags share one object."""
+    return tuple(dict.fromkeys(sys.intern(tag) for tag in tags if isinstance(tag, str)))
+
+
+def to_epoch(value: Any) -> float:
+    """Epoch seconds for a datetime, ISO string or number."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def to_iso(epoch: float) -> str:
+    """ISO string for epoch seconds, as datetime.now().isoformat() writes it."""
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+class CompactRecord:
+    """
+    Slot-based form of a MemoryRecord.
+
+    Metadata is only kept when it differs from the default MemoryMetadata(),
+    which is what InMemoryStore writes for every record.
+    """
+
+    __slots__ = ("key", "content", "tags", "timestamp", "priority", "metadata", "ttl_seconds", "embedding")
+
+    def __init__(
+        self,
+        key: str,
+        content: JSONValue,
+        tags: Tuple[str, ...],
+        timestamp: float,
+        priority: MemoryPriority = MemoryPriority.MEDIUM,
+        metadata: Optional[MemoryMetadata] = None,
+        ttl_seconds: Optional[int] = None,
+        embedding: Optional[Tuple[float, ...]] = None,
+    ):
+        self.key = key
+        self.content = content
+        self.tags = tags
+        self.timestamp = timestamp
+        self.priority = priority
+        self.metadata = metadata
+        self.ttl_seconds = ttl_seconds
+        self.embedding = embedding
+
+    @classmethod
+    def from_record(cls, record: MemoryRecord) -> "CompactRecord":
+        """Compact a validated MemoryRecord."""
+        metadata = record.metadata
+        if metadata == _DEFAULT_METADATA:
+            metadata = None
+        elif metadata.agent_id is not None:
+            metadata.agent_id = sys.intern(metadata.agent_id)
+        return cls(
+            key=record.key,
+            content=record.content,
+            tags=intern_tags(record.tags),
+            timestamp=record.timestamp.timestamp(),
+            priority=record.priority,
+            metadata=metadata,
+            ttl_seconds=record.ttl_seconds,
+            embedding=tuple(record.embedding) if record.embedding is not None else None,
+        )
+
+    @property
+    def agent_id(self) -> Optional[str]:
+        return self.metadata.agent_id if self.metadata is not None else None
+
+    def to_record(self) -> MemoryRecord:
+        """Public MemoryRecord for this record (fields were validated on the way in)."""
+        return MemoryRecord.model_construct(
+            key=self.key,
+            content=self.content,
+            tags=list(self.tags),
+            timestamp=datetime.fromtimestamp(self.timestamp),
+            priority=self.priority,
+            metadata=self.metadata.model_copy(deep=True) if self.metadata is not None else MemoryMetadata(),
+            ttl_seconds=self.ttl_seconds,
+            embedding=list(self.embedding) if self.embedding is not None else None,
+        )
+
+
+class SwarmRecord(Mapping):
+    """
+    Slot-based SwarmMemoryStore memory.
+
+    Store code uses the attributes (timestamps as epoch floats, priority as
+    the shared MemoryPriority member). The mapping interface reproduces the
+    dict layout the store used to keep, with ISO timestamp strings, so
+    to_dict() is what the store hands out at its API boundaries. ttl_seconds
+    is attribute-only, as it never was part of that layout.
+    """
+
+    __slots__ = (
+        "key",
+        "content",
+        "tags",
+        "agent_id",
+        "priority",
+        "is_shared",
+        "timestamp",
+        "access_count",
+        "last_accessed",
+        "ttl_seconds",
+    )
+
+    FIELDS = (
+        "key",
+        "namespaced_key",
+        "content",
+        "tags",
+        "agent_id",
+        "priority",
+        "is_shared",
+        "timestamp",
+        "access_count",
+        "last_accessed",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        content: Any,
+        tags: Tuple[str, ...],
+        agent_id: str,
+        priority: int,
+        is_shared: bool,
+        timestamp: float,
+        access_count: int = 0,
+        last_accessed: Optional[float] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self.key = key
+        self.content = content
+        self.tags = tags
+        self.agent_id = sys.intern(agent_id)
+        self.priority = priority
+        self.is_shared = is_shared
+        self.timestamp = timestamp
+        self.access_count = access_count
+        self.last_accessed = timestamp if last_accessed is None else last_accessed
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def namespaced_key(self) -> str:
+        return f"{self.agent_id}:{self.key}"
+
+    def __getitem__(self, name: str) -> Any:
+        if name == "timestamp" or name == "last_accessed":
+            return to_iso(getattr(self, name))
+        if name == "tags":
+            return list(self.tags)
+        if name == "priority":
+            return int(self.priority)
+        if name in self.FIELDS:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        if name == "timestamp" or name == "last_accessed":
+            value = to_epoch(value)
+        elif name == "tags":
+            value = intern_tags(value)
+        elif name not in self.FIELDS or name == "namespaced_key":
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def to_dict(self) -> Dict[str, JSONValue]:
+        """The record as the plain dict SwarmMemoryStore used to store."""
+        return cast(Dict[str, JSONValue], {name: self[name] for name in self.FIELDS})
+
+    copy = to_dict
@@ -0,0 +1,317 @@
+"""
+Persistent embedding cache shared across processes.
+
+Embeddings are keyed by (provider, model, content hash) in a SQLite database
+running in WAL mode, so several agency processes can read and write the same
+cache concurrently. Entries carry a last-used timestamp and the least recently
+used ones are evicted once the cache exceeds ``max_entries``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from shared.type_definitions.json import JSONValue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join("logs", "embeddings", "embedding_cache.sqlite3")
+
+# SQLite caps the number of bound parameters per statement
+_SQL_BATCH = 500
+
+T = TypeVar("T")
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Whether error means another connection holds the database (SQLITE_BUSY or an extended code)."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def calculate_content_hash(content: Any) -> str:
+    """
+    Stable SHA-256 hex digest of content.
+
+    Strings are hashed as their JSON encoding, so the digest matches the one
+    computed for the same value nested in a memory record.
+
+    Args:
+        content: Any JSON-serializable value
+
+    Returns:
+        64-character hex digest
+    """
+    content_str = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed LRU cache of embedding vectors.
+
+    Vectors are stored as float32 blobs. Each thread gets its own connection
+    in WAL mode. Writes take the write lock up front (BEGIN IMMEDIATE) and are
+    retried while another process holds it, for up to ``timeout`` seconds.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000, timeout: float = 30.0):
+        """
+        Initialize EmbeddingCache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            max_entries: Entries kept before least recently used ones are evicted
+            timeout: Seconds to wait on a database locked by another process
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        def create(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (provider, model, content_hash)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+
+        self._write(create)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are opened explicitly by _write
+            conn = sqlite3.connect(self.path, timeout=self._timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, statements: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run statements in one write transaction.
+
+        A deferred transaction that reads before it writes fails with
+        SQLITE_BUSY without waiting when another process committed in
+        between, so the write lock is taken before anything is read. Busy
+        errors are retried until the timeout.
+
+        Raises:
+            sqlite3.Error: The write failed or the database stayed locked
+        """
+        conn = self._connection()
+        deadline = time.monotonic() + self._timeout
+        delay = 0.001
+        while True:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    result = statements(conn)
+                    conn.execute("COMMIT")
+                    return result
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+
+    def get_many(self, provider: str, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            provider: Embedding provider name
+            model: Embedding model name
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of content hash to vector for the hashes found
+        """
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        if not unique:
+            return found
+
+        conn = self._connection()
+        try:
+            for start in range(0, len(unique), _SQL_BATCH):
+                chunk = unique[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings "
+                    f"WHERE provider = ? AND model = ? AND content_hash IN ({placeholders})",
+                    (provider, model, *chunk),
+                ).fetchall()
+                for content_hash, blob in rows:
+                    found[content_hash] = array("f", blob).tolist()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+        if found:
+            now = time.time()
+            hit_hashes = list(found)
+
+            def touch(conn: sqlite3.Connection) -> None:
+                for start in range(0, len(hit_hashes), _SQL_BATCH):
+                    chunk = hit_hashes[start : start + _SQL_BATCH]
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(
+                        f"UPDATE embeddings SET last_used = ? "
+                        f"WHERE provider = ? AND model = ? AND content_hash IN ({placeholders})",
+                        (now, provider, model, *chunk),
+                    )
+
+            try:
+                self._write(touch)
+            except sqlite3.Error as e:
+                # The vectors are still valid; only their LRU position is stale
+                logger.warning(f"Embedding cache last-used update failed: {e}")
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, provider: str, model: str, items: Iterable[Tuple[str, Sequence[float]]]) -> int:
+        """
+        Store vectors and evict least recently used entries over the limit.
+
+        Args:
+            provider: Embedding provider name
+            model: Embedding model name
+            items: (content_hash, vector) pairs
+
+        Returns:
+            Number of vectors written
+
+        Raises:
+            sqlite3.Error: The write failed or the database stayed locked past the timeout
+        """
+        now = time.time()
+        rows = [
+            (provider, model, content_hash, array("f", vector).tobytes(), now)
+            for content_hash, vector in items
+        ]
+        if not rows:
+            return 0
+
+        def insert(conn: sqlite3.Connection) -> int:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(provider, model, content_hash, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (excess,),
+                )
+            return max(0, excess)
+
+        evicted = self._write(insert)
+        if evicted:
+            with self._stats_lock:
+                self.evictions += evicted
+        return len(rows)
+
+    def __len__(self) -> int:
+        try:
+            return int(self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+        except sqlite3.Error:
+            return 0
+
+    def clear(self) -> None:
+        """Delete every cached vector."""
+        self._write(lambda conn: conn.execute("DELETE FROM embeddings"))
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get_stats(self) -> Dict[str, JSONValue]:
+        """
+        Get cache statistics for this process.
+
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": len(self),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Global cache instances, one per database path
+_default_caches: Dict[str, EmbeddingCache] = {}
+_default_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(path: Optional[str] = None) -> Optional[EmbeddingCache]:
+    """
+    Get the shared embedding cache for this process.
+
+    Configured through AGENCY_EMBEDDING_CACHE (set to "false" to disable)
+    and AGENCY_EMBEDDING_CACHE_PATH.
+
+    Args:
+        path: Database file (defaults to AGENCY_EMBEDDING_CACHE_PATH or logs/embeddings/)
+
+    Returns:
+        EmbeddingCache, or None if caching is disabled or the database cannot be opened
+    """
+    if os.getenv("AGENCY_EMBEDDING_CACHE", "true").lower() != "true":
+        return None
+
+    target = os.path.abspath(path or os.getenv("AGENCY_EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+    with _default_caches_lock:
+        cache = _default_caches.get(target)
+        if cache is None:
+            try:
+                max_entries = int(os.getenv("AGENCY_EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+                cache = EmbeddingCache(target, max_entries=max_entries)
+            except (OSError, sqlite3.Error, ValueError) as e:
+                logger.warning(f"Embedding cache unavailable at {target}: {e}")
+                return None
+            _default_caches[target] = cache
+        return cache
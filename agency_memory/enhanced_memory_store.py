@@ -6,13 +6,35 @@ Automatically populates VectorStore during normal memory operations.
 """
 
 import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional, cast
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, cast
 from shared.type_definitions.json import JSONValue
 from .memory import MemoryStore
-from shared.models.memory import MemorySearchResult, MemoryRecord, MemoryPriority, MemoryMetadata
+from shared.models.memory import MemorySearchResult, MemoryRecord, MemoryPriority, MemoryMetadata, MemoryQuery
 from .vector_store import VectorStore, SimilarityResult
+from .tag_index import TagIndex
+from .timing_wheel import TimingWheel
+from .compact_record import to_epoch
+from .learning import IncrementalConsolidator, format_learning_report
+from .learning_pipeline import LearningPipeline
+from .learning_patterns import HANDOFF_TAGS, TOOL_NAMES, LearningPatternIndex, PatternContribution, error_type_of
 from .type_conversion_utils import MemoryConverter, create_memory_converter
+from .snapshot import (
+    SnapshotError,
+    SnapshotScheduler,
+    StoreSnapshot,
+    capture_store,
+    paused_gc,
+    read_store_snapshot,
+    write_snapshot,
+)
 import json
 
 logger = logging.getLogger(__name__)
@@ -26,44 +48,84 @@ class EnhancedMemoryStore(MemoryStore):
     ensuring that all stored memories are available for both tag-based and semantic search.
     """
 
-    def __init__(self, vector_store: Optional[VectorStore] = None, embedding_provider: str = "sentence-transformers"):
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        embedding_provider: str = "sentence-transformers",
+        clock: Optional[Callable[[], float]] = None,
+    ):
         """
         Initialize enhanced memory store.
 
         Args:
             vector_store: Optional VectorStore instance
             embedding_provider: Embedding provider for semantic search
+            clock: Source of epoch seconds for TTL expiry (default time.time)
         """
         self._memories: Dict[str, Dict[str, JSONValue]] = {}
+        self._tag_index = TagIndex()
+        # TTL deadlines: expired memories are hidden from reads at once and
+        # reclaimed in batches by expire_memories()
+        self._expiry = TimingWheel(clock=clock or time.time)
         self.vector_store = vector_store or VectorStore(embedding_provider=embedding_provider)
         self._learning_triggers: List[str] = []
         self.memory_converter = create_memory_converter()
+        # Bumped on every mutation so snapshots can skip unchanged stores;
+        # each stored or deleted memory gets its own revision in the change
+        # log, which incremental learning reads through changes_since()
+        self.store_id = uuid.uuid4().hex
+        self.revision = 0
+        self._key_revisions: Dict[str, int] = {}
+        self._change_log: List[Tuple[int, str]] = []
+        self._change_floor = 0
+        self.snapshot_scheduler: Optional[SnapshotScheduler] = None
+        self.learning_consolidator: Optional[IncrementalConsolidator] = None
+        self._pattern_index: Optional[LearningPatternIndex] = None
+        # Embedding and trigger evaluation of stored memories run here once
+        # start_learning_pipeline() is called; the lock serializes VectorStore
+        # access between callers and pipeline workers
+        self.learning_pipeline: Optional[LearningPipeline[Tuple[Dict[str, JSONValue], int]]] = None
+        self._vector_lock = threading.RLock()
 
         logger.info(f"EnhancedMemoryStore initialized with embedding provider: {embedding_provider}")
 
-    def store(self, key: str, content: Any, tags: List[str]) -> None:
+    def store(self, key: str, content: Any, tags: List[str], ttl_seconds: Optional[int] = None) -> None:
         """
         Store content with automatic VectorStore integration.
 
+        The memory is searchable by tag as soon as this returns. With a
+        learning pipeline running, embedding and learning trigger evaluation
+        happen on its workers; semantic searches wait for them, learning
+        triggers are eventually consistent.
+
         Args:
             key: Unique memory key
             content: Content to store
             tags: Tags for categorization
+            ttl_seconds: Expire the memory this many seconds after storing it
         """
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.expire_memories()
+
         # Create memory record with timestamp
-        memory_record = {
-            "key": key,
-            "content": content,
-            "tags": tags,
-            "timestamp": datetime.now().isoformat(),
-        }
+        memory_record = self._new_record(key, content, tags, ttl_seconds)
 
         # Store in traditional memory
         self._memories[key] = memory_record
+        self._index_tags(key, memory_record)
+        self._schedule_expiry(key, ttl_seconds)
+        self._record_change(key)
+
+        if self.learning_pipeline is not None:
+            self.learning_pipeline.submit((memory_record, len(self._memories)))
+            logger.debug(f"Stored memory with key: {key}, tags: {tags}")
+            return
 
         # Add to vector store for semantic search
         try:
-            self.vector_store.add_memory(key, memory_record)
+            with self._vector_lock:
+                self.vector_store.add_memory(key, memory_record)
             logger.debug(f"Added memory to VectorStore: {key}")
         except Exception as e:
             logger.warning(f"Failed to add memory to VectorStore: {e}")
@@ -73,15 +135,288 @@ class EnhancedMemoryStore(MemoryStore):
 
         logger.debug(f"Stored memory with key: {key}, tags: {tags}")
 
-    def search(self, tags: List[str]) -> MemorySearchResult:
+    def store_batch(self, items: Iterable[Tuple[str, Any, List[str]]], ttl_seconds: Optional[int] = None) -> int:
+        """
+        Store many memories and embed them in batched calls.
+
+        Args:
+            items: (key, content, tags) tuples
+            ttl_seconds: Expire every memory of the batch this many seconds
+                after storing it
+
+        Returns:
+            Number of memories stored
+        """
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.expire_memories()
+
+        records: List[Dict[str, JSONValue]] = []
+        for key, content, tags in items:
+            memory_record = self._new_record(key, content, tags, ttl_seconds)
+            self._memories[key] = memory_record
+            self._index_tags(key, memory_record)
+            self._schedule_expiry(key, ttl_seconds)
+            self._record_change(key)
+            records.append(memory_record)
+
+        if self.learning_pipeline is not None:
+            for memory_record in records:
+                self.learning_pipeline.submit((memory_record, len(self._memories)))
+            logger.debug(f"Stored batch of {len(records)} memories")
+            return len(records)
+
+        try:
+            with self._vector_lock:
+                self.vector_store.add_memories(
+                    (cast(str, record["key"]), record) for record in records
+                )
+        except Exception as e:
+            logger.warning(f"Failed to add memory batch to VectorStore: {e}")
+
+        for memory_record in records:
+            self._check_learning_triggers(memory_record)
+
+        logger.debug(f"Stored batch of {len(records)} memories")
+        return len(records)
+
+    def _process_writes(self, writes: List[Tuple[Dict[str, JSONValue], int]]) -> None:
+        """
+        Embed and evaluate learning triggers for a batch of pipeline writes.
+
+        Args:
+            writes: (memory record, store size when it was stored) pairs
+        """
+        with self._vector_lock:
+            # Skip records deleted or overwritten since they were queued
+            current = [
+                (cast(str, record["key"]), record)
+                for record, _ in writes
+                if self._memories.get(cast(str, record["key"])) is record
+            ]
+            try:
+                self.vector_store.add_memories(current)
+            except Exception as e:
+                logger.warning(f"Failed to add memory batch to VectorStore: {e}")
+
+        for memory_record, memory_count in writes:
+            self._check_learning_triggers(memory_record, memory_count)
+
+    def start_learning_pipeline(
+        self,
+        workers: int = 1,
+        max_queue: int = 10_000,
+        backpressure: str = "block",
+        batch_size: Optional[int] = None,
+    ) -> LearningPipeline[Tuple[Dict[str, JSONValue], int]]:
+        """
+        Move embedding and learning trigger evaluation off store().
+
+        Args:
+            workers: Worker threads
+            max_queue: Queued memories before backpressure applies
+            backpressure: "block", "inline" or "drop_oldest" (dropped memories
+                are embedded by the next optimize_vector_store())
+            batch_size: Memories per embedding batch (default: the VectorStore's)
+
+        Returns:
+            Running LearningPipeline (stopped automatically at exit)
+        """
+        self.stop_learning_pipeline()
+        pipeline = LearningPipeline(
+            self._process_writes,
+            workers=workers,
+            max_queue=max_queue,
+            backpressure=backpressure,
+            batch_size=batch_size or self.vector_store._embedding_batch_size,
+            name="memory-learning",
+        )
+        self.learning_pipeline = pipeline.start()
+        return pipeline
+
+    def stop_learning_pipeline(self, drain: bool = True) -> None:
+        """Stop the learning pipeline; later writes are processed in store() again."""
+        pipeline, self.learning_pipeline = self.learning_pipeline, None
+        if pipeline is not None:
+            pipeline.stop(drain=drain)
+
+    def flush_learning(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until memories stored so far are embedded and trigger-checked.
+
+        Args:
+            timeout: Most seconds to wait (None waits indefinitely)
+
+        Returns:
+            True unless the timeout expired first
+        """
+        pipeline = self.learning_pipeline
+        return pipeline.flush(timeout) if pipeline is not None else True
+
+    def get_learning_pipeline_stats(self) -> Dict[str, JSONValue]:
+        """Queue depth, throughput and lag of the learning pipeline."""
+        pipeline = self.learning_pipeline
+        return pipeline.metrics() if pipeline is not None else {"running": False}
+
+    @contextmanager
+    def _vector_reads(self) -> Iterator[VectorStore]:
+        """VectorStore with every memory stored so far added to it."""
+        self.flush_learning()
+        with self._vector_lock:
+            yield self.vector_store
+
+    @staticmethod
+    def _new_record(key: str, content: Any, tags: List[str], ttl_seconds: Optional[int]) -> Dict[str, JSONValue]:
+        """Memory record for a store; ttl_seconds is only recorded when set."""
+        memory_record: Dict[str, JSONValue] = {
+            "key": key,
+            "content": content,
+            "tags": cast(JSONValue, tags),
+            "timestamp": datetime.now().isoformat(),
+        }
+        if ttl_seconds is not None:
+            memory_record["ttl_seconds"] = ttl_seconds
+        return memory_record
+
+    def _schedule_expiry(self, key: str, ttl_seconds: Optional[int]) -> None:
+        """Schedule key to expire ttl_seconds from now, or clear its TTL."""
+        if ttl_seconds is not None:
+            self._expiry.schedule(key, self._expiry.clock() + ttl_seconds)
+        else:
+            self._expiry.cancel(key)
+
+    def expire_memories(self) -> int:
+        """
+        Reclaim every memory whose TTL has run out.
+
+        Expired memories are already hidden from reads; this removes them
+        from the store, the tag index and the VectorStore in one batch and
+        logs each as a deletion in the change log. Writes and changes_since()
+        call it, so reclamation keeps pace with writes and learning.
+
+        Returns:
+            Number of memories removed
+        """
+        expired = [key for key in self._expiry.advance() if self._memories.pop(key, None) is not None]
+        if not expired:
+            return 0
+        for key in expired:
+            self._tag_index.remove(key)
+            self._record_change(key)
+        try:
+            with self._vector_lock:
+                for key in expired:
+                    self.vector_store.remove_memory(key)
+        except Exception as e:
+            logger.warning(f"Failed to remove expired memories from VectorStore: {e}")
+        logger.debug(f"Expired {len(expired)} memories")
+        return len(expired)
+
+    def _unexpired(self, keys: Iterable[str]) -> Iterable[str]:
+        """Keys whose TTL has not run out (all of them when nothing has a TTL)."""
+        if not self._expiry:
+            return keys
+        now = self._expiry.clock()
+        return (key for key in keys if not self._expiry.is_expired(key, now))
+
+    def _live_memories(self) -> List[Dict[str, JSONValue]]:
+        """Stored memories whose TTL has not run out."""
+        if not self._expiry:
+            return list(self._memories.values())
+        return [self._memories[key] for key in self._unexpired(list(self._memories))]
+
+    def _index_tags(self, key: str, memory_record: Dict[str, JSONValue]) -> None:
+        """Add memory_record to the tag index."""
+        self._tag_index.add(
+            key,
+            self.memory_converter.extract_tags_list(memory_record.get("tags", [])),
+            self.memory_converter.safe_string_conversion(memory_record.get("timestamp")),
+        )
+
+    def _record_change(self, key: str) -> None:
+        """Give the latest store or delete of key a new revision."""
+        self.revision += 1
+        self._key_revisions[key] = self.revision
+        self._change_log.append((self.revision, key))
+        if len(self._change_log) > 2 * len(self._memories) + 1024:
+            self._compact_change_log()
+
+    def _compact_change_log(self) -> None:
+        """Drop superseded log entries, and deletions once they outnumber live memories."""
+        deleted = [key for key in self._key_revisions if key not in self._memories]
+        if len(deleted) > len(self._memories):
+            # Readers behind the newest dropped deletion have to start over
+            self._change_floor = max(self._change_floor, max(self._key_revisions[key] for key in deleted))
+            for key in deleted:
+                del self._key_revisions[key]
+        self._change_log = sorted((revision, key) for key, revision in self._key_revisions.items())
+
+    def changes_since(
+        self, revision: int
+    ) -> Tuple[int, bool, List[Tuple[str, Optional[Dict[str, JSONValue]]]]]:
+        """
+        Memories stored or deleted after revision.
+
+        Args:
+            revision: Revision returned by a previous call (0 for everything)
+
+        Returns:
+            (current revision, reset, changes). changes holds each changed key
+            once, oldest change first, with its memory in get_all() record form
+            (None if it was deleted). reset is True when revision predates the
+            retained change log; changes then hold every memory, and state
+            built from earlier calls must be discarded.
+        """
+        self.expire_memories()
+        reset = revision < self._change_floor
+        start = 0 if reset else bisect_left(self._change_log, (revision + 1,))
+        changes: List[Tuple[str, Optional[Dict[str, JSONValue]]]] = []
+        for changed_at, key in self._change_log[start:]:
+            if self._key_revisions.get(key) != changed_at:
+                continue  # Superseded by a later change
+            memory = self._memories.get(key)
+            record = self.memory_converter.memory_dict_to_record(memory) if memory is not None else None
+            if record is not None:
+                changes.append((key, self.memory_converter.record_to_dict(record)))
+            elif not reset:
+                changes.append((key, None))
+        return self.revision, reset, changes
+
+    def delete(self, key: str) -> bool:
         """
-        Return memories that have any of the specified tags.
+        Delete a memory from the store and the VectorStore.
+
+        Args:
+            key: Memory key
+
+        Returns:
+            True if the memory existed
+        """
+        if self._memories.pop(key, None) is None:
+            return False
+        self._tag_index.remove(key)
+        self._expiry.cancel(key)
+        self._record_change(key)
+        try:
+            with self._vector_lock:
+                self.vector_store.remove_memory(key)
+        except Exception as e:
+            logger.warning(f"Failed to remove memory from VectorStore: {e}")
+        return True
+
+    def search(
+        self, tags: List[str], match_all: bool = False, limit: Optional[int] = None
+    ) -> MemorySearchResult:
+        """
+        Return memories that have any (or all) of the specified tags.
 
         Args:
             tags: List of tags to search for
+            match_all: Require every tag instead of at least one
+            limit: Return only the newest N matches
 
         Returns:
-            List of matching memory records
+            List of matching memory records, newest first
         """
         if not tags:
             return MemorySearchResult(
@@ -91,20 +426,17 @@ class EnhancedMemoryStore(MemoryStore):
                 execution_time_ms=0
             )
 
-        matches = []
-        tag_set = set(tags)
-
-        for memory in self._memories.values():
-            tags_value = memory.get("tags", [])
-            memory_tags = set(self.memory_converter.extract_tags_list(tags_value))
-            if tag_set.intersection(memory_tags):
-                matches.append(memory)
-
-        # Sort by timestamp (newest first) with type guard
-        def sort_key(x: Dict[str, JSONValue]) -> str:
-            timestamp = x.get("timestamp")
-            return self.memory_converter.safe_string_conversion(timestamp)
-        matches.sort(key=sort_key, reverse=True)
+        # Newest first, straight from the tag index
+        if self._expiry:
+            # Stream so expired keys don't count against the limit
+            if match_all:
+                keys = self._tag_index.iter_query(all_tags=tags)
+            else:
+                keys = self._tag_index.iter_query(any_tags=tags)
+            selected: Iterable[str] = islice(self._unexpired(keys), limit)
+        else:
+            selected = self._tag_index.query(tags, match_all=match_all, limit=limit)
+        matches = [self._memories[key] for key in selected]
         logger.debug(f"Found {len(matches)} memories matching tags: {tags}")
 
         # Convert to MemorySearchResult
@@ -138,13 +470,14 @@ class EnhancedMemoryStore(MemoryStore):
         """
         try:
             # Get all memories for search
-            all_memories = list(self._memories.values())
+            all_memories = self._live_memories()
 
             if not all_memories:
                 return []
 
             # Perform semantic search
-            results = self.vector_store.hybrid_search(query, all_memories, top_k)
+            with self._vector_reads() as vector_store:
+                results = vector_store.hybrid_search(query, all_memories, top_k)
 
             # Filter by minimum similarity and convert to memory format
             filtered_results = []
@@ -198,7 +531,8 @@ class EnhancedMemoryStore(MemoryStore):
             return []
 
         try:
-            semantic_results = self.vector_store.hybrid_search(query, memories, top_k)
+            with self._vector_reads() as vector_store:
+                semantic_results = vector_store.hybrid_search(query, memories, top_k)
             return [
                 self.memory_converter.add_relevance_score(
                     result.memory, result.similarity_score, result.search_type
@@ -272,16 +606,42 @@ class EnhancedMemoryStore(MemoryStore):
             # Return all memories
             return self._format_all_memories_results(top_k)
 
-    def get_all(self) -> MemorySearchResult:
-        """Return all memories sorted by timestamp (newest first)."""
-        all_memories = list(self._memories.values())
+    def query(self, query: MemoryQuery) -> Iterator[MemoryRecord]:
+        """
+        Stream memories matching a structured query, newest first.
+
+        Filters, cursor and limit are resolved by the tag index; only the
+        returned memories are converted to MemoryRecord.
+
+        Args:
+            query: Structured memory query
 
-        # Sort by timestamp with type guard
-        def sort_key(x: Dict[str, JSONValue]) -> str:
-            timestamp = x.get("timestamp")
-            return self.memory_converter.safe_string_conversion(timestamp)
+        Returns:
+            Iterator over matching memory records
+        """
+        cursor = query.decode_cursor()
+        keys = self._tag_index.iter_query(
+            all_tags=query.all_tags,
+            any_tags=query.any_tags,
+            exclude_tags=query.exclude_tags,
+            # The index is keyed by ISO timestamp strings
+            since=query.since.isoformat() if query.since else None,
+            until=query.until.isoformat() if query.until else None,
+            after=(cursor[0].isoformat(), cursor[1]) if cursor else None,
+        )
+        records = (
+            self.memory_converter.memory_dict_to_record(self._memories[key])
+            for key in self._unexpired(keys)
+            if key in self._memories
+        )
+        records = (r for r in records if r is not None)
+        if query.agent_id is not None:
+            records = (r for r in records if r.metadata.agent_id == query.agent_id)
+        return islice(records, query.limit)
 
-        all_memories.sort(key=sort_key, reverse=True)
+    def get_all(self) -> MemorySearchResult:
+        """Return all memories sorted by timestamp (newest first)."""
+        all_memories = [self._memories[key] for key in self._unexpired(self._tag_index.newest())]
         logger.debug(f"Retrieved all {len(all_memories)} memories")
 
         # Convert to MemorySearchResult
@@ -304,6 +664,9 @@ class EnhancedMemoryStore(MemoryStore):
         """
         Extract learning patterns from stored memories.
 
+        Pattern statistics are kept up to date incrementally, so each call
+        only classifies the memories changed since the previous one.
+
         Args:
             min_confidence: Minimum confidence threshold for patterns
 
@@ -311,35 +674,16 @@ class EnhancedMemoryStore(MemoryStore):
             List of extracted learning patterns
         """
         try:
-            all_result = self.get_all()
-            all_memories = []
-            for record in all_result.records:
-                memory_dict: Dict[str, JSONValue] = {
-                    "key": record.key,
-                    "content": record.content,
-                    "tags": cast(JSONValue, record.tags),
-                    "timestamp": record.timestamp.isoformat(),
-                }
-                all_memories.append(memory_dict)
+            index = self._update_pattern_index()
+            evidence = self._pattern_evidence
             patterns: List[Dict[str, JSONValue]] = []
 
             # Pattern 1: Successful tool usage patterns
-            tool_patterns = self._extract_tool_patterns(all_memories)
-            for p in tool_patterns:
-                conf = p.get('confidence', 0)
-                if isinstance(conf, (int, float)) and conf >= min_confidence:
-                    patterns.append(p)
-
             # Pattern 2: Error resolution patterns
-            error_patterns = self._extract_error_patterns(all_memories)
-            for p in error_patterns:
-                conf = p.get('confidence', 0)
-                if isinstance(conf, (int, float)) and conf >= min_confidence:
-                    patterns.append(p)
-
             # Pattern 3: Agent interaction patterns
-            interaction_patterns = self._extract_interaction_patterns(all_memories)
-            for p in interaction_patterns:
+            for p in chain(
+                index.tool_patterns(evidence), index.error_patterns(evidence), index.interaction_patterns(evidence)
+            ):
                 conf = p.get('confidence', 0)
                 if isinstance(conf, (int, float)) and conf >= min_confidence:
                     patterns.append(p)
@@ -351,145 +695,70 @@ class EnhancedMemoryStore(MemoryStore):
             logger.error(f"Error extracting learning patterns: {e}")
             return []
 
-    def _extract_tool_patterns(self, memories: List[Dict[str, JSONValue]]) -> List[Dict[str, JSONValue]]:
-        """Extract tool usage patterns from memories."""
-        patterns: List[Dict[str, JSONValue]] = []
-
-        # Find tool-related memories
-        tool_memories = []
-        for m in memories:
-            tags = m.get('tags', [])
-            tags_list = self.memory_converter.extract_tags_list(tags)
-            if any('tool' in tag for tag in tags_list):
-                tool_memories.append(m)
-
-        if len(tool_memories) < 3:
-            return patterns
-
-        # Group by tool type
-        tool_groups: Dict[str, List[Dict[str, JSONValue]]] = {}
-        for memory in tool_memories:
-            content = str(memory.get('content', ''))
-
-            # Extract tool names (simplified pattern matching)
-            for tool in ['Read', 'Write', 'Edit', 'Grep', 'Bash', 'TodoWrite']:
-                if tool in content:
-                    if tool not in tool_groups:
-                        tool_groups[tool] = []
-                    tool_groups[tool].append(memory)
-
-        # Create patterns for frequently used tools
-        for tool, tool_memories in tool_groups.items():
-            if len(tool_memories) >= 3:
-                # Check for success indicators
-                successful = [m for m in tool_memories if self._is_successful_memory(m)]
-                success_rate = len(successful) / len(tool_memories)
-
-                if success_rate > 0.7:
-                    patterns.append({
-                        'pattern_id': f'tool_success_{tool.lower()}',
-                        'type': 'tool_pattern',
-                        'tool': tool,
-                        'usage_count': len(tool_memories),
-                        'success_rate': success_rate,
-                        'confidence': min(0.9, len(tool_memories) / 10),
-                        'description': f'Tool {tool} shows high success rate ({success_rate:.1%})',
-                        'actionable_insight': f'Prioritize {tool} for similar tasks',
-                        'evidence': cast(JSONValue, tool_memories[:2])
-                    })
-
-        return patterns
-
-    def _extract_error_patterns(self, memories: List[Dict[str, JSONValue]]) -> List[Dict[str, JSONValue]]:
-        """Extract error resolution patterns from memories."""
-        patterns: List[Dict[str, JSONValue]] = []
-
-        # Find error-related memories
-        error_memories = []
-        for m in memories:
-            tags = m.get('tags', [])
-            tags_list = self.memory_converter.extract_tags_list(tags)
-            if any('error' in tag for tag in tags_list):
-                error_memories.append(m)
-
-        if len(error_memories) < 2:
-            return patterns
-
-        # Group by error types (simplified)
-        error_groups: Dict[str, List[Dict[str, JSONValue]]] = {}
-        for memory in error_memories:
-            content = str(memory.get('content', '')).lower()
-
-            # Simple error type detection
-            if 'permission' in content:
-                error_type = 'permission_error'
-            elif 'not found' in content or 'missing' in content:
-                error_type = 'file_not_found'
-            elif 'timeout' in content:
-                error_type = 'timeout_error'
-            elif 'connection' in content:
-                error_type = 'connection_error'
+    def _update_pattern_index(self) -> LearningPatternIndex:
+        """Fold memories changed since the last call into the pattern index."""
+        index = self._pattern_index
+        if index is None or index.store_id != self.store_id:
+            index = LearningPatternIndex(self.store_id)
+        revision, reset, changes = self.changes_since(index.high_water_mark)
+        if reset:
+            index = LearningPatternIndex(self.store_id)
+        for key, memory in changes:
+            entry = self._tag_index.order_of(key)
+            if memory is None or entry is None:
+                index.discard(key)
             else:
-                error_type = 'general_error'
-
-            if error_type not in error_groups:
-                error_groups[error_type] = []
-            error_groups[error_type].append(memory)
-
-        # Create patterns for common errors
-        for error_type, error_memories in error_groups.items():
-            if len(error_memories) >= 2:
-                # Check for resolution patterns
-                resolved = [m for m in error_memories if self._is_resolved_error(m)]
-                resolution_rate = len(resolved) / len(error_memories)
-
-                patterns.append({
-                    'pattern_id': f'error_resolution_{error_type}',
-                    'type': 'error_resolution',
-                    'error_type': error_type,
-                    'occurrence_count': len(error_memories),
-                    'resolution_rate': resolution_rate,
-                    'confidence': min(0.8, len(error_memories) / 5),
-                    'description': f'Error type {error_type} with {resolution_rate:.1%} resolution rate',
-                    'actionable_insight': f'Apply known resolution patterns for {error_type}',
-                    'evidence': cast(JSONValue, resolved[:2] if resolved else error_memories[:2])
-                })
-
-        return patterns
+                index.set(key, self._pattern_contribution((*entry, key), memory))
+        index.high_water_mark = revision
+        self._pattern_index = index
+        return index
+
+    def _pattern_contribution(
+        self, entry: Tuple[Any, int, str], memory: Dict[str, JSONValue]
+    ) -> PatternContribution:
+        """Classify one memory (in get_all() record form) for the pattern index."""
+        tags_list = self.memory_converter.extract_tags_list(memory.get('tags', []))
+        content = str(memory.get('content', ''))
+        tool = any('tool' in tag for tag in tags_list)
+        error = any('error' in tag for tag in tags_list)
+        return PatternContribution(
+            entry=entry,
+            tool=tool,
+            tools=tuple(name for name in TOOL_NAMES if name in content) if tool else (),
+            successful=self._is_successful_memory(memory),
+            error_type=error_type_of(content.lower()) if error else None,
+            resolved=error and self._is_resolved_error(memory),
+            handoff=any(keyword in tags_list for keyword in HANDOFF_TAGS),
+        )
 
-    def _extract_interaction_patterns(self, memories: List[Dict[str, JSONValue]]) -> List[Dict[str, JSONValue]]:
-        """Extract agent interaction patterns from memories."""
-        patterns: List[Dict[str, JSONValue]] = []
+    def _pattern_evidence(self, keys: List[str]) -> List[Dict[str, JSONValue]]:
+        """Evidence records for pattern keys, in the layout patterns have always used."""
+        evidence: List[Dict[str, JSONValue]] = []
+        for key in keys:
+            record = self.memory_converter.memory_dict_to_record(self._memories[key])
+            if record is not None:
+                evidence.append({
+                    "key": record.key,
+                    "content": record.content,
+                    "tags": cast(JSONValue, record.tags),
+                    "timestamp": record.timestamp.isoformat(),
+                })
+        return evidence
 
-        # Find handoff-related memories
-        handoff_memories = []
-        for m in memories:
-            tags = m.get('tags', [])
-            tags_list = self.memory_converter.extract_tags_list(tags)
-            if any(keyword in tags_list for keyword in ['handoff', 'agent', 'communication']):
-                handoff_memories.append(m)
+    def consolidate_learnings(self) -> Dict[str, JSONValue]:
+        """
+        Consolidate learnings over all memories, like learning.consolidate_learnings().
 
-        if len(handoff_memories) < 3:
-            return patterns
+        Aggregates are kept in learning_consolidator between calls, so only
+        memories changed since the previous call are processed.
+        """
+        if self.learning_consolidator is None:
+            self.learning_consolidator = IncrementalConsolidator(self)
+        return self.learning_consolidator.consolidate()
 
-        # Analyze handoff success
-        successful_handoffs = [m for m in handoff_memories if self._is_successful_memory(m)]
-        success_rate = len(successful_handoffs) / len(handoff_memories)
-
-        if success_rate > 0.6:
-            patterns.append({
-                'pattern_id': 'agent_interaction_success',
-                'type': 'interaction_pattern',
-                'interaction_type': 'handoff',
-                'total_interactions': len(handoff_memories),
-                'success_rate': success_rate,
-                'confidence': min(0.8, len(handoff_memories) / 8),
-                'description': f'Agent interactions have {success_rate:.1%} success rate',
-                'actionable_insight': 'Current handoff patterns are effective, maintain approach',
-                'evidence': cast(JSONValue, successful_handoffs[:2])
-            })
-
-        return patterns
+    def generate_learning_report(self, session_id: Optional[str] = None) -> str:
+        """Markdown report of consolidate_learnings(), like learning.generate_learning_report()."""
+        return format_learning_report(self.consolidate_learnings(), session_id)
 
     def _is_successful_memory(self, memory: Dict[str, JSONValue]) -> bool:
         """Check if a memory indicates success."""
@@ -503,8 +772,16 @@ class EnhancedMemoryStore(MemoryStore):
         resolution_indicators = ['resolved', 'fixed', 'solved', 'recovered', 'retry succeeded']
         return any(indicator in content for indicator in resolution_indicators)
 
-    def _check_learning_triggers(self, memory_record: Dict[str, JSONValue]) -> None:
-        """Check if memory triggers learning consolidation."""
+    def _check_learning_triggers(self, memory_record: Dict[str, JSONValue], memory_count: Optional[int] = None) -> None:
+        """
+        Check if memory triggers learning consolidation.
+
+        Args:
+            memory_record: Stored memory
+            memory_count: Store size when it was stored (default: the current size)
+        """
+        if memory_count is None:
+            memory_count = len(self._memories)
         tags = memory_record.get('tags', [])
         content = str(memory_record.get('content', '')).lower()
 
@@ -515,7 +792,7 @@ class EnhancedMemoryStore(MemoryStore):
             'error' in tags_list and 'resolved' in content,
             'optimization' in tags_list,
             'pattern' in tags_list,
-            len(self._memories) % 50 == 0  # Every 50 memories
+            memory_count % 50 == 0  # Every 50 memories
         ]
 
         if any(learning_trigger_conditions):
@@ -523,7 +800,7 @@ class EnhancedMemoryStore(MemoryStore):
                 'trigger_time': str(memory_record.get('timestamp', '')),
                 'trigger_key': str(memory_record.get('key', '')),
                 'trigger_reason': 'automatic_learning_consolidation',
-                'memory_count': len(self._memories)
+                'memory_count': memory_count
             }
             trigger_str = json.dumps(trigger_dict)  # Convert to string for the List[str] type
             self._learning_triggers.append(trigger_str)
@@ -545,11 +822,131 @@ class EnhancedMemoryStore(MemoryStore):
     def clear_learning_triggers(self) -> None:
         """Clear processed learning triggers."""
         self._learning_triggers.clear()
+        self.revision += 1
+
+    def save_snapshot(self, path: str) -> str:
+        """
+        Write records, embeddings and learning triggers to a snapshot file.
+
+        The file is replaced atomically, so this is safe to call while a
+        previous snapshot at path is being read.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            path
+        """
+        self.flush_learning()
+        with self._vector_lock:
+            sections = capture_store(self)
+        write_snapshot(path, sections)
+        logger.info(f"Saved memory snapshot with {len(self._memories)} memories to {path}")
+        return path
+
+    def load_snapshot(self, path: str, verify: bool = True) -> bool:
+        """
+        Warm-restore an empty store from a snapshot.
+
+        Embeddings are memory-mapped from the file instead of recomputed when
+        they were produced by the current embedding model, and the tag index
+        and searchable texts are adopted instead of rebuilt. Missing, truncated or
+        corrupted snapshots are ignored and leave the store unchanged.
+
+        Args:
+            path: Snapshot file
+            verify: Check section checksums
+
+        Returns:
+            True if the snapshot was loaded
+        """
+        if self._memories:
+            raise ValueError("Snapshots can only be loaded into an empty store")
+        with paused_gc():
+            try:
+                snapshot = read_store_snapshot(path, verify=verify)
+            except SnapshotError as e:
+                logger.warning(f"Ignoring memory snapshot: {e}")
+                return False
+            adopted = self._restore_snapshot(snapshot)
+
+        logger.info(f"Loaded memory snapshot from {path}: {len(self._memories)} memories, {adopted} embeddings reused")
+        return True
+
+    def _restore_snapshot(self, snapshot: StoreSnapshot) -> int:
+        """Install decoded snapshot state; returns the number of embeddings reused."""
+        records = snapshot["records"]
+        memories = {cast(str, memory_record["key"]): memory_record for memory_record in records}
+        try:
+            tag_index: Optional[TagIndex] = TagIndex.from_state(snapshot["tag_index"])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            tag_index = None
+
+        self._memories = memories
+        for key, memory_record in memories.items():
+            ttl_seconds = memory_record.get("ttl_seconds")
+            if isinstance(ttl_seconds, int):
+                # Deadlines run from when the memory was stored, not restored
+                self._expiry.schedule(key, to_epoch(memory_record["timestamp"]) + ttl_seconds)
+        if tag_index is not None and len(tag_index) == len(memories) and all(key in tag_index for key in memories):
+            self._tag_index = tag_index
+        else:
+            for key, memory_record in memories.items():
+                self._index_tags(key, memory_record)
+        self._learning_triggers = [str(trigger) for trigger in snapshot["triggers"]]
+        try:
+            with self._vector_lock:
+                adopted = self.vector_store.restore_state(self._memories.items(), snapshot["vector_state"])
+        except Exception as e:
+            logger.warning(f"Failed to restore VectorStore from snapshot: {e}")
+            adopted = 0
+        self._restore_changes(snapshot.get("changes"), snapshot.get("learning"))
+        return adopted
+
+    def _restore_changes(self, changes: Any, learning: Any) -> None:
+        """Continue the snapshotted change log, or start a new one covering every memory."""
+        try:
+            key_revisions = {str(key): int(revision) for key, revision in changes["keys"].items()}
+            if not all(key in key_revisions for key in self._memories):
+                raise ValueError("change log does not cover every memory")
+            self.store_id = str(changes["store_id"])
+            self.revision = int(changes["revision"])
+            self._change_floor = int(changes["floor"])
+            self._key_revisions = key_revisions
+            self._change_log = sorted((revision, key) for key, revision in key_revisions.items())
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.store_id = uuid.uuid4().hex
+            for key in self._memories:
+                self._record_change(key)
+        self._pattern_index = None
+        self.learning_consolidator = None
+        if isinstance(learning, dict):
+            try:
+                self.learning_consolidator = IncrementalConsolidator.from_dict(self, learning)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring learning consolidation state in snapshot: {e}")
+
+    def start_snapshots(self, path: str, interval_seconds: float = 300.0) -> SnapshotScheduler:
+        """
+        Write snapshots to path in the background while the store changes.
+
+        Args:
+            path: Snapshot file
+            interval_seconds: Time between snapshots
+
+        Returns:
+            Running SnapshotScheduler (stopped automatically at exit)
+        """
+        if self.snapshot_scheduler is not None:
+            self.snapshot_scheduler.stop(final_snapshot=False)
+        self.snapshot_scheduler = SnapshotScheduler(self, path, interval_seconds).start()
+        return self.snapshot_scheduler
 
     def get_vector_store_stats(self) -> Dict[str, JSONValue]:
         """Get VectorStore statistics."""
         try:
-            return self.vector_store.get_stats()
+            with self._vector_reads() as vector_store:
+                return vector_store.get_stats()
         except Exception as e:
             logger.error(f"Error getting VectorStore stats: {e}")
             return {'error': str(e)}
@@ -563,25 +960,36 @@ class EnhancedMemoryStore(MemoryStore):
                 'errors': 0
             }
 
-            for key, memory in self._memories.items():
-                # Type-safe increment
-                memories_processed = optimization_stats['memories_processed']
-                if isinstance(memories_processed, int):
-                    optimization_stats['memories_processed'] = memories_processed + 1
-
-                try:
-                    # Check if memory exists in vector store
-                    if key not in self.vector_store._embeddings:
-                        self.vector_store.add_memory(key, memory)
-                        embeddings_generated = optimization_stats['embeddings_generated']
-                        if isinstance(embeddings_generated, int):
-                            optimization_stats['embeddings_generated'] = embeddings_generated + 1
-
-                except Exception as e:
-                    errors_count = optimization_stats['errors']
-                    if isinstance(errors_count, int):
-                        optimization_stats['errors'] = errors_count + 1
-                    logger.warning(f"Error optimizing memory {key}: {e}")
+            self.expire_memories()
+            with self._vector_reads() as vector_store:
+                # Drain queued embeddings so only truly missing ones are regenerated
+                vector_store.flush()
+                missing: List[Tuple[str, Dict[str, JSONValue]]] = []
+
+                for key, memory in self._memories.items():
+                    # Type-safe increment
+                    memories_processed = optimization_stats['memories_processed']
+                    if isinstance(memories_processed, int):
+                        optimization_stats['memories_processed'] = memories_processed + 1
+
+                    try:
+                        # Check if memory exists in vector store
+                        if key not in vector_store._embeddings:
+                            missing.append((key, memory))
+
+                    except Exception as e:
+                        errors_count = optimization_stats['errors']
+                        if isinstance(errors_count, int):
+                            optimization_stats['errors'] = errors_count + 1
+                        logger.warning(f"Error optimizing memory {key}: {e}")
+
+                if missing:
+                    vector_store.add_memories(missing)
+                    # Embeddings that failed (or without an embedding function)
+                    # leave their keys missing
+                    optimization_stats['embeddings_generated'] = sum(
+                        1 for key, _ in missing if key in vector_store._embeddings
+                    )
 
             logger.info(f"VectorStore optimization completed: {optimization_stats}")
             return cast(Dict[str, JSONValue], optimization_stats)
@@ -596,13 +1004,13 @@ class EnhancedMemoryStore(MemoryStore):
             # Get memories for the session or all memories
             if session_id:
                 session_memories = []
-                for m in self._memories.values():
+                for m in self._live_memories():
                     tags = m.get('tags', [])
                     tags_list = self.memory_converter.extract_tags_list(tags)
                     if f"session:{session_id}" in tags_list:
                         session_memories.append(m)
             else:
-                session_memories = list(self._memories.values())
+                session_memories = self._live_memories()
 
             # Extract patterns
             patterns = self.get_learning_patterns()
@@ -628,14 +1036,37 @@ class EnhancedMemoryStore(MemoryStore):
             return {'error': str(e)}
 
 
-def create_enhanced_memory_store(embedding_provider: str = "sentence-transformers") -> EnhancedMemoryStore:
+def create_enhanced_memory_store(
+    embedding_provider: str = "sentence-transformers",
+    snapshot_path: Optional[str] = None,
+    snapshot_interval_seconds: Optional[float] = None,
+    learning_workers: int = 0,
+    learning_queue_size: int = 10_000,
+    learning_backpressure: str = "block",
+) -> EnhancedMemoryStore:
     """
     Factory function to create an EnhancedMemoryStore.
 
     Args:
         embedding_provider: Embedding provider for semantic search
+        snapshot_path: Snapshot to warm-restore from if it exists
+        snapshot_interval_seconds: Also write snapshots to snapshot_path this often
+        learning_workers: Embed and check learning triggers on this many
+            background workers instead of in store() (0 keeps it synchronous)
+        learning_queue_size: Queued memories before backpressure applies
+        learning_backpressure: "block", "inline" or "drop_oldest"
 
     Returns:
         Configured EnhancedMemoryStore instance
     """
-    return EnhancedMemoryStore(embedding_provider=embedding_provider)
\ No newline at end of file
+    store = EnhancedMemoryStore(embedding_provider=embedding_provider)
+    if snapshot_path:
+        if os.path.exists(snapshot_path):
+            store.load_snapshot(snapshot_path)
+        if snapshot_interval_seconds:
+            store.start_snapshots(snapshot_path, snapshot_interval_seconds)
+    if learning_workers > 0:
+        store.start_learning_pipeline(
+            workers=learning_workers, max_queue=learning_queue_size, backpressure=learning_backpressure
+        )
+    return store
\ No newline at end of file
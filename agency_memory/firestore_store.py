@@ -1,12 +1,21 @@
 """
 FirestoreStore implementation with verbose fallback to InMemoryStore.
 Only activates when FRESH_USE_FIRESTORE=true and gracefully degrades.
+
+Writes are buffered and committed as batched writes (write-behind) within a
+bounded latency; reads are cursor-paginated and served through a bounded
+local cache that the store's own writes invalidate.
 """
 
 import os
+import atexit
 import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, cast
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, cast
 from shared.type_definitions.json import JSONValue
 
 # Expose firestore at module scope for test patching
@@ -20,6 +29,22 @@ from shared.models.memory import MemorySearchResult, MemoryRecord, MemoryPriorit
 
 logger = logging.getLogger(__name__)
 
+# Firestore caps a write batch at 500 operations and array-contains-any at 10 values
+MAX_BATCH_WRITES = 500
+MAX_ARRAY_CONTAINS_ANY = 10
+
+# Stores with buffered writes, flushed at interpreter exit
+_live_stores: "weakref.WeakSet[FirestoreStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_stores() -> None:
+    for store in list(_live_stores):
+        try:
+            store.flush()
+        except Exception as e:  # pragma: no cover - best effort at exit
+            logger.error(f"FirestoreStore: Flush at exit failed: {e}")
+
 
 class FirestoreStore(MemoryStore):
     """
@@ -32,18 +57,52 @@ class FirestoreStore(MemoryStore):
     4. Respects FIRESTORE_EMULATOR_HOST for local development
     """
 
-    def __init__(self, collection_name: str = "agency_memories"):
+    def __init__(
+        self,
+        collection_name: str = "agency_memories",
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        page_size: int = 300,
+        cache_size: int = 128,
+        cache_ttl: float = 30.0,
+    ):
         """
         Initialize FirestoreStore with fallback logic.
 
         Args:
             collection_name: Firestore collection name for memories
+            batch_size: Buffered writes that trigger an immediate flush (max 500)
+            flush_interval: Maximum seconds a buffered write waits before commit
+            page_size: Documents fetched per paginated read
+            cache_size: Read results kept in the local cache
+            cache_ttl: Seconds before a cached read is fetched again
         """
         self.collection_name = collection_name
         self._fallback_store = None
         self._client = None
         self._collection = None
 
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_WRITES))
+        self.flush_interval = flush_interval
+        self.page_size = max(1, page_size)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        # Buffered writes keyed by memory key; a rewrite replaces the pending one
+        self._pending: Dict[str, Dict[str, JSONValue]] = {}
+        self._lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # Read-through cache: cache key -> (fetched_at, records)
+        self._cache: "OrderedDict[Tuple[str, ...], Tuple[float, List[MemoryRecord]]]" = OrderedDict()
+        # Bumped by every write so reads racing a write do not cache stale results
+        self._generation = 0
+        self.stats: Dict[str, int] = {
+            "commits": 0,
+            "documents_written": 0,
+            "page_reads": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+
         # Check if Firestore should be used
         use_firestore = os.getenv("FRESH_USE_FIRESTORE", "").lower() == "true"
 
@@ -125,7 +184,13 @@ class FirestoreStore(MemoryStore):
         )
 
     def store(self, key: str, content: Any, tags: List[str]) -> None:
-        """Store content with timestamp and tags."""
+        """
+        Buffer content for a batched write.
+
+        The write is committed once batch_size writes are pending or
+        flush_interval seconds have passed, whichever comes first. Reads from
+        this store see buffered writes immediately.
+        """
         if self._fallback_store:
             return self._fallback_store.store(key, content, tags)
 
@@ -136,20 +201,73 @@ class FirestoreStore(MemoryStore):
             "timestamp": datetime.now().isoformat(),
         }
 
-        try:
-            # Use key as document ID for easy retrieval
-            self._collection.document(key).set(memory_record)  # type: ignore
-            logger.debug(f"FirestoreStore: Stored memory with key: {key}")
+        with self._lock:
+            self._pending[key] = memory_record
+            self._invalidate({key}, set(tags))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                _live_stores.add(self)
+        logger.debug(f"FirestoreStore: Buffered memory with key: {key}")
+
+    def flush(self) -> int:
+        """
+        Commit buffered writes as batched writes.
 
-        except Exception as e:
-            logger.error(f"FirestoreStore: Failed to store memory {key}: {e}")
-            # Initialize fallback if Firestore fails during operation
-            if not self._fallback_store:
+        Returns:
+            Number of memories committed
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending = self._pending, {}
+            if not pending or self._fallback_store:
+                return 0
+
+            records = list(pending.values())
+            committed = 0
+            try:
+                for start in range(0, len(records), MAX_BATCH_WRITES):
+                    batch = self._client.batch()  # type: ignore
+                    chunk = records[start : start + MAX_BATCH_WRITES]
+                    for memory_record in chunk:
+                        # Use key as document ID for easy retrieval
+                        batch.set(self._collection.document(memory_record["key"]), memory_record)  # type: ignore
+                    batch.commit()
+                    committed += len(chunk)
+                    self.stats["commits"] += 1
+                    self.stats["documents_written"] += len(chunk)
+                # Reads cached while these were buffered did not include them
+                self._invalidate(
+                    {cast(str, r["key"]) for r in records},
+                    {tag for r in records for tag in cast(List[str], r["tags"])},
+                )
+                logger.debug(f"FirestoreStore: Committed {committed} buffered memories")
+                return committed
+
+            except Exception as e:
+                logger.error(f"FirestoreStore: Failed to commit {len(records) - committed} memories: {e}")
+                # Initialize fallback if Firestore fails during operation
                 self._initialize_fallback()
-            self._fallback_store.store(key, content, tags)  # type: ignore
+                for memory_record in records[committed:]:
+                    self._fallback_store.store(  # type: ignore
+                        cast(str, memory_record["key"]),
+                        memory_record["content"],
+                        cast(List[str], memory_record["tags"]),
+                    )
+                return committed
+
+    def close(self) -> None:
+        """Commit buffered writes and stop the flush timer."""
+        self.flush()
+        _live_stores.discard(self)
 
     def search(self, tags: List[str]) -> MemorySearchResult:
-        """Search memories by tags using Firestore array-contains-any."""
+        """Search memories by tags using paginated Firestore array-contains-any queries."""
         if self._fallback_store:
             return self._fallback_store.search(tags)
 
@@ -161,41 +279,9 @@ class FirestoreStore(MemoryStore):
                 execution_time_ms=0
             )
 
+        wanted = sorted(set(tags))
         try:
-            # Firestore query for documents where tags array contains any of the search tags
-            query = self._collection.where("tags", "array_contains_any", tags)  # type: ignore
-            docs = query.stream()
-
-            memory_records = []
-            for doc in docs:
-                memory_dict = doc.to_dict()
-                # Convert dict to MemoryRecord
-                try:
-                    record = MemoryRecord(
-                        key=memory_dict.get("key", ""),
-                        content=memory_dict.get("content", ""),
-                        tags=memory_dict.get("tags", []),
-                        timestamp=datetime.fromisoformat(memory_dict.get("timestamp", datetime.now().isoformat())),
-                        priority=MemoryPriority(memory_dict.get("priority", "medium"))
-                    )
-                    memory_records.append(record)
-                except Exception as e:
-                    logger.warning(f"Failed to convert Firestore doc to MemoryRecord: {e}")
-                    continue
-
-            # Sort by timestamp (newest first)
-            memory_records.sort(key=lambda x: x.timestamp, reverse=True)
-            logger.debug(
-                f"FirestoreStore: Found {len(memory_records)} memories for tags: {tags}"
-            )
-
-            return MemorySearchResult(
-                records=memory_records,
-                total_count=len(memory_records),
-                search_query={"tags": cast(JSONValue, tags)},
-                execution_time_ms=0
-            )
-
+            stored = self._cached_read(("tags", *wanted), lambda: self._fetch_tags(wanted))
         except Exception as e:
             logger.error(f"FirestoreStore: Search failed for tags {tags}: {e}")
             # Fall back to empty result rather than crash
@@ -206,42 +292,25 @@ class FirestoreStore(MemoryStore):
                 execution_time_ms=0
             )
 
+        memory_records = self._with_pending(stored, lambda record: bool(set(record.tags) & set(wanted)))
+        logger.debug(
+            f"FirestoreStore: Found {len(memory_records)} memories for tags: {tags}"
+        )
+
+        return MemorySearchResult(
+            records=memory_records,
+            total_count=len(memory_records),
+            search_query={"tags": cast(JSONValue, tags)},
+            execution_time_ms=0
+        )
+
     def get_all(self) -> MemorySearchResult:
-        """Get all memories from Firestore."""
+        """Get all memories from Firestore, reading the collection page by page."""
         if self._fallback_store:
             return self._fallback_store.get_all()
 
         try:
-            docs = self._collection.stream()  # type: ignore
-            memory_records = []
-
-            for doc in docs:
-                memory_dict = doc.to_dict()
-                # Convert dict to MemoryRecord
-                try:
-                    record = MemoryRecord(
-                        key=memory_dict.get("key", ""),
-                        content=memory_dict.get("content", ""),
-                        tags=memory_dict.get("tags", []),
-                        timestamp=datetime.fromisoformat(memory_dict.get("timestamp", datetime.now().isoformat())),
-                        priority=MemoryPriority(memory_dict.get("priority", "medium"))
-                    )
-                    memory_records.append(record)
-                except Exception as e:
-                    logger.warning(f"Failed to convert Firestore doc to MemoryRecord: {e}")
-                    continue
-
-            # Sort by timestamp (newest first)
-            memory_records.sort(key=lambda x: x.timestamp, reverse=True)
-            logger.debug(f"FirestoreStore: Retrieved {len(memory_records)} total memories")
-
-            return MemorySearchResult(
-                records=memory_records,
-                total_count=len(memory_records),
-                search_query={},
-                execution_time_ms=0
-            )
-
+            stored = self._cached_read(("all",), lambda: self._fetch(self._collection))
         except Exception as e:
             logger.error(f"FirestoreStore: Failed to retrieve all memories: {e}")
             return MemorySearchResult(
@@ -251,6 +320,126 @@ class FirestoreStore(MemoryStore):
                 execution_time_ms=0
             )
 
+        memory_records = self._with_pending(stored, lambda record: True)
+        logger.debug(f"FirestoreStore: Retrieved {len(memory_records)} total memories")
+
+        return MemorySearchResult(
+            records=memory_records,
+            total_count=len(memory_records),
+            search_query={},
+            execution_time_ms=0
+        )
+
+    def _fetch_tags(self, tags: Sequence[str]) -> List[MemoryRecord]:
+        """Query each group of up to MAX_ARRAY_CONTAINS_ANY tags and merge by key."""
+        found: Dict[str, MemoryRecord] = {}
+        for start in range(0, len(tags), MAX_ARRAY_CONTAINS_ANY):
+            chunk = list(tags[start : start + MAX_ARRAY_CONTAINS_ANY])
+            # Firestore query for documents where tags array contains any of the search tags
+            query = self._collection.where("tags", "array_contains_any", chunk)  # type: ignore
+            for record in self._fetch(query):
+                found[record.key] = record
+        return list(found.values())
+
+    def _fetch(self, query: Any) -> List[MemoryRecord]:
+        """Read every document of query as MemoryRecords."""
+        memory_records = []
+        for doc in self._stream_pages(query):
+            record = self._to_record(doc.to_dict())
+            if record is not None:
+                memory_records.append(record)
+        return memory_records
+
+    def _stream_pages(self, query: Any) -> Iterator[Any]:
+        """
+        Stream query results page_size documents at a time.
+
+        Pages are ordered by document ID and resumed with a start_after
+        cursor, which needs no composite index alongside tag filters.
+        """
+        ordered = query.order_by("__name__")
+        last = None
+        while True:
+            page_query = ordered.limit(self.page_size)
+            if last is not None:
+                page_query = page_query.start_after(last)
+            page = list(page_query.stream())
+            self.stats["page_reads"] += 1
+            yield from page
+            if len(page) < self.page_size:
+                return
+            last = page[-1]
+
+    def _to_record(self, memory_dict: Optional[Dict[str, Any]]) -> Optional[MemoryRecord]:
+        """Convert a Firestore document dict to a MemoryRecord (None if malformed)."""
+        if not memory_dict:
+            return None
+        try:
+            return MemoryRecord(
+                key=memory_dict.get("key", ""),
+                content=memory_dict.get("content", ""),
+                tags=memory_dict.get("tags", []),
+                timestamp=datetime.fromisoformat(memory_dict.get("timestamp", datetime.now().isoformat())),
+                priority=MemoryPriority(memory_dict.get("priority", "medium"))
+            )
+        except Exception as e:
+            logger.warning(f"Failed to convert Firestore doc to MemoryRecord: {e}")
+            return None
+
+    def _cached_read(self, cache_key: Tuple[str, ...], fetch: Callable[[], List[MemoryRecord]]) -> List[MemoryRecord]:
+        """Serve a read from the local cache, fetching and caching it on a miss."""
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(cache_key)
+                self.stats["cache_hits"] += 1
+                return cached[1]
+            self.stats["cache_misses"] += 1
+            generation = self._generation
+
+        records = fetch()
+
+        with self._lock:
+            # A write that landed while fetching may not be in the results
+            if generation == self._generation and self.cache_size > 0:
+                self._cache[cache_key] = (time.monotonic(), records)
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return records
+
+    def _invalidate(self, keys: Set[str], tags: Set[str]) -> None:
+        """Drop cached reads that writing keys with tags can change."""
+        self._generation += 1
+        for cache_key, (_, records) in list(self._cache.items()):
+            kind, cached_tags = cache_key[0], set(cache_key[1:])
+            if kind == "all" or cached_tags & tags or any(r.key in keys for r in records):
+                del self._cache[cache_key]
+
+    def _with_pending(
+        self, stored: List[MemoryRecord], matches: Callable[[MemoryRecord], bool]
+    ) -> List[MemoryRecord]:
+        """Overlay buffered writes on stored records, newest first."""
+        with self._lock:
+            pending = list(self._pending.values())
+        if not pending:
+            merged = list(stored)
+        else:
+            by_key = {record.key: record for record in stored}
+            for memory_record in pending:
+                record = self._to_record(memory_record)
+                if record is None:
+                    continue
+                if matches(record):
+                    by_key[record.key] = record
+                else:
+                    by_key.pop(record.key, None)
+            merged = list(by_key.values())
+
+        # Sort by timestamp (newest first)
+        merged.sort(key=lambda x: x.timestamp, reverse=True)
+        return merged
+
 
 def create_firestore_store(collection_name: str = "agency_memories") -> FirestoreStore:
     """
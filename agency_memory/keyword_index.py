@@ -0,0 +1,178 @@
+"""
+Inverted keyword index with BM25 scoring for VectorStore.
+
+Texts are tokenized once when a memory is added; queries then only touch the
+posting lists of their own terms, so keyword search costs time proportional
+to the matching postings instead of re-tokenizing the whole corpus.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of text."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Incrementally maintained inverted index with Okapi BM25 scoring.
+
+    Keeps a posting list (key -> term frequency) per term plus document
+    lengths, so adds and removes update the term statistics in place.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize InvertedIndex.
+
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._doc_lengths
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct indexed terms."""
+        return len(self._postings)
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Index text under key, replacing any previous text for key.
+
+        Args:
+            key: Memory key
+            text: Searchable text
+        """
+        if key in self._doc_lengths:
+            self.remove(key)
+
+        terms = tokenize(text)
+        frequencies = Counter(terms)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[key] = frequency
+        self._doc_terms[key] = tuple(frequencies)
+        self._doc_lengths[key] = len(terms)
+        self._total_length += len(terms)
+
+    def remove(self, key: str) -> bool:
+        """
+        Drop key from every posting list it appears in.
+
+        Returns:
+            True if key was indexed
+        """
+        length = self._doc_lengths.pop(key, None)
+        if length is None:
+            return False
+        self._total_length -= length
+
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+        return True
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed keys containing term."""
+        return len(self._postings.get(term, ()))
+
+    def _idf(self, term: str) -> float:
+        df = self.document_frequency(term)
+        n = len(self._doc_lengths)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def matching_keys(self, terms: Iterable[str], require_all: bool = False) -> Set[str]:
+        """
+        Keys containing any (or all) of terms.
+
+        All-term matches intersect posting lists from the shortest one up, so
+        the cost is bounded by the rarest term.
+
+        Args:
+            terms: Query terms (already tokenized)
+            require_all: Intersect instead of unite the posting lists
+
+        Returns:
+            Set of matching keys
+        """
+        postings = [self._postings.get(term, {}) for term in set(terms)]
+        if not postings:
+            return set()
+        if require_all:
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                result.intersection_update(posting)
+                if not result:
+                    break
+            return result
+        result = set()
+        for posting in postings:
+            result.update(posting)
+        return result
+
+    def score(
+        self,
+        query: str,
+        candidates: Optional[Collection[str]] = None,
+        require_all: bool = False,
+    ) -> Dict[str, float]:
+        """
+        BM25 scores of keys matching query.
+
+        Args:
+            query: Raw query text
+            candidates: Restrict scoring to these keys (None scores the whole index)
+            require_all: Only score keys containing every query term
+
+        Returns:
+            Mapping of key to BM25 score for keys with at least one query term
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_lengths:
+            return {}
+
+        allowed = candidates
+        if require_all:
+            matching = self.matching_keys(terms, require_all=True)
+            allowed = matching if candidates is None else matching & candidates
+
+        avg_length = self._total_length / len(self._doc_lengths) or 1.0
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            if allowed is None:
+                matches = postings.items()
+            elif len(allowed) < len(postings):
+                # Walk the smaller side: a narrow candidate set on a common term
+                matches = [(key, postings[key]) for key in allowed if key in postings]
+            else:
+                matches = [(key, tf) for key, tf in postings.items() if key in allowed]
+            for key, frequency in matches:
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[key] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+        return scores
@@ -1,12 +1,17 @@
 """
 Simple learning consolidation module.
 Provides deterministic summarization of memory tag frequencies and patterns.
+
+Consolidations are computed from mergeable LearningAggregates counters.
+IncrementalConsolidator keeps those counters for one store and folds in only
+the memories changed since its last run, giving the same result as a full
+recomputation.
 """
 
 import logging
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Protocol, Tuple, cast
 from shared.type_definitions.json import JSONValue
 from shared.models.learning import (
     LearningConsolidation, LearningInsight, PatternAnalysis,
@@ -17,6 +22,243 @@ from shared.models.memory import MemoryRecord
 logger = logging.getLogger(__name__)
 
 
+# Tie-break orders, so results do not depend on the order memories are seen in
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_CONTENT_TYPE_ORDER = (
+    "text", "error", "success", "command", "url", "long_text", "code", "empty", "structured", "numeric", "other"
+)
+
+
+class MemoryContribution(NamedTuple):
+    """What one memory adds to each LearningAggregates counter."""
+
+    tags: Tuple[str, ...]
+    tag_count: int
+    content_type: str
+    hour: Optional[int]
+    day: Optional[str]
+
+
+def memory_contribution(memory: Mapping[str, Any]) -> MemoryContribution:
+    """
+    Reduce a memory record to its contribution to the aggregates.
+
+    Args:
+        memory: Memory record with tags, timestamp and content
+
+    Returns:
+        MemoryContribution of the memory
+    """
+    tags = memory.get("tags", [])
+    string_tags: Tuple[str, ...] = ()
+    tag_count = 0
+    if isinstance(tags, list):
+        # Only string tags are counted, but every tag counts toward the average
+        string_tags = tuple(str(tag) for tag in tags if isinstance(tag, str))
+        tag_count = len(tags)
+
+    hour: Optional[int] = None
+    day: Optional[str] = None
+    timestamp_str = memory.get("timestamp", "")
+    if isinstance(timestamp_str, str) and timestamp_str:
+        try:
+            timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+            hour = timestamp.hour
+            day = timestamp.strftime("%A")
+        except (ValueError, AttributeError):
+            logger.debug(f"Could not parse timestamp: {timestamp_str}")
+
+    return MemoryContribution(
+        string_tags, tag_count, _categorize_content(memory.get("content", "")), hour, day
+    )
+
+
+def _bump(counter: Counter, key: Any, weight: int) -> None:
+    counter[key] += weight
+    if not counter[key]:
+        del counter[key]
+
+
+class LearningAggregates:
+    """
+    Mergeable counters behind a learning consolidation.
+
+    Every statistic in a consolidation is a sum over memories, so the
+    aggregates of disjoint memory sets merge by addition and a memory's
+    contribution can be subtracted again when it is updated or deleted.
+    summarize() only reads the counters and breaks ties by value rather than
+    by arrival order, so it gives the same result however the aggregates
+    were assembled.
+    """
+
+    def __init__(self) -> None:
+        self.total_memories = 0
+        self.total_tags = 0
+        self.tags: Counter[str] = Counter()
+        self.content_types: Counter[str] = Counter()
+        self.hourly: Counter[int] = Counter()
+        self.daily: Counter[str] = Counter()
+
+    @classmethod
+    def from_memories(cls, memories: Iterable[Mapping[str, Any]]) -> "LearningAggregates":
+        """Aggregates of a collection of memory records."""
+        aggregates = cls()
+        for memory in memories:
+            aggregates.add(memory_contribution(memory))
+        return aggregates
+
+    def add(self, contribution: MemoryContribution, weight: int = 1) -> None:
+        """
+        Count one memory (or discount it, with weight -1).
+
+        Args:
+            contribution: Contribution of the memory
+            weight: 1 to add, -1 to remove
+        """
+        self.total_memories += weight
+        self.total_tags += weight * contribution.tag_count
+        for tag in contribution.tags:
+            _bump(self.tags, tag, weight)
+        _bump(self.content_types, contribution.content_type, weight)
+        if contribution.hour is not None:
+            _bump(self.hourly, contribution.hour, weight)
+        if contribution.day is not None:
+            _bump(self.daily, contribution.day, weight)
+
+    def remove(self, contribution: MemoryContribution) -> None:
+        """Discount a memory previously passed to add()."""
+        self.add(contribution, -1)
+
+    def merge(self, other: "LearningAggregates") -> "LearningAggregates":
+        """Add the counts of other (for a disjoint set of memories) in place."""
+        self.total_memories += other.total_memories
+        self.total_tags += other.total_tags
+        for mine, theirs in (
+            (self.tags, other.tags),
+            (self.content_types, other.content_types),
+            (self.hourly, other.hourly),
+            (self.daily, other.daily),
+        ):
+            for key, count in theirs.items():
+                _bump(mine, key, count)
+        return self
+
+    def to_dict(self) -> Dict[str, JSONValue]:
+        """Counters as JSON-compatible values."""
+        return {
+            "total_memories": self.total_memories,
+            "total_tags": self.total_tags,
+            "tags": dict(self.tags),
+            "content_types": dict(self.content_types),
+            "hourly": {str(hour): count for hour, count in self.hourly.items()},
+            "daily": dict(self.daily),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Mapping[str, Any]) -> "LearningAggregates":
+        """Rebuild aggregates from to_dict() output."""
+        aggregates = cls()
+        aggregates.total_memories = int(state["total_memories"])
+        aggregates.total_tags = int(state["total_tags"])
+        aggregates.tags = Counter({str(tag): int(count) for tag, count in state["tags"].items()})
+        aggregates.content_types = Counter(
+            {str(kind): int(count) for kind, count in state["content_types"].items()}
+        )
+        aggregates.hourly = Counter({int(hour): int(count) for hour, count in state["hourly"].items()})
+        aggregates.daily = Counter({str(day): int(count) for day, count in state["daily"].items()})
+        return aggregates
+
+    def summarize(self) -> Dict[str, JSONValue]:
+        """Structured summary of the counted memories, as consolidate_learnings() returns it."""
+        if not self.total_memories:
+            # Return simple dict for backward compatibility
+            return {
+                "summary": "No memories to analyze",
+                "total_memories": 0,
+                "tag_frequencies": {},
+                "patterns": {},
+                "generated_at": datetime.now().isoformat(),
+            }
+
+        # Generate insights
+        total_memories = self.total_memories
+        top_tags = sorted(self.tags.items(), key=lambda item: (-item[1], item[0]))[:10]
+
+        # Calculate tag usage patterns
+        tag_frequencies = dict(sorted(self.tags.items()))
+        unique_tags = len(tag_frequencies)
+        avg_tags_per_memory = self.total_tags / total_memories
+
+        # Find peak usage times (earliest hour / first weekday on ties)
+        hourly_distribution = dict(sorted(self.hourly.items()))
+        daily_distribution = {day: self.daily[day] for day in _WEEKDAYS if day in self.daily}
+        peak_hour = max(hourly_distribution, key=hourly_distribution.__getitem__) if hourly_distribution else None
+        peak_day = max(daily_distribution, key=daily_distribution.__getitem__) if daily_distribution else None
+
+        # Content analysis
+        content_breakdown = {
+            kind: self.content_types[kind] for kind in _CONTENT_TYPE_ORDER if kind in self.content_types
+        }
+
+        # Build content type breakdown
+        # Add any missing types to 'other' for backward compatibility
+        structured_count = content_breakdown.get('structured', 0)
+        numeric_count = content_breakdown.get('numeric', 0)
+        other_count = content_breakdown.get('other', 0) + structured_count + numeric_count
+
+        content_type_breakdown = ContentTypeBreakdown(
+            text=content_breakdown.get('text', 0),
+            error=content_breakdown.get('error', 0),
+            success=content_breakdown.get('success', 0),
+            command=content_breakdown.get('command', 0),
+            url=content_breakdown.get('url', 0),
+            long_text=content_breakdown.get('long_text', 0),
+            code=content_breakdown.get('code', 0),
+            empty=content_breakdown.get('empty', 0),
+            other=other_count
+        )
+
+        # Build time distribution
+        time_distribution = TimeDistribution(
+            hourly=hourly_distribution,
+            daily=daily_distribution,
+            peak_hour=peak_hour,
+            peak_day=peak_day
+        )
+
+        # Build pattern analysis
+        patterns = PatternAnalysis(
+            content_types=content_type_breakdown,
+            time_distribution=time_distribution
+        )
+
+        # Build learning insights
+        insights = _generate_insights_models(
+            total_memories,
+            unique_tags,
+            top_tags,
+            content_breakdown,
+            peak_hour if peak_hour is not None else 0,
+            peak_day if peak_day is not None else ""
+        )
+
+        # Build structured summary with Pydantic model
+        consolidation = LearningConsolidation(
+            summary=f"Analyzed {total_memories} memories with {unique_tags} unique tags",
+            total_memories=total_memories,
+            unique_tags=unique_tags,
+            avg_tags_per_memory=round(avg_tags_per_memory, 2),
+            tag_frequencies=tag_frequencies,
+            top_tags=[{"tag": tag, "count": count} for tag, count in top_tags],
+            patterns=patterns,
+            insights=insights,
+            generated_at=datetime.now()
+        )
+
+        logger.info(f"Learning consolidation completed: {total_memories} memories analyzed")
+        return _flatten_consolidation(consolidation, content_breakdown)
+
+
 def consolidate_learnings(memories: List[dict[str, JSONValue]]) -> Dict[str, JSONValue]:
     """
     Consolidate learnings from memory records into structured summary.
@@ -33,134 +275,13 @@ def consolidate_learnings(memories: List[dict[str, JSONValue]]) -> Dict[str, JSO
     Returns:
         Structured summary with learning insights
     """
-    if not memories:
-        # Return simple dict for backward compatibility
-        return {
-            "summary": "No memories to analyze",
-            "total_memories": 0,
-            "tag_frequencies": {},
-            "patterns": {},
-            "generated_at": datetime.now().isoformat(),
-        }
-
-    # Initialize counters and analyzers
-    tag_counter: Counter[str] = Counter()
-    content_types: Counter[str] = Counter()
-    hourly_distribution: defaultdict[int, int] = defaultdict(int)
-    daily_distribution: defaultdict[str, int] = defaultdict(int)
-
-    # Process each memory
-    for memory in memories:
-        # Count tags
-        tags = memory.get("tags", [])
-        if isinstance(tags, list):
-            # Filter to only string tags
-            string_tags = [str(tag) for tag in tags if isinstance(tag, str)]
-            tag_counter.update(string_tags)
-
-        # Analyze content types
-        content = memory.get("content", "")
-        content_type = _categorize_content(content)
-        content_types[content_type] += 1
-
-        # Time pattern analysis
-        timestamp_str = memory.get("timestamp", "")
-        if isinstance(timestamp_str, str) and timestamp_str:
-            try:
-                timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                hour = timestamp.hour
-                day = timestamp.strftime("%A")
-                hourly_distribution[hour] += 1
-                daily_distribution[day] += 1
-            except (ValueError, AttributeError):
-                logger.debug(f"Could not parse timestamp: {timestamp_str}")
-
-    # Generate insights
-    total_memories = len(memories)
-    top_tags = tag_counter.most_common(10)
-
-    # Calculate tag usage patterns
-    tag_frequencies = dict(tag_counter)
-    unique_tags = len(tag_frequencies)
-    # Calculate average tags per memory with type safety
-    total_tags = 0
-    for m in memories:
-        tags = m.get("tags", [])
-        if isinstance(tags, list):
-            total_tags += len(tags)
-    avg_tags_per_memory = total_tags / total_memories if total_memories > 0 else 0
-
-    # Find peak usage times
-    peak_hour = (
-        max(hourly_distribution.items(), key=lambda x: x[1])[0]
-        if hourly_distribution
-        else None
-    )
-    peak_day = (
-        max(daily_distribution.items(), key=lambda x: x[1])[0]
-        if daily_distribution
-        else None
-    )
-
-    # Content analysis
-    content_breakdown = dict(content_types)
-
-    # Build content type breakdown
-    # Add any missing types to 'other' for backward compatibility
-    structured_count = content_breakdown.get('structured', 0)
-    numeric_count = content_breakdown.get('numeric', 0)
-    other_count = content_breakdown.get('other', 0) + structured_count + numeric_count
-
-    content_type_breakdown = ContentTypeBreakdown(
-        text=content_breakdown.get('text', 0),
-        error=content_breakdown.get('error', 0),
-        success=content_breakdown.get('success', 0),
-        command=content_breakdown.get('command', 0),
-        url=content_breakdown.get('url', 0),
-        long_text=content_breakdown.get('long_text', 0),
-        code=content_breakdown.get('code', 0),
-        empty=content_breakdown.get('empty', 0),
-        other=other_count
-    )
-
-    # Build time distribution
-    time_distribution = TimeDistribution(
-        hourly=dict(hourly_distribution),
-        daily=dict(daily_distribution),
-        peak_hour=peak_hour,
-        peak_day=peak_day
-    )
-
-    # Build pattern analysis
-    patterns = PatternAnalysis(
-        content_types=content_type_breakdown,
-        time_distribution=time_distribution
-    )
-
-    # Build learning insights
-    insights = _generate_insights_models(
-        total_memories,
-        unique_tags,
-        top_tags,
-        content_breakdown,
-        peak_hour if peak_hour is not None else 0,
-        peak_day if peak_day is not None else ""
-    )
+    return LearningAggregates.from_memories(memories or []).summarize()
 
-    # Build structured summary with Pydantic model
-    consolidation = LearningConsolidation(
-        summary=f"Analyzed {total_memories} memories with {unique_tags} unique tags",
-        total_memories=total_memories,
-        unique_tags=unique_tags,
-        avg_tags_per_memory=round(avg_tags_per_memory, 2),
-        tag_frequencies=tag_frequencies,
-        top_tags=[{"tag": tag, "count": count} for tag, count in top_tags],
-        patterns=patterns,
-        insights=insights,
-        generated_at=datetime.now()
-    )
 
-    logger.info(f"Learning consolidation completed: {total_memories} memories analyzed")
+def _flatten_consolidation(
+    consolidation: LearningConsolidation, content_breakdown: Dict[str, int]
+) -> Dict[str, JSONValue]:
+    """Convert a LearningConsolidation to the flat legacy dict layout."""
     # Return as dict for backward compatibility with flat structure
     result = consolidation.to_dict()
 
@@ -362,6 +483,120 @@ def _generate_insights_models(
     return insights
 
 
+class ChangeLogStore(Protocol):
+    """Store that can list the memories changed since a revision."""
+
+    store_id: str
+
+    def changes_since(
+        self, revision: int
+    ) -> Tuple[int, bool, List[Tuple[str, Optional[Dict[str, JSONValue]]]]]:
+        ...
+
+
+class IncrementalConsolidator:
+    """
+    Learning consolidation of one store, kept current from its change log.
+
+    Each update() asks the store for the memories stored or deleted since
+    the high-water mark of the previous update and folds only those into the
+    aggregates. The contribution of every counted memory is kept so that
+    updated and deleted memories can be subtracted again. If the store no
+    longer retains changes that far back, or is a different store
+    (store_id), the aggregates are rebuilt from scratch.
+    """
+
+    def __init__(self, store: ChangeLogStore):
+        """
+        Initialize IncrementalConsolidator.
+
+        Args:
+            store: Store providing store_id and changes_since()
+        """
+        self.store = store
+        self.store_id: Optional[str] = store.store_id
+        self.high_water_mark = 0
+        self.aggregates = LearningAggregates()
+        self._contributions: Dict[str, MemoryContribution] = {}
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def update(self) -> int:
+        """
+        Fold in memories changed since the high-water mark.
+
+        Returns:
+            Number of changed memories processed
+        """
+        if self.store.store_id != self.store_id:
+            self._reset()
+        mark, reset, changes = self.store.changes_since(self.high_water_mark)
+        if reset:
+            self._reset()
+        for key, memory in changes:
+            previous = self._contributions.pop(key, None)
+            if previous is not None:
+                self.aggregates.remove(previous)
+            if memory is not None:
+                contribution = memory_contribution(memory)
+                self.aggregates.add(contribution)
+                self._contributions[key] = contribution
+        self.high_water_mark = mark
+        if changes:
+            logger.debug(f"Consolidated {len(changes)} changed memories up to revision {mark}")
+        return len(changes)
+
+    def consolidate(self) -> Dict[str, JSONValue]:
+        """Bring the aggregates up to date and summarize them like consolidate_learnings()."""
+        self.update()
+        return self.aggregates.summarize()
+
+    def report(self, session_id: Optional[str] = None) -> str:
+        """Bring the aggregates up to date and format them like generate_learning_report()."""
+        return format_learning_report(self.consolidate(), session_id)
+
+    def to_dict(self) -> Dict[str, JSONValue]:
+        """State as JSON-compatible values, for persisting alongside the store."""
+        return {
+            "store_id": self.store_id,
+            "high_water_mark": self.high_water_mark,
+            "aggregates": self.aggregates.to_dict(),
+            "contributions": {
+                key: [list(c.tags), c.tag_count, c.content_type, c.hour, c.day]
+                for key, c in list(self._contributions.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, store: ChangeLogStore, state: Mapping[str, Any]) -> "IncrementalConsolidator":
+        """
+        Resume a consolidation from to_dict() output.
+
+        Args:
+            store: Store the state was taken from (or its restored copy)
+            state: to_dict() output
+
+        Returns:
+            IncrementalConsolidator continuing from the saved high-water mark
+        """
+        consolidator = cls(store)
+        consolidator.store_id = state["store_id"]
+        consolidator.high_water_mark = int(state["high_water_mark"])
+        consolidator.aggregates = LearningAggregates.from_dict(state["aggregates"])
+        consolidator._contributions = {
+            key: MemoryContribution(tuple(tags), tag_count, content_type, hour, day)
+            for key, (tags, tag_count, content_type, hour, day) in state["contributions"].items()
+        }
+        return consolidator
+
+    def _reset(self) -> None:
+        self.store_id = self.store.store_id
+        self.high_water_mark = 0
+        self.aggregates = LearningAggregates()
+        self._contributions = {}
+
+
 def generate_learning_report(
     memories: List[dict[str, JSONValue]], session_id: str = None
 ) -> str:
@@ -375,8 +610,20 @@ def generate_learning_report(
     Returns:
         Formatted markdown report string
     """
-    analysis = consolidate_learnings(memories)
+    return format_learning_report(consolidate_learnings(memories), session_id)
 
+
+def format_learning_report(analysis: Dict[str, JSONValue], session_id: Optional[str] = None) -> str:
+    """
+    Format a consolidate_learnings() result as a markdown report.
+
+    Args:
+        analysis: Consolidated analysis
+        session_id: Optional session identifier
+
+    Returns:
+        Formatted markdown report string
+    """
     report = "# Learning Consolidation Report\n\n"
 
     if session_id:
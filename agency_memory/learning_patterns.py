@@ -0,0 +1,210 @@
+"""
+Incrementally maintained learning patterns.
+
+EnhancedMemoryStore.get_learning_patterns used to convert and rescan every
+memory on each call. LearningPatternIndex keeps, per tool and error type,
+the members in timeline order together with their success and resolution
+counts, so a call only has to classify the memories changed since the last
+one. Patterns are emitted in the order a newest-first scan would have found
+them, so the result matches a full recomputation exactly.
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, cast
+
+from shared.type_definitions.json import JSONValue
+
+TOOL_NAMES = ("Read", "Write", "Edit", "Grep", "Bash", "TodoWrite")
+HANDOFF_TAGS = ("handoff", "agent", "communication")
+
+# (timestamp, -sequence, key) as in the tag index timeline; larger is newer
+TimelineEntry = Tuple[Any, int, str]
+
+# Builds evidence records for keys, newest first
+EvidenceLoader = Callable[[List[str]], List[Dict[str, JSONValue]]]
+
+
+class PatternContribution(NamedTuple):
+    """How one memory counts toward the learning patterns."""
+
+    entry: TimelineEntry
+    tool: bool
+    tools: Tuple[str, ...]
+    successful: bool
+    error_type: Optional[str]
+    resolved: bool
+    handoff: bool
+
+
+def error_type_of(content: str) -> str:
+    """Simple error type detection from lowercased memory content."""
+    if 'permission' in content:
+        return 'permission_error'
+    if 'not found' in content or 'missing' in content:
+        return 'file_not_found'
+    if 'timeout' in content:
+        return 'timeout_error'
+    if 'connection' in content:
+        return 'connection_error'
+    return 'general_error'
+
+
+def _remove_entry(entries: List[TimelineEntry], entry: TimelineEntry) -> None:
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _insert(members: Dict[str, List[TimelineEntry]], group: str, entry: TimelineEntry) -> None:
+    insort(members.setdefault(group, []), entry)
+
+
+def _discard(members: Dict[str, List[TimelineEntry]], group: str, entry: TimelineEntry) -> None:
+    entries = members.get(group)
+    if entries is None:
+        return
+    _remove_entry(entries, entry)
+    if not entries:
+        del members[group]
+
+
+def _newest_keys(entries: List[TimelineEntry], count: int = 2) -> List[str]:
+    return [key for _, _, key in reversed(entries[-count:])]
+
+
+class LearningPatternIndex:
+    """
+    Pattern statistics of a store, updated one memory at a time.
+
+    Owners call set() with a memory's PatternContribution whenever it is
+    stored and discard() when it is deleted, and record the revision they
+    have caught up to in high_water_mark.
+    """
+
+    def __init__(self, store_id: Optional[str] = None):
+        self.store_id = store_id
+        self.high_water_mark = 0
+        self._contributions: Dict[str, PatternContribution] = {}
+        self._tool_memories = 0
+        self._tool_members: Dict[str, List[TimelineEntry]] = {}
+        self._tool_successes: Counter[str] = Counter()
+        self._error_memories = 0
+        self._error_members: Dict[str, List[TimelineEntry]] = {}
+        self._error_resolved: Dict[str, List[TimelineEntry]] = {}
+        self._handoff_memories = 0
+        self._handoff_successes: List[TimelineEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def set(self, key: str, contribution: PatternContribution) -> None:
+        """Count key with contribution, replacing its previous contribution."""
+        self.discard(key)
+        self._apply(contribution, 1)
+        self._contributions[key] = contribution
+
+    def discard(self, key: str) -> None:
+        """Stop counting key."""
+        previous = self._contributions.pop(key, None)
+        if previous is not None:
+            self._apply(previous, -1)
+
+    def _apply(self, c: PatternContribution, weight: int) -> None:
+        update = _insert if weight > 0 else _discard
+        if c.tool:
+            self._tool_memories += weight
+            for tool in c.tools:
+                update(self._tool_members, tool, c.entry)
+                if c.successful:
+                    self._tool_successes[tool] += weight
+        if c.error_type is not None:
+            self._error_memories += weight
+            update(self._error_members, c.error_type, c.entry)
+            if c.resolved:
+                update(self._error_resolved, c.error_type, c.entry)
+        if c.handoff:
+            self._handoff_memories += weight
+            if c.successful and weight > 0:
+                insort(self._handoff_successes, c.entry)
+            elif c.successful:
+                _remove_entry(self._handoff_successes, c.entry)
+
+    def tool_patterns(self, evidence: EvidenceLoader) -> List[Dict[str, JSONValue]]:
+        """Successful tool usage patterns."""
+        patterns: List[Dict[str, JSONValue]] = []
+        if self._tool_memories < 3:
+            return patterns
+
+        # Groups in order of their newest member, then tool order
+        tools = sorted(self._tool_members, key=TOOL_NAMES.index)
+        tools.sort(key=lambda tool: self._tool_members[tool][-1], reverse=True)
+        for tool in tools:
+            members = self._tool_members[tool]
+            if len(members) >= 3:
+                success_rate = self._tool_successes[tool] / len(members)
+
+                if success_rate > 0.7:
+                    patterns.append({
+                        'pattern_id': f'tool_success_{tool.lower()}',
+                        'type': 'tool_pattern',
+                        'tool': tool,
+                        'usage_count': len(members),
+                        'success_rate': success_rate,
+                        'confidence': min(0.9, len(members) / 10),
+                        'description': f'Tool {tool} shows high success rate ({success_rate:.1%})',
+                        'actionable_insight': f'Prioritize {tool} for similar tasks',
+                        'evidence': cast(JSONValue, evidence(_newest_keys(members)))
+                    })
+
+        return patterns
+
+    def error_patterns(self, evidence: EvidenceLoader) -> List[Dict[str, JSONValue]]:
+        """Error resolution patterns."""
+        patterns: List[Dict[str, JSONValue]] = []
+        if self._error_memories < 2:
+            return patterns
+
+        error_types = sorted(self._error_members, key=lambda kind: self._error_members[kind][-1], reverse=True)
+        for error_type in error_types:
+            members = self._error_members[error_type]
+            if len(members) >= 2:
+                resolved = self._error_resolved.get(error_type, [])
+                resolution_rate = len(resolved) / len(members)
+
+                patterns.append({
+                    'pattern_id': f'error_resolution_{error_type}',
+                    'type': 'error_resolution',
+                    'error_type': error_type,
+                    'occurrence_count': len(members),
+                    'resolution_rate': resolution_rate,
+                    'confidence': min(0.8, len(members) / 5),
+                    'description': f'Error type {error_type} with {resolution_rate:.1%} resolution rate',
+                    'actionable_insight': f'Apply known resolution patterns for {error_type}',
+                    'evidence': cast(JSONValue, evidence(_newest_keys(resolved or members)))
+                })
+
+        return patterns
+
+    def interaction_patterns(self, evidence: EvidenceLoader) -> List[Dict[str, JSONValue]]:
+        """Agent interaction patterns."""
+        patterns: List[Dict[str, JSONValue]] = []
+        if self._handoff_memories < 3:
+            return patterns
+
+        success_rate = len(self._handoff_successes) / self._handoff_memories
+
+        if success_rate > 0.6:
+            patterns.append({
+                'pattern_id': 'agent_interaction_success',
+                'type': 'interaction_pattern',
+                'interaction_type': 'handoff',
+                'total_interactions': self._handoff_memories,
+                'success_rate': success_rate,
+                'confidence': min(0.8, self._handoff_memories / 8),
+                'description': f'Agent interactions have {success_rate:.1%} success rate',
+                'actionable_insight': 'Current handoff patterns are effective, maintain approach',
+                'evidence': cast(JSONValue, evidence(_newest_keys(self._handoff_successes)))
+            })
+
+        return patterns
@@ -0,0 +1,262 @@
+"""
+Bounded background work queue for memory writes.
+
+EnhancedMemoryStore.store used to embed each memory and evaluate learning
+triggers before returning, which put the embedding model on the critical
+path of every hook-driven write. LearningPipeline moves that work to worker
+threads: store() records the memory, submits it and returns, and workers
+hand queued memories to the store in batches. flush() is a barrier for
+tests, snapshots and shutdown, and metrics() reports queue depth and lag.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from shared.type_definitions.json import JSONValue
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# What submit() does when the queue is full
+BACKPRESSURE_POLICIES = ("block", "inline", "drop_oldest")
+
+
+class LearningPipeline(Generic[T]):
+    """
+    Bounded queue drained by worker threads in batches.
+
+    Items are handed to the handler in submission order, in batches of up to
+    batch_size; with several workers, batches run concurrently, so the
+    handler must be thread-safe. When the queue holds max_queue items,
+    submit() applies the backpressure policy:
+
+    - "block": wait for a worker to make room
+    - "inline": run the item in the submitting thread
+    - "drop_oldest": discard the oldest queued item (counted in metrics)
+
+    Before start() (and after stop()) items run inline.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], None],
+        workers: int = 1,
+        max_queue: int = 10_000,
+        backpressure: str = "block",
+        batch_size: int = 64,
+        name: str = "learning-pipeline",
+    ):
+        """
+        Initialize LearningPipeline.
+
+        Args:
+            handler: Processes a batch of items
+            workers: Worker threads
+            max_queue: Queued items before backpressure applies
+            backpressure: "block", "inline" or "drop_oldest"
+            batch_size: Most items handed to one handler call
+            name: Worker thread name prefix
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_POLICIES}, got {backpressure!r}")
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.batch_size = max(1, batch_size)
+        self.name = name
+        # (sequence, enqueue time, item), oldest first
+        self._queue: Deque[Tuple[int, float, T]] = deque()
+        self._in_flight: Set[int] = set()
+        self._next_sequence = 0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._submitted = 0
+        self._processed = 0
+        self._inline = 0
+        self._dropped = 0
+        self._failed = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    @property
+    def depth(self) -> int:
+        """Items queued and not yet picked up by a worker."""
+        return len(self._queue)
+
+    def start(self) -> "LearningPipeline[T]":
+        """Start the worker threads."""
+        with self._condition:
+            if self._threads:
+                return self
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers.
+
+        Args:
+            drain: Process queued items first (otherwise they are run inline
+                after the workers exit, so nothing is lost either way)
+            timeout: Most seconds to wait for the workers
+        """
+        if drain:
+            self.flush(timeout)
+        with self._condition:
+            threads, self._threads = self._threads, []
+            self._stopping = True
+            self._condition.notify_all()
+        if threads:
+            atexit.unregister(self.stop)
+        for thread in threads:
+            thread.join(timeout)
+        # Anything still queued (drain=False, or a timeout) runs here
+        with self._condition:
+            leftover = [item for _, _, item in self._queue]
+            self._queue.clear()
+            self._condition.notify_all()
+        if leftover:
+            self._run_inline(leftover)
+
+    def submit(self, item: T) -> bool:
+        """
+        Queue one item for the workers.
+
+        Args:
+            item: Item for the handler
+
+        Returns:
+            False if the item was run inline instead of queued
+        """
+        with self._condition:
+            if self._threads and len(self._queue) >= self.max_queue:
+                if self.backpressure == "block":
+                    while self._threads and len(self._queue) >= self.max_queue:
+                        self._condition.wait()
+                elif self.backpressure == "drop_oldest":
+                    self._queue.popleft()
+                    self._dropped += 1
+                    self._condition.notify_all()
+            if self._threads and len(self._queue) < self.max_queue:
+                self._queue.append((self._next_sequence, time.monotonic(), item))
+                self._next_sequence += 1
+                self._submitted += 1
+                self._condition.notify()
+                return True
+        self._run_inline([item])
+        return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every item submitted before this call has been handled.
+
+        Args:
+            timeout: Most seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the barrier was reached, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            barrier = self._next_sequence
+            while self._oldest_outstanding() < barrier:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def metrics(self) -> Dict[str, JSONValue]:
+        """
+        Queue depth, throughput counters and lag.
+
+        lag_seconds is the age of the oldest queued item; last_lag_seconds
+        and max_lag_seconds are the time items waited before a worker picked
+        them up.
+        """
+        with self._condition:
+            oldest = self._queue[0][1] if self._queue else None
+            return {
+                "running": bool(self._threads),
+                "workers": self.workers,
+                "backpressure": self.backpressure,
+                "depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "in_flight": len(self._in_flight),
+                "submitted": self._submitted,
+                "processed": self._processed,
+                "inline": self._inline,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "lag_seconds": time.monotonic() - oldest if oldest is not None else 0.0,
+                "last_lag_seconds": self._last_lag,
+                "max_lag_seconds": self._max_lag,
+            }
+
+    def _oldest_outstanding(self) -> int:
+        oldest = self._next_sequence
+        if self._queue:
+            oldest = self._queue[0][0]
+        if self._in_flight:
+            oldest = min(oldest, min(self._in_flight))
+        return oldest
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                sequences = {sequence for sequence, _, _ in batch}
+                self._in_flight.update(sequences)
+                self._last_lag = now - batch[0][1]
+                self._max_lag = max(self._max_lag, self._last_lag)
+                # Wake producers blocked on a full queue
+                self._condition.notify_all()
+            failed = 0
+            try:
+                self.handler([item for _, _, item in batch])
+            except Exception as e:
+                failed = len(batch)
+                logger.warning(f"{self.name} failed to process {len(batch)} items: {e}")
+            with self._condition:
+                self._in_flight.difference_update(sequences)
+                self._processed += len(batch) - failed
+                self._failed += failed
+                self._condition.notify_all()
+
+    def _run_inline(self, items: List[T]) -> None:
+        try:
+            self.handler(items)
+        except Exception as e:
+            logger.warning(f"{self.name} failed to process {len(items)} items inline: {e}")
+            with self._condition:
+                self._failed += len(items)
+            return
+        with self._condition:
+            self._inline += len(items)
@@ -7,12 +7,19 @@ See MCP_INTEGRATION_STANDARDS.md for detailed specifications.
 """
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional, cast
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, cast
 from shared.type_definitions.json import JSONValue
 from abc import ABC, abstractmethod
 import os
 import logging
-from shared.models.memory import MemoryRecord, MemoryPriority, MemoryMetadata, MemorySearchResult
+import time
+from shared.models.memory import MemoryRecord, MemoryPriority, MemoryMetadata, MemorySearchResult, MemoryQuery
+
+from .compact_record import CompactRecord
+from .session_transcript import SessionTranscriptWriter, default_sessions_dir, transcript_filename
+from .tag_index import TagIndex
+from .timing_wheel import TimingWheel
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +55,46 @@ class MemoryStore(ABC):
         """Get all stored memories."""
         pass
 
+    def query(self, query: MemoryQuery) -> Iterator[MemoryRecord]:
+        """Stream memories matching a structured query, newest first.
+
+        Generic fallback that filters get_all() in Python. Stores with a tag
+        index override this to push the filters, cursor and limit down.
+        """
+        return filter_memory_query(self.get_all().records, query)
+
+
+def filter_memory_query(records: Iterable[MemoryRecord], query: MemoryQuery) -> Iterator[MemoryRecord]:
+    """Apply query filters, cursor and limit to newest-first records.
+
+    Args:
+        records: Records ordered newest first
+        query: Query to apply
+
+    Returns:
+        Iterator over the matching page of records
+    """
+    cursor = query.decode_cursor()
+    if cursor is not None:
+        records = _resume_after(records, cursor)
+    return islice((record for record in records if query.matches(record)), query.limit)
+
+
+def _resume_after(records: Iterable[MemoryRecord], cursor: Tuple[datetime, str]) -> Iterator[MemoryRecord]:
+    """Records strictly after the cursor record in newest-first order.
+
+    If the cursor record is gone, resumes with the first strictly older record.
+    """
+    timestamp, key = cursor
+    records = iter(records)
+    for record in records:
+        if record.timestamp < timestamp:
+            yield record
+            break
+        if record.timestamp == timestamp and record.key == key:
+            break
+    yield from records
+
 
 class InMemoryStore(MemoryStore):
     """In-memory implementation of MemoryStore using dict.
@@ -57,18 +104,36 @@ class InMemoryStore(MemoryStore):
     See MCP_INTEGRATION_STANDARDS.md for persistent memory alternatives.
     """
 
-    def __init__(self):
-        self._memories: Dict[str, MemoryRecord] = {}
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        """Initialize the store.
+
+        Args:
+            clock: Source of epoch seconds for TTL expiry (default time.time)
+        """
+        # Records are kept compact and converted to MemoryRecord on the way
+        # out; the tag index is keyed by epoch-float timestamps
+        self._memories: Dict[str, CompactRecord] = {}
+        self._tag_index = TagIndex()
+        # TTL deadlines: expired records are hidden from reads at once and
+        # reclaimed in batches by expire_memories()
+        self._expiry = TimingWheel(clock=clock or time.time)
         logger.info(
             "InMemoryStore initialized - data will not persist between sessions"
         )
 
-    def store(self, key: str, content: Any, tags: List[str]) -> None:
+    def store(self, key: str, content: Any, tags: List[str], ttl_seconds: Optional[int] = None) -> None:
         """Store content with timestamp and tags.
 
         Implements MCP-compatible memory storage with structured metadata.
         Automatically adds timestamps for memory lifecycle management.
+
+        Args:
+            key: Unique memory key
+            content: Memory content
+            tags: Associated tags
+            ttl_seconds: Expire the memory this many seconds after storing it
         """
+        self.expire_memories()
         memory_record = MemoryRecord(
             key=key,
             content=content,
@@ -76,17 +141,65 @@ class InMemoryStore(MemoryStore):
             timestamp=datetime.now(),
             priority=MemoryPriority.MEDIUM,
             metadata=MemoryMetadata(),
-            ttl_seconds=None,
+            ttl_seconds=ttl_seconds,
             embedding=None
         )
-        self._memories[key] = memory_record
+        compact = CompactRecord.from_record(memory_record)
+        self._memories[key] = compact
+        self._tag_index.add(key, compact.tags, compact.timestamp)
+        if ttl_seconds is not None:
+            self._expiry.schedule(key, self._expiry.clock() + ttl_seconds)
+        else:
+            self._expiry.cancel(key)
         logger.debug(f"Stored memory with key: {key}, tags: {tags}")
 
-    def search(self, tags: List[str]) -> MemorySearchResult:
-        """Return memories that have any of the specified tags.
+    def delete(self, key: str) -> bool:
+        """Delete a memory by key. Returns True if it existed."""
+        if self._memories.pop(key, None) is None:
+            return False
+        self._tag_index.remove(key)
+        self._expiry.cancel(key)
+        logger.debug(f"Deleted memory with key: {key}")
+        return True
+
+    def expire_memories(self) -> int:
+        """Reclaim every memory whose TTL has run out.
+
+        Expired memories are already hidden from reads; this removes them
+        from the store and the tag index in one batch. store() calls it, so
+        reclamation keeps pace with writes.
+
+        Returns:
+            Number of memories removed
+        """
+        expired = self._expiry.advance()
+        for key in expired:
+            self._memories.pop(key, None)
+            self._tag_index.remove(key)
+        if expired:
+            logger.debug(f"Expired {len(expired)} memories")
+        return len(expired)
+
+    def _unexpired(self, keys: Iterable[str]) -> Iterable[str]:
+        """Keys whose TTL has not run out (all of them when nothing has a TTL)."""
+        if not self._expiry:
+            return keys
+        now = self._expiry.clock()
+        return (key for key in keys if not self._expiry.is_expired(key, now))
+
+    def search(
+        self, tags: List[str], match_all: bool = False, limit: Optional[int] = None
+    ) -> MemorySearchResult:
+        """Return memories that have any (or all) of the specified tags.
 
         Implements tag-based retrieval pattern from MCP standards.
         Returns sorted results with newest memories first for optimal context.
+        Served from the tag index, so cost follows the number of matches.
+
+        Args:
+            tags: Tags to match
+            match_all: Require every tag instead of at least one
+            limit: Return only the newest N matches
         """
         if not tags:
             search_query: Dict[str, JSONValue] = {"tags": cast(JSONValue, tags)}
@@ -97,16 +210,17 @@ class InMemoryStore(MemoryStore):
                 execution_time_ms=0
             )
 
-        matches: List[MemoryRecord] = []
-        tag_set = set(tags)
-
-        for memory in self._memories.values():
-            memory_tags = set(memory.tags)
-            if tag_set.intersection(memory_tags):
-                matches.append(memory)
-
-        # Sort by timestamp (newest first)
-        matches.sort(key=lambda x: x.timestamp, reverse=True)
+        # Newest first, straight from the index's timeline
+        if self._expiry:
+            # Stream so expired keys don't count against the limit
+            if match_all:
+                keys = self._tag_index.iter_query(all_tags=tags)
+            else:
+                keys = self._tag_index.iter_query(any_tags=tags)
+            selected: Iterable[str] = islice(self._unexpired(keys), limit)
+        else:
+            selected = self._tag_index.query(tags, match_all=match_all, limit=limit)
+        matches = [self._memories[key].to_record() for key in selected]
         logger.debug(f"Found {len(matches)} memories matching tags: {tags}")
 
         final_search_query: Dict[str, JSONValue] = {"tags": cast(JSONValue, tags)}
@@ -117,14 +231,40 @@ class InMemoryStore(MemoryStore):
             execution_time_ms=0
         )
 
+    def query(self, query: MemoryQuery) -> Iterator[MemoryRecord]:
+        """Stream memories matching a structured query, newest first.
+
+        Tag, time-window and cursor filters are resolved by the tag index, so
+        a limited query touches only the records it returns.
+        """
+        cursor = query.decode_cursor()
+        keys = self._tag_index.iter_query(
+            all_tags=query.all_tags,
+            any_tags=query.any_tags,
+            exclude_tags=query.exclude_tags,
+            since=query.since.timestamp() if query.since else None,
+            until=query.until.timestamp() if query.until else None,
+            after=(cursor[0].timestamp(), cursor[1]) if cursor else None,
+        )
+        compacts: Iterable[CompactRecord] = (
+            self._memories[key] for key in self._unexpired(keys) if key in self._memories
+        )
+        if query.agent_id is not None:
+            compacts = (c for c in compacts if c.agent_id == query.agent_id)
+        return (c.to_record() for c in islice(compacts, query.limit))
+
     def get(self, key: str) -> Optional[MemoryRecord]:
         """Get a specific memory by key."""
-        return self._memories.get(key)
+        compact = self._memories.get(key)
+        if compact is None or self._expiry.is_expired(key):
+            return None
+        return compact.to_record()
 
     def get_all(self) -> MemorySearchResult:
         """Return all memories sorted by timestamp (newest first)."""
-        all_memories = list(self._memories.values())
-        all_memories.sort(key=lambda x: x.timestamp, reverse=True)
+        all_memories = [
+            self._memories[key].to_record() for key in self._unexpired(self._tag_index.newest())
+        ]
         logger.debug(f"Retrieved all {len(all_memories)} memories")
 
         return MemorySearchResult(
@@ -147,10 +287,19 @@ class Memory:
         """Initialize with store backend. Defaults to InMemoryStore."""
         self._store = store or InMemoryStore()
 
-    def store(self, key: str, content: Any, tags: Optional[List[str]] = None) -> None:
-        """Store content with key and optional tags."""
+    def store(
+        self, key: str, content: Any, tags: Optional[List[str]] = None, ttl_seconds: Optional[int] = None
+    ) -> None:
+        """Store content with key and optional tags.
+
+        ttl_seconds is passed on only when set, so stores without TTL
+        support keep working for memories that never expire.
+        """
         tags = tags or []  # Default to empty list if not provided
-        self._store.store(key, content, tags)
+        if ttl_seconds is None:
+            self._store.store(key, content, tags)
+        else:
+            self._store.store(key, content, tags, ttl_seconds=ttl_seconds)
 
     def search(self, tags: List[str]) -> List[Dict[str, JSONValue]]:
         """Search memories by tags."""
@@ -174,6 +323,14 @@ class Memory:
                 return memory
         return None
 
+    def query(self, query: MemoryQuery) -> Iterator[Dict[str, JSONValue]]:
+        """Stream memories matching a structured query, newest first."""
+        if hasattr(self._store, 'query'):
+            records = self._store.query(query)
+        else:
+            records = filter_memory_query(self._store.get_all().records, query)
+        return (cast(Dict[str, JSONValue], record.to_dict()) for record in records)
+
     def get_all(self) -> List[Dict[str, JSONValue]]:
         """Get all memories."""
         result = self._store.get_all()
@@ -185,20 +342,29 @@ class Memory:
             return cast(List[Dict[str, JSONValue]], result)
 
 
-def create_session_transcript(memories: List[dict[str, JSONValue]], session_id: str) -> str:
+def create_session_transcript(
+    memories: List[dict[str, JSONValue]],
+    session_id: str,
+    directory: Optional[str] = None,
+    compress: bool = False,
+) -> str:
     """
     Create a markdown session transcript from memories.
 
+    Writes the whole transcript in one pass; sessions that record memories
+    as they go should append to a SessionTranscriptWriter instead.
+
     Args:
         memories: List of memory records
         session_id: Unique session identifier
+        directory: Transcript directory (default: AGENCY_SESSIONS_DIR or logs/sessions)
+        compress: Gzip the transcript
 
     Returns:
         Path to created transcript file
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{session_id}.md"
-    filepath = os.path.join("/Users/am/Code/Agency/logs/sessions", filename)
+    filename = transcript_filename(session_id, compress)
+    filepath = os.path.join(directory or default_sessions_dir(), filename)
     # Ensure filepath is a concrete string even if os.path.join is monkey-patched
     if not isinstance(filepath, str):
         base = os.getenv("TMPDIR", "/tmp")
@@ -208,48 +374,17 @@ def create_session_transcript(memories: List[dict[str, JSONValue]], session_id:
             base += "/"
         filepath = base + filename
 
-    # Create transcript content
-    content = f"# Session Transcript: {session_id}\n\n"
-    content += f"**Generated:** {datetime.now().isoformat()}\n"
-    content += f"**Total Memories:** {len(memories)}\n\n"
-
-    if not memories:
-        content += "No memories recorded for this session.\n"
-    else:
-        content += "## Memory Records\n\n"
-
-        for i, memory in enumerate(memories, 1):
-            content += f"### {i}. {memory.get('key', 'Unnamed')}\n\n"
-            content += f"**Timestamp:** {memory.get('timestamp', 'Unknown')}\n"
-            tags = memory.get('tags', [])
-            if isinstance(tags, list):
-                tag_strings = [str(tag) for tag in tags if isinstance(tag, str)]
-                content += f"**Tags:** {', '.join(tag_strings)}\n\n"
-            else:
-                content += "**Tags:** \n\n"
-
-            # Format content
-            memory_content = memory.get("content", "")
-            if isinstance(memory_content, str):
-                content += f"**Content:**\n```\n{memory_content}\n```\n\n"
-            else:
-                content += f"**Content:** {str(memory_content)}\n\n"
-
-            content += "---\n\n"
-
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    def write(path: str) -> None:
+        with SessionTranscriptWriter(session_id, path=path, compress=compress, total=len(memories)) as writer:
+            for memory in memories:
+                writer.append(memory)
 
     # Write transcript with fallback if permission is denied
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        write(filepath)
     except PermissionError:
-        fallback_path = f"/tmp/{filename}"
-        os.makedirs(os.path.dirname(fallback_path), exist_ok=True)
-        with open(fallback_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        filepath = fallback_path
+        filepath = f"/tmp/{filename}"
+        write(filepath)
 
     logger.info(f"Session transcript created: {filepath}")
     return filepath
@@ -9,20 +9,36 @@ Implements industry best practices from 2024-2025 research:
 - Improved performance optimizations
 """
 
+import heapq
 import logging
-import hashlib
 import json
 import math
+import sys
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, cast
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, cast
 from shared.type_definitions.json import JSONValue
 from collections import defaultdict, Counter
 from enum import Enum, IntEnum
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
+from .embedding_cache import calculate_content_hash
+from .minhash_lsh import MinHashLSH
+from .retention_queue import RetentionQueue
+
+try:  # pragma: no cover - exercised implicitly when numpy is installed
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 logger = logging.getLogger(__name__)
 
+# Reference epoch for the log-domain recency stored with each memory
+IMPORTANCE_EPOCH = datetime(2025, 1, 1)
+
+# Memories accessed more recently than this are never pruned
+RECENT_ACCESS_WINDOW = timedelta(hours=24)
+
 
 class MemoryType(Enum):
     """Memory type classification based on cognitive science."""
@@ -52,7 +68,7 @@ class MemoryModality(Enum):
     MULTIMODAL = "multimodal"
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryMetadata:
     """Enhanced metadata for memory records."""
 
@@ -70,13 +86,17 @@ class MemoryMetadata:
     consolidation_level: int = 0  # 0=original, 1=first consolidation, etc.
     parent_memory_id: Optional[str] = None
     related_memory_ids: Optional[List[str]] = None
+    # Set by AttentionMechanism.update_memory_importance: the time-independent
+    # part of the importance score and log(recency) at IMPORTANCE_EPOCH
+    importance_base: Optional[float] = None
+    importance_log_recency: Optional[float] = None
 
     def __post_init__(self):
         if self.related_memory_ids is None:
             self.related_memory_ids = []
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryContent:
     """Structured memory content with embeddings."""
 
@@ -94,11 +114,10 @@ class MemoryContent:
 
     def _calculate_hash(self) -> str:
         """Calculate content hash for deduplication."""
-        content_str = json.dumps(self.raw_content, sort_keys=True, default=str)
-        return hashlib.sha256(content_str.encode()).hexdigest()[:16]
+        return calculate_content_hash(self.raw_content)[:16]
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedMemoryRecord:
     """Complete memory record with metadata and content."""
 
@@ -127,7 +146,15 @@ class EnhancedMemoryRecord:
 
 
 class AttentionMechanism:
-    """Neural pathway-inspired attention mechanism for memory importance."""
+    """
+    Neural pathway-inspired attention mechanism for memory importance.
+
+    Only the recency term of the score changes with time, and it decays
+    exponentially, so update_memory_importance also stores the rest of the
+    score and log(recency) at IMPORTANCE_EPOCH on the memory. The current
+    score is then derived in O(1) (current_importance), or for many memories
+    at once (batch_importance), without re-parsing timestamps.
+    """
 
     def __init__(
         self,
@@ -224,20 +251,218 @@ class AttentionMechanism:
         """Update and return memory importance score."""
         score = self.calculate_importance_score(memory, current_context)
         memory.metadata.importance_score = score
+        self._stamp(memory)
         return score
 
+    def current_importance(
+        self, memory: EnhancedMemoryRecord, now: Optional[datetime] = None
+    ) -> float:
+        """
+        Importance score at now without context, derived from the stored terms.
+
+        Equals calculate_importance_score(memory) as long as the memory's
+        access statistics have not changed since update_memory_importance.
+        """
+        base, log_recency = self._terms(memory)
+        log_now = self._log_recency_at_epoch(now or datetime.now())
+        return min(base + self.recency_weight * math.exp(log_recency - log_now), 1.0)
+
+    def batch_importance(
+        self, memories: Sequence[EnhancedMemoryRecord], now: Optional[datetime] = None
+    ) -> List[float]:
+        """Current context-free importance of many memories (vectorized)."""
+        raw = self._raw_importance(memories, now)
+        if np is None:
+            return [min(score, 1.0) for score in raw]
+        return np.minimum(np.asarray(raw), 1.0).tolist()
+
+    def top_memories(
+        self,
+        memories: Sequence[EnhancedMemoryRecord],
+        limit: int,
+        current_context: Optional[str] = None,
+        min_importance: float = 0.0,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[EnhancedMemoryRecord, float]]:
+        """
+        The most important memories and their current scores, best first.
+
+        Ranks as sorting every memory by calculate_importance_score(memory,
+        current_context) would, ties in input order. Context relevance only
+        moves a score by relevance_weight * 0.5 either way, so it is computed
+        only for memories whose best case can still reach the top limit.
+
+        Args:
+            memories: Memories to rank
+            limit: Maximum number of memories to return
+            current_context: Context for relevance scoring
+            min_importance: Minimum current score to include
+            now: Time to score at (default: now)
+
+        Returns:
+            (memory, score) pairs in descending score order
+        """
+        if limit <= 0 or not memories:
+            return []
+        raw = self._raw_importance(memories, now)
+        if np is None:
+            if current_context:
+                raw = self._apply_context(memories, raw, current_context, limit)
+            ranked = [(index, min(score, 1.0)) for index, score in enumerate(raw)]
+            ranked = [item for item in ranked if item[1] >= min_importance]
+            top = heapq.nlargest(limit, ranked, key=lambda item: item[1])
+            return [(memories[index], score) for index, score in top]
+
+        if current_context:
+            raw = np.asarray(self._apply_context(memories, raw, current_context, limit))
+        scores = np.minimum(raw, 1.0)
+        selected = np.flatnonzero(scores >= min_importance)
+        if len(selected) > limit:
+            kth = np.partition(scores[selected], len(selected) - limit)[len(selected) - limit]
+            selected = selected[scores[selected] >= kth]
+        # Descending score, ties in input order
+        selected = selected[np.lexsort((selected, -scores[selected]))][:limit]
+        return [(memories[index], float(scores[index])) for index in selected.tolist()]
+
+    def _apply_context(
+        self,
+        memories: Sequence[EnhancedMemoryRecord],
+        raw: Any,
+        context: str,
+        limit: int,
+    ) -> Any:
+        """Swap the neutral relevance for context relevance where it can matter."""
+        spread = self.relevance_weight * 0.5
+        contextual = [
+            bool(memory.content.embeddings and memory.content.embeddings.get("text"))
+            for memory in memories
+        ]
+        if np is None:
+            lower = [score - spread if has_text else score for score, has_text in zip(raw, contextual)]
+            cutoff = min(heapq.nlargest(limit, lower)[-1], 1.0) if len(lower) > limit else -math.inf
+            contenders = [
+                index for index, has_text in enumerate(contextual)
+                if has_text and min(raw[index] + spread, 1.0) >= cutoff
+            ]
+        else:
+            mask = np.array(contextual, dtype=bool)
+            lower = np.where(mask, raw - spread, raw)
+            cutoff = (
+                min(float(np.partition(lower, len(lower) - limit)[len(lower) - limit]), 1.0)
+                if len(lower) > limit
+                else -math.inf
+            )
+            contenders = np.flatnonzero(mask & (np.minimum(raw + spread, 1.0) >= cutoff)).tolist()
+
+        # Memories outside the contenders can't reach the top limit even with
+        # the best relevance, so they keep their lower bound
+        adjusted = lower.copy() if np is not None else list(lower)
+        for index in contenders:
+            relevance = self._calculate_semantic_similarity(
+                context, memories[index].content.text_representation
+            )
+            adjusted[index] = raw[index] + self.relevance_weight * (relevance - 0.5)
+        return adjusted
+
+    def _raw_importance(
+        self, memories: Sequence[EnhancedMemoryRecord], now: Optional[datetime]
+    ) -> Any:
+        """Context-free scores before clipping at 1.0 (an array with numpy)."""
+        log_now = self._log_recency_at_epoch(now or datetime.now())
+        terms = [self._terms(memory) for memory in memories]
+        if np is None:
+            return [
+                base + self.recency_weight * math.exp(log_recency - log_now)
+                for base, log_recency in terms
+            ]
+        if not terms:
+            return np.zeros(0)
+        base, log_recency = np.array(terms, dtype=np.float64).T
+        return base + self.recency_weight * np.exp(log_recency - log_now)
+
+    def _log_recency_at_epoch(self, when: datetime) -> float:
+        """log(recency) of an access at when, measured at IMPORTANCE_EPOCH."""
+        return self.decay_rate * (when - IMPORTANCE_EPOCH).total_seconds() / 3600
+
+    def _stamp(self, memory: EnhancedMemoryRecord) -> Tuple[float, float]:
+        """Store the time-independent score terms and log recency on memory."""
+        metadata = memory.metadata
+        frequency_score = min(metadata.access_count / 100, 1.0)
+        priority_score = metadata.priority.value / MemoryPriority.CRITICAL.value
+        base = (
+            self.frequency_weight * frequency_score
+            + self.relevance_weight * 0.5
+            + self.priority_weight * priority_score
+        )
+        log_recency = self._log_recency_at_epoch(datetime.fromisoformat(metadata.last_accessed))
+        metadata.importance_base = base
+        metadata.importance_log_recency = log_recency
+        return base, log_recency
+
+    def _terms(self, memory: EnhancedMemoryRecord) -> Tuple[float, float]:
+        base = memory.metadata.importance_base
+        log_recency = memory.metadata.importance_log_recency
+        if base is None or log_recency is None:
+            return self._stamp(memory)
+        return base, log_recency
+
 
 class SemanticMemoryClusterer:
-    """Cluster related memories for intelligent consolidation."""
+    """
+    Cluster related memories for intelligent consolidation.
+
+    Pairs are only scored when MinHash LSH over their words or tags marks
+    them as candidates. The combined similarity weighs content and tags at
+    0.4 each and time at 0.2, so a pair can only reach the threshold if its
+    content or tag Jaccard similarity reaches (threshold - 0.2) / 0.8; the
+    LSH indexes are tuned to collide at that similarity with probability
+    lsh_recall. Signatures are cached per memory (see index_memory).
+    """
 
-    def __init__(self, similarity_threshold: float = 0.7):
+    def __init__(
+        self,
+        similarity_threshold: float = 0.7,
+        use_lsh: bool = True,
+        lsh_num_perm: int = 64,
+        lsh_recall: float = 0.95,
+    ):
         """
         Initialize clusterer.
 
         Args:
             similarity_threshold: Minimum similarity for clustering
+            use_lsh: Score only LSH candidate pairs instead of every pair
+            lsh_num_perm: MinHash signature length
+            lsh_recall: Chance that a pair just at the threshold is a candidate
         """
         self.similarity_threshold = similarity_threshold
+        # Below this Jaccard similarity in both content and tags, a pair
+        # can't reach similarity_threshold
+        component_threshold = (similarity_threshold - 0.2) / 0.8
+        # With a threshold time alone can reach, every pair is a candidate
+        self.use_lsh = use_lsh and component_threshold > 0
+        self._content_lsh = MinHashLSH(component_threshold, lsh_num_perm, lsh_recall)
+        self._tag_lsh = MinHashLSH(component_threshold, lsh_num_perm, lsh_recall)
+        # namespaced key -> (text, tags) its signatures were computed from
+        self._indexed: Dict[str, tuple] = {}
+
+    def index_memory(self, memory: EnhancedMemoryRecord) -> None:
+        """Compute (or refresh) the LSH signatures of a memory."""
+        if not self.use_lsh:
+            return
+        key = memory.namespaced_key
+        source = (memory.content.text_representation, tuple(memory.metadata.tags))
+        if self._indexed.get(key) == source:
+            return
+        self._content_lsh.add(key, source[0].lower().split())
+        self._tag_lsh.add(key, source[1])
+        self._indexed[key] = source
+
+    def forget_memory(self, namespaced_key: str) -> None:
+        """Drop the LSH signatures of a removed memory."""
+        if self._indexed.pop(namespaced_key, None) is not None:
+            self._content_lsh.remove(namespaced_key)
+            self._tag_lsh.remove(namespaced_key)
 
     def cluster_memories(
         self, memories: List[EnhancedMemoryRecord]
@@ -254,6 +479,11 @@ class SemanticMemoryClusterer:
         if not memories:
             return []
 
+        if self.use_lsh:
+            by_key = {memory.namespaced_key: memory for memory in memories}
+            if len(by_key) == len(memories):
+                return self._cluster_candidates(memories, by_key)
+
         clusters = []
         unclustered = memories.copy()
 
@@ -277,6 +507,41 @@ class SemanticMemoryClusterer:
 
         return clusters
 
+    def _cluster_candidates(
+        self,
+        memories: List[EnhancedMemoryRecord],
+        by_key: Dict[str, EnhancedMemoryRecord],
+    ) -> List[List[EnhancedMemoryRecord]]:
+        """Greedy clustering as above, scoring only LSH candidates of each seed."""
+        for memory in memories:
+            self.index_memory(memory)
+
+        position = {key: i for i, key in enumerate(by_key)}
+        unclustered = dict.fromkeys(by_key)
+        clusters = []
+
+        for seed_key in position:
+            if seed_key not in unclustered:
+                continue
+            del unclustered[seed_key]
+            seed_memory = by_key[seed_key]
+            cluster = [seed_memory]
+
+            candidates = (
+                self._content_lsh.candidates(seed_key) | self._tag_lsh.candidates(seed_key)
+            )
+            # Visit candidates in input order, as the exhaustive scan does
+            for key in sorted(
+                (key for key in candidates if key in unclustered), key=position.__getitem__
+            ):
+                if self._are_memories_similar(seed_memory, by_key[key]):
+                    cluster.append(by_key[key])
+                    del unclustered[key]
+
+            clusters.append(cluster)
+
+        return clusters
+
     def _are_memories_similar(
         self, memory1: EnhancedMemoryRecord, memory2: EnhancedMemoryRecord
     ) -> bool:
@@ -356,6 +621,7 @@ class EnhancedMemoryStore(ABC):
         include_shared: bool = True,
         min_importance: float = 0.0,
         limit: int = 100,
+        current_context: Optional[str] = None,
     ) -> List[EnhancedMemoryRecord]:
         """Search memories with advanced filtering."""
         pass
@@ -393,6 +659,9 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
         self._type_indices: Dict[MemoryType, Set[str]] = defaultdict(set)
         self._tag_indices: Dict[str, Set[str]] = defaultdict(set)
         self._shared_memories: Set[str] = set()
+        # Per-agent pruning order, and when automatic pruning may next succeed
+        self._retention: Dict[str, RetentionQueue] = defaultdict(RetentionQueue)
+        self._prune_retry_at: Dict[str, datetime] = {}
 
         self.max_memories_per_agent = max_memories_per_agent
         self.attention_mechanism = AttentionMechanism()
@@ -404,6 +673,9 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
 
     def store_memory(self, memory: EnhancedMemoryRecord) -> None:
         """Store memory with automatic indexing."""
+        # Share one string object per agent id and tag across memories
+        memory.metadata.agent_id = sys.intern(memory.metadata.agent_id)
+        memory.metadata.tags = [sys.intern(tag) for tag in memory.metadata.tags]
         namespaced_key = memory.namespaced_key
 
         # Update access timestamp if storing existing memory
@@ -426,6 +698,8 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
 
         # Update importance score
         self.attention_mechanism.update_memory_importance(memory)
+        self._retention[memory.metadata.agent_id].push(namespaced_key, self._retention_score(memory))
+        self.clusterer.index_memory(memory)
 
         logger.debug(
             f"Stored memory: {namespaced_key} (type: {memory.metadata.memory_type.value})"
@@ -448,6 +722,7 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
 
             # Update importance score
             self.attention_mechanism.update_memory_importance(memory)
+            self._retention[agent_id].push(namespaced_key, self._retention_score(memory))
 
         return memory
 
@@ -459,8 +734,14 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
         include_shared: bool = True,
         min_importance: float = 0.0,
         limit: int = 100,
+        current_context: Optional[str] = None,
     ) -> List[EnhancedMemoryRecord]:
-        """Advanced memory search with multiple filters."""
+        """
+        Advanced memory search with multiple filters.
+
+        Results are ranked by importance at query time, optionally relative
+        to current_context.
+        """
         candidate_keys = set()
 
         # Start with agent memories
@@ -487,17 +768,13 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
                 tag_keys.update(self._tag_indices.get(tag, set()))
             candidate_keys = candidate_keys.intersection(tag_keys)
 
-        # Get memories and filter by importance
-        memories = []
-        for key in candidate_keys:
-            memory = self._memories.get(key)
-            if memory and memory.metadata.importance_score >= min_importance:
-                memories.append(memory)
-
-        # Sort by importance score (descending)
-        memories.sort(key=lambda m: m.metadata.importance_score, reverse=True)
+        memories = [self._memories[key] for key in candidate_keys if key in self._memories]
 
-        return memories[:limit]
+        # Rank by current importance, filtered by min_importance
+        ranked = self.attention_mechanism.top_memories(
+            memories, limit, current_context=current_context, min_importance=min_importance
+        )
+        return [memory for memory, _ in ranked]
 
     def get_agent_memories(
         self, agent_id: str, memory_type: Optional[MemoryType] = None
@@ -513,9 +790,10 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
             ):
                 memories.append(memory)
 
-        # Sort by importance
-        memories.sort(key=lambda m: m.metadata.importance_score, reverse=True)
-        return memories
+        # Sort by current importance
+        scores = self.attention_mechanism.batch_importance(memories)
+        order = sorted(range(len(memories)), key=scores.__getitem__, reverse=True)
+        return [memories[index] for index in order]
 
     def remove_memory(self, agent_id: str, key: str) -> bool:
         """Remove memory and clean up indices."""
@@ -534,6 +812,8 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
             self._tag_indices[tag].discard(namespaced_key)
 
         self._shared_memories.discard(namespaced_key)
+        self._retention[agent_id].discard(namespaced_key)
+        self.clusterer.forget_memory(namespaced_key)
 
         logger.debug(f"Removed memory: {namespaced_key}")
         return True
@@ -591,43 +871,75 @@ class EnhancedInMemoryStore(EnhancedMemoryStore):
         threshold = int(self.max_memories_per_agent * 0.8)
 
         if agent_memory_count >= threshold:
+            retry_at = self._prune_retry_at.get(agent_id)
+            if retry_at is not None and datetime.now() < retry_at:
+                # The last pruning pass found nothing it could remove yet
+                return
             logger.info(
                 f"Agent {agent_id} memory threshold reached ({agent_memory_count}/{self.max_memories_per_agent})"
             )
             self._prune_agent_memories(agent_id)
 
+    @staticmethod
+    def _retention_score(memory: EnhancedMemoryRecord) -> tuple:
+        """Pruning order: lowest priority, least important, oldest first."""
+        return (
+            memory.metadata.priority.value,
+            memory.metadata.importance_score,
+            memory.metadata.timestamp,
+        )
+
     def _prune_agent_memories(self, agent_id: str, target_ratio: float = 0.7) -> int:
         """Prune low-importance memories for an agent."""
         target_count = int(self.max_memories_per_agent * target_ratio)
-        agent_memories = self.get_agent_memories(agent_id)
+        excess = len(self._agent_indices.get(agent_id, ())) - target_count
 
-        if len(agent_memories) <= target_count:
+        if excess <= 0:
             return 0
 
-        # Sort by importance (ascending) to prune least important first
-        agent_memories.sort(
-            key=lambda m: (
-                m.metadata.priority.value,
-                m.metadata.importance_score,
-                m.metadata.timestamp,
-            )
-        )
-
-        memories_to_prune = agent_memories[: len(agent_memories) - target_count]
+        # The least important memories, popped from the retention queue
+        # instead of sorting every memory of the agent. Memories that must be
+        # kept are set aside so prunable ones behind them are still reached.
+        queue = self._retention[agent_id]
+        now = datetime.now()
+        retry_at: Optional[datetime] = None
+        kept: List[EnhancedMemoryRecord] = []
         pruned_count = 0
 
-        for memory in memories_to_prune:
-            # Don't prune critical memories or very recent ones
-            if memory.metadata.priority >= MemoryPriority.HIGH:
-                continue
-
-            last_accessed = datetime.fromisoformat(memory.metadata.last_accessed)
-            if datetime.now() - last_accessed < timedelta(hours=24):
-                continue
-
-            # Remove memory
-            if self.remove_memory(agent_id, memory.metadata.key):
-                pruned_count += 1
+        while pruned_count < excess:
+            popped = queue.pop_lowest(excess - pruned_count)
+            if not popped:
+                break
+            for _, namespaced_key in popped:
+                memory = self._memories.get(namespaced_key)
+                if memory is None:
+                    continue
+
+                # Don't prune critical memories or very recent ones
+                if memory.metadata.priority >= MemoryPriority.HIGH:
+                    kept.append(memory)
+                    continue
+
+                last_accessed = datetime.fromisoformat(memory.metadata.last_accessed)
+                if now - last_accessed < RECENT_ACCESS_WINDOW:
+                    eligible_at = last_accessed + RECENT_ACCESS_WINDOW
+                    retry_at = eligible_at if retry_at is None else min(retry_at, eligible_at)
+                    kept.append(memory)
+                    continue
+
+                # Remove memory
+                if self.remove_memory(agent_id, memory.metadata.key):
+                    pruned_count += 1
+
+        for memory in kept:
+            queue.push(memory.namespaced_key, self._retention_score(memory))
+
+        # The whole queue was searched and nothing more can be pruned before
+        # retry_at, so automatic pruning backs off until then
+        if pruned_count < excess:
+            self._prune_retry_at[agent_id] = retry_at or now + RECENT_ACCESS_WINDOW
+        else:
+            self._prune_retry_at.pop(agent_id, None)
 
         logger.info(f"Pruned {pruned_count} memories for agent {agent_id}")
         return pruned_count
@@ -841,6 +1153,7 @@ class EnhancedSwarmMemory:
         min_importance: float = 0.0,
         limit: int = 50,
         agent_id: Optional[str] = None,
+        current_context: Optional[str] = None,
     ) -> List[Dict[str, JSONValue]]:
         """
         Search memories with advanced filtering.
@@ -852,6 +1165,7 @@ class EnhancedSwarmMemory:
             min_importance: Minimum importance score
             limit: Maximum number of results
             agent_id: Override default agent ID
+            current_context: Optional context to rank relevance against
 
         Returns:
             List of memory records with content and metadata
@@ -865,6 +1179,7 @@ class EnhancedSwarmMemory:
             include_shared=include_shared,
             min_importance=min_importance,
             limit=limit,
+            current_context=current_context,
         )
 
         # Convert to dictionaries for return
@@ -0,0 +1,141 @@
+"""
+MinHash signatures with LSH banding for near-duplicate candidate search.
+
+SemanticMemoryClusterer used to score every pair of memories. MinHashLSH
+keeps a signature per key and buckets each signature band, so the keys
+likely to have a Jaccard similarity above a threshold can be listed by
+looking up the key's own buckets instead of comparing against every key.
+"""
+
+import random
+from typing import Dict, Iterable, List, Set, Tuple
+
+try:  # pragma: no cover - exercised implicitly when numpy is installed
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Largest prime below 2**32: the universal hash family (a * h + b) mod _PRIME
+# needs a, b drawn from the whole field, and a * h + b then still fits in uint64
+_PRIME = (1 << 32) - 5
+_MAX_HASH = (1 << 32) - 1
+
+
+def choose_bands(threshold: float, num_perm: int, recall: float) -> Tuple[int, int]:
+    """
+    Pick an LSH band layout for a Jaccard threshold.
+
+    Uses the most rows per band (fewest false candidates) for which a pair
+    at exactly the threshold still collides in some band with probability
+    at least recall.
+
+    Args:
+        threshold: Jaccard similarity pairs must reach to be candidates
+        num_perm: Signature length
+        recall: Minimum collision probability at the threshold
+
+    Returns:
+        (bands, rows) with bands * rows <= num_perm
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class MinHashLSH:
+    """
+    MinHash signatures of token sets, bucketed by band.
+
+    Keys are added one at a time as their token sets become known and can be
+    removed or re-added, so the index is maintained incrementally. Tokens
+    are hashed with Python's hash(), so signatures are only comparable
+    within one process.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        num_perm: int = 64,
+        recall: float = 0.95,
+        seed: int = 1,
+    ):
+        """
+        Initialize MinHashLSH.
+
+        Args:
+            threshold: Jaccard similarity candidates should reach
+            num_perm: Number of hash permutations in each signature
+            recall: Collision probability wanted for pairs at the threshold
+            seed: Seed for the permutation parameters
+        """
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(num_perm)
+        ]
+        if np is not None:
+            # a, b < _PRIME and hashes < 2**32, so a * h + b fits in uint64
+            self._a = np.array([a for a, _ in self._permutations], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._permutations], dtype=np.uint64)[:, None]
+        self.bands, self.rows = choose_bands(threshold, num_perm, recall)
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(self.bands)]
+        self._band_keys: Dict[str, List[Tuple[int, ...]]] = {}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._band_keys
+
+    def __len__(self) -> int:
+        return len(self._band_keys)
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a token set (empty for no tokens)."""
+        hashes = {hash(token) & _MAX_HASH for token in tokens}
+        if not hashes:
+            return ()
+        if np is not None:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            minima = ((self._a * values + self._b) % np.uint64(_PRIME)).min(axis=1)
+            return tuple(minima.tolist())
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes)
+            for a, b in self._permutations
+        )
+
+    def add(self, key: str, tokens: Iterable[str]) -> None:
+        """
+        Index key under the signature of tokens, replacing any previous entry.
+
+        Keys with no tokens are not indexed and have no candidates.
+        """
+        self.remove(key)
+        signature = self.signature(tokens)
+        if not signature:
+            return
+        band_keys = [
+            signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)
+        ]
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, set()).add(key)
+        self._band_keys[key] = band_keys
+
+    def remove(self, key: str) -> None:
+        """Remove key if present."""
+        band_keys = self._band_keys.pop(key, None)
+        if band_keys is None:
+            return
+        for buckets, band_key in zip(self._buckets, band_keys):
+            bucket = buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band_key]
+
+    def candidates(self, key: str) -> Set[str]:
+        """Keys sharing at least one band bucket with key (excluding key)."""
+        found: Set[str] = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys.get(key, ())):
+            found |= buckets[band_key]
+        found.discard(key)
+        return found
@@ -0,0 +1,81 @@
+"""
+Incrementally maintained eviction order for memory pruning.
+
+The stores used to sort every memory of an agent each time it crossed its
+pruning threshold. RetentionQueue keeps the memories in a lazy-deletion
+min-heap keyed by their retention score instead, so admitting, rescoring
+and evicting a memory each cost amortized O(log n).
+"""
+
+import heapq
+from typing import Any, Dict, List, Tuple
+
+
+class RetentionQueue:
+    """
+    Min-heap of keys ordered by retention score (lowest evicted first).
+
+    Rescoring or removing a key leaves its old heap entry in place; stale
+    entries are skipped when popped and the heap is rebuilt once they
+    outnumber the live ones. Equal scores pop in the order they were pushed.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[Any, int, str]] = []
+        # key -> (score, sequence) of its live heap entry
+        self._live: Dict[str, Tuple[Any, int]] = {}
+        self._sequence = 0
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._live
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def score_of(self, key: str) -> Any:
+        """Current retention score of key (KeyError if absent)."""
+        return self._live[key][0]
+
+    def push(self, key: str, score: Any) -> None:
+        """
+        Add key, or move it to a new score.
+
+        Args:
+            key: Memory key
+            score: Comparable retention score; lower is evicted first
+        """
+        current = self._live.get(key)
+        if current is not None and current[0] == score:
+            return
+        self._sequence += 1
+        self._live[key] = (score, self._sequence)
+        heapq.heappush(self._heap, (score, self._sequence, key))
+        self._maybe_compact()
+
+    def discard(self, key: str) -> None:
+        """Remove key if present."""
+        if self._live.pop(key, None) is not None:
+            self._maybe_compact()
+
+    def pop_lowest(self, count: int) -> List[Tuple[Any, str]]:
+        """
+        Remove and return up to count keys with the lowest scores.
+
+        Args:
+            count: Maximum number of keys to pop
+
+        Returns:
+            (score, key) pairs in ascending score order
+        """
+        popped: List[Tuple[Any, str]] = []
+        while self._heap and len(popped) < count:
+            score, sequence, key = heapq.heappop(self._heap)
+            if self._live.get(key) == (score, sequence):
+                del self._live[key]
+                popped.append((score, key))
+        return popped
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(score, sequence, key) for key, (score, sequence) in self._live.items()]
+            heapq.heapify(self._heap)
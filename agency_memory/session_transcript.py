@@ -0,0 +1,315 @@
+"""
+Streaming session transcripts.
+
+create_session_transcript used to rebuild the whole markdown transcript
+by string concatenation once the session had ended. SessionTranscriptWriter
+appends each memory as it is recorded, buffers the encoded entries and
+writes them out in batches (optionally as gzip members), and keeps a
+sidecar index of entry offsets so readers can fetch a range of entries
+without parsing the whole file.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from typing import IO, Any, Dict, List, Optional, Tuple, cast
+
+from shared.type_definitions.json import JSONValue
+
+# Directory for session transcripts unless a writer is given one
+SESSIONS_DIR_ENV = "AGENCY_SESSIONS_DIR"
+DEFAULT_SESSIONS_DIR = os.path.join("logs", "sessions")
+
+# Buffered transcript bytes written out once this many pile up
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# Seconds an entry may sit in the buffer before the next append flushes it
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Parsed indexes kept by read_transcript_index, most recently read last
+INDEX_CACHE_SIZE = 32
+
+INDEX_SUFFIX = ".index.jsonl"
+
+
+def default_sessions_dir() -> str:
+    """Transcript directory from AGENCY_SESSIONS_DIR, else logs/sessions."""
+    return os.getenv(SESSIONS_DIR_ENV) or DEFAULT_SESSIONS_DIR
+
+
+def transcript_filename(session_id: str, compress: bool = False) -> str:
+    """File name for a new transcript of session_id."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{timestamp}_{session_id}.md" + (".gz" if compress else "")
+
+
+def is_transcript_file(filename: str) -> bool:
+    """Whether filename is a (possibly compressed) transcript."""
+    return filename.endswith(".md") or filename.endswith(".md.gz")
+
+
+def format_transcript_entry(position: int, memory: Mapping) -> str:
+    """Markdown section for one memory (position counts from 1)."""
+    parts = [f"### {position}. {memory.get('key', 'Unnamed')}\n\n"]
+    parts.append(f"**Timestamp:** {memory.get('timestamp', 'Unknown')}\n")
+    tags = memory.get("tags", [])
+    if isinstance(tags, list):
+        tag_strings = [str(tag) for tag in tags if isinstance(tag, str)]
+        parts.append(f"**Tags:** {', '.join(tag_strings)}\n\n")
+    else:
+        parts.append("**Tags:** \n\n")
+
+    memory_content = memory.get("content", "")
+    if isinstance(memory_content, str):
+        parts.append(f"**Content:**\n```\n{memory_content}\n```\n\n")
+    else:
+        parts.append(f"**Content:** {str(memory_content)}\n\n")
+    parts.append("---\n\n")
+    return "".join(parts)
+
+
+class SessionTranscriptWriter:
+    """
+    Append-only markdown transcript of one session.
+
+    Entries are encoded once when appended and buffered; flush() appends
+    the buffer to the transcript and the matching offsets to the index.
+    Offsets count bytes of the uncompressed transcript, so they stay valid
+    for gzip transcripts, whose flushes are appended as separate members.
+    Nothing is written until the first flush, so a session that records no
+    memories leaves no file unless close() is called.
+
+    The buffer is flushed once it holds buffer_size bytes or its oldest
+    entry is flush_interval seconds old, whichever comes first, so a crash
+    loses at most that much of the tail. Callers that pause between
+    appends (e.g. between agent run steps) should flush() themselves.
+    When total is not known up front, close() ends the transcript with
+    its "Total Memories" line instead of the header.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        directory: Optional[str] = None,
+        path: Optional[str] = None,
+        compress: Optional[bool] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        total: Optional[int] = None,
+        flush_interval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+    ):
+        """
+        Initialize SessionTranscriptWriter.
+
+        Args:
+            session_id: Session the transcript belongs to
+            directory: Directory for a generated file name (default: default_sessions_dir())
+            path: Exact transcript path, overriding directory
+            compress: Gzip the transcript (default: whether path ends in .gz)
+            buffer_size: Buffered bytes that trigger a flush
+            total: Memory count for the header, when known up front
+            flush_interval: Age in seconds of the oldest buffered entry that
+                triggers a flush on the next append (None: size only)
+        """
+        if compress is None:
+            compress = path is not None and path.endswith(".gz")
+        if path is None:
+            path = os.path.join(directory or default_sessions_dir(), transcript_filename(session_id, compress))
+        self.session_id = session_id
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._total = total
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._buffered_at = 0.0
+        self._pending_index: List[Dict[str, JSONValue]] = []
+        self._offset = 0
+        self._started = False
+        self._closed = False
+
+    def __enter__(self) -> "SessionTranscriptWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def append(self, memory: Mapping) -> int:
+        """
+        Add one memory to the transcript.
+
+        Args:
+            memory: Memory dict with key, timestamp, tags and content
+
+        Returns:
+            Position of the entry (from 1)
+        """
+        if self._closed:
+            raise ValueError("transcript is closed")
+        if not self._started:
+            self._write_header()
+            self._push("## Memory Records\n\n".encode("utf-8"))
+        self.count += 1
+        data = format_transcript_entry(self.count, memory).encode("utf-8")
+        tags = memory.get("tags", [])
+        self._pending_index.append({
+            "position": self.count,
+            "key": cast(JSONValue, memory.get("key")),
+            "timestamp": cast(JSONValue, memory.get("timestamp")),
+            "tags": cast(JSONValue, list(tags) if isinstance(tags, list) else []),
+            "offset": self._offset,
+            "length": len(data),
+        })
+        self._push(data)
+        if self._buffered >= self.buffer_size or (
+            self.flush_interval is not None and time.monotonic() - self._buffered_at >= self.flush_interval
+        ):
+            self.flush()
+        return self.count
+
+    def flush(self) -> None:
+        """Append buffered entries to the transcript and their offsets to the index."""
+        if not self._buffer:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = b"".join(self._buffer)
+        stream: IO[bytes]
+        stream = gzip.open(self.path, "ab") if self.compress else open(self.path, "ab")
+        with stream:
+            stream.write(data)
+        if self._pending_index:
+            with open(self.index_path, "a", encoding="utf-8") as index:
+                index.write("".join(json.dumps(entry) + "\n" for entry in self._pending_index))
+        self._buffer = []
+        self._buffered = 0
+        self._pending_index = []
+
+    def close(self) -> None:
+        """Flush, writing a header-only transcript if nothing was appended."""
+        if self._closed:
+            return
+        if not self._started:
+            self._write_header()
+            self._push("No memories recorded for this session.\n".encode("utf-8"))
+        elif self._total is None:
+            self._push(f"**Total Memories:** {self.count}\n".encode("utf-8"))
+        self.flush()
+        self._closed = True
+
+    def _write_header(self) -> None:
+        header = f"# Session Transcript: {self.session_id}\n\n"
+        header += f"**Generated:** {datetime.now().isoformat()}\n"
+        if self._total is not None:
+            header += f"**Total Memories:** {self._total}\n"
+        self._push((header + "\n").encode("utf-8"))
+        self._started = True
+
+    def _push(self, data: bytes) -> None:
+        if not self._buffer:
+            self._buffered_at = time.monotonic()
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self._offset += len(data)
+
+
+def _open_transcript(path: str) -> IO[bytes]:
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def read_transcript(path: str) -> str:
+    """Full text of a transcript, compressed or not."""
+    with _open_transcript(path) as stream:
+        return stream.read().decode("utf-8")
+
+
+# index path -> (inode, bytes parsed, entries)
+_index_cache: "OrderedDict[str, Tuple[int, int, List[Dict[str, JSONValue]]]]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def _load_index(path: str) -> List[Dict[str, JSONValue]]:
+    """
+    Cached index entries of a transcript.
+
+    The index is append-only, so a cached index only needs the lines
+    written since it was last read; a replaced or truncated index is
+    parsed again from the start. The returned list is shared with the
+    cache and must not be modified.
+    """
+    index_path = path + INDEX_SUFFIX
+    try:
+        stat = os.stat(index_path)
+    except FileNotFoundError:
+        with _index_cache_lock:
+            _index_cache.pop(index_path, None)
+        return []
+    with _index_cache_lock:
+        inode, parsed, entries = _index_cache.pop(index_path, (stat.st_ino, 0, []))
+        if inode != stat.st_ino or stat.st_size < parsed:
+            inode, parsed, entries = stat.st_ino, 0, []
+        if stat.st_size > parsed:
+            with open(index_path, "rb") as index:
+                index.seek(parsed)
+                data = index.read()
+            # A line still being written is picked up on the next read
+            complete = data[:data.rfind(b"\n") + 1]
+            entries = entries + [json.loads(line) for line in complete.splitlines() if line.strip()]
+            parsed += len(complete)
+        _index_cache[index_path] = (inode, parsed, entries)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+        return entries
+
+
+def read_transcript_index(path: str) -> List[Dict[str, JSONValue]]:
+    """
+    Index entries of a transcript (empty if it has no index).
+
+    Args:
+        path: Transcript path
+
+    Returns:
+        One dict per entry with position, key, timestamp, tags, offset and length
+    """
+    return [dict(entry) for entry in _load_index(path)]
+
+
+def read_transcript_entries(path: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """
+    Text of a range of transcript entries, read through the index.
+
+    Only the bytes spanning the requested entries are read (for gzip
+    transcripts, decompressed up to their end), and the index is cached
+    between calls, so only entries added since the last read are parsed.
+
+    Args:
+        path: Transcript path
+        start: First entry (0-based, as in a slice)
+        stop: Entry to stop before (default: the last entry)
+
+    Returns:
+        Markdown of each entry in the range
+    """
+    entries = _load_index(path)[start:stop]
+    if not entries:
+        return []
+    first = cast(int, entries[0]["offset"])
+    last = entries[-1]
+    end = cast(int, last["offset"]) + cast(int, last["length"])
+    with _open_transcript(path) as stream:
+        stream.seek(first)
+        data = stream.read(end - first)
+    texts = []
+    for entry in entries:
+        begin = cast(int, entry["offset"]) - first
+        texts.append(data[begin:begin + cast(int, entry["length"])].decode("utf-8"))
+    return texts
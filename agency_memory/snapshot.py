@@ -0,0 +1,461 @@
+"""
+Binary snapshots for warm-restoring memory stores.
+
+A snapshot is a single versioned file: a header and a section table with a
+CRC32 per section, followed by the sections themselves. JSON sections hold
+records and store metadata; vector sections hold raw little-endian arrays,
+aligned so they can be memory-mapped straight into the vector index instead
+of being re-embedded. Files are written to a temporary path and renamed into
+place, so readers only ever see complete snapshots; anything truncated or
+corrupted fails validation and raises SnapshotError.
+"""
+
+import atexit
+import gc
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, TypedDict, Union, cast
+
+try:  # pragma: no cover - exercised implicitly when numpy is installed
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from shared.type_definitions.json import JSONValue
+
+from .tag_index import TagIndexState
+from .vector_store import VectorState
+
+if TYPE_CHECKING:
+    from .enhanced_memory_store import EnhancedMemoryStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"AGMEMSNP"
+SNAPSHOT_VERSION = 1
+
+# Section payloads start on multiples of this many bytes
+SECTION_ALIGNMENT = 64
+
+# magic, format version, section count
+_HEADER = struct.Struct("<8sII")
+# name, offset, length, crc32
+_SECTION = struct.Struct("<16sQQI")
+# crc32 of header and section table
+_TABLE_CRC = struct.Struct("<I")
+
+SectionData = Union[bytes, bytearray, memoryview]
+
+
+class StoreSnapshot(TypedDict):
+    """EnhancedMemoryStore state decoded by read_store_snapshot()."""
+
+    meta: Dict[str, JSONValue]
+    records: List[Dict[str, JSONValue]]
+    triggers: List[JSONValue]
+    tag_index: TagIndexState
+    vector_state: VectorState
+    changes: Optional[Dict[str, JSONValue]]
+    learning: Optional[Dict[str, JSONValue]]
+
+
+class SnapshotError(ValueError):
+    """Snapshot file is missing, truncated, corrupted or of another version."""
+
+
+def write_snapshot(path: str, sections: Dict[str, SectionData]) -> str:
+    """
+    Write sections to path atomically.
+
+    Args:
+        path: Snapshot file
+        sections: Section name (at most 16 bytes of UTF-8) -> payload
+
+    Returns:
+        path
+    """
+    table = []
+    offset = _HEADER.size + _SECTION.size * len(sections) + _TABLE_CRC.size
+    payloads = []
+    for name, data in sections.items():
+        encoded_name = name.encode("utf-8")
+        if len(encoded_name) > 16:
+            raise ValueError(f"Section name too long: {name}")
+        view = memoryview(data).cast("B")
+        offset = _align(offset)
+        table.append(_SECTION.pack(encoded_name, offset, view.nbytes, zlib.crc32(view)))
+        payloads.append((offset, view))
+        offset += view.nbytes
+
+    head = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(sections)) + b"".join(table)
+    head += _TABLE_CRC.pack(zlib.crc32(head))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(head)
+            position = len(head)
+            for start, view in payloads:
+                f.write(b"\0" * (start - position))
+                f.write(view)
+                position = start + view.nbytes
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+class SnapshotReader:
+    """
+    Read-only view of a snapshot file.
+
+    The file is memory-mapped copy-on-write: arrays returned by vectors()
+    share pages with the file until they are written to, so adopting them
+    costs no copy.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Open and validate a snapshot.
+
+        Args:
+            path: Snapshot file
+            verify: Check the CRC32 of every section (reads each section once)
+
+        Raises:
+            SnapshotError: If the file is unreadable or fails validation
+        """
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+
+        size = len(self._map)
+        if size < _HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"{path} is not a memory snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} in {path}")
+
+        table_end = _HEADER.size + _SECTION.size * count
+        if table_end + _TABLE_CRC.size > size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        (table_crc,) = _TABLE_CRC.unpack_from(self._map, table_end)
+        if zlib.crc32(memoryview(self._map)[:table_end]) != table_crc:
+            raise SnapshotError(f"Snapshot {path} has a corrupted section table")
+
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            raw_name, offset, length, crc = _SECTION.unpack_from(self._map, _HEADER.size + _SECTION.size * i)
+            name = raw_name.rstrip(b"\0").decode("utf-8")
+            if offset + length > size:
+                raise SnapshotError(f"Snapshot {path} is truncated in section {name}")
+            if verify and zlib.crc32(memoryview(self._map)[offset:offset + length]) != crc:
+                raise SnapshotError(f"Snapshot {path} has a corrupted section {name}")
+            self._sections[name] = (offset, length)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._sections
+
+    @property
+    def sections(self) -> List[str]:
+        """Section names in file order."""
+        return list(self._sections)
+
+    def _span(self, name: str) -> Tuple[int, int]:
+        try:
+            return self._sections[name]
+        except KeyError:
+            raise SnapshotError(f"Snapshot {self.path} has no section {name}") from None
+
+    def json(self, name: str) -> Any:
+        """Decode a JSON section."""
+        offset, length = self._span(name)
+        try:
+            return json.loads(self._map[offset:offset + length].decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise SnapshotError(f"Snapshot {self.path} has an unreadable section {name}: {e}") from e
+
+    def vectors(self, name: str, dim: int, dtype: str = "f") -> Any:
+        """
+        A vector section as rows of dim values.
+
+        Args:
+            name: Section name
+            dim: Values per row
+            dtype: array typecode of the values ('f' float32, 'q' int64)
+
+        Returns:
+            Zero-copy NumPy array of shape (rows, dim) when NumPy is available,
+            else a list of rows (a flat list when dim is 0)
+        """
+        offset, length = self._span(name)
+        itemsize = array(dtype).itemsize
+        if length % itemsize or (dim and length % (itemsize * dim)):
+            raise SnapshotError(f"Snapshot {self.path} section {name} does not hold whole rows")
+        if np is not None:
+            values = np.frombuffer(self._map, dtype=np.dtype(dtype).newbyteorder("<"), count=length // itemsize, offset=offset)
+            return values.reshape(-1, dim) if dim else values
+        values = array(dtype)
+        values.frombytes(self._map[offset:offset + length])
+        if sys.byteorder == "big":
+            values.byteswap()
+        if not dim:
+            return values.tolist()
+        return [values[i:i + dim].tolist() for i in range(0, len(values), dim)]
+
+
+def _vector_bytes(vectors: Any, dtype: str = "f") -> SectionData:
+    """Little-endian bytes of an array or of rows of numbers."""
+    if np is not None:
+        return memoryview(np.ascontiguousarray(vectors, dtype=np.dtype(dtype).newbyteorder("<")))
+    values = array(dtype)
+    for row in vectors:
+        if isinstance(row, (int, float)):
+            values.append(row)
+        else:
+            values.extend(row)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def capture_store(store: "EnhancedMemoryStore") -> Dict[str, SectionData]:
+    """
+    Encode the state of an EnhancedMemoryStore as snapshot sections.
+
+    Only shallow copies are taken from the live store, so a capture may run
+    on a background thread while the store is being written to.
+
+    Args:
+        store: Store to capture
+
+    Returns:
+        Section name -> payload, ready for write_snapshot()
+    """
+    for attempt in range(3):
+        try:
+            records = list(store._memories.values())
+            triggers = list(store._learning_triggers)
+            tag_index = store._tag_index.export_state()
+            vector_state = store.vector_store.export_state()
+            changes = {
+                "store_id": store.store_id,
+                "revision": store.revision,
+                "floor": store._change_floor,
+                "keys": dict(store._key_revisions),
+            }
+            consolidator = store.learning_consolidator
+            learning = consolidator.to_dict() if consolidator is not None else None
+            break
+        except (RuntimeError, KeyError):
+            # The store changed size mid-copy; try again
+            if attempt == 2:
+                raise
+
+    keys = vector_state["keys"]
+    vectors = vector_state["vectors"]
+    meta: Dict[str, JSONValue] = {
+        "created_at": datetime.now().isoformat(),
+        "memory_count": len(records),
+        "embedding_model": vector_state["embedding_model"],
+        "normalized": vector_state["normalized"],
+        "dim": len(vectors[0]) if len(keys) else 0,
+    }
+    sections: Dict[str, SectionData] = {
+        "meta": b"",
+        "records": _json_bytes(records),
+        "tag_index": _json_bytes(tag_index),
+        "texts": _json_bytes(vector_state["texts"]),
+        "triggers": _json_bytes(triggers),
+        "keys": _json_bytes(keys),
+        "embeddings": _vector_bytes(vectors),
+        "changes": _json_bytes(changes),
+    }
+    if learning is not None:
+        sections["learning"] = _json_bytes(learning)
+    if "ivf_centroids" in vector_state:
+        meta["ivf_trained_size"] = vector_state["ivf_trained_size"]
+        sections["ivf_centroids"] = _vector_bytes(vector_state["ivf_centroids"])
+        sections["ivf_lists"] = _vector_bytes(vector_state["ivf_assignment"], "q")
+    sections["meta"] = _json_bytes(meta)
+    return sections
+
+
+def read_store_snapshot(path: str, verify: bool = True) -> StoreSnapshot:
+    """
+    Decode a snapshot written from an EnhancedMemoryStore.
+
+    Args:
+        path: Snapshot file
+        verify: Check section checksums
+
+    Returns:
+        Dict with meta, records, triggers, tag_index, vector_state (in the
+        shape of VectorStore.export_state()), and the change log and learning
+        consolidation state as changes and learning (None when absent)
+
+    Raises:
+        SnapshotError: If the snapshot is missing, invalid or inconsistent
+    """
+    reader = SnapshotReader(path, verify=verify)
+    meta = reader.json("meta")
+    records = reader.json("records")
+    keys = reader.json("keys")
+    triggers = reader.json("triggers")
+    if not all(isinstance(value, t) for value, t in ((meta, dict), (records, list), (keys, list), (triggers, list))):
+        raise SnapshotError(f"Snapshot {path} has malformed sections")
+    dim = meta.get("dim", 0)
+    if not isinstance(dim, int) or dim < 0:
+        raise SnapshotError(f"Snapshot {path} has an invalid embedding dimension")
+    vectors = reader.vectors("embeddings", dim) if keys else []
+    if len(vectors) != len(keys) or any(not isinstance(r, dict) or "key" not in r for r in records):
+        raise SnapshotError(f"Snapshot {path} has inconsistent sections")
+
+    vector_state: VectorState = {
+        "texts": reader.json("texts"),
+        "embedding_model": meta.get("embedding_model"),
+        "normalized": bool(meta.get("normalized")),
+        "keys": keys,
+        "vectors": vectors,
+    }
+    if "ivf_centroids" in reader and np is not None:
+        vector_state["ivf_centroids"] = reader.vectors("ivf_centroids", dim)
+        vector_state["ivf_assignment"] = reader.vectors("ivf_lists", 0, "q")
+        vector_state["ivf_trained_size"] = int(meta.get("ivf_trained_size") or 0)
+    return {
+        "meta": meta,
+        "records": records,
+        "triggers": triggers,
+        "tag_index": cast(TagIndexState, reader.json("tag_index")),
+        "vector_state": vector_state,
+        "changes": reader.json("changes") if "changes" in reader else None,
+        "learning": reader.json("learning") if "learning" in reader else None,
+    }
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Suspend cyclic garbage collection for a bulk load.
+
+    Decoding a snapshot allocates hundreds of thousands of dicts and lists;
+    without this every few thousand of them trigger a collection that
+    rescans the whole (already large) heap.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SnapshotScheduler:
+    """
+    Writes snapshots of a store from a daemon thread.
+
+    A snapshot is written every interval_seconds if the store has changed
+    since the last one, and once more when the scheduler is stopped
+    (including at interpreter exit).
+    """
+
+    def __init__(self, store: "EnhancedMemoryStore", path: str, interval_seconds: float = 300.0):
+        """
+        Initialize SnapshotScheduler.
+
+        Args:
+            store: Store to snapshot
+            path: Snapshot file
+            interval_seconds: Time between change checks
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.store = store
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.snapshots_written = 0
+        self._written_revision: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SnapshotScheduler":
+        """Start the background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memory-snapshot", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self, final_snapshot: bool = True) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            final_snapshot: Write a last snapshot if the store changed
+        """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            atexit.unregister(self.stop)
+            self._stop.set()
+            thread.join()
+        if final_snapshot:
+            self.snapshot_now()
+
+    def snapshot_now(self, force: bool = False) -> bool:
+        """
+        Write a snapshot if the store changed since the last one.
+
+        Args:
+            force: Write even if nothing changed
+
+        Returns:
+            True if a snapshot was written
+        """
+        with self._lock:
+            revision = self.store.revision
+            if not force and revision == self._written_revision:
+                return False
+            try:
+                self.store.save_snapshot(self.path)
+            except Exception as e:
+                logger.warning(f"Failed to write memory snapshot to {self.path}: {e}")
+                return False
+            self._written_revision = revision
+            self.snapshots_written += 1
+            return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.snapshot_now()
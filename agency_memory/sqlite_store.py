@@ -0,0 +1,442 @@
+"""
+SQLite-backed durable memory store.
+
+Local alternative to FirestoreStore: memories survive restarts without a
+remote service. The database runs in WAL mode, so readers never block the
+writer and a crashed process loses at most its uncommitted transaction.
+Tags and timestamps live in indexed columns and memory text is mirrored into
+an FTS5 table for full-text search.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, cast
+
+from shared.type_definitions.json import JSONValue
+from shared.models.memory import MemoryRecord, MemoryPriority, MemoryMetadata, MemorySearchResult, MemoryQuery
+
+from .memory import MemoryStore, InMemoryStore
+from .firestore_store import create_firestore_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join("logs", "memory", "agency_memory.sqlite3")
+
+# Newest first; equal timestamps keep insertion order like the in-memory stores
+_ORDER_BY = "ORDER BY m.timestamp DESC, m.rowid ASC"
+_COLUMNS = "m.key, m.content, m.tags, m.timestamp, m.priority, m.metadata, m.ttl_seconds"
+
+
+class SQLiteStore(MemoryStore):
+    """
+    Durable MemoryStore on a local SQLite database.
+
+    Each thread gets its own connection; WAL mode plus a busy timeout let
+    several threads and processes share one database file. Every write runs
+    in a single transaction, and store_batch() commits many memories at once.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, timeout: float = 30.0):
+        """
+        Initialize SQLiteStore.
+
+        Args:
+            path: SQLite database file (created if missing)
+            timeout: Seconds to wait on a database locked by another writer
+        """
+        self.path = path
+        self._timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memories (
+                    key TEXT NOT NULL UNIQUE,
+                    content TEXT NOT NULL,
+                    tags TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    agent_id TEXT,
+                    metadata TEXT NOT NULL,
+                    ttl_seconds INTEGER
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memories_agent ON memories(agent_id, timestamp)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memory_tags (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (tag, key)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_tags_key ON memory_tags(key)")
+        self.fts_enabled = self._create_fts(conn)
+
+        logger.info(f"SQLiteStore initialized at {os.path.abspath(path)} (fts5={self.fts_enabled})")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self._timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Committed transactions survive a process crash; only an OS
+            # crash can roll back the most recent ones
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _create_fts(conn: sqlite3.Connection) -> bool:
+        """Create the full-text table, returning False if FTS5 is unavailable."""
+        try:
+            with conn:
+                conn.execute(
+                    # Rows share the memories rowid, so updates are point lookups
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(text)"
+                )
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLiteStore: FTS5 unavailable, text search will scan content: {e}")
+            return False
+
+    def store(self, key: str, content: Any, tags: List[str]) -> None:
+        """Store content with timestamp and tags in one transaction."""
+        self.store_batch([(key, content, tags)])
+
+    def store_batch(self, items: Iterable[Tuple[str, Any, List[str]]]) -> int:
+        """
+        Store many memories in a single transaction.
+
+        Either every memory in the batch is committed or, if the process dies
+        or a write fails midway, none of them are.
+
+        Args:
+            items: (key, content, tags) tuples
+
+        Returns:
+            Number of memories stored
+        """
+        conn = self._connection()
+        count = 0
+        with conn:
+            for key, content, tags in items:
+                record = MemoryRecord(
+                    key=key,
+                    content=content,
+                    tags=tags,
+                    timestamp=datetime.now(),
+                    priority=MemoryPriority.MEDIUM,
+                    metadata=MemoryMetadata(),
+                    ttl_seconds=None,
+                    embedding=None
+                )
+                self._write(conn, record)
+                count += 1
+        logger.debug(f"SQLiteStore: stored {count} memories")
+        return count
+
+    def _write(self, conn: sqlite3.Connection, record: MemoryRecord) -> None:
+        """Upsert record and its tag and full-text rows (caller owns the transaction)."""
+        content_json = json.dumps(record.content, default=str)
+        # Upsert keeps the rowid, so a rewritten key keeps its tie-break position
+        conn.execute(
+            """
+            INSERT INTO memories (key, content, tags, timestamp, priority, agent_id, metadata, ttl_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                content = excluded.content,
+                tags = excluded.tags,
+                timestamp = excluded.timestamp,
+                priority = excluded.priority,
+                agent_id = excluded.agent_id,
+                metadata = excluded.metadata,
+                ttl_seconds = excluded.ttl_seconds
+            """,
+            (
+                record.key,
+                content_json,
+                json.dumps(record.tags),
+                _format_timestamp(record.timestamp),
+                record.priority.value,
+                record.metadata.agent_id,
+                record.metadata.model_dump_json(),
+                record.ttl_seconds,
+            ),
+        )
+        # memory_tags indexes tag lookups; the tags column keeps their order
+        conn.execute("DELETE FROM memory_tags WHERE key = ?", (record.key,))
+        conn.executemany(
+            "INSERT INTO memory_tags (tag, key) VALUES (?, ?)",
+            [(tag, record.key) for tag in record.tags],
+        )
+        if self.fts_enabled:
+            text = record.content if isinstance(record.content, str) else content_json
+            rowid = conn.execute("SELECT rowid FROM memories WHERE key = ?", (record.key,)).fetchone()[0]
+            conn.execute("DELETE FROM memories_fts WHERE rowid = ?", (rowid,))
+            conn.execute(
+                "INSERT INTO memories_fts (rowid, text) VALUES (?, ?)",
+                (rowid, " ".join([text, *record.tags])),
+            )
+
+    def delete(self, key: str) -> bool:
+        """Delete a memory by key. Returns True if it existed."""
+        conn = self._connection()
+        with conn:
+            row = conn.execute("SELECT rowid FROM memories WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM memories WHERE rowid = ?", row)
+            conn.execute("DELETE FROM memory_tags WHERE key = ?", (key,))
+            if self.fts_enabled:
+                conn.execute("DELETE FROM memories_fts WHERE rowid = ?", row)
+        return True
+
+    def get(self, key: str) -> Optional[MemoryRecord]:
+        """Get a specific memory by key."""
+        rows = self._fetch_records(f"SELECT {_COLUMNS} FROM memories m WHERE m.key = ?", [key])
+        return rows[0] if rows else None
+
+    def search(
+        self, tags: List[str], match_all: bool = False, limit: Optional[int] = None
+    ) -> MemorySearchResult:
+        """
+        Return memories that have any (or all) of the specified tags.
+
+        Args:
+            tags: Tags to match
+            match_all: Require every tag instead of at least one
+            limit: Return only the newest N matches
+
+        Returns:
+            Matching memory records, newest first
+        """
+        search_query: Dict[str, JSONValue] = {"tags": cast(JSONValue, tags)}
+        if not tags:
+            return MemorySearchResult(records=[], total_count=0, search_query=search_query, execution_time_ms=0)
+
+        if match_all:
+            query = MemoryQuery(all_tags=tags, limit=limit)
+        else:
+            query = MemoryQuery(any_tags=tags, limit=limit)
+        records = list(self.query(query))
+        return MemorySearchResult(
+            records=records,
+            total_count=len(records),
+            search_query=search_query,
+            execution_time_ms=0
+        )
+
+    def get_all(self) -> MemorySearchResult:
+        """Return all memories sorted by timestamp (newest first)."""
+        records = list(self.query(MemoryQuery()))
+        return MemorySearchResult(
+            records=records,
+            total_count=len(records),
+            search_query={},
+            execution_time_ms=0
+        )
+
+    def query(self, query: MemoryQuery) -> Iterator[MemoryRecord]:
+        """
+        Stream memories matching a structured query, newest first.
+
+        Compiled into one SQL statement over the tag and timestamp indexes;
+        rows are read from the cursor as the caller consumes them.
+
+        Args:
+            query: Structured memory query
+
+        Returns:
+            Iterator over matching memory records
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for tag in dict.fromkeys(query.all_tags):
+            clauses.append("m.key IN (SELECT key FROM memory_tags WHERE tag = ?)")
+            params.append(tag)
+        if query.any_tags:
+            clauses.append(f"m.key IN (SELECT key FROM memory_tags WHERE tag IN ({_placeholders(query.any_tags)}))")
+            params.extend(query.any_tags)
+        if query.exclude_tags:
+            clauses.append(
+                f"m.key NOT IN (SELECT key FROM memory_tags WHERE tag IN ({_placeholders(query.exclude_tags)}))"
+            )
+            params.extend(query.exclude_tags)
+        if query.since is not None:
+            clauses.append("m.timestamp >= ?")
+            params.append(_format_timestamp(query.since))
+        if query.until is not None:
+            clauses.append("m.timestamp <= ?")
+            params.append(_format_timestamp(query.until))
+        if query.agent_id is not None:
+            clauses.append("m.agent_id = ?")
+            params.append(query.agent_id)
+        cursor = query.decode_cursor()
+        if cursor is not None:
+            # A deleted cursor row makes the subquery NULL: resume strictly older
+            clauses.append(
+                "(m.timestamp < ? OR (m.timestamp = ? AND m.rowid > (SELECT rowid FROM memories WHERE key = ?)))"
+            )
+            timestamp = _format_timestamp(cursor[0])
+            params.extend([timestamp, timestamp, cursor[1]])
+
+        sql = f"SELECT {_COLUMNS} FROM memories m"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" {_ORDER_BY}"
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            params.append(query.limit)
+        return self._iter_records(sql, params)
+
+    def text_search(self, text: str, limit: int = 10) -> MemorySearchResult:
+        """
+        Full-text search over memory content and tags.
+
+        Uses FTS5 ranked by BM25 when available, otherwise a substring scan.
+
+        Args:
+            text: Words to search for (all must match)
+            limit: Maximum number of results
+
+        Returns:
+            Matching memory records, best match first
+        """
+        search_query: Dict[str, JSONValue] = {"text": text}
+        words = text.split()
+        if not words:
+            return MemorySearchResult(records=[], total_count=0, search_query=search_query, execution_time_ms=0)
+
+        if self.fts_enabled:
+            # Quote every word so user input is never parsed as FTS syntax
+            match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+            sql = (
+                f"SELECT {_COLUMNS} FROM memories_fts f JOIN memories m ON m.rowid = f.rowid "
+                "WHERE memories_fts MATCH ? ORDER BY bm25(memories_fts), m.timestamp DESC LIMIT ?"
+            )
+            params: List[Any] = [match, limit]
+        else:
+            sql = f"SELECT {_COLUMNS} FROM memories m WHERE " + " AND ".join(["m.content LIKE ?"] * len(words))
+            params = [f"%{word}%" for word in words]
+            sql += f" {_ORDER_BY} LIMIT ?"
+            params.append(limit)
+
+        try:
+            records = self._fetch_records(sql, params)
+        except sqlite3.Error as e:
+            logger.error(f"SQLiteStore: text search failed for {text!r}: {e}")
+            records = []
+        return MemorySearchResult(
+            records=records,
+            total_count=len(records),
+            search_query=search_query,
+            execution_time_ms=0
+        )
+
+    def _iter_records(self, sql: str, params: List[Any]) -> Iterator[MemoryRecord]:
+        for row in self._connection().execute(sql, params):
+            record = _row_to_record(row)
+            if record is not None:
+                yield record
+
+    def _fetch_records(self, sql: str, params: List[Any]) -> List[MemoryRecord]:
+        return list(self._iter_records(sql, params))
+
+    def __len__(self) -> int:
+        return int(self._connection().execute("SELECT COUNT(*) FROM memories").fetchone()[0])
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _format_timestamp(timestamp: datetime) -> str:
+    """
+    Fixed-width ISO timestamp, so text order matches time order.
+
+    Timezone-aware datetimes are converted to naive local time, the form
+    records are stored in, so they compare correctly as text (as with
+    datetime.timestamp(), naive datetimes are taken to be local time).
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp.isoformat(timespec="microseconds")
+
+
+def _placeholders(values: List[str]) -> str:
+    return ",".join("?" * len(values))
+
+
+def _row_to_record(row: Tuple[Any, ...]) -> Optional[MemoryRecord]:
+    """Convert a memories row to a MemoryRecord (None if malformed)."""
+    key, content, tags, timestamp, priority, metadata, ttl_seconds = row
+    try:
+        return MemoryRecord(
+            key=key,
+            content=json.loads(content),
+            tags=json.loads(tags),
+            timestamp=datetime.fromisoformat(timestamp),
+            priority=MemoryPriority(priority),
+            metadata=MemoryMetadata.model_validate_json(metadata),
+            ttl_seconds=ttl_seconds,
+            embedding=None
+        )
+    except Exception as e:
+        logger.warning(f"SQLiteStore: failed to convert row {key!r} to MemoryRecord: {e}")
+        return None
+
+
+def create_sqlite_store(path: Optional[str] = None) -> SQLiteStore:
+    """
+    Factory function to create SQLiteStore with standard configuration.
+
+    Args:
+        path: Database file (defaults to AGENCY_MEMORY_DB_PATH or logs/memory/)
+
+    Returns:
+        SQLiteStore instance
+    """
+    return SQLiteStore(path or os.getenv("AGENCY_MEMORY_DB_PATH", DEFAULT_DB_PATH))
+
+
+def create_memory_store(backend: Optional[str] = None) -> MemoryStore:
+    """
+    Create the configured persistent or in-memory MemoryStore.
+
+    Args:
+        backend: "sqlite", "firestore" or "memory". Defaults to
+            AGENCY_MEMORY_BACKEND, then to "firestore" when
+            FRESH_USE_FIRESTORE=true, else "memory".
+
+    Returns:
+        MemoryStore instance
+    """
+    if backend is None:
+        backend = os.getenv("AGENCY_MEMORY_BACKEND", "")
+    if not backend:
+        backend = "firestore" if os.getenv("FRESH_USE_FIRESTORE", "").lower() == "true" else "memory"
+
+    backend = backend.lower()
+    if backend == "sqlite":
+        return create_sqlite_store()
+    if backend == "firestore":
+        return create_firestore_store()
+    if backend == "memory":
+        return InMemoryStore()
+    raise ValueError(f"Unknown memory backend: {backend!r} (expected 'sqlite', 'firestore' or 'memory')")
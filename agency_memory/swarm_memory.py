@@ -9,17 +9,29 @@ See MCP_INTEGRATION_STANDARDS.md for architectural guidelines.
 """
 
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, cast
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 from shared.type_definitions.json import JSONValue
 from collections import defaultdict, Counter
 from enum import IntEnum
 
-from .memory import Memory, MemoryStore
-from shared.models.memory import MemorySearchResult, MemoryRecord, MemoryMetadata, MemoryPriority as SharedMemoryPriority
+from .compact_record import SwarmRecord, intern_tags
+from .memory import Memory, MemoryStore, _resume_after
+from .tag_index import TagIndex
+from .retention_queue import RetentionQueue
+from .timing_wheel import TimingWheel
+from shared.models.memory import MemorySearchResult, MemoryRecord, MemoryMetadata, MemoryQuery, MemoryPriority as SharedMemoryPriority
 
 logger = logging.getLogger(__name__)
 
+# Memories accessed more recently than this are never pruned
+RECENT_ACCESS_WINDOW = timedelta(hours=1)
+
+# Buffered search hits merged into access statistics once this many pile up
+ACCESS_LOG_FLUSH_SIZE = 10_000
+
 
 class MemoryPriority(IntEnum):
     """Memory importance levels for prioritization and pruning."""
@@ -49,7 +61,10 @@ class SwarmMemoryStore(MemoryStore):
     """
 
     def __init__(
-        self, max_memories_per_agent: int = 1000, pruning_threshold: float = 0.8
+        self,
+        max_memories_per_agent: int = 1000,
+        pruning_threshold: float = 0.8,
+        clock: Optional[Callable[[], float]] = None,
     ):
         """
         Initialize SwarmMemoryStore.
@@ -57,11 +72,27 @@ class SwarmMemoryStore(MemoryStore):
         Args:
             max_memories_per_agent: Maximum memories per agent before pruning
             pruning_threshold: When to trigger pruning (0.8 = 80% of max)
+            clock: Source of epoch seconds for TTL expiry (default time.time)
         """
-        self._memories: Dict[str, Dict[str, JSONValue]] = {}
+        # Compact records; the mapping interface and to_dict() give the
+        # legacy dict layout at API boundaries
+        self._memories: Dict[str, SwarmRecord] = {}
         self._agent_namespaces: Dict[str, Set[str]] = defaultdict(set)
-        self._shared_knowledge: Dict[str, Dict[str, JSONValue]] = {}
+        self._shared_knowledge: Dict[str, SwarmRecord] = {}
         self._memory_summaries: Dict[str, Dict[str, JSONValue]] = {}
+        # Tag postings over namespaced keys and over shared (plain) keys,
+        # ordered by epoch-float timestamps
+        self._tag_index = TagIndex()
+        self._shared_tag_index = TagIndex()
+        # Per-agent pruning order, and when automatic pruning may next succeed
+        self._retention: Dict[str, RetentionQueue] = defaultdict(RetentionQueue)
+        self._prune_retry_at: Dict[str, datetime] = {}
+        # Search hits as (namespaced_key, accessed_at epoch), not yet merged
+        # into access_count/last_accessed (see flush_access_stats)
+        self._access_log: List[Tuple[str, float]] = []
+        # TTL deadlines of namespaced keys: expired memories are hidden from
+        # reads at once and reclaimed in batches by expire_memories()
+        self._expiry = TimingWheel(clock=clock or time.time)
 
         self.max_memories_per_agent = max_memories_per_agent
         self.pruning_threshold = pruning_threshold
@@ -78,6 +109,7 @@ class SwarmMemoryStore(MemoryStore):
         agent_id: str = "default",
         priority: MemoryPriority = MemoryPriority.NORMAL,
         is_shared: bool = False,
+        ttl_seconds: Optional[int] = None,
     ) -> None:
         """
         Store content with agent namespace, priority, and sharing options.
@@ -95,32 +127,44 @@ class SwarmMemoryStore(MemoryStore):
             agent_id: Agent identifier for namespacing
             priority: Memory importance level (follows MCP priority patterns)
             is_shared: Whether memory should be shared across agents
+            ttl_seconds: Expire the memory this many seconds after storing it
         """
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.expire_memories()
+
         # Create namespaced key
         namespaced_key = f"{agent_id}:{key}"
-
-        memory_record = {
-            "key": key,
-            "namespaced_key": namespaced_key,
-            "content": content,
-            "tags": tags,
-            "agent_id": agent_id,
-            "priority": priority.value,
-            "is_shared": is_shared,
-            "timestamp": datetime.now().isoformat(),
-            "access_count": 0,
-            "last_accessed": datetime.now().isoformat(),
-        }
+        if namespaced_key in self._memories and self._access_log:
+            # Don't credit hits on the record being replaced to the new one
+            self.flush_access_stats()
+
+        memory_record = SwarmRecord(
+            key=key,
+            content=content,
+            tags=intern_tags(tags),
+            agent_id=agent_id,
+            priority=MemoryPriority(priority),
+            is_shared=is_shared,
+            timestamp=datetime.now().timestamp(),
+            ttl_seconds=ttl_seconds,
+        )
 
         # Store in main memory
         self._memories[namespaced_key] = memory_record
+        self._tag_index.add(namespaced_key, memory_record.tags, memory_record.timestamp)
+        if ttl_seconds is not None:
+            self._expiry.schedule(namespaced_key, self._expiry.clock() + ttl_seconds)
+        else:
+            self._expiry.cancel(namespaced_key)
 
-        # Track agent namespace
+        # Track agent namespace and pruning order
         self._agent_namespaces[agent_id].add(namespaced_key)
+        self._retention[agent_id].push(namespaced_key, self._retention_score(memory_record))
 
         # Add to shared knowledge if marked as shared
         if is_shared:
-            self._shared_knowledge[key] = memory_record
+            self._share(key, memory_record)
 
         logger.debug(
             f"Stored memory for agent {agent_id}: {key} (priority: {priority.name})"
@@ -143,7 +187,8 @@ class SwarmMemoryStore(MemoryStore):
         - Agent-scoped memory retrieval
         - Cross-agent memory sharing
         - Priority-based filtering
-        - Access tracking for memory optimization
+        - Access tracking for memory optimization (buffered, merged into the
+          stored records by flush_access_stats)
 
         Args:
             tags: Tags to search for
@@ -163,115 +208,48 @@ class SwarmMemoryStore(MemoryStore):
                 execution_time_ms=0
             )
 
-        matches = []
-        tag_set = set(tags)
+        matches: List[SwarmRecord] = []
+        accessed_at = datetime.now().timestamp()
 
-        # Search agent-specific memories
-        for namespaced_key in self._agent_namespaces.get(agent_id, set()):
+        # Search agent-specific memories: tag postings intersected with the
+        # agent namespace, so only matching memories are visited
+        agent_keys = self._agent_namespaces.get(agent_id, set())
+        for namespaced_key in self._unexpired(self._tag_index.match(tags) & agent_keys):
             memory = self._memories.get(namespaced_key)
-            if memory:
-                priority_val = memory.get("priority")
-                if isinstance(priority_val, (int, float)) and priority_val >= min_priority.value:
-                    tags_value = memory.get("tags", [])
-                    if isinstance(tags_value, list):
-                        memory_tags = set(str(tag) for tag in tags_value if isinstance(tag, str))
-                    else:
-                        memory_tags = set()
-                    if tag_set.intersection(memory_tags):
-                        # Update access tracking
-                        access_count = memory.get("access_count", 0)
-                        if isinstance(access_count, (int, float)):
-                            memory["access_count"] = int(access_count) + 1
-                        else:
-                            memory["access_count"] = 1
-                        memory["last_accessed"] = datetime.now().isoformat()
-                        matches.append(memory.copy())
+            if memory is not None and memory.priority >= min_priority:
+                # Stored records are only read below, so no copy is needed
+                self._access_log.append((namespaced_key, accessed_at))
+                matches.append(memory)
 
         # Include shared memories if requested
         if include_shared:
-            for shared_memory in self._shared_knowledge.values():
-                shared_priority = shared_memory.get("priority")
-                if (
-                    shared_memory.get("agent_id") != agent_id
-                    and isinstance(shared_priority, (int, float))
-                    and shared_priority >= min_priority.value
-                ):
-                    tags_value = shared_memory.get("tags", [])
-                    if isinstance(tags_value, list):
-                        memory_tags = set(str(tag) for tag in tags_value if isinstance(tag, str))
-                    else:
-                        memory_tags = set()
-                    if tag_set.intersection(memory_tags):
-                        # Update access tracking in the original memory record
-                        original_key = shared_memory.get("namespaced_key")
-                        if isinstance(original_key, str) and original_key in self._memories:
-                            memory_ref = self._memories[original_key]
-                            access_count = memory_ref.get("access_count", 0)
-                            if isinstance(access_count, (int, float)):
-                                memory_ref["access_count"] = int(access_count) + 1
-                            else:
-                                memory_ref["access_count"] = 1
-                            memory_ref["last_accessed"] = datetime.now().isoformat()
-                        matches.append(shared_memory.copy())
+            for shared_key in self._shared_tag_index.match(tags):
+                shared_memory = self._shared_knowledge.get(shared_key)
+                if shared_memory is None or self._expiry.is_expired(shared_memory.namespaced_key):
+                    continue
+                if shared_memory.agent_id != agent_id and shared_memory.priority >= min_priority:
+                    # Update access tracking in the original memory record
+                    original_key = shared_memory.namespaced_key
+                    if original_key in self._memories:
+                        self._access_log.append((original_key, accessed_at))
+                    matches.append(shared_memory)
 
         # Sort by priority (descending) then timestamp (newest first)
-        # Type guard for sort key
-        def get_sort_key(x: Dict[str, JSONValue]) -> tuple:
-            priority = x.get("priority", 0)
-            timestamp = x.get("timestamp", "")
-            priority_val = -int(priority) if isinstance(priority, (int, float)) else 0
-            timestamp_val = str(timestamp) if isinstance(timestamp, str) else ""
-            return (priority_val, timestamp_val)
-
-        matches.sort(key=get_sort_key, reverse=True)
+        matches.sort(key=lambda m: (-m.priority, m.timestamp), reverse=True)
 
         logger.debug(
             f"Found {len(matches)} memories for agent {agent_id} with tags: {tags}"
         )
 
+        if len(self._access_log) >= ACCESS_LOG_FLUSH_SIZE:
+            self.flush_access_stats()
+
         # Convert to MemoryRecord objects for MemorySearchResult
         memory_records = []
         for match in matches:
-            # Create MemoryRecord from dict
-            try:
-                # Get tags with type validation
-                tags_value = match.get("tags", [])
-                tags_list = [str(tag) for tag in tags_value if isinstance(tag, str)] if isinstance(tags_value, list) else []
-
-                # Get priority with type validation and mapping
-                priority_value = match.get("priority", 1)
-                if isinstance(priority_value, (int, float)):
-                    # Map int priorities to string priorities
-                    priority_mapping = {
-                        1: SharedMemoryPriority.LOW,
-                        2: SharedMemoryPriority.MEDIUM,
-                        3: SharedMemoryPriority.HIGH,
-                        4: SharedMemoryPriority.CRITICAL
-                    }
-                    priority = priority_mapping.get(int(priority_value), SharedMemoryPriority.LOW)
-                else:
-                    priority = SharedMemoryPriority.LOW
-
-                # Create metadata with agent_id from the match
-                metadata = MemoryMetadata()
-                match_agent_id = match.get("agent_id")
-                if isinstance(match_agent_id, str):
-                    metadata.agent_id = match_agent_id
-
-                record = MemoryRecord(
-                    key=str(match.get("key", "")),
-                    content=match.get("content", ""),
-                    tags=tags_list,
-                    timestamp=datetime.fromisoformat(str(match.get("timestamp", datetime.now().isoformat()))),
-                    priority=priority,
-                    metadata=metadata,
-                    ttl_seconds=None,
-                    embedding=None
-                )
+            record = self._to_record(match)
+            if record is not None:
                 memory_records.append(record)
-            except Exception as e:
-                logger.warning(f"Failed to convert memory to MemoryRecord: {e}")
-                continue
 
         # Cast tags to JSONValue (list of strings becomes JSONValue)
         tags_as_json: JSONValue = cast(JSONValue, tags)
@@ -300,56 +278,20 @@ class SwarmMemoryStore(MemoryStore):
         """
         # Get all memories as MemoryRecord objects
         if agent_id:
-            memories = []
-            for namespaced_key in self._agent_namespaces.get(agent_id, set()):
-                memory = self._memories.get(namespaced_key)
-                if memory:
-                    memories.append(memory)
+            keys: Iterable[str] = self._agent_namespaces.get(agent_id, set())
         else:
-            memories = list(self._memories.values())
+            keys = self._memories.keys()
+        memories = []
+        for namespaced_key in self._unexpired(keys):
+            memory = self._memories.get(namespaced_key)
+            if memory is not None:
+                memories.append(memory)
         memory_records = []
 
         for memory_dict in memories:
-            try:
-                # Get tags with type validation
-                tags_value = memory_dict.get("tags", [])
-                tags_list = [str(tag) for tag in tags_value if isinstance(tag, str)] if isinstance(tags_value, list) else []
-
-                # Get priority with type validation and mapping
-                priority_value = memory_dict.get("priority", 1)
-                if isinstance(priority_value, (int, float)):
-                    # Map int priorities to string priorities
-                    priority_mapping = {
-                        1: SharedMemoryPriority.LOW,
-                        2: SharedMemoryPriority.MEDIUM,
-                        3: SharedMemoryPriority.HIGH,
-                        4: SharedMemoryPriority.CRITICAL
-                    }
-                    priority = priority_mapping.get(int(priority_value), SharedMemoryPriority.LOW)
-                else:
-                    priority = SharedMemoryPriority.LOW
-
-                # Create metadata with agent_id from the memory_dict
-                metadata = MemoryMetadata()
-                dict_agent_id = memory_dict.get("agent_id")
-                if isinstance(dict_agent_id, str):
-                    metadata.agent_id = dict_agent_id
-
-                # Create MemoryRecord
-                record = MemoryRecord(
-                    key=str(memory_dict.get("key", "")),
-                    content=memory_dict.get("content", ""),
-                    tags=tags_list,
-                    timestamp=datetime.fromisoformat(str(memory_dict.get("timestamp", datetime.now().isoformat()))),
-                    priority=priority,
-                    metadata=metadata,
-                    ttl_seconds=None,
-                    embedding=None
-                )
+            record = self._to_record(memory_dict)
+            if record is not None:
                 memory_records.append(record)
-            except Exception as e:
-                logger.warning(f"Failed to convert memory to MemoryRecord: {e}")
-                continue
 
         # Sort by timestamp (newest first)
         memory_records.sort(key=lambda x: x.timestamp, reverse=True)
@@ -361,6 +303,75 @@ class SwarmMemoryStore(MemoryStore):
             execution_time_ms=0
         )
 
+    def query(self, query: MemoryQuery) -> Iterator[MemoryRecord]:
+        """
+        Stream memories matching a structured query, newest first.
+
+        Tag and time filters are resolved by the tag index and agent_id is
+        matched against the agent namespace. Unlike search(), this is a
+        read-only view: it neither merges shared memories nor updates access
+        statistics.
+
+        Args:
+            query: Structured memory query
+
+        Returns:
+            Iterator over matching memory records
+        """
+        # The index is keyed by epoch timestamps
+        until = query.until.timestamp() if query.until else None
+        cursor = query.decode_cursor()
+        if cursor is not None:
+            # Records carry plain keys, so bound the window at the cursor time
+            # and skip the few equal-time records before it below
+            cursor_time = cursor[0].timestamp()
+            until = cursor_time if until is None else min(until, cursor_time)
+        keys = self._tag_index.iter_query(
+            all_tags=query.all_tags,
+            any_tags=query.any_tags,
+            exclude_tags=query.exclude_tags,
+            since=query.since.timestamp() if query.since else None,
+            until=until,
+        )
+        if query.agent_id is not None:
+            agent_keys = self._agent_namespaces.get(query.agent_id, set())
+            keys = (key for key in keys if key in agent_keys)
+        records = (self._to_record(self._memories[key]) for key in self._unexpired(keys) if key in self._memories)
+        records = (record for record in records if record is not None)
+        if cursor is not None:
+            records = _resume_after(records, cursor)
+        return islice(records, query.limit)
+
+    def _to_record(self, memory: SwarmRecord) -> Optional[MemoryRecord]:
+        """Convert a stored memory to a MemoryRecord (None if malformed)."""
+        try:
+            # Map int priorities to string priorities
+            priority_mapping = {
+                1: SharedMemoryPriority.LOW,
+                2: SharedMemoryPriority.MEDIUM,
+                3: SharedMemoryPriority.HIGH,
+                4: SharedMemoryPriority.CRITICAL
+            }
+            priority = priority_mapping.get(int(memory.priority), SharedMemoryPriority.LOW)
+
+            # Create metadata with agent_id from the memory
+            metadata = MemoryMetadata()
+            metadata.agent_id = memory.agent_id
+
+            return MemoryRecord(
+                key=memory.key,
+                content=memory.content,
+                tags=list(memory.tags),
+                timestamp=datetime.fromtimestamp(memory.timestamp),
+                priority=priority,
+                metadata=metadata,
+                ttl_seconds=memory.ttl_seconds,
+                embedding=None
+            )
+        except Exception as e:
+            logger.warning(f"Failed to convert memory to MemoryRecord: {e}")
+            return None
+
     def get_agent_memories(self, agent_id: str) -> List[Dict[str, JSONValue]]:
         """
         Get all memories for a specific agent.
@@ -371,21 +382,19 @@ class SwarmMemoryStore(MemoryStore):
         Returns:
             List of memory dictionaries
         """
+        return [memory.to_dict() for memory in self._agent_records(agent_id)]
+
+    def _agent_records(self, agent_id: str) -> List[SwarmRecord]:
+        """Stored records of an agent, in get_agent_memories order."""
+        self.flush_access_stats()
         memories = []
-        for namespaced_key in self._agent_namespaces.get(agent_id, set()):
+        for namespaced_key in self._unexpired(self._agent_namespaces.get(agent_id, set())):
             memory = self._memories.get(namespaced_key)
-            if memory:
+            if memory is not None:
                 memories.append(memory)
 
-        # Sort by priority then timestamp with type guards
-        def sort_key(x: Dict[str, JSONValue]) -> tuple:
-            priority = x.get("priority", 0)
-            timestamp = x.get("timestamp", "")
-            priority_val = -int(priority) if isinstance(priority, (int, float)) else 0
-            timestamp_val = str(timestamp) if isinstance(timestamp, str) else ""
-            return (priority_val, timestamp_val)
-
-        memories.sort(key=sort_key, reverse=True)
+        # Sort by priority then timestamp
+        memories.sort(key=lambda m: (-m.priority, m.timestamp), reverse=True)
         return memories
 
     def get_agent_summary(self, agent_id: str) -> Dict[str, JSONValue]:
@@ -398,7 +407,7 @@ class SwarmMemoryStore(MemoryStore):
         Returns:
             Summary statistics and insights
         """
-        agent_memories = self.get_agent_memories(agent_id)
+        agent_memories = self._agent_records(agent_id)
 
         if not agent_memories:
             return {
@@ -530,68 +539,179 @@ class SwarmMemoryStore(MemoryStore):
         if target_count is None:
             target_count = int(self.max_memories_per_agent * 0.7)
 
-        agent_memories = self.get_agent_memories(agent_id)
-
-        if len(agent_memories) <= target_count:
+        # Pruning order and the recent-access check read access statistics;
+        # expired memories go first so they don't count toward the target
+        self.flush_access_stats()
+        self.expire_memories()
+        excess = len(self._agent_namespaces.get(agent_id, ())) - target_count
+        if excess <= 0:
             return 0
 
-        # Sort memories for pruning (lowest priority, least accessed, oldest first)
-        def prune_sort_key(m: Dict[str, JSONValue]) -> tuple:
-            priority = m.get("priority", 0)
-            access_count = m.get("access_count", 0)
-            timestamp = m.get("timestamp", "")
-
-            priority_val = int(priority) if isinstance(priority, (int, float)) else 0
-            access_val = int(access_count) if isinstance(access_count, (int, float)) else 0
-            timestamp_val = str(timestamp) if isinstance(timestamp, str) else ""
-
-            return (priority_val, access_val, timestamp_val)
-
-        agent_memories.sort(key=prune_sort_key)
-
-        memories_to_prune = agent_memories[: len(agent_memories) - target_count]
+        # The lowest-scoring memories (lowest priority, least accessed, oldest
+        # first), popped from the retention queue instead of sorting. Memories
+        # that must be kept are set aside so prunable ones behind them are
+        # still reached.
+        queue = self._retention[agent_id]
+        now = datetime.now()
+        retry_at: Optional[datetime] = None
+        kept: List[str] = []
         pruned_count = 0
 
-        for memory in memories_to_prune:
-            # Don't prune critical or high priority memories
-            priority = memory.get("priority", 0)
-            if isinstance(priority, (int, float)) and priority >= MemoryPriority.HIGH.value:
-                continue
+        while pruned_count < excess:
+            popped = queue.pop_lowest(excess - pruned_count)
+            if not popped:
+                break
+            for _, namespaced_key in popped:
+                memory = self._memories.get(namespaced_key)
+                if memory is None:
+                    continue
 
-            # Don't prune very recently accessed memories (within 1 hour for tests)
-            last_accessed_val = memory.get("last_accessed")
-            if isinstance(last_accessed_val, str):
-                try:
-                    last_accessed = datetime.fromisoformat(last_accessed_val)
-                    if datetime.now() - last_accessed < timedelta(hours=1):
-                        continue
-                except ValueError:
-                    # Skip invalid timestamps
+                # Don't prune critical or high priority memories
+                if memory.priority >= MemoryPriority.HIGH:
+                    kept.append(namespaced_key)
                     continue
 
-            # Remove from all stores
-            namespaced_key = memory.get("namespaced_key")
-            if isinstance(namespaced_key, str) and namespaced_key in self._memories:
-                del self._memories[namespaced_key]
-                self._agent_namespaces[agent_id].discard(namespaced_key)
+                # Don't prune very recently accessed memories (within 1 hour for tests)
+                last_accessed = datetime.fromtimestamp(memory.last_accessed)
+                if now - last_accessed < RECENT_ACCESS_WINDOW:
+                    eligible_at = last_accessed + RECENT_ACCESS_WINDOW
+                    retry_at = eligible_at if retry_at is None else min(retry_at, eligible_at)
+                    kept.append(namespaced_key)
+                    continue
+
+                # Remove from all stores
+                self._remove_memory(namespaced_key, agent_id)
 
                 # Remove from shared knowledge if present
-                is_shared = memory.get("is_shared")
-                key = memory.get("key")
-                if isinstance(is_shared, bool) and is_shared and isinstance(key, str) and key in self._shared_knowledge:
-                    del self._shared_knowledge[key]
+                if memory.is_shared and memory.key in self._shared_knowledge:
+                    del self._shared_knowledge[memory.key]
+                    self._shared_tag_index.remove(memory.key)
 
                 pruned_count += 1
 
+        for namespaced_key in kept:
+            queue.push(namespaced_key, self._retention_score(self._memories[namespaced_key]))
+
+        # The whole queue was searched and nothing more can be pruned before
+        # retry_at, so automatic pruning backs off until then
+        if pruned_count < excess:
+            self._prune_retry_at[agent_id] = retry_at or now + RECENT_ACCESS_WINDOW
+        else:
+            self._prune_retry_at.pop(agent_id, None)
+
         logger.info(f"Pruned {pruned_count} memories for agent {agent_id}")
         return pruned_count
 
+    def _remove_memory(self, namespaced_key: str, agent_id: str) -> None:
+        """Remove a memory from the main store, its namespace and the indexes."""
+        if self._access_log:
+            # Settle its buffered hits so a later record under the key starts clean
+            self.flush_access_stats()
+        self._memories.pop(namespaced_key, None)
+        self._agent_namespaces[agent_id].discard(namespaced_key)
+        self._tag_index.remove(namespaced_key)
+        self._retention[agent_id].discard(namespaced_key)
+        self._expiry.cancel(namespaced_key)
+
+    def expire_memories(self) -> int:
+        """
+        Reclaim every memory whose TTL has run out.
+
+        Expired memories are already hidden from reads; this removes them
+        from the store, their namespaces, the tag and retention indexes and
+        shared knowledge in one batch. store() calls it, so reclamation
+        keeps pace with writes.
+
+        Returns:
+            Number of memories removed
+        """
+        expired = self._expiry.advance()
+        for namespaced_key in expired:
+            memory = self._memories.get(namespaced_key)
+            if memory is None:
+                continue
+            self._remove_memory(namespaced_key, memory.agent_id)
+            if memory.is_shared and self._shared_knowledge.get(memory.key) is memory:
+                del self._shared_knowledge[memory.key]
+                self._shared_tag_index.remove(memory.key)
+        if expired:
+            logger.debug(f"Expired {len(expired)} memories")
+        return len(expired)
+
+    def _unexpired(self, keys: Iterable[str]) -> Iterable[str]:
+        """Namespaced keys whose TTL has not run out (all of them when nothing has a TTL)."""
+        if not self._expiry:
+            return keys
+        now = self._expiry.clock()
+        return (key for key in keys if not self._expiry.is_expired(key, now))
+
+    def get_shared_memories(self) -> List[Dict[str, JSONValue]]:
+        """
+        Shared memories of every agent, as dicts.
+
+        Returns:
+            Shared memory dictionaries
+        """
+        self.flush_access_stats()
+        return [
+            memory.to_dict()
+            for memory in self._shared_knowledge.values()
+            if not self._expiry.is_expired(memory.namespaced_key)
+        ]
+
+    @staticmethod
+    def _retention_score(memory: SwarmRecord) -> tuple:
+        """Pruning order: lowest priority, least accessed, oldest first."""
+        return (int(memory.priority), memory.access_count, memory.timestamp)
+
+    def flush_access_stats(self) -> int:
+        """
+        Merge buffered search hits into access_count and last_accessed.
+
+        search() only appends to the access log; this runs before anything
+        that reads the statistics (pruning, summaries, consolidation) and
+        whenever the log reaches ACCESS_LOG_FLUSH_SIZE entries.
+
+        Returns:
+            Number of memories whose statistics changed
+        """
+        if not self._access_log:
+            return 0
+
+        hits: Counter[str] = Counter()
+        last_seen: Dict[str, float] = {}
+        for namespaced_key, accessed_at in self._access_log:
+            hits[namespaced_key] += 1
+            last_seen[namespaced_key] = accessed_at
+        self._access_log = []
+
+        updated = 0
+        for namespaced_key, count in hits.items():
+            memory = self._memories.get(namespaced_key)
+            if memory is None:
+                # Pruned or removed since it was accessed
+                continue
+            memory.access_count += count
+            memory.last_accessed = last_seen[namespaced_key]
+            self._retention[memory.agent_id].push(namespaced_key, self._retention_score(memory))
+            updated += 1
+        return updated
+
+    def _share(self, key: str, memory_record: SwarmRecord) -> None:
+        """Publish a memory record to shared knowledge under its plain key."""
+        self._shared_knowledge[key] = memory_record
+        self._shared_tag_index.add(key, memory_record.tags, memory_record.timestamp)
+
     def _check_and_prune_agent_memories(self, agent_id: str) -> None:
         """Check if agent needs memory pruning and execute if needed."""
         agent_memory_count = len(self._agent_namespaces[agent_id])
         threshold = int(self.max_memories_per_agent * self.pruning_threshold)
 
         if agent_memory_count >= threshold:
+            retry_at = self._prune_retry_at.get(agent_id)
+            if retry_at is not None and datetime.now() < retry_at:
+                # The last pruning pass found nothing it could remove yet
+                return
             logger.info(
                 f"Agent {agent_id} memory threshold reached ({agent_memory_count}/{self.max_memories_per_agent})"
             )
@@ -616,7 +736,7 @@ class SwarmMemoryStore(MemoryStore):
         Returns:
             Consolidation summary with statistics and metadata
         """
-        agent_memories = self.get_agent_memories(agent_id)
+        agent_memories = self._agent_records(agent_id)
 
         if len(agent_memories) <= max_summary_memories:
             return {
@@ -739,8 +859,7 @@ class SwarmMemoryStore(MemoryStore):
             for memory in summary_candidates:
                 namespaced_key = memory.get("namespaced_key")
                 if isinstance(namespaced_key, str) and namespaced_key in self._memories:
-                    del self._memories[namespaced_key]
-                    self._agent_namespaces[agent_id].discard(namespaced_key)
+                    self._remove_memory(namespaced_key, agent_id)
 
             return {
                 "agent_id": agent_id,
@@ -807,6 +926,7 @@ class SwarmMemory(Memory):
         priority: MemoryPriority = MemoryPriority.NORMAL,
         is_shared: bool = False,
         agent_id: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
     ) -> None:
         """
         Store memory with swarm features.
@@ -821,10 +941,11 @@ class SwarmMemory(Memory):
             priority: Memory importance level (MCP priority pattern)
             is_shared: Whether to share across agents (MCP sharing pattern)
             agent_id: Override default agent ID
+            ttl_seconds: Expire the memory this many seconds after storing it
         """
         effective_agent_id = agent_id or self.agent_id
         tags = tags or []  # Handle None case
-        self._store.store(key, content, tags, effective_agent_id, priority, is_shared)
+        self._store.store(key, content, tags, effective_agent_id, priority, is_shared, ttl_seconds)
 
     def search(
         self,
@@ -853,21 +974,36 @@ class SwarmMemory(Memory):
             tags, effective_agent_id, include_shared, min_priority
         )
         # Convert MemorySearchResult to List[dict[str, JSONValue]]
-        result_list: List[dict[str, JSONValue]] = []
-        for record in search_result.records:
-            # Cast tags to JSONValue
-            tags_as_json: JSONValue = cast(JSONValue, record.tags)
-            record_dict: Dict[str, JSONValue] = {
-                "key": record.key,
-                "content": record.content,
-                "tags": tags_as_json,
-                "timestamp": record.timestamp.isoformat(),
-                "priority": record.priority.value,
-                "agent_id": record.metadata.agent_id if record.metadata and record.metadata.agent_id else effective_agent_id,
-                "metadata": cast(JSONValue, record.metadata.model_dump()) if record.metadata else {}
-            }
-            result_list.append(record_dict)
-        return result_list
+        return [self._record_to_dict(record, effective_agent_id) for record in search_result.records]
+
+    def query(self, query: MemoryQuery) -> Iterator[dict[str, JSONValue]]:
+        """
+        Stream this agent's memories matching a structured query, newest first.
+
+        Args:
+            query: Structured memory query (agent_id defaults to this agent)
+
+        Returns:
+            Iterator over matching memories
+        """
+        if query.agent_id is None:
+            query = query.model_copy(update={"agent_id": self.agent_id})
+        return (self._record_to_dict(record, query.agent_id) for record in self._store.query(query))
+
+    @staticmethod
+    def _record_to_dict(record: MemoryRecord, agent_id: str) -> Dict[str, JSONValue]:
+        """Dict form returned by search() and query()."""
+        # Cast tags to JSONValue
+        tags_as_json: JSONValue = cast(JSONValue, record.tags)
+        return {
+            "key": record.key,
+            "content": record.content,
+            "tags": tags_as_json,
+            "timestamp": record.timestamp.isoformat(),
+            "priority": record.priority.value,
+            "agent_id": record.metadata.agent_id if record.metadata and record.metadata.agent_id else agent_id,
+            "metadata": cast(JSONValue, record.metadata.model_dump()) if record.metadata else {}
+        }
 
     def get_summary(self, agent_id: Optional[str] = None) -> Dict[str, JSONValue]:
         """Get memory summary for agent."""
@@ -911,7 +1047,7 @@ class SwarmMemory(Memory):
         if namespaced_key in self._store._memories:
             memory = self._store._memories[namespaced_key]
             memory["is_shared"] = True
-            self._store._shared_knowledge[key] = memory
+            self._store._share(key, memory)
             logger.info(f"Memory '{key}' from agent {effective_agent_id} is now shared")
             return True
 
@@ -919,4 +1055,4 @@ class SwarmMemory(Memory):
 
     def get_shared_memories(self) -> List[dict[str, JSONValue]]:
         """Get all shared memories in the swarm."""
-        return list(self._store._shared_knowledge.values())
+        return self._store.get_shared_memories()
@@ -0,0 +1,275 @@
+"""
+Tag inverted index shared by the tag-searchable memory stores.
+
+Maps each tag to the keys carrying it and keeps a timestamp-ordered
+timeline of keys, so "newest N memories with tags X" costs time
+proportional to the matching keys instead of the store size.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypedDict
+
+
+class TagIndexState(TypedDict):
+    """Plain-data copy of a TagIndex, as returned by TagIndex.export_state()."""
+
+    postings: Dict[str, List[str]]
+    tags: Dict[str, Sequence[str]]
+    # (timestamp, negated insertion sequence, key) in ascending order
+    timeline: List[Sequence[Any]]
+    next_sequence: int
+
+
+class TagIndex:
+    """
+    Tag -> key posting sets plus a newest-first timeline.
+
+    Timestamps only need to be mutually comparable (datetime objects or ISO
+    strings). Keys with equal timestamps keep their first-insertion order,
+    matching a stable ``sort(reverse=True)`` over an insertion-ordered dict.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Tuple[str, ...]] = {}
+        # key -> (timestamp, -sequence); the timeline holds the same tuples
+        # plus the key, in ascending order, and is read from the end
+        self._order: Dict[str, Tuple[Any, int]] = {}
+        self._timeline: List[Tuple[Any, int, str]] = []
+        self._sequence: Dict[str, int] = {}
+        self._next_sequence = 0
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._key_tags
+
+    def __len__(self) -> int:
+        return len(self._key_tags)
+
+    def export_state(self) -> TagIndexState:
+        """
+        Copy of the index as plain dicts and lists, for snapshots.
+
+        Timestamps are kept as given, so they must be JSON values for the
+        state to be JSON-encodable.
+        """
+        return {
+            "postings": {tag: list(keys) for tag, keys in self._postings.items()},
+            "tags": dict(self._key_tags),
+            "timeline": list(self._timeline),
+            "next_sequence": self._next_sequence,
+        }
+
+    @classmethod
+    def from_state(cls, state: TagIndexState) -> "TagIndex":
+        """Rebuild an index from export_state() output (or its JSON round trip)."""
+        index = cls()
+        index._postings = {tag: set(keys) for tag, keys in state["postings"].items()}
+        index._key_tags = {key: tuple(tags) for key, tags in state["tags"].items()}
+        index._timeline = [tuple(entry) for entry in state["timeline"]]
+        index._order = {key: (timestamp, negated) for timestamp, negated, key in index._timeline}
+        index._sequence = {key: -negated for _, negated, key in index._timeline}
+        index._next_sequence = state["next_sequence"]
+        return index
+
+    def add(self, key: str, tags: Iterable[str], timestamp: Any) -> None:
+        """
+        Index key under tags, replacing any previous entry for key.
+
+        Args:
+            key: Memory key
+            tags: Tags of the memory
+            timestamp: Sort value for recency ordering
+        """
+        if key in self._key_tags:
+            self._unlink(key)
+        sequence = self._sequence.get(key)
+        if sequence is None:
+            sequence = self._next_sequence
+            self._sequence[key] = sequence
+            self._next_sequence += 1
+
+        unique_tags = tuple(dict.fromkeys(tag for tag in tags if isinstance(tag, str)))
+        for tag in unique_tags:
+            self._postings.setdefault(tag, set()).add(key)
+        self._key_tags[key] = unique_tags
+
+        order = (timestamp, -sequence)
+        self._order[key] = order
+        insort(self._timeline, (*order, key))
+
+    def remove(self, key: str) -> bool:
+        """
+        Drop key from the index.
+
+        Returns:
+            True if key was indexed
+        """
+        if key not in self._key_tags:
+            return False
+        self._unlink(key)
+        self._sequence.pop(key, None)
+        return True
+
+    def _unlink(self, key: str) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._postings.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._postings[tag]
+
+        entry = (*self._order.pop(key), key)
+        position = bisect_left(self._timeline, entry)
+        if position < len(self._timeline) and self._timeline[position] == entry:
+            del self._timeline[position]
+
+    def order_of(self, key: str) -> Optional[Tuple[Any, int]]:
+        """Sort tuple of key in the timeline (larger is newer), or None."""
+        return self._order.get(key)
+
+    def tags_of(self, key: str) -> Tuple[str, ...]:
+        """Tags indexed for key."""
+        return self._key_tags.get(key, ())
+
+    def match(self, tags: Iterable[str], match_all: bool = False) -> Set[str]:
+        """
+        Keys carrying any (or all) of tags.
+
+        Args:
+            tags: Tags to match
+            match_all: Require every tag instead of at least one
+
+        Returns:
+            Set of matching keys
+        """
+        postings = [self._postings.get(tag, set()) for tag in dict.fromkeys(tags)]
+        if not postings:
+            return set()
+        if match_all:
+            postings.sort(key=len)
+            result = set(postings[0])
+            for keys in postings[1:]:
+                result.intersection_update(keys)
+                if not result:
+                    break
+            return result
+        result = set()
+        for keys in postings:
+            result.update(keys)
+        return result
+
+    def newest(self, keys: Optional[Collection[str]] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Order keys newest first.
+
+        Args:
+            keys: Keys to order (default: every indexed key)
+            limit: Return at most this many keys
+
+        Returns:
+            Keys ordered by descending timestamp
+        """
+        if keys is None:
+            return [key for _, _, key in islice(reversed(self._timeline), limit)]
+
+        if limit is None:
+            return sorted(keys, key=self._order.__getitem__, reverse=True)
+        if limit <= 0:
+            return []
+
+        # Dense matches: walking the timeline finds limit hits after about
+        # limit * n / m steps, cheaper than selecting among all m matches
+        if limit * len(self._timeline) < len(keys) * len(keys):
+            selected: List[str] = []
+            for _, _, key in reversed(self._timeline):
+                if key in keys:
+                    selected.append(key)
+                    if len(selected) >= limit:
+                        break
+            return selected
+        return heapq.nlargest(limit, keys, key=self._order.__getitem__)
+
+    def query(self, tags: Iterable[str], match_all: bool = False, limit: Optional[int] = None) -> List[str]:
+        """
+        Keys matching tags, newest first.
+
+        Args:
+            tags: Tags to match
+            match_all: Require every tag instead of at least one
+            limit: Return at most this many keys
+
+        Returns:
+            Matching keys ordered by descending timestamp
+        """
+        return self.newest(self.match(tags, match_all), limit)
+
+    def iter_query(
+        self,
+        all_tags: Iterable[str] = (),
+        any_tags: Iterable[str] = (),
+        exclude_tags: Iterable[str] = (),
+        since: Any = None,
+        until: Any = None,
+        after: Optional[Tuple[Any, str]] = None,
+    ) -> Iterator[str]:
+        """
+        Lazily yield keys matching a structured query, newest first.
+
+        The time window and cursor are located by bisecting the timeline.
+        Sparse tag matches are sorted directly; dense ones are streamed by
+        walking the window, so no more of it is visited than the consumer reads.
+
+        Args:
+            all_tags: Keys must carry every one of these tags
+            any_tags: Keys must carry at least one of these tags
+            exclude_tags: Keys carrying any of these tags are skipped
+            since: Inclusive lower timestamp bound
+            until: Inclusive upper timestamp bound
+            after: (timestamp, key) cursor; only keys strictly after it are yielded
+
+        Returns:
+            Iterator over matching keys
+        """
+        all_tags = list(all_tags)
+        any_tags = list(any_tags)
+        candidates: Optional[Set[str]] = None
+        if all_tags:
+            candidates = self.match(all_tags, match_all=True)
+        if any_tags:
+            any_keys = self.match(any_tags)
+            candidates = any_keys if candidates is None else candidates & any_keys
+        excluded = self.match(exclude_tags)
+
+        timeline = self._timeline
+        lo = 0 if since is None else bisect_left(timeline, (since,))
+        hi = len(timeline) if until is None else bisect_left(timeline, (until, float("inf")))
+        if after is not None:
+            timestamp, key = after
+            order = self._order.get(key)
+            # A deleted cursor record falls back to "strictly older than it"
+            bound = order if order is not None and order[0] == timestamp else (timestamp, float("-inf"))
+            hi = min(hi, bisect_left(timeline, bound))
+        if hi <= lo:
+            return
+
+        if candidates is not None and len(candidates) * 4 < hi - lo:
+            low_entry = timeline[lo]
+            high_entry = timeline[hi] if hi < len(timeline) else None
+            window = []
+            for key in candidates:
+                entry = (*self._order[key], key)
+                if entry >= low_entry and (high_entry is None or entry < high_entry):
+                    window.append(entry)
+            window.sort(reverse=True)
+            for _, _, key in window:
+                if key not in excluded:
+                    yield key
+            return
+
+        for position in range(hi - 1, lo - 1, -1):
+            key = timeline[position][2]
+            if (candidates is None or key in candidates) and key not in excluded:
+                yield key
@@ -0,0 +1,206 @@
+"""
+Hierarchical timing wheel for memory TTL expiry.
+
+MemoryRecord.ttl_seconds used to be carried around without anything ever
+expiring. TimingWheel schedules each key into a slot of a hierarchy of
+wheels in O(1) and hands back every key whose deadline has passed in one
+batch, so stores can reclaim expired records from all of their indexes
+together instead of scanning for them.
+"""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class TimingWheel:
+    """
+    Deadlines for keys, bucketed by tick on a hierarchy of wheels.
+
+    Level 0 has one slot per tick; each higher level has slots wheel_size
+    times wider and is cascaded into the levels below as the clock reaches
+    it. Deadlines beyond the top level wait in an overflow bucket.
+    Scheduling and cancelling are O(1); advance() costs one slot visit per
+    tick plus the entries it moves, and falls back to a single pass over
+    all entries when that is cheaper.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        wheel_size: int = 64,
+        levels: int = 4,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize TimingWheel.
+
+        Args:
+            tick_seconds: Width of a level-0 slot in seconds
+            wheel_size: Slots per level
+            levels: Number of levels
+            clock: Source of epoch seconds (injectable for tests)
+        """
+        if tick_seconds <= 0 or wheel_size < 2 or levels < 1:
+            raise ValueError("tick_seconds must be positive, wheel_size >= 2 and levels >= 1")
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.clock = clock
+        self._wheels: List[List[Dict[str, int]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._overflow: Dict[str, int] = {}
+        # key -> exact deadline, and where its entry sits (level, slot);
+        # level == levels means the overflow bucket
+        self._deadlines: Dict[str, float] = {}
+        self._location: Dict[str, Tuple[int, int]] = {}
+        self._level_counts = [0] * (levels + 1)
+        self._current = self._tick_of(clock())
+        # Entries that reached the current tick, expired once now passes them
+        self._held: Dict[str, float] = {}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def deadline_of(self, key: str) -> Optional[float]:
+        """Deadline of key in epoch seconds, or None if not scheduled."""
+        return self._deadlines.get(key)
+
+    def is_expired(self, key: str, now: Optional[float] = None) -> bool:
+        """Whether key's deadline has passed, whether or not it was reclaimed."""
+        deadline = self._deadlines.get(key)
+        if deadline is None:
+            return False
+        return deadline <= (self.clock() if now is None else now)
+
+    def schedule(self, key: str, deadline: float) -> None:
+        """Schedule key to expire at deadline (epoch seconds), replacing any earlier deadline."""
+        self.cancel(key)
+        self._deadlines[key] = deadline
+        self._place(key, self._tick_of(deadline))
+
+    def cancel(self, key: str) -> bool:
+        """Unschedule key. Returns True if it was scheduled."""
+        if self._deadlines.pop(key, None) is None:
+            return False
+        if self._held.pop(key, None) is not None:
+            return True
+        level, slot = self._location.pop(key)
+        if level == self.levels:
+            del self._overflow[key]
+        else:
+            del self._wheels[level][slot][key]
+        self._level_counts[level] -= 1
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """
+        Unschedule and return every key whose deadline is at or before now.
+
+        Keys are returned in deadline order.
+
+        Args:
+            now: Epoch seconds to advance to (defaults to the clock)
+
+        Returns:
+            Expired keys
+        """
+        if now is None:
+            now = self.clock()
+        target = self._tick_of(now)
+        while self._current < target:
+            if not self._location:
+                self._current = target
+                break
+            if (target - self._current) // self.wheel_size > len(self._location):
+                # Stepping through the ticks would cost more than one pass
+                self._rebuild(target)
+                break
+            if self._level_counts[0] == 0:
+                # Nothing in level 0: jump to the next cascade boundary
+                boundary = (self._current // self.wheel_size + 1) * self.wheel_size
+                if boundary > target:
+                    self._current = target
+                    break
+                self._step(boundary)
+            else:
+                self._step(self._current + 1)
+
+        # Held entries are due within the current tick; only some may be past
+        due = sorted(
+            (deadline, key) for key, deadline in self._held.items() if deadline <= now
+        )
+        for _, key in due:
+            del self._held[key]
+            del self._deadlines[key]
+        return [key for _, key in due]
+
+    def _tick_of(self, seconds: float) -> int:
+        return math.floor(seconds / self.tick_seconds)
+
+    def _place(self, key: str, tick: int) -> None:
+        """File key's entry for tick relative to the current tick."""
+        delta = tick - self._current
+        if delta <= 0:
+            self._held[key] = self._deadlines[key]
+            return
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.wheel_size:
+                slot = (tick // span) % self.wheel_size
+                self._wheels[level][slot][key] = tick
+                self._location[key] = (level, slot)
+                self._level_counts[level] += 1
+                return
+            span *= self.wheel_size
+        self._overflow[key] = tick
+        self._location[key] = (self.levels, 0)
+        self._level_counts[self.levels] += 1
+
+    def _step(self, tick: int) -> None:
+        """Move to tick: cascade the higher levels due now, then hold its level-0 slot."""
+        self._current = tick
+        if tick % self.wheel_size == 0:
+            span = self.wheel_size
+            cascade = []
+            for level in range(1, self.levels + 1):
+                if tick % span:
+                    break
+                cascade.append((level, span))
+                span *= self.wheel_size
+            for level, span in reversed(cascade):
+                if level == self.levels:
+                    entries = self._overflow
+                    self._overflow = {}
+                else:
+                    slot = (tick // span) % self.wheel_size
+                    entries = self._wheels[level][slot]
+                    self._wheels[level][slot] = {}
+                self._level_counts[level] -= len(entries)
+                for key, entry_tick in entries.items():
+                    del self._location[key]
+                    self._place(key, entry_tick)
+
+        slot = tick % self.wheel_size
+        entries = self._wheels[0][slot]
+        if entries:
+            self._wheels[0][slot] = {}
+            self._level_counts[0] -= len(entries)
+            for key in entries:
+                del self._location[key]
+                self._held[key] = self._deadlines[key]
+
+    def _rebuild(self, target: int) -> None:
+        """Jump straight to target, re-filing every entry in one pass."""
+        entries = [(key, self._deadlines[key]) for key in self._location]
+        self._wheels = [[{} for _ in range(self.wheel_size)] for _ in range(self.levels)]
+        self._overflow = {}
+        self._location = {}
+        self._level_counts = [0] * (self.levels + 1)
+        self._current = target
+        for key, deadline in entries:
+            self._place(key, self._tick_of(deadline))
@@ -130,6 +130,8 @@ class MemoryConverter:
             key = self.safe_string_conversion(memory_dict.get("key", ""))
             content = memory_dict.get("content", "")
             timestamp = self.safe_timestamp_conversion(memory_dict.get("timestamp"))
+            ttl_value = memory_dict.get("ttl_seconds")
+            ttl_seconds = ttl_value if isinstance(ttl_value, int) else None
 
             return MemoryRecord(
                 key=key,
@@ -138,7 +140,7 @@ class MemoryConverter:
                 timestamp=timestamp,
                 priority=MemoryPriority.LOW,
                 metadata=MemoryMetadata(),
-                ttl_seconds=None,
+                ttl_seconds=ttl_seconds,
                 embedding=None
             )
         except Exception:
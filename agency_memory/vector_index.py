@@ -0,0 +1,546 @@
+"""
+Vector index backends for VectorStore.
+
+Keeps embeddings in a single pre-normalized float32 matrix so semantic
+search becomes one matrix-vector product plus an argpartition top-k
+instead of a per-record Python cosine loop. An inverted-file (IVF) variant
+adds approximate search for large corpora, entirely in NumPy.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from shared.type_definitions.json import JSONValue
+
+try:  # pragma: no cover - exercised implicitly when numpy is installed
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+NUMPY_AVAILABLE = np is not None
+
+
+class EmbeddingMatrix:
+    """
+    Contiguous embedding matrix with a stable key <-> row mapping.
+
+    Rows are L2-normalized on insert, so a dot product with a normalized query
+    is the cosine similarity. Appends grow the backing array geometrically and
+    deletes recycle rows through a free list, so neither operation rebuilds the
+    matrix or moves the rows of other keys.
+
+    Implements the subset of the dict interface that VectorStore uses for
+    ``_embeddings`` (``in``, ``len``, ``[]``, ``pop``), so it can stand in for
+    the plain dict of lists.
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        """
+        Initialize EmbeddingMatrix.
+
+        Args:
+            dim: Embedding dimension (inferred from the first vector if None)
+            initial_capacity: Rows allocated up front before the first growth
+        """
+        if np is None:
+            raise ImportError("numpy not available. Install with: pip install numpy")
+
+        self._dim = dim
+        self._capacity = max(1, initial_capacity)
+        self._matrix = np.zeros((self._capacity, dim), dtype=np.float32) if dim else None
+        self._key_to_row: Dict[str, int] = {}
+        self._row_keys: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Embedding dimension, or None until the first vector is added."""
+        return self._dim
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._key_to_row
+
+    def __len__(self) -> int:
+        return len(self._key_to_row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._key_to_row)
+
+    def __getitem__(self, key: str) -> List[float]:
+        """Return the normalized embedding stored for key."""
+        return self._matrix[self._key_to_row[key]].tolist()
+
+    def __setitem__(self, key: str, vector: Sequence[float]) -> None:
+        self.add(key, vector)
+
+    def keys(self) -> List[str]:
+        return list(self._key_to_row)
+
+    def row_of(self, key: str) -> Optional[int]:
+        """Return the matrix row holding key, or None if absent."""
+        return self._key_to_row.get(key)
+
+    def export_rows(self) -> Tuple[List[str], "np.ndarray"]:
+        """
+        Keys and their normalized rows, packed into a new contiguous array.
+
+        Returns:
+            (keys, vectors) with vectors[i] holding the row of keys[i]
+        """
+        keys = list(self._key_to_row)
+        rows = np.fromiter((self._key_to_row[key] for key in keys), dtype=np.int64, count=len(keys))
+        if not len(rows):
+            return keys, np.zeros((0, self._dim or 0), dtype=np.float32)
+        return keys, self._matrix[rows]
+
+    @classmethod
+    def from_rows(cls, keys: Sequence[str], vectors: "np.ndarray", **options: Any) -> "EmbeddingMatrix":
+        """
+        Wrap already-normalized rows without copying them.
+
+        vectors may be a (copy-on-write) memory-mapped array; it is only
+        copied once the matrix has to grow.
+
+        Args:
+            keys: Key of each row
+            vectors: float32 array of shape (len(keys), dim)
+            options: Constructor arguments
+
+        Returns:
+            Index holding keys[i] in row i
+        """
+        if vectors.ndim == 2 and vectors.shape[1]:
+            options["dim"] = int(vectors.shape[1])
+        options.setdefault("initial_capacity", 1)
+        index = cls(**options)
+        if not len(keys):
+            return index
+        index._matrix = vectors
+        index._capacity = len(keys)
+        index._row_keys = list(keys)
+        index._key_to_row = {key: row for row, key in enumerate(keys)}
+        return index
+
+    def add(self, key: str, vector: Sequence[float]) -> int:
+        """
+        Insert or replace the embedding for key.
+
+        Args:
+            key: Memory key
+            vector: Raw (unnormalized) embedding
+
+        Returns:
+            Row index assigned to key
+        """
+        arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self._dim is None:
+            self._dim = int(arr.shape[0])
+            self._matrix = np.zeros((self._capacity, self._dim), dtype=np.float32)
+        elif arr.shape[0] != self._dim:
+            raise ValueError(
+                f"Embedding dimension mismatch for {key}: expected {self._dim}, got {arr.shape[0]}"
+            )
+
+        norm = float(np.linalg.norm(arr))
+        if norm > 0:
+            arr = arr / norm
+
+        row = self._key_to_row.get(key)
+        if row is None:
+            row = self._allocate_row()
+            self._key_to_row[key] = row
+            self._row_keys[row] = key
+
+        self._matrix[row] = arr
+        return row
+
+    def pop(self, key: str, default: Optional[List[float]] = None) -> Optional[List[float]]:
+        """Remove key and return its embedding (dict.pop semantics)."""
+        row = self._key_to_row.get(key)
+        if row is None:
+            return default
+        vector = self._matrix[row].tolist()
+        self.remove(key)
+        return vector
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove key and recycle its row.
+
+        Returns:
+            True if key was present
+        """
+        row = self._key_to_row.pop(key, None)
+        if row is None:
+            return False
+        self._matrix[row] = 0.0
+        self._row_keys[row] = None
+        self._free_rows.append(row)
+        return True
+
+    def _allocate_row(self) -> int:
+        """Return a free row, growing the backing array when full."""
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        row = len(self._row_keys)
+        if row >= self._capacity:
+            new_capacity = self._capacity * 2
+            grown = np.zeros((new_capacity, self._dim), dtype=np.float32)
+            grown[: self._capacity] = self._matrix
+            self._matrix = grown
+            self._capacity = new_capacity
+        self._row_keys.append(None)
+        return row
+
+    def _normalize_query(self, query: Sequence[float]) -> "np.ndarray":
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        return q / norm if norm > 0 else q
+
+    def scores_for_rows(self, query: Sequence[float], rows: "np.ndarray") -> "np.ndarray":
+        """
+        Cosine similarity between query and the given rows.
+
+        Args:
+            query: Raw query embedding
+            rows: Integer array of matrix rows (may contain duplicates)
+
+        Returns:
+            float32 array aligned with rows
+        """
+        if self._matrix is None or len(rows) == 0:
+            return np.zeros(len(rows), dtype=np.float32)
+        q = self._normalize_query(query)
+        if q.shape[0] != self._dim:
+            return np.zeros(len(rows), dtype=np.float32)
+        return self._matrix[rows] @ q
+
+    def search(self, query: Sequence[float], top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Rank every indexed key against query.
+
+        Args:
+            query: Raw query embedding
+            top_k: Maximum number of results
+
+        Returns:
+            (key, score) pairs ordered by descending similarity
+        """
+        if not self._key_to_row:
+            return []
+        used = len(self._row_keys)
+        q = self._normalize_query(query)
+        if q.shape[0] != self._dim:
+            return []
+        scores = self._matrix[:used] @ q
+        if self._free_rows:
+            scores[self._free_rows] = -np.inf
+        order = top_k_indices(scores, min(top_k, len(self._key_to_row)))
+        return [(self._row_keys[i], float(scores[i])) for i in order]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the backing matrix."""
+        return int(self._matrix.nbytes) if self._matrix is not None else 0
+
+
+def top_k_indices(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """
+    Indices of the k highest scores, ordered like a stable descending sort.
+
+    Ties are broken by position, matching ``list.sort(reverse=True)`` on the
+    same scores, so the result is identical to sorting everything and slicing.
+    argpartition keeps the selection O(n) rather than O(n log n).
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        kth = scores[candidates].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        selected = np.concatenate([above, ties])
+    else:
+        selected = np.arange(n)
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+class IVFIndex(EmbeddingMatrix):
+    """
+    Inverted-file approximate nearest-neighbour index.
+
+    Rows are assigned to the nearest of ``n_lists`` spherical k-means
+    centroids. A query scores the centroids, then only the rows in the
+    ``n_probe`` closest lists. Raising ``n_probe`` trades latency for recall;
+    ``n_probe >= n_lists`` is exact.
+
+    Below ``exact_threshold`` rows the index is untrained and every search is
+    an exact scan. Training happens automatically when the threshold is
+    crossed and again whenever the index has grown by ``retrain_factor``
+    since the last training, so inserts stay O(n_lists * dim) in between.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        initial_capacity: int = 1024,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        exact_threshold: int = 5000,
+        retrain_factor: float = 4.0,
+        kmeans_iterations: int = 10,
+        seed: int = 0,
+    ):
+        """
+        Initialize IVFIndex.
+
+        Args:
+            dim: Embedding dimension (inferred from the first vector if None)
+            initial_capacity: Rows allocated up front before the first growth
+            n_lists: Number of inverted lists (default: sqrt of size at training)
+            n_probe: Lists scanned per query
+            exact_threshold: Size below which searches are exact
+            retrain_factor: Growth since the last training that triggers retraining
+            kmeans_iterations: Lloyd iterations per training run
+            seed: Random seed for centroid initialization
+        """
+        super().__init__(dim=dim, initial_capacity=initial_capacity)
+        self.n_lists = n_lists
+        self.n_probe = max(1, n_probe)
+        self.exact_threshold = max(1, exact_threshold)
+        self.retrain_factor = max(1.0, retrain_factor)
+        self.kmeans_iterations = kmeans_iterations
+        self._seed = seed
+        self._centroids: Optional["np.ndarray"] = None
+        self._lists: List[Set[int]] = []
+        self._row_list: Dict[int, int] = {}
+        self._trained_size = 0
+
+    @property
+    def is_trained(self) -> bool:
+        """True once centroids exist and searches are approximate."""
+        return self._centroids is not None
+
+    def add(self, key: str, vector: Sequence[float]) -> int:
+        row = super().add(key, vector)
+        if self._centroids is not None:
+            self._assign(row)
+        if self._needs_training():
+            self.train()
+        return row
+
+    def remove(self, key: str) -> bool:
+        row = self._key_to_row.get(key)
+        if row is not None:
+            list_id = self._row_list.pop(row, None)
+            if list_id is not None:
+                self._lists[list_id].discard(row)
+        return super().remove(key)
+
+    def _needs_training(self) -> bool:
+        size = len(self._key_to_row)
+        if size < self.exact_threshold:
+            return False
+        if self._centroids is None:
+            return True
+        return size >= self._trained_size * self.retrain_factor
+
+    def _live_rows(self) -> "np.ndarray":
+        return np.fromiter(self._key_to_row.values(), dtype=np.int64, count=len(self._key_to_row))
+
+    def train(self) -> None:
+        """(Re)build centroids with spherical k-means and reassign all rows."""
+        rows = self._live_rows()
+        if len(rows) == 0:
+            return
+
+        n_lists = self.n_lists or int(np.sqrt(len(rows)))
+        n_lists = max(1, min(n_lists, len(rows)))
+        rng = np.random.default_rng(self._seed)
+
+        sample_size = min(len(rows), n_lists * 256)
+        sample = self._matrix[rng.choice(rows, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for list_id in range(n_lists):
+                members = sample[assignment == list_id]
+                if len(members) == 0:
+                    # Re-seed empty lists from a random sample point
+                    centroids[list_id] = sample[rng.integers(sample_size)]
+                    continue
+                centroid = members.sum(axis=0)
+                norm = float(np.linalg.norm(centroid))
+                centroids[list_id] = centroid / norm if norm > 0 else centroid
+
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [set() for _ in range(n_lists)]
+        self._row_list = {}
+        assignment = self._nearest_lists(self._matrix[rows])
+        for row, list_id in zip(rows.tolist(), assignment.tolist()):
+            self._lists[list_id].add(row)
+            self._row_list[row] = list_id
+        self._trained_size = len(rows)
+        logger.info(f"IVFIndex trained: {len(rows)} vectors in {n_lists} lists")
+
+    def _nearest_lists(self, vectors: "np.ndarray") -> "np.ndarray":
+        return np.argmax(vectors @ self._centroids.T, axis=1)
+
+    def _assign(self, row: int) -> None:
+        previous = self._row_list.get(row)
+        if previous is not None:
+            self._lists[previous].discard(row)
+        list_id = int(np.argmax(self._centroids @ self._matrix[row]))
+        self._lists[list_id].add(row)
+        self._row_list[row] = list_id
+
+    def probe_rows(self, query: Sequence[float]) -> Optional["np.ndarray"]:
+        """
+        Rows in the n_probe lists closest to query.
+
+        Returns:
+            Row array, or None when the index is untrained (search exactly)
+        """
+        if self._centroids is None:
+            return None
+        q = self._normalize_query(query)
+        if q.shape[0] != self._dim:
+            return None
+        n_probe = min(self.n_probe, len(self._lists))
+        if n_probe >= len(self._lists):
+            return None
+        probed = top_k_indices(self._centroids @ q, n_probe)
+        rows: List[int] = []
+        for list_id in probed.tolist():
+            rows.extend(self._lists[list_id])
+        return np.asarray(sorted(rows), dtype=np.int64)
+
+    def search(self, query: Sequence[float], top_k: int = 10) -> List[Tuple[str, float]]:
+        rows = self.probe_rows(query)
+        if rows is None:
+            return super().search(query, top_k)
+        scores = self.scores_for_rows(query, rows)
+        order = top_k_indices(scores, min(top_k, len(rows)))
+        return [(self._row_keys[int(rows[i])], float(scores[i])) for i in order]
+
+    def export_lists(self, keys: Sequence[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Centroids and the inverted list of each key.
+
+        Args:
+            keys: Keys to report, e.g. as returned by export_rows()
+
+        Returns:
+            (centroids, assignment) with -1 for keys in no list
+        """
+        centroids = self._centroids if self._centroids is not None else np.zeros((0, self._dim or 0), dtype=np.float32)
+        assignment = np.asarray([self._row_list.get(self._key_to_row[key], -1) for key in keys], dtype=np.int64)
+        return centroids, assignment
+
+    def restore_lists(self, centroids: "np.ndarray", assignment: "np.ndarray", trained_size: int) -> None:
+        """
+        Reinstate trained centroids without re-running k-means.
+
+        Args:
+            centroids: Centroids from export_lists()
+            assignment: List of the key in each row (-1 for none)
+            trained_size: Index size at the last training
+        """
+        if not len(centroids):
+            return
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [set() for _ in range(len(centroids))]
+        self._row_list = {}
+        for row, list_id in enumerate(assignment.tolist()):
+            if list_id >= 0:
+                self._lists[list_id].add(row)
+                self._row_list[row] = list_id
+        self._trained_size = trained_size
+
+    def save(self, path: str) -> None:
+        """
+        Persist vectors, centroids and list assignments atomically.
+
+        Args:
+            path: Target .npz file (written via a temp file and os.replace)
+        """
+        keys, vectors = self.export_rows()
+        centroids, assignment = self.export_lists(keys)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                keys=np.asarray(keys, dtype=np.str_),
+                vectors=vectors,
+                centroids=centroids,
+                assignment=assignment,
+                params=np.asarray(
+                    [self.n_lists or 0, self.n_probe, self.exact_threshold, self._trained_size],
+                    dtype=np.int64,
+                ),
+                retrain_factor=np.asarray([self.retrain_factor], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **overrides: Any) -> "IVFIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            path: .npz file produced by save()
+            overrides: Constructor arguments overriding the persisted ones (e.g. n_probe)
+
+        Returns:
+            Restored IVFIndex
+        """
+        with np.load(path, allow_pickle=False) as data:
+            keys = data["keys"].tolist()
+            vectors = data["vectors"]
+            centroids = data["centroids"]
+            assignment = data["assignment"]
+            n_lists, n_probe, exact_threshold, trained_size = data["params"].tolist()
+            retrain_factor = float(data["retrain_factor"][0])
+
+        params: Dict[str, JSONValue] = {
+            "n_lists": n_lists or None,
+            "n_probe": n_probe,
+            "exact_threshold": exact_threshold,
+            "retrain_factor": retrain_factor,
+        }
+        params.update(overrides)
+        # Rows are already normalized; adopt them without re-training
+        index = cls.from_rows(keys, vectors.astype(np.float32, copy=False), **params)
+        index.restore_lists(centroids, assignment, trained_size)
+        return index
+
+
+def create_embedding_index(backend: str = "python", **options: Any) -> Optional[EmbeddingMatrix]:
+    """
+    Create the embedding container for a VectorStore backend.
+
+    Args:
+        backend: 'python' (dict of lists), 'matrix' (exact NumPy EmbeddingMatrix)
+            or 'ivf' (approximate IVFIndex)
+        options: Backend-specific constructor arguments
+
+    Returns:
+        EmbeddingMatrix/IVFIndex for NumPy backends, None for the plain dict backend
+    """
+    if backend == "python":
+        return None
+    if backend in ("matrix", "ivf"):
+        if not NUMPY_AVAILABLE:
+            logger.warning(f"numpy not available - falling back to python vector backend instead of {backend}")
+            return None
+        if backend == "ivf":
+            return IVFIndex(**options)
+        return EmbeddingMatrix(**options)
+    raise ValueError(f"Unknown vector index backend: {backend}")
@@ -6,15 +6,26 @@ Provides semantic search capabilities alongside tag-based search.
 Lightweight implementation with optional embeddings support.
 """
 
+import heapq
 import logging
 import json
-from typing import Any, Dict, List, Optional, Callable, cast
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Callable, Tuple, TypedDict, cast
 from shared.type_definitions.json import JSONValue
 from dataclasses import dataclass
 from datetime import datetime
 
+from .keyword_index import InvertedIndex
+from .embedding_cache import EmbeddingCache, calculate_content_hash, get_embedding_cache
+from .vector_index import EmbeddingMatrix, IVFIndex, create_embedding_index, top_k_indices
+
 logger = logging.getLogger(__name__)
 
+# Least seconds between embedding_cache telemetry events per store
+CACHE_TELEMETRY_INTERVAL = 60.0
+
 
 @dataclass
 class SimilarityResult:
@@ -25,37 +36,239 @@ class SimilarityResult:
     search_type: str  # 'semantic', 'keyword', or 'hybrid'
 
 
+class VectorState(TypedDict, total=False):
+    """Searchable texts and embeddings of a VectorStore, for snapshots."""
+
+    texts: Dict[str, str]
+    embedding_model: Optional[str]
+    normalized: bool
+    keys: List[str]
+    # float32 array (NumPy backends) or lists of floats (dict backend)
+    vectors: Any
+    # Present once an IVF index is trained
+    ivf_centroids: Any
+    ivf_assignment: Any
+    ivf_trained_size: int
+
+
 class VectorStore:
     """
     Lightweight vector store for semantic memory search.
 
     Features:
     - Text embeddings for semantic search
-    - Keyword-based fallback
-    - Hybrid search combining both approaches
+    - BM25 keyword search over an incrementally maintained inverted index
+    - Hybrid search fusing bounded candidate lists (weighted or reciprocal-rank)
     - Optional external embedding provider support
+    - Optional NumPy matrix backend for vectorized semantic search
+    - Optional IVF approximate nearest-neighbour backend with on-disk persistence
+    - Micro-batched embedding generation with read-your-writes searches
+    - Persistent content-hash keyed embedding cache shared across processes
     """
 
-    def __init__(self, embedding_provider: Optional[str] = None):
+    def __init__(
+        self,
+        embedding_provider: Optional[str] = None,
+        index_backend: str = "python",
+        embedding_batch_size: int = 32,
+        max_batch_latency_ms: float = 50.0,
+        index_options: Optional[Dict[str, JSONValue]] = None,
+        index_path: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+    ):
         """
         Initialize VectorStore.
 
         Args:
             embedding_provider: Optional embedding provider ('openai', 'sentence-transformers', etc.)
+            index_backend: Embedding storage backend ('python' dict of lists, 'matrix'
+                for a contiguous NumPy matrix with vectorized top-k, or 'ivf' for an
+                approximate inverted-file index)
+            embedding_batch_size: Pending texts that trigger an embedding call
+            max_batch_latency_ms: Age of the oldest pending text that triggers a flush
+                on the next write
+            index_options: Backend tuning (e.g. n_lists, n_probe, exact_threshold for 'ivf')
+            index_path: File the 'ivf' index is loaded from and saved to
+            embedding_cache: Persistent embedding cache (defaults to the shared
+                process cache when an embedding provider is configured)
         """
-        self._embeddings: Dict[str, List[float]] = {}
+        self._index_path = index_path
+        self._index_options = index_options or {}
+        matrix = self._load_index(index_backend, self._index_options)
+        self._embeddings: Dict[str, List[float]] = matrix if matrix is not None else {}
+        if isinstance(matrix, IVFIndex):
+            self._index_backend = "ivf"
+        else:
+            self._index_backend = "matrix" if matrix is not None else "python"
         self._memory_texts: Dict[str, str] = {}
         self._memory_records: Dict[str, Dict[str, JSONValue]] = {}
+        self._keyword_index = InvertedIndex()
         self._embedding_provider = embedding_provider
         self._embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None
+        self._embedding_model_name: Optional[str] = None
+        self._embedding_batch_size = max(1, embedding_batch_size)
+        self._max_batch_latency = max_batch_latency_ms / 1000.0
+        self._pending_texts: Dict[str, str] = {}
+        self._pending_since: Optional[float] = None
+        self._embedding_calls = 0
 
         # Try to initialize embedding function
         self._initialize_embeddings()
 
+        self._embedding_cache = embedding_cache
+        if self._embedding_cache is None and self._embedding_function is not None:
+            self._embedding_cache = get_embedding_cache()
+        # Cache hits and misses not yet reported to telemetry
+        self._unreported_hits = 0
+        self._unreported_misses = 0
+        self._cache_reported_at = time.monotonic()
+
         logger.info(
             f"VectorStore initialized with provider: {embedding_provider or 'keyword-only'}"
         )
 
+    def _load_index(self, backend: str, options: Dict[str, JSONValue]) -> Optional[EmbeddingMatrix]:
+        """Restore a persisted IVF index when available, else create a fresh one."""
+        if backend == "ivf" and self._index_path and os.path.exists(self._index_path):
+            try:
+                index = IVFIndex.load(self._index_path, **options)
+                logger.info(f"Loaded IVF index with {len(index)} embeddings from {self._index_path}")
+                return index
+            except Exception as e:
+                logger.warning(f"Failed to load IVF index from {self._index_path}: {e}")
+        return create_embedding_index(backend, **options)
+
+    def save_index(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Persist the IVF index next to the memory data.
+
+        Args:
+            path: Target file (defaults to the index_path given at construction)
+
+        Returns:
+            Path written, or None if the backend has nothing to persist
+        """
+        target = path or self._index_path
+        if not target or not isinstance(self._embeddings, IVFIndex):
+            return None
+        self.flush()
+        self._embeddings.save(target)
+        logger.info(f"Saved IVF index with {len(self._embeddings)} embeddings to {target}")
+        return target
+
+    def export_state(self) -> VectorState:
+        """
+        Capture searchable texts and embeddings for a snapshot.
+
+        Queued texts are not embedded first; they are re-queued on restore.
+
+        Returns:
+            Dict with texts, embedding_model, normalized, keys and
+            vectors (a float32 array for the NumPy backends, lists of floats for
+            the dict backend), plus ivf_centroids, ivf_assignment and
+            ivf_trained_size once an IVF index is trained
+        """
+        state: VectorState = {
+            "texts": dict(self._memory_texts),
+            "embedding_model": self._embedding_model_name,
+        }
+        embeddings = self._embeddings
+        if isinstance(embeddings, EmbeddingMatrix):
+            keys, vectors = embeddings.export_rows()
+            state.update(normalized=True, keys=keys, vectors=vectors)
+            if isinstance(embeddings, IVFIndex) and embeddings.is_trained:
+                centroids, assignment = embeddings.export_lists(keys)
+                state.update(
+                    ivf_centroids=centroids,
+                    ivf_assignment=assignment,
+                    ivf_trained_size=embeddings._trained_size,
+                )
+        else:
+            items = list(embeddings.items())
+            state.update(normalized=False, keys=[key for key, _ in items], vectors=[vector for _, vector in items])
+        return state
+
+    def restore_state(
+        self,
+        memories: Iterable[Tuple[str, Dict[str, JSONValue]]],
+        state: Optional[VectorState] = None,
+    ) -> int:
+        """
+        Register memories, adopting snapshot state instead of recomputing it.
+
+        Searchable texts are adopted when the store is empty and they cover
+        exactly these memories (the keyword index is rebuilt from them, which
+        costs about as much as decoding a stored copy); otherwise memories are
+        registered one by one. Embeddings are only adopted when they came from the same
+        embedding model. Memories without an adopted embedding are queued as
+        usual.
+
+        Args:
+            memories: (key, memory record) pairs
+            state: State in the shape returned by export_state(), with vectors
+                as a float32 array or lists of floats
+
+        Returns:
+            Number of embeddings adopted
+        """
+        memories = list(memories)
+        state = state or {}
+        texts = state.get("texts")
+        if (
+            not self._memory_records
+            and isinstance(texts, dict)
+            and len(texts) == len(memories)
+            and all(memory_key in texts for memory_key, _ in memories)
+        ):
+            for memory_key, memory in memories:
+                if "key" not in memory:
+                    memory["key"] = memory_key
+                self._memory_records[memory_key] = memory
+                self._keyword_index.add(memory_key, texts[memory_key])
+            self._memory_texts = texts
+            if self._embedding_function:
+                self._pending_texts = dict(texts)
+                self._pending_since = time.monotonic() if texts else None
+        else:
+            for memory_key, memory in memories:
+                self._register_memory(memory_key, memory)
+
+        if (
+            not state.get("keys")
+            or self._embedding_function is None
+            or state.get("embedding_model") != self._embedding_model_name
+        ):
+            return 0
+
+        keys: List[str] = state["keys"]
+        vectors = state["vectors"]
+        if isinstance(self._embeddings, EmbeddingMatrix):
+            import numpy as np
+
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if not state.get("normalized"):
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                vectors = vectors / np.where(norms > 0, norms, 1.0)
+            index_type = IVFIndex if isinstance(self._embeddings, IVFIndex) else EmbeddingMatrix
+            restored = index_type.from_rows(keys, vectors, **self._index_options)
+            if isinstance(restored, IVFIndex) and state.get("ivf_centroids") is not None:
+                restored.restore_lists(state["ivf_centroids"], state["ivf_assignment"], state["ivf_trained_size"])
+            self._embeddings = restored
+        else:
+            rows = vectors.tolist() if hasattr(vectors, "tolist") else vectors
+            self._embeddings = dict(zip(keys, rows))
+
+        # Drop embeddings of memories that are not part of the restore
+        for memory_key in [key for key in keys if key not in self._memory_records]:
+            self._embeddings.pop(memory_key, None)
+        for memory_key in keys:
+            self._pending_texts.pop(memory_key, None)
+        if not self._pending_texts:
+            self._pending_since = None
+        if isinstance(self._embeddings, IVFIndex) and self._embeddings._needs_training():
+            self._embeddings.train()
+        return len(self._embeddings)
+
     def _initialize_embeddings(self) -> None:
         """Initialize embedding function based on provider."""
         if not self._embedding_provider:
@@ -84,6 +297,7 @@ class VectorStore:
             # Use a lightweight model for efficiency
             model_name = "all-MiniLM-L6-v2"  # 22MB, fast, good quality
             self._embedding_model = SentenceTransformer(model_name)
+            self._embedding_model_name = model_name
 
             def embed_texts(texts: List[str]) -> List[List[float]]:
                 embeddings = self._embedding_model.encode(
@@ -110,16 +324,20 @@ class VectorStore:
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
 
+            # One client per store so its HTTP connection pool is reused
+            client = openai.OpenAI(api_key=api_key)
+            model_name = "text-embedding-3-small"  # Efficient and cost-effective
+
             def embed_texts(texts: List[str]) -> List[List[float]]:
                 """Embed texts using OpenAI API."""
-                client = openai.OpenAI(api_key=api_key)
                 response = client.embeddings.create(
-                    model="text-embedding-3-small",  # Efficient and cost-effective
+                    model=model_name,
                     input=texts,
                 )
                 return [embedding.embedding for embedding in response.data]
 
             self._embedding_function = embed_texts
+            self._embedding_model_name = model_name
             logger.info("Initialized OpenAI embeddings")
 
         except ImportError:
@@ -129,25 +347,183 @@ class VectorStore:
         """
         Add memory to vector store for search.
 
+        The embedding is queued and generated with the next batch: when the
+        queue reaches ``embedding_batch_size``, when the oldest queued text is
+        older than ``max_batch_latency_ms``, or before any search reads it.
+
         Args:
             memory_key: Unique memory identifier
             memory_content: Memory record with content and metadata
         """
+        self._register_memory(memory_key, memory_content)
+
+        if not self._embedding_function:
+            return
+
+        if (
+            len(self._pending_texts) >= self._embedding_batch_size
+            or (
+                self._pending_since is not None
+                and time.monotonic() - self._pending_since >= self._max_batch_latency
+            )
+        ):
+            self.flush()
+
+    def add_memories(
+        self,
+        items: Iterable[Tuple[str, Dict[str, JSONValue]]],
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Add many memories and embed them in batched calls.
+
+        Args:
+            items: (memory_key, memory_content) pairs
+            batch_size: Texts per embedding call (defaults to embedding_batch_size)
+
+        Returns:
+            Number of memories added
+        """
+        count = 0
+        for memory_key, memory_content in items:
+            self._register_memory(memory_key, memory_content)
+            count += 1
+
+        self.flush(batch_size)
+        return count
+
+    def _register_memory(self, memory_key: str, memory_content: Dict[str, JSONValue]) -> None:
+        """Record memory and its searchable text, queueing it for embedding."""
         if "key" not in memory_content:
             memory_content["key"] = memory_key
         self._memory_records[memory_key] = memory_content
 
         searchable_text = self._extract_searchable_text(memory_content)
         self._memory_texts[memory_key] = searchable_text
+        self._keyword_index.add(memory_key, searchable_text)
 
-        # Generate embedding if provider is available
         if self._embedding_function:
+            if not self._pending_texts:
+                self._pending_since = time.monotonic()
+            self._pending_texts[memory_key] = searchable_text
+
+    def flush(self, batch_size: Optional[int] = None) -> int:
+        """
+        Embed all queued texts.
+
+        Each chunk is sent as a single embedding call. If a chunk fails, its
+        texts are retried one by one so a single bad input only loses its own
+        embedding.
+
+        Args:
+            batch_size: Texts per embedding call (defaults to embedding_batch_size)
+
+        Returns:
+            Number of embeddings generated
+        """
+        if not self._pending_texts or not self._embedding_function:
+            return 0
+
+        pending = list(self._pending_texts.items())
+        self._pending_texts = {}
+        self._pending_since = None
+        chunk_size = max(1, batch_size or self._embedding_batch_size)
+        generated = 0
+
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start : start + chunk_size]
             try:
-                embeddings = self._embedding_function([searchable_text])
-                self._embeddings[memory_key] = embeddings[0]
-                logger.debug(f"Generated embedding for memory: {memory_key}")
+                embeddings = self._embed_texts([text for _, text in chunk])
+                for (memory_key, _), embedding in zip(chunk, embeddings):
+                    generated += self._store_embedding(memory_key, embedding)
             except Exception as e:
-                logger.warning(f"Failed to generate embedding for {memory_key}: {e}")
+                logger.warning(f"Batch embedding failed ({len(chunk)} texts), retrying individually: {e}")
+                for memory_key, text in chunk:
+                    try:
+                        embedding = self._embed_texts([text])[0]
+                        generated += self._store_embedding(memory_key, embedding)
+                    except Exception as item_error:
+                        logger.warning(f"Failed to generate embedding for {memory_key}: {item_error}")
+
+        if time.monotonic() - self._cache_reported_at >= CACHE_TELEMETRY_INTERVAL:
+            self._emit_cache_telemetry()
+
+        logger.debug(f"Generated {generated} embeddings in batches of {chunk_size}")
+        return generated
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, serving previously seen content from the embedding cache.
+
+        Only cache misses reach the embedding function, in a single call.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings aligned with texts
+        """
+        if self._embedding_cache is None:
+            self._embedding_calls += 1
+            return self._embedding_function(texts)
+
+        provider = self._embedding_provider or "custom"
+        model = self._embedding_model_name or "default"
+        hashes = [calculate_content_hash(text) for text in texts]
+        cached = self._embedding_cache.get_many(provider, model, hashes)
+
+        misses = list({h: text for h, text in zip(hashes, texts) if h not in cached}.items())
+        self._unreported_hits += len(cached)
+        self._unreported_misses += len(misses)
+        if misses:
+            self._embedding_calls += 1
+            fresh = self._embedding_function([text for _, text in misses])
+            new_entries = [(h, vector) for (h, _), vector in zip(misses, fresh)]
+            try:
+                self._embedding_cache.put_many(provider, model, new_entries)
+            except sqlite3.Error as e:
+                # The fresh embeddings are still used; they'll be recomputed next time
+                logger.warning(f"Embedding cache write failed ({len(new_entries)} vectors): {e}")
+            cached.update(new_entries)
+
+        return [cached[h] for h in hashes]
+
+    def _emit_cache_telemetry(self) -> None:
+        """Report cache hits and misses since the last report to the unified telemetry sink."""
+        self._cache_reported_at = time.monotonic()
+        hits, misses = self._unreported_hits, self._unreported_misses
+        if self._embedding_cache is None or not (hits or misses):
+            return
+        self._unreported_hits = self._unreported_misses = 0
+        try:
+            from core.telemetry import emit
+
+            stats = self._embedding_cache.get_stats()
+            emit(
+                "embedding_cache",
+                {
+                    "provider": self._embedding_provider or "custom",
+                    "model": self._embedding_model_name or "default",
+                    "hits": hits,
+                    "misses": misses,
+                    "total_hits": stats["hits"],
+                    "total_misses": stats["misses"],
+                    "evictions": stats["evictions"],
+                },
+            )
+        except Exception as e:
+            logger.debug(f"Embedding cache telemetry unavailable: {e}")
+
+    def _store_embedding(self, memory_key: str, embedding: List[float]) -> int:
+        """Store an embedding unless its memory was removed meanwhile."""
+        if memory_key not in self._memory_records:
+            return 0
+        try:
+            self._embeddings[memory_key] = embedding
+        except ValueError as e:
+            logger.warning(f"Failed to store embedding for {memory_key}: {e}")
+            return 0
+        return 1
 
     def _extract_searchable_text(self, memory: Dict[str, JSONValue]) -> str:
         """
@@ -207,101 +583,259 @@ class VectorStore:
 
         try:
             # Generate query embedding
-            query_embeddings = self._embedding_function([query])
-            query_embedding = query_embeddings[0]
-
-            results = []
-
-            for memory in memories:
-                memory_key = memory.get("namespaced_key", memory.get("key", ""))
-
-                # Ensure memory is in vector store
-                if memory_key not in self._embeddings:
-                    if isinstance(memory, dict) and isinstance(memory_key, str):
-                        self.add_memory(memory_key, cast(Dict[str, JSONValue], memory))
-                    else:
-                        continue
-
-                # Skip if still no embedding
-                if memory_key not in self._embeddings:
-                    continue
-
-                # Calculate cosine similarity
-                if isinstance(memory_key, str):
-                    memory_embedding = self._embeddings[memory_key]
-                else:
-                    continue
-                similarity = self._cosine_similarity(query_embedding, memory_embedding)
-
-                results.append(
-                    SimilarityResult(
-                        memory=memory,
-                        similarity_score=similarity,
-                        search_type="semantic",
-                    )
-                )
+            query_embedding = self._embed_texts([query])[0]
 
-            # Sort by similarity score (descending)
-            results.sort(key=lambda x: x.similarity_score, reverse=True)
+            # Embed memories not seen before in one batch, then drain the queue
+            self._embed_missing(memories)
 
-            return results[:top_k]
+            return self._rank_semantic(query_embedding, memories, top_k)
 
         except Exception as e:
             logger.error(f"Semantic search failed: {e}")
             return self.keyword_search(query, memories, top_k)
 
+    def _rank_semantic(
+        self,
+        query_embedding: List[float],
+        memories: List[dict[str, JSONValue]],
+        top_k: int,
+    ) -> List[SimilarityResult]:
+        """
+        Top-k embedded memories by cosine similarity to query_embedding.
+
+        Args:
+            query_embedding: Embedded query
+            memories: Memory records to rank (unembedded ones are skipped)
+            top_k: Maximum number of results
+
+        Returns:
+            Similarity results ordered by relevance, ties in input order
+        """
+        if isinstance(self._embeddings, EmbeddingMatrix):
+            return self._matrix_semantic_search(query_embedding, memories, top_k)
+
+        results = []
+
+        for memory in memories:
+            memory_key = self._embedded_key(memory)
+            if memory_key is None:
+                continue
+
+            # Calculate cosine similarity
+            memory_embedding = self._embeddings[memory_key]
+            similarity = self._cosine_similarity(query_embedding, memory_embedding)
+
+            results.append(
+                SimilarityResult(
+                    memory=memory,
+                    similarity_score=similarity,
+                    search_type="semantic",
+                )
+            )
+
+        # Bounded selection; equivalent to a stable descending sort and slice
+        return heapq.nlargest(top_k, results, key=lambda x: x.similarity_score)
+
+    def _semantic_score(self, query_embedding: List[float], memory_key: str) -> Optional[float]:
+        """Cosine similarity of one memory to query_embedding, or None if unembedded."""
+        if memory_key not in self._embeddings:
+            return None
+        if isinstance(self._embeddings, EmbeddingMatrix):
+            import numpy as np
+
+            row = np.asarray([self._embeddings.row_of(memory_key)], dtype=np.int64)
+            return float(self._embeddings.scores_for_rows(query_embedding, row)[0])
+        return self._cosine_similarity(query_embedding, self._embeddings[memory_key])
+
+    def _embed_missing(self, memories: List[dict[str, JSONValue]]) -> None:
+        """Queue memories that have no embedding yet and flush the queue."""
+        missing: List[Tuple[str, Dict[str, JSONValue]]] = []
+        for memory in memories:
+            memory_key = memory.get("namespaced_key", memory.get("key", ""))
+            if (
+                isinstance(memory, dict)
+                and isinstance(memory_key, str)
+                and memory_key not in self._embeddings
+                and memory_key not in self._pending_texts
+            ):
+                missing.append((memory_key, cast(Dict[str, JSONValue], memory)))
+
+        if missing:
+            self.add_memories(missing)
+        else:
+            self.flush()
+
+    def _embedded_key(self, memory: Dict[str, JSONValue]) -> Optional[str]:
+        """
+        Return the memory's key if it has an embedding.
+
+        Args:
+            memory: Memory record passed to a search call
+
+        Returns:
+            Memory key, or None if the memory has no embedding
+        """
+        memory_key = memory.get("namespaced_key", memory.get("key", ""))
+        if not isinstance(memory_key, str) or memory_key not in self._embeddings:
+            return None
+        return memory_key
+
+    def _matrix_semantic_search(
+        self,
+        query_embedding: List[float],
+        memories: List[dict[str, JSONValue]],
+        top_k: int,
+    ) -> List[SimilarityResult]:
+        """
+        Score memories with one matrix-vector product over their embedding rows.
+
+        Produces the same ordering as the per-record loop: ties keep the order
+        of ``memories``, exactly like the stable sort in the python backend.
+        With the IVF backend only rows in the probed lists are scored.
+        """
+        import numpy as np
+
+        matrix = cast(EmbeddingMatrix, self._embeddings)
+        candidates: List[dict[str, JSONValue]] = []
+        rows: List[int] = []
+
+        for memory in memories:
+            memory_key = self._embedded_key(memory)
+            if memory_key is None:
+                continue
+            candidates.append(memory)
+            rows.append(cast(int, matrix.row_of(memory_key)))
+
+        if not candidates:
+            return []
+
+        row_array = np.asarray(rows, dtype=np.int64)
+        limit = min(top_k, len(candidates))
+
+        if isinstance(matrix, IVFIndex):
+            # Score only candidates in the probed lists; fall back to the exact
+            # scan when the probe cannot fill top_k (small or filtered inputs)
+            probed = matrix.probe_rows(query_embedding)
+            if probed is not None:
+                positions = np.flatnonzero(np.isin(row_array, probed))
+                if len(positions) >= limit:
+                    scores = matrix.scores_for_rows(query_embedding, row_array[positions])
+                    order = top_k_indices(scores, limit)
+                    return [
+                        SimilarityResult(
+                            memory=candidates[int(positions[i])],
+                            similarity_score=float(scores[i]),
+                            search_type="semantic",
+                        )
+                        for i in order
+                    ]
+
+        scores = matrix.scores_for_rows(query_embedding, row_array)
+        order = top_k_indices(scores, limit)
+
+        return [
+            SimilarityResult(
+                memory=candidates[i],
+                similarity_score=float(scores[i]),
+                search_type="semantic",
+            )
+            for i in order
+        ]
+
     def keyword_search(
-        self, query: str, memories: List[dict[str, JSONValue]], top_k: int = 10
+        self,
+        query: str,
+        memories: List[dict[str, JSONValue]],
+        top_k: int = 10,
+        require_all_terms: bool = False,
     ) -> List[SimilarityResult]:
         """
-        Perform keyword-based search as fallback.
+        Perform BM25 keyword search over the inverted index.
+
+        Only the posting lists of the query terms are scored. Scores are
+        normalized by the best match (0 to 1) after a 1.5x boost for exact
+        phrase matches.
 
         Args:
             query: Search query
             memories: List of memory records to search
             top_k: Maximum number of results
+            require_all_terms: Only match memories containing every query term
 
         Returns:
             List of similarity results ordered by relevance
         """
-        query_words = set(query.lower().split())
-        results = []
+        candidates = self._index_candidates(memories)
+        scores = self._keyword_scores(query, candidates, require_all_terms)
 
-        for memory in memories:
-            # Get searchable text
-            memory_key = memory.get("namespaced_key", memory.get("key", ""))
+        # Ties keep the order of memories, like a stable sort
+        ranked = heapq.nsmallest(
+            top_k, scores.items(), key=lambda item: (-item[1], candidates[item[0]][0])
+        )
+        return [
+            SimilarityResult(
+                memory=candidates[memory_key][1], similarity_score=score, search_type="keyword"
+            )
+            for memory_key, score in ranked
+        ]
+
+    def _index_candidates(
+        self, memories: List[dict[str, JSONValue]]
+    ) -> Dict[str, Tuple[int, dict[str, JSONValue]]]:
+        """
+        Map searchable memories to (position, memory), indexing unseen ones.
+
+        Args:
+            memories: Memory records passed to a search call
 
-            if isinstance(memory_key, str):
-                if memory_key not in self._memory_texts:
+        Returns:
+            Mapping of memory key to its first position and record
+        """
+        candidates: Dict[str, Tuple[int, dict[str, JSONValue]]] = {}
+        for position, memory in enumerate(memories):
+            memory_key = memory.get("namespaced_key", memory.get("key", ""))
+            if not isinstance(memory_key, str) or memory_key in candidates:
+                continue
+            if memory_key not in self._keyword_index:
+                searchable_text = self._memory_texts.get(memory_key)
+                if searchable_text is None:
                     searchable_text = self._extract_searchable_text(memory)
                     self._memory_texts[memory_key] = searchable_text
-                else:
-                    searchable_text = self._memory_texts[memory_key]
-            else:
-                continue
-
-            # Calculate keyword overlap score
-            memory_words = set(searchable_text.lower().split())
-            overlap = query_words.intersection(memory_words)
+                self._keyword_index.add(memory_key, searchable_text)
+            candidates[memory_key] = (position, memory)
+        return candidates
 
-            if overlap:
-                # Simple scoring: ratio of overlapping words
-                score = len(overlap) / len(query_words) if query_words else 0
+    def _keyword_scores(
+        self,
+        query: str,
+        candidates: Dict[str, Tuple[int, dict[str, JSONValue]]],
+        require_all_terms: bool = False,
+    ) -> Dict[str, float]:
+        """
+        Normalized BM25 scores for the candidates matching query.
 
-                # Boost score for exact phrase matches
-                if query.lower() in searchable_text.lower():
-                    score *= 1.5
+        Args:
+            query: Search query
+            candidates: Output of _index_candidates
+            require_all_terms: Only match memories containing every query term
 
-                results.append(
-                    SimilarityResult(
-                        memory=memory, similarity_score=score, search_type="keyword"
-                    )
-                )
+        Returns:
+            Mapping of memory key to score in (0, 1] for matching candidates
+        """
+        scores = self._keyword_index.score(query, candidates.keys(), require_all=require_all_terms)
+        if not scores:
+            return {}
 
-        # Sort by similarity score (descending)
-        results.sort(key=lambda x: x.similarity_score, reverse=True)
+        # Boost score for exact phrase matches
+        phrase = query.lower()
+        for memory_key in scores:
+            if phrase in self._memory_texts.get(memory_key, "").lower():
+                scores[memory_key] *= 1.5
 
-        return results[:top_k]
+        best = max(scores.values())
+        if best <= 0:
+            return {}
+        return {memory_key: score / best for memory_key, score in scores.items()}
 
     def hybrid_search(
         self,
@@ -309,67 +843,184 @@ class VectorStore:
         memories: List[dict[str, JSONValue]],
         top_k: int = 10,
         semantic_weight: float = 0.7,
+        fusion: str = "weighted",
+        candidate_pool: Optional[int] = None,
+        rrf_k: int = 60,
     ) -> List[SimilarityResult]:
         """
         Perform hybrid search combining semantic and keyword approaches.
 
+        Both signals produce bounded, ranked candidate lists instead of
+        ranking the whole corpus. With ``fusion="weighted"`` the result equals
+        scoring every memory with ``semantic_weight * semantic +
+        (1 - semantic_weight) * keyword``: candidates are consumed in rank
+        order and scanning stops once the k-th fused score reaches the best
+        score an unseen memory could still get (threshold algorithm).
+        ``fusion="rrf"`` combines the two candidate lists by reciprocal rank.
+
         Args:
             query: Search query
             memories: List of memory records to search
             top_k: Maximum number of results
             semantic_weight: Weight for semantic scores (0.0 to 1.0)
+            fusion: 'weighted' score fusion or 'rrf' reciprocal-rank fusion
+            candidate_pool: Initial candidates taken from each signal
+                (default: 4 * top_k, at least 32)
+            rrf_k: Rank offset for reciprocal-rank fusion
 
         Returns:
             List of similarity results ordered by combined relevance
         """
+        if fusion not in ("weighted", "rrf"):
+            raise ValueError(f"Unknown fusion method: {fusion}")
+
         if not self._embedding_function:
             return self.keyword_search(query, memories, top_k)
 
-        # Get results from both approaches
-        semantic_results = self.semantic_search(query, memories, len(memories))
-        keyword_results = self.keyword_search(query, memories, len(memories))
+        if top_k <= 0 or not memories:
+            return []
 
-        # Create combined score mapping
-        combined_scores = {}
-        memory_map = {}
+        try:
+            query_embedding = self._embed_texts([query])[0]
+            self._embed_missing(memories)
+        except Exception as e:
+            logger.error(f"Semantic search failed: {e}")
+            return self.keyword_search(query, memories, top_k)
+
+        candidates = self._index_candidates(memories)
+        keyword_scores = self._keyword_scores(query, candidates)
+        keyword_ranked = sorted(
+            keyword_scores.items(), key=lambda item: (-item[1], candidates[item[0]][0])
+        )
+        pool = max(1, candidate_pool or max(top_k * 4, 32))
 
-        # Process semantic results
-        for result in semantic_results:
-            memory_key = result.memory.get(
-                "namespaced_key", result.memory.get("key", "")
+        if fusion == "rrf":
+            fused, memory_map = self._rrf_fusion(
+                query_embedding, memories, candidates, keyword_ranked, pool, semantic_weight, rrf_k
+            )
+        else:
+            fused, memory_map = self._weighted_fusion(
+                query_embedding, memories, candidates, keyword_scores, keyword_ranked,
+                top_k, pool, semantic_weight,
             )
-            combined_scores[memory_key] = semantic_weight * result.similarity_score
-            memory_map[memory_key] = result.memory
 
-        # Add keyword results
+        final_results = [
+            SimilarityResult(memory=memory_map[memory_key], similarity_score=score, search_type="hybrid")
+            for memory_key, score in fused.items()
+            if score > 0  # Only include results with positive scores
+        ]
+        return heapq.nlargest(top_k, final_results, key=lambda x: x.similarity_score)
+
+    def _weighted_fusion(
+        self,
+        query_embedding: List[float],
+        memories: List[dict[str, JSONValue]],
+        candidates: Dict[str, Tuple[int, dict[str, JSONValue]]],
+        keyword_scores: Dict[str, float],
+        keyword_ranked: List[Tuple[str, float]],
+        top_k: int,
+        pool: int,
+        semantic_weight: float,
+    ) -> Tuple[Dict[str, float], Dict[str, dict[str, JSONValue]]]:
+        """
+        Weighted score fusion with threshold early termination.
+
+        Walks the semantic and keyword rankings in lockstep, scoring each newly
+        seen memory on both signals. The semantic ranking is re-fetched with a
+        doubled pool whenever it runs out before the threshold is met.
+
+        Returns:
+            (fused scores, memory records) for every memory scored
+        """
         keyword_weight = 1.0 - semantic_weight
-        for result in keyword_results:
-            memory_key = result.memory.get(
-                "namespaced_key", result.memory.get("key", "")
-            )
+        fused: Dict[str, float] = {}
+        memory_map: Dict[str, dict[str, JSONValue]] = {}
+        best: List[float] = []  # min-heap of the top_k fused scores so far
+
+        def record(memory_key: str, memory: dict[str, JSONValue], score: float) -> None:
+            fused[memory_key] = score
+            memory_map[memory_key] = memory
+            if len(best) < top_k:
+                heapq.heappush(best, score)
+            elif score > best[0]:
+                heapq.heapreplace(best, score)
+
+        semantic_ranked = self._rank_semantic(query_embedding, memories, pool)
+        depth = 0
+        while True:
+            if depth >= len(semantic_ranked) and len(semantic_ranked) == pool:
+                pool *= 2
+                semantic_ranked = self._rank_semantic(query_embedding, memories, pool)
+                continue
 
-            if memory_key in combined_scores:
-                combined_scores[memory_key] += keyword_weight * result.similarity_score
-            else:
-                combined_scores[memory_key] = keyword_weight * result.similarity_score
-                memory_map[memory_key] = result.memory
-
-        # Create final results
-        final_results = []
-        for memory_key, score in combined_scores.items():
-            if score > 0:  # Only include results with positive scores
-                final_results.append(
-                    SimilarityResult(
-                        memory=memory_map[memory_key],
-                        similarity_score=score,
-                        search_type="hybrid",
-                    )
+            semantic_entry = semantic_ranked[depth] if depth < len(semantic_ranked) else None
+            keyword_entry = keyword_ranked[depth] if depth < len(keyword_ranked) else None
+            if semantic_entry is None and keyword_entry is None:
+                break
+
+            if semantic_entry is not None:
+                memory_key = semantic_entry.memory.get(
+                    "namespaced_key", semantic_entry.memory.get("key", "")
                 )
+                if memory_key not in fused:
+                    record(
+                        memory_key,
+                        semantic_entry.memory,
+                        semantic_weight * semantic_entry.similarity_score
+                        + keyword_weight * keyword_scores.get(memory_key, 0.0),
+                    )
+
+            if keyword_entry is not None:
+                memory_key, keyword_score = keyword_entry
+                if memory_key not in fused:
+                    semantic_score = self._semantic_score(query_embedding, memory_key)
+                    record(
+                        memory_key,
+                        candidates[memory_key][1],
+                        semantic_weight * (semantic_score or 0.0) + keyword_weight * keyword_score,
+                    )
+
+            # Best fused score any unseen memory can still reach; memories
+            # without embeddings contribute 0 on the semantic side
+            semantic_bound = max(semantic_entry.similarity_score, 0.0) if semantic_entry else 0.0
+            keyword_bound = keyword_entry[1] if keyword_entry else 0.0
+            threshold = semantic_weight * semantic_bound + keyword_weight * keyword_bound
+            if threshold <= 0 or (len(best) == top_k and best[0] >= threshold):
+                break
+            depth += 1
+
+        return fused, memory_map
+
+    def _rrf_fusion(
+        self,
+        query_embedding: List[float],
+        memories: List[dict[str, JSONValue]],
+        candidates: Dict[str, Tuple[int, dict[str, JSONValue]]],
+        keyword_ranked: List[Tuple[str, float]],
+        pool: int,
+        semantic_weight: float,
+        rrf_k: int,
+    ) -> Tuple[Dict[str, float], Dict[str, dict[str, JSONValue]]]:
+        """
+        Weighted reciprocal-rank fusion of the top ``pool`` candidates per signal.
+
+        Returns:
+            (fused scores, memory records) for every memory in either list
+        """
+        keyword_weight = 1.0 - semantic_weight
+        fused: Dict[str, float] = {}
+        memory_map: Dict[str, dict[str, JSONValue]] = {}
+
+        for rank, result in enumerate(self._rank_semantic(query_embedding, memories, pool)):
+            memory_key = result.memory.get("namespaced_key", result.memory.get("key", ""))
+            fused[memory_key] = fused.get(memory_key, 0.0) + semantic_weight / (rrf_k + rank + 1)
+            memory_map[memory_key] = result.memory
 
-        # Sort by combined score (descending)
-        final_results.sort(key=lambda x: x.similarity_score, reverse=True)
+        for rank, (memory_key, _) in enumerate(keyword_ranked[:pool]):
+            fused[memory_key] = fused.get(memory_key, 0.0) + keyword_weight / (rrf_k + rank + 1)
+            memory_map.setdefault(memory_key, candidates[memory_key][1])
 
-        return final_results[:top_k]
+        return fused, memory_map
 
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -428,9 +1079,11 @@ class VectorStore:
         Args:
             memory_key: Memory key to remove
         """
+        self._pending_texts.pop(memory_key, None)
         self._embeddings.pop(memory_key, None)
         self._memory_texts.pop(memory_key, None)
         self._memory_records.pop(memory_key, None)
+        self._keyword_index.remove(memory_key)
 
     def get_stats(self) -> Dict[str, JSONValue]:
         """
@@ -439,12 +1092,19 @@ class VectorStore:
         Returns:
             Dictionary with store statistics
         """
+        self.flush()
+        self._emit_cache_telemetry()
         return {
             "total_memories": len(self._memory_texts),
             "memories_with_embeddings": len(self._embeddings),
             "embedding_provider": self._embedding_provider,
             "embedding_available": self._embedding_function is not None,
             "has_embeddings": self._embedding_function is not None,
+            "index_backend": self._index_backend,
+            "embedding_calls": self._embedding_calls,
+            "keyword_terms": self._keyword_index.vocabulary_size,
+            "index_trained": isinstance(self._embeddings, IVFIndex) and self._embeddings.is_trained,
+            "embedding_cache": self._embedding_cache.get_stats() if self._embedding_cache else None,
             "last_updated": datetime.now().isoformat(),
         }
 
@@ -510,7 +1170,7 @@ class EnhancedSwarmMemoryStore:
         memories = [record.to_dict() for record in memories_result.records]
 
         if include_shared:
-            shared_memories = list(self.swarm_store._shared_knowledge.values())
+            shared_memories = self.swarm_store.get_shared_memories()
             # Filter out memories from the same agent
             shared_memories = [m for m in shared_memories if m["agent_id"] != agent_id]
             memories.extend(shared_memories)
@@ -1,18 +1,292 @@
 """
 SimpleTelemetry: Unified telemetry system with automatic retention.
 Consolidates multiple telemetry systems into a single JSONL sink.
+
+The global instance writes through a BufferedJSONLSink: one long-lived file
+handle per run, fed by a bounded in-memory queue that a background thread
+flushes by size and age, and flushed at exit and on SIGTERM/SIGHUP.
 """
 
 import os
+import sys
 import json
 import glob
+import atexit
 import shutil
+import signal
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Callable, Dict, IO, List, Optional
 from shared.type_definitions.json import JSONValue
 from shared.models.telemetry import TelemetryEvent, EventType, EventSeverity
 from pathlib import Path
 
+# Environment overrides for the global instance's sink
+BUFFERED_ENV = "AGENCY_TELEMETRY_BUFFERED"
+OVERFLOW_ENV = "AGENCY_TELEMETRY_OVERFLOW"
+QUEUE_SIZE_ENV = "AGENCY_TELEMETRY_QUEUE_SIZE"
+FLUSH_INTERVAL_ENV = "AGENCY_TELEMETRY_FLUSH_INTERVAL"
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+# Sinks still open, flushed at exit and on fatal signals
+_open_sinks: "weakref.WeakSet[BufferedJSONLSink]" = weakref.WeakSet()
+_shutdown_hooks_installed = False
+_FATAL_SIGNALS = tuple(getattr(signal, name) for name in ("SIGTERM", "SIGHUP") if hasattr(signal, name))
+
+
+def flush_all_sinks(timeout: Optional[float] = 5.0) -> None:
+    """Flush every open BufferedJSONLSink."""
+    for sink in list(_open_sinks):
+        sink.flush(timeout)
+
+
+def _close_all_sinks() -> None:
+    for sink in list(_open_sinks):
+        sink.close(timeout=5.0)
+
+
+def _on_fatal_signal(signum: int, frame: Any, previous: Any) -> None:
+    flush_all_sinks()
+    if callable(previous):
+        previous(signum, frame)
+    elif previous != signal.SIG_IGN:
+        # Re-deliver with the default action (normally terminating)
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+
+def _install_shutdown_hooks() -> None:
+    """Flush sinks at interpreter exit and before fatal signals terminate the process."""
+    global _shutdown_hooks_installed
+    if _shutdown_hooks_installed:
+        return
+    _shutdown_hooks_installed = True
+    atexit.register(_close_all_sinks)
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for signum in _FATAL_SIGNALS:
+        try:
+            previous = signal.getsignal(signum)
+            signal.signal(signum, lambda n, f, previous=previous: _on_fatal_signal(n, f, previous))
+        except (ValueError, OSError):
+            pass
+
+
+class BufferedJSONLSink:
+    """
+    Append-only JSONL file written by a background flusher thread.
+
+    write() only queues the encoded line; the flusher appends queued lines
+    through a single long-lived handle once flush_bytes are pending or the
+    oldest pending line is flush_interval seconds old. When max_queue lines
+    are pending, write() either drops the line (counted in stats()) or
+    blocks until the flusher catches up, as chosen by overflow. The file is
+    created with 0600 permissions and reopened if it disappears mid-run.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        is_safe_path: Optional[Callable[[Path], bool]] = None,
+        max_queue: int = 10_000,
+        flush_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        overflow: str = "drop",
+    ):
+        """
+        Initialize BufferedJSONLSink.
+
+        Args:
+            path: JSONL file to append to
+            is_safe_path: Check the file's directory must pass before it is opened
+            max_queue: Pending lines before the overflow policy applies
+            flush_bytes: Pending bytes that trigger a flush
+            flush_interval: Most seconds a line waits before being flushed
+            overflow: "drop" or "block"
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.path = path
+        self.is_safe_path = is_safe_path
+        self.max_queue = max(1, max_queue)
+        self.flush_bytes = max(1, flush_bytes)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._pending_since: Optional[float] = None
+        # Lines accepted so far, and how many of them have been handled
+        self._accepted = 0
+        self._handled = 0
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._file: Optional[IO[str]] = None
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._flushes = 0
+        self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+        self._thread.start()
+        _open_sinks.add(self)
+        _install_shutdown_hooks()
+
+    def write(self, line: str) -> bool:
+        """
+        Queue one encoded line (including its newline).
+
+        Returns:
+            False if the line was dropped
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._pending) >= self.max_queue:
+                if self.overflow == "drop":
+                    self._dropped += 1
+                    return False
+                self._flush_requested = True
+                self._condition.notify_all()
+                while len(self._pending) >= self.max_queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return False
+            first = not self._pending
+            if first:
+                self._pending_since = time.monotonic()
+            self._pending.append(line)
+            self._pending_bytes += len(line)
+            self._accepted += 1
+            # Wake the flusher to start the age timer, or to flush a full buffer
+            if first or self._pending_bytes >= self.flush_bytes:
+                self._condition.notify_all()
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write out every line queued before this call.
+
+        Args:
+            timeout: Most seconds to wait (None waits indefinitely)
+
+        Returns:
+            True unless the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            target = self._accepted
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._handled < target and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush and stop the flusher thread; later writes are dropped."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        _open_sinks.discard(self)
+
+    def stats(self) -> Dict[str, JSONValue]:
+        """Counters for written, dropped and failed lines, flushes and queue depth."""
+        with self._condition:
+            return {
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "flushes": self._flushes,
+                "pending": len(self._pending),
+                "overflow": self.overflow,
+            }
+
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        if self._flush_requested or self._closed or self._pending_bytes >= self.flush_bytes:
+            return True
+        return self._pending_since is not None and time.monotonic() - self._pending_since >= self.flush_interval
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._due() and not self._closed:
+                    if not self._pending:
+                        self._flush_requested = False
+                        self._condition.wait()
+                    else:
+                        age = time.monotonic() - (self._pending_since or time.monotonic())
+                        self._condition.wait(max(0.0, self.flush_interval - age))
+                lines, self._pending = self._pending, []
+                self._pending_bytes = 0
+                self._pending_since = None
+                self._flush_requested = False
+                # Writers blocked on a full queue can continue
+                self._condition.notify_all()
+            if lines:
+                written = self._write_lines(lines)
+                with self._condition:
+                    self._written += written
+                    self._failed += len(lines) - written
+                    self._handled += len(lines)
+                    self._flushes += 1
+                    self._condition.notify_all()
+                continue
+            with self._condition:
+                if self._closed and not self._pending:
+                    self._close_file()
+                    self._condition.notify_all()
+                    return
+
+    def _write_lines(self, lines: List[str]) -> int:
+        try:
+            handle = self._open()
+            handle.write("".join(lines))
+            handle.flush()
+            return len(lines)
+        except Exception as e:
+            self._close_file()
+            print(f"Telemetry error: {e}", file=sys.stderr)
+            return 0
+
+    def _open(self) -> IO[str]:
+        # Reopen if the file was deleted or rotated away mid-run
+        if self._file is not None and not self.path.exists():
+            self._close_file()
+        if self._file is None:
+            parent = self.path.parent
+            if self.is_safe_path is not None and not self.is_safe_path(parent):
+                raise PermissionError(f"Unsafe telemetry path outside project root: {parent}")
+            parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(self.path), os.O_CREAT | os.O_APPEND | os.O_WRONLY, 0o600)
+            try:
+                self._file = os.fdopen(fd, "a", encoding="utf-8")
+            except Exception:
+                os.close(fd)
+                raise
+            try:
+                os.chmod(self.path, 0o600)
+            except Exception:
+                pass
+        return self._file
+
+    def _close_file(self) -> None:
+        handle, self._file = self._file, None
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception:
+                pass
+
 
 class SimpleTelemetry:
     """
@@ -20,12 +294,24 @@ class SimpleTelemetry:
     Single source of truth for all telemetry events.
     """
 
-    def __init__(self, retention_runs: int = 10):
+    def __init__(
+        self,
+        retention_runs: int = 10,
+        buffered: bool = False,
+        overflow: str = "drop",
+        max_queue: int = 10_000,
+        flush_interval: float = 1.0,
+    ):
         """
         Initialize telemetry with configurable retention policy.
 
         Args:
             retention_runs: Number of recent runs to keep (default: 10)
+            buffered: Write through a BufferedJSONLSink instead of opening the
+                run file for every event
+            overflow: What a full sink queue does to new events: "drop" or "block"
+            max_queue: Events the sink queues before overflow applies
+            flush_interval: Most seconds an event waits in the sink
         """
         # Anchor all paths under the current working directory (repo root during tests)
         self.allowed_root = Path.cwd().resolve()
@@ -41,6 +327,15 @@ class SimpleTelemetry:
         self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.current_file = self.events_dir / f"run_{self.run_id}.jsonl"
 
+        self.buffered = buffered
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.overflow = overflow
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self._sink: Optional[BufferedJSONLSink] = None
+        self._sink_lock = threading.Lock()
+
         # Apply retention on initialization
         self._apply_retention()
 
@@ -96,6 +391,13 @@ class SimpleTelemetry:
             "data": data or {}
         }
 
+        if self.buffered:
+            try:
+                self._get_sink().write(json.dumps(entry) + "\n")
+            except Exception as e:
+                print(f"Telemetry error: {e}", file=sys.stderr)
+            return
+
         try:
             # Recreate directory on-demand (covers mid-run deletions)
             parent = self.current_file.parent
@@ -123,9 +425,50 @@ class SimpleTelemetry:
                 raise
         except Exception as e:
             # Fallback to stderr if file logging fails
-            import sys
             print(f"Telemetry error: {e}", file=sys.stderr)
 
+    def _get_sink(self) -> BufferedJSONLSink:
+        """Sink for current_file, replacing the sink if current_file was changed."""
+        sink = self._sink
+        if sink is not None and sink.path == self.current_file:
+            return sink
+        with self._sink_lock:
+            if self._sink is None or self._sink.path != self.current_file:
+                if self._sink is not None:
+                    self._sink.close()
+                self._sink = BufferedJSONLSink(
+                    self.current_file,
+                    is_safe_path=self._is_safe_path,
+                    max_queue=self.max_queue,
+                    flush_interval=self.flush_interval,
+                    overflow=self.overflow,
+                )
+            return self._sink
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write out buffered events.
+
+        Args:
+            timeout: Most seconds to wait (None waits indefinitely)
+
+        Returns:
+            True unless the timeout expired first
+        """
+        sink = self._sink
+        return sink.flush(timeout) if sink is not None else True
+
+    def close(self) -> None:
+        """Flush buffered events and release the run file handle."""
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink.close()
+
+    def sink_stats(self) -> Dict[str, JSONValue]:
+        """Written, dropped and pending event counts of the buffered sink."""
+        sink = self._sink
+        return sink.stats() if sink is not None else {"buffered": self.buffered}
+
     def query(self,
               event_filter: Optional[str] = None,
               since: Optional[datetime] = None,
@@ -142,6 +485,7 @@ class SimpleTelemetry:
             List of matching events
         """
         events = []
+        self.flush()
 
         # Read from current and recent files
         files = sorted(self.events_dir.glob("run_*.jsonl"), reverse=True)[:3]
@@ -351,12 +695,21 @@ def get_telemetry() -> SimpleTelemetry:
     """
     Get the global telemetry instance (singleton pattern).
 
+    The instance is buffered unless AGENCY_TELEMETRY_BUFFERED=0; the
+    AGENCY_TELEMETRY_OVERFLOW ("drop" or "block"), AGENCY_TELEMETRY_QUEUE_SIZE
+    and AGENCY_TELEMETRY_FLUSH_INTERVAL variables tune its sink.
+
     Returns:
         SimpleTelemetry: The global telemetry instance
     """
     global _telemetry_instance
     if _telemetry_instance is None:
-        _telemetry_instance = SimpleTelemetry()
+        _telemetry_instance = SimpleTelemetry(
+            buffered=os.getenv(BUFFERED_ENV, "1") != "0",
+            overflow=os.getenv(OVERFLOW_ENV, "drop"),
+            max_queue=int(os.getenv(QUEUE_SIZE_ENV, "10000")),
+            flush_interval=float(os.getenv(FLUSH_INTERVAL_ENV, "1.0")),
+        )
     return _telemetry_instance
 
 
@@ -13,6 +13,8 @@ from shared.type_definitions.json import JSONValue
 import logging
 from collections import defaultdict
 
+from agency_memory.session_transcript import is_transcript_file, read_transcript
+
 
 def _safe_get_str(data: JSONValue, key: str, default: str = "") -> str:
     """Safely extract string from JSONValue dict with type checking."""
@@ -247,7 +249,7 @@ class CrossSessionLearner(BaseTool):  # type: ignore[misc]
             cutoff_date = datetime.now() - timedelta(days=30)  # Last 30 days
 
             for filename in os.listdir(sessions_dir):
-                if filename.endswith('.md'):
+                if is_transcript_file(filename):
                     filepath = os.path.join(sessions_dir, filename)
                     file_mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
 
@@ -292,8 +294,7 @@ class CrossSessionLearner(BaseTool):  # type: ignore[misc]
         learnings: List[Dict[str, JSONValue]] = []
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = read_transcript(filepath)
 
             # Look for learning indicators
             lines = content.split('\n')
@@ -5,7 +5,7 @@ from agency_swarm.tools import BaseTool
 from pydantic import Field
 from agency_memory import VectorStore
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from shared.type_definitions.json import JSONValue
 from datetime import datetime
 from learning_agent.json_utils import (
@@ -64,11 +64,15 @@ class StoreKnowledge(BaseTool):  # type: ignore[misc]
                 # Consolidated format with multiple learnings
                 learning_objects_raw = safe_get_list(learning_data, "learning_objects")
                 learning_objects = [ensure_dict(obj) for obj in learning_objects_raw]
-                stored_count = 0
+                batch: List[Tuple[str, Dict[str, JSONValue]]] = []
 
                 for learning_obj in learning_objects:
-                    if self._store_learning_object(learning_obj, vector_store):
-                        stored_count += 1
+                    try:
+                        batch.append(self._build_learning_memory(learning_obj))
+                    except Exception as e:
+                        print(f"Error storing learning object: {e}")
+
+                stored_count = vector_store.add_memories(batch)
 
                 result: Dict[str, JSONValue] = {
                     "status": "success",
@@ -110,21 +114,21 @@ class StoreKnowledge(BaseTool):  # type: ignore[misc]
                 error_result: Dict[str, JSONValue] = {"status": "error", "message": "No learning objects found"}
                 return json.dumps(error_result, indent=2)
 
-            stored_count = 0
             failed_count = 0
             stored_ids: List[JSONValue] = []
+            batch: List[Tuple[str, Dict[str, JSONValue]]] = []
 
             for learning_obj in learning_objects:
                 try:
-                    if self._store_learning_object(learning_obj, vector_store):
-                        stored_count += 1
-                        stored_ids.append(safe_get_str(learning_obj, "learning_id", "unknown"))
-                    else:
-                        failed_count += 1
+                    batch.append(self._build_learning_memory(learning_obj))
+                    stored_ids.append(safe_get_str(learning_obj, "learning_id", "unknown"))
                 except Exception as e:
                     failed_count += 1
                     print(f"Failed to store learning {safe_get_str(learning_obj, 'learning_id', 'unknown')}: {e}")
 
+            # Embed the whole batch with grouped embedding calls
+            stored_count = vector_store.add_memories(batch)
+
             batch_result: Dict[str, JSONValue] = {
                 "status": "success" if stored_count > 0 else "partial_failure",
                 "message": f"Batch storage completed: {stored_count} stored, {failed_count} failed",
@@ -195,37 +199,7 @@ class StoreKnowledge(BaseTool):  # type: ignore[misc]
     def _store_learning_object(self, learning_obj: Dict[str, JSONValue], vector_store: VectorStore, update_mode: bool = False) -> bool:
         """Store a single learning object in the vector store."""
         try:
-            # Generate embedding text from key fields
-            embedding_text = self._create_embedding_text(learning_obj)
-
-            # Prepare metadata
-            metadata_obj = safe_get_dict(learning_obj, "metadata")
-            metadata: Dict[str, JSONValue] = {
-                "learning_id": safe_get_str(learning_obj, "learning_id", "unknown"),
-                "type": safe_get_str(learning_obj, "type", "unknown"),
-                "category": safe_get_str(learning_obj, "category", "general"),
-                "confidence": safe_get_float(learning_obj, "confidence", 0.5),
-                "keywords": safe_get_list(learning_obj, "keywords"),
-                "created_timestamp": safe_get_str(metadata_obj, "created_timestamp", datetime.now().isoformat()),
-                "stored_timestamp": datetime.now().isoformat(),
-                "source_session": safe_get_str(metadata_obj, "source_session", "unknown"),
-                "update_mode": update_mode,
-                "namespace": self.namespace,
-            }
-
-            memory_key = safe_get_str(learning_obj, "learning_id", f"learning_{datetime.now().timestamp()}")
-            namespaced_key = f"{self.namespace}:{memory_key}"
-            memory_content: Dict[str, JSONValue] = {
-                "key": memory_key,
-                "namespaced_key": namespaced_key,
-                "content": embedding_text,
-                "title": safe_get_str(learning_obj, "title", "Untitled Learning"),
-                "description": safe_get_str(learning_obj, "description"),
-                "actionable_insight": safe_get_str(learning_obj, "actionable_insight"),
-                "metadata": metadata,
-                "full_learning_object": learning_obj
-            }
-
+            namespaced_key, memory_content = self._build_learning_memory(learning_obj, update_mode)
             vector_store.add_memory(namespaced_key, memory_content)
 
             return True
@@ -234,6 +208,41 @@ class StoreKnowledge(BaseTool):  # type: ignore[misc]
             print(f"Error storing learning object: {e}")
             return False
 
+    def _build_learning_memory(self, learning_obj: Dict[str, JSONValue], update_mode: bool = False) -> Tuple[str, Dict[str, JSONValue]]:
+        """Build the (namespaced_key, memory record) pair for a learning object."""
+        # Generate embedding text from key fields
+        embedding_text = self._create_embedding_text(learning_obj)
+
+        # Prepare metadata
+        metadata_obj = safe_get_dict(learning_obj, "metadata")
+        metadata: Dict[str, JSONValue] = {
+            "learning_id": safe_get_str(learning_obj, "learning_id", "unknown"),
+            "type": safe_get_str(learning_obj, "type", "unknown"),
+            "category": safe_get_str(learning_obj, "category", "general"),
+            "confidence": safe_get_float(learning_obj, "confidence", 0.5),
+            "keywords": safe_get_list(learning_obj, "keywords"),
+            "created_timestamp": safe_get_str(metadata_obj, "created_timestamp", datetime.now().isoformat()),
+            "stored_timestamp": datetime.now().isoformat(),
+            "source_session": safe_get_str(metadata_obj, "source_session", "unknown"),
+            "update_mode": update_mode,
+            "namespace": self.namespace,
+        }
+
+        memory_key = safe_get_str(learning_obj, "learning_id", f"learning_{datetime.now().timestamp()}")
+        namespaced_key = f"{self.namespace}:{memory_key}"
+        memory_content: Dict[str, JSONValue] = {
+            "key": memory_key,
+            "namespaced_key": namespaced_key,
+            "content": embedding_text,
+            "title": safe_get_str(learning_obj, "title", "Untitled Learning"),
+            "description": safe_get_str(learning_obj, "description"),
+            "actionable_insight": safe_get_str(learning_obj, "actionable_insight"),
+            "metadata": metadata,
+            "full_learning_object": learning_obj
+        }
+
+        return namespaced_key, memory_content
+
     def _create_embedding_text(self, learning_obj: Dict[str, JSONValue]) -> str:
         """Create text for embedding generation from learning object."""
         # Combine key textual fields for embedding
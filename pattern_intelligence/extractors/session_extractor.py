@@ -17,6 +17,8 @@ from shared.type_definitions.json import JSONValue
 from datetime import datetime, timedelta
 import logging
 
+from agency_memory.session_transcript import is_transcript_file, read_transcript
+
 from .base_extractor import BasePatternExtractor
 from ..coding_pattern import CodingPattern, ProblemContext, SolutionApproach, EffectivenessMetric
 
@@ -81,7 +83,7 @@ class SessionPatternExtractor(BasePatternExtractor):
             cutoff_date = datetime.now() - timedelta(days=days_back)
 
             for filename in os.listdir(self.sessions_dir):
-                if filename.endswith('.md'):
+                if is_transcript_file(filename):
                     file_path = os.path.join(self.sessions_dir, filename)
 
                     # Check file modification time
@@ -379,9 +381,8 @@ class SessionPatternExtractor(BasePatternExtractor):
         }
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                session_data['content'] = content
+            content = read_transcript(file_path)
+            session_data['content'] = content
 
             # Extract tools used
             tool_patterns = [
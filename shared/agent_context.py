@@ -6,9 +6,12 @@ Provides lightweight context management for injecting shared services
 like Memory without using global state.
 """
 
-from typing import Optional, Any, Dict
+from datetime import datetime
+from typing import Optional, Any, Dict, Iterator
 from shared.type_definitions.json import JSONValue
+from shared.models.memory import MemoryQuery
 from agency_memory import Memory
+from agency_memory.session_transcript import SessionTranscriptWriter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,8 @@ class AgentContext:
         self.memory = memory or Memory()
         self.session_id = session_id or self._generate_session_id()
         self._metadata: Dict[str, JSONValue] = {}
+        # Streaming transcript that store_memory() appends to, if attached
+        self.transcript: Optional[SessionTranscriptWriter] = None
 
         logger.debug(f"AgentContext initialized with session_id: {self.session_id}")
 
@@ -49,7 +54,9 @@ class AgentContext:
         """Get metadata from this context."""
         return self._metadata.get(key, default)
 
-    def store_memory(self, key: str, content: Any, tags: list[str]) -> None:
+    def store_memory(
+        self, key: str, content: Any, tags: list[str], ttl_seconds: Optional[int] = None
+    ) -> None:
         """
         Store a memory record with automatic session tagging.
 
@@ -57,12 +64,38 @@ class AgentContext:
             key: Unique identifier for the memory
             content: Content to store
             tags: Tags for categorization (session tag added automatically)
+            ttl_seconds: Expire the memory this many seconds after storing it
         """
         # Always include session tag
         all_tags = tags + [f"session:{self.session_id}"]
-        self.memory.store(key, content, all_tags)
+        self.memory.store(key, content, all_tags, ttl_seconds=ttl_seconds)
+        if self.transcript is not None:
+            try:
+                self.transcript.append(
+                    {"key": key, "content": content, "tags": all_tags, "timestamp": datetime.now().isoformat()}
+                )
+            except OSError as e:
+                logger.warning(f"Failed to append to session transcript: {e}")
+
+    def attach_transcript(
+        self, directory: Optional[str] = None, compress: bool = False
+    ) -> SessionTranscriptWriter:
+        """
+        Stream memories stored from now on into a session transcript.
+
+        Args:
+            directory: Transcript directory (default: AGENCY_SESSIONS_DIR or logs/sessions)
+            compress: Gzip the transcript
 
-    def search_memories(self, tags: list[str], include_session: bool = True) -> list[dict[str, JSONValue]]:
+        Returns:
+            The attached writer (flush() it to persist buffered entries)
+        """
+        self.transcript = SessionTranscriptWriter(self.session_id, directory=directory, compress=compress)
+        return self.transcript
+
+    def search_memories(
+        self, tags: list[str], include_session: bool = True, limit: Optional[int] = None
+    ) -> list[dict[str, JSONValue]]:
         """
         Search memories with optional session filtering.
 
@@ -71,25 +104,40 @@ class AgentContext:
         - Return memories that contain ALL requested tags (conjunctive), not any-of.
         - Additionally, when searching for ["tool"] specifically, exclude error-tagged
           memories so that tool-only queries do not return error events.
+        - Results are newest first; limit keeps only the newest N.
+
+        The filters are pushed down to the memory store (see query_memories),
+        so the session is never materialized in full.
         """
-        # Gather candidate set (session-scoped)
-        session_tag = f"session:{self.session_id}"
-        candidates = self.memory.search([session_tag]) if include_session else self.memory.get_all()
+        if limit is not None and limit <= 0:
+            return []
+        return list(self.query_memories(self.build_memory_query(tags, include_session, limit)))
+
+    def build_memory_query(
+        self, tags: list[str], include_session: bool = True, limit: Optional[int] = None
+    ) -> MemoryQuery:
+        """Translate search_memories arguments into a MemoryQuery."""
+        all_tags = list(tags or [])
+        if include_session:
+            all_tags.append(f"session:{self.session_id}")
+        # Exclude error-tagged entries for tool-only queries
+        exclude_tags = ["error"] if set(tags or []) == {"tool"} else []
+        return MemoryQuery(all_tags=all_tags, exclude_tags=exclude_tags, limit=limit)
 
-        req = set(tags or [])
-        results: list[dict[str, JSONValue]] = []
-        for mem in candidates:
-            mem_tags = set(mem.get("tags", []))
-            if req.issubset(mem_tags):
-                results.append(mem)
+    def query_memories(self, query: MemoryQuery) -> Iterator[dict[str, JSONValue]]:
+        """
+        Stream memories matching a structured query, newest first.
 
-        # Exclude error-tagged entries for tool-only queries
-        if req == {"tool"}:
-            results = [m for m in results if "error" not in m.get("tags", [])]
+        Use MemoryQuery.next_page() on the last record of a page to fetch the
+        next one.
 
-        # Keep newest first (they already come roughly sorted, but ensure)
-        results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        return results
+        Args:
+            query: Tag (AND/OR/exclude), time-range, agent, limit and cursor filters
+
+        Returns:
+            Iterator over matching memories
+        """
+        return self.memory.query(query)
 
     def get_session_memories(self) -> list[dict[str, JSONValue]]:
         """Get all memories for this session."""
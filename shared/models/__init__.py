@@ -8,6 +8,7 @@ from .memory import (
     MemoryPriority,
     MemoryMetadata,
     MemorySearchResult,
+    MemoryQuery,
 )
 from .learning import (
     LearningConsolidation,
@@ -77,6 +78,7 @@ __all__ = [
     "MemoryPriority",
     "MemoryMetadata",
     "MemorySearchResult",
+    "MemoryQuery",
     # Learning models
     "LearningConsolidation",
     "LearningInsight",
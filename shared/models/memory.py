@@ -3,9 +3,10 @@ Memory-related Pydantic models for Agency OS.
 Replaces Dict[str, Any] with concrete typed models.
 """
 
+import json
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Union
 from shared.type_definitions.json import JSONValue
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
@@ -108,4 +109,64 @@ class MemorySearchResult(BaseModel):
         return [
             r for r in self.records
             if priority_order[r.priority] >= min_level
-        ]
\ No newline at end of file
+        ]
+
+
+class MemoryQuery(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    """Structured memory query that stores can execute natively.
+
+    Results are ordered newest first. ``cursor`` resumes a previous query
+    strictly after the record it was created from (see ``next_page``).
+    """
+    all_tags: List[str] = Field(default_factory=list, description="Records must carry every one of these tags")
+    any_tags: List[str] = Field(default_factory=list, description="Records must carry at least one of these tags")
+    exclude_tags: List[str] = Field(default_factory=list, description="Records carrying any of these tags are skipped")
+    since: Optional[datetime] = Field(None, description="Only records at or after this time")
+    until: Optional[datetime] = Field(None, description="Only records at or before this time")
+    agent_id: Optional[str] = Field(None, description="Only records owned by this agent")
+    limit: Optional[int] = Field(None, gt=0, description="Maximum number of records")
+    cursor: Optional[str] = Field(None, description="Opaque position from next_page()")
+
+    @staticmethod
+    def encode_cursor(record: Union[MemoryRecord, Dict[str, JSONValue]]) -> str:
+        """Cursor positioned right after record (a MemoryRecord or its dict form)."""
+        if isinstance(record, MemoryRecord):
+            return json.dumps([record.timestamp.isoformat(), record.key])
+        timestamp = datetime.fromisoformat(str(record["timestamp"]))
+        return json.dumps([timestamp.isoformat(), str(record["key"])])
+
+    def decode_cursor(self) -> Optional[Tuple[datetime, str]]:
+        """Return (timestamp, key) of the cursor record, or None."""
+        if not self.cursor:
+            return None
+        try:
+            timestamp, key = json.loads(self.cursor)
+            return datetime.fromisoformat(timestamp), str(key)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid memory query cursor: {self.cursor!r}") from e
+
+    def next_page(self, last_record: Union[MemoryRecord, Dict[str, JSONValue]]) -> "MemoryQuery":
+        """Same query resuming after last_record."""
+        return self.model_copy(update={"cursor": self.encode_cursor(last_record)})
+
+    def matches(self, record: MemoryRecord) -> bool:
+        """Check the tag, time and agent filters (not cursor/limit) against record."""
+        tags = set(record.tags)
+        if self.all_tags and not set(self.all_tags).issubset(tags):
+            return False
+        if self.any_tags and not tags.intersection(self.any_tags):
+            return False
+        if self.exclude_tags and tags.intersection(self.exclude_tags):
+            return False
+        if self.since is not None and record.timestamp < self.since:
+            return False
+        if self.until is not None and record.timestamp > self.until:
+            return False
+        if self.agent_id is not None and record.metadata.agent_id != self.agent_id:
+            return False
+        return True
+
+    def to_search_query(self) -> Dict[str, JSONValue]:
+        """JSON form for MemorySearchResult.search_query."""
+        return self.model_dump(mode="json", exclude_none=True)
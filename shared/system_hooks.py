@@ -89,15 +89,38 @@ class MemoryIntegrationHook(AgentHooks):
     - Session transcripts
     """
 
-    def __init__(self, agent_context: Optional[AgentContext] = None):
+    def __init__(
+        self,
+        agent_context: Optional[AgentContext] = None,
+        tool_memory_ttl_seconds: Optional[int] = None,
+        transcript_dir: Optional[str] = None,
+        compress_transcript: bool = False,
+        stream_transcript: bool = False,
+    ):
         """
         Initialize with optional agent context.
 
         Args:
             agent_context: AgentContext instance. Creates default if None.
+            tool_memory_ttl_seconds: Expire tool call/result memories after this
+                many seconds (kept for the whole session if None)
+            transcript_dir: Session transcript directory (default:
+                AGENCY_SESSIONS_DIR or logs/sessions)
+            compress_transcript: Gzip the session transcript
+            stream_transcript: Append memories to the transcript as they are
+                stored instead of writing it when the agent finishes
         """
         self.agent_context = agent_context or create_agent_context()
+        self.tool_memory_ttl_seconds = tool_memory_ttl_seconds
+        self.transcript_dir = transcript_dir
+        self.compress_transcript = compress_transcript
         self.session_start_time: Optional[str] = None
+        # A streamed transcript is flushed after every run step, so on_end
+        # only has to flush the last one
+        if stream_transcript and getattr(self.agent_context, "transcript", None) is None and hasattr(
+            self.agent_context, "attach_transcript"
+        ):
+            self.agent_context.attach_transcript(transcript_dir, compress_transcript)
         logger.debug(f"MemoryIntegrationHook initialized for session: {self.agent_context.session_id}")
 
     async def on_start(self, context: RunContextWrapper, agent) -> None:
@@ -116,6 +139,7 @@ class MemoryIntegrationHook(AgentHooks):
             key = f"session_start_{timestamp}"
             self.agent_context.store_memory(key, metadata, ["session", "start"])
             logger.debug(f"Stored session start memory: {key}")
+            self._flush_transcript()
 
         except Exception as e:
             logger.warning(f"Failed to store session start memory: {e}")
@@ -177,6 +201,7 @@ class MemoryIntegrationHook(AgentHooks):
             key = f"handoff_{timestamp}"
             self.agent_context.store_memory(key, metadata, ["handoff", "agent_transfer"])
             logger.debug(f"Stored handoff memory: {key}")
+            self._flush_transcript()
 
         except Exception as e:
             logger.warning(f"Failed to store handoff memory: {e}")
@@ -195,8 +220,11 @@ class MemoryIntegrationHook(AgentHooks):
             }
 
             key = f"tool_call_{tool_name}_{timestamp}"
-            self.agent_context.store_memory(key, metadata, ["tool", tool_name, "call"])
+            self.agent_context.store_memory(
+                key, metadata, ["tool", tool_name, "call"], ttl_seconds=self.tool_memory_ttl_seconds
+            )
             logger.debug(f"Stored tool start memory: {key}")
+            self._flush_transcript()
 
         except Exception as e:
             logger.warning(f"Failed to store tool start memory: {e}")
@@ -219,8 +247,11 @@ class MemoryIntegrationHook(AgentHooks):
             }
 
             key = f"tool_result_{tool_name}_{timestamp}"
-            self.agent_context.store_memory(key, metadata, ["tool", tool_name, "result"])
+            self.agent_context.store_memory(
+                key, metadata, ["tool", tool_name, "result"], ttl_seconds=self.tool_memory_ttl_seconds
+            )
             logger.debug(f"Stored tool result memory: {key}")
+            self._flush_transcript()
 
         except Exception as e:
             logger.warning(f"Failed to store tool result memory: {e}")
@@ -236,6 +267,7 @@ class MemoryIntegrationHook(AgentHooks):
 
                 error_key = f"tool_error_{tool_name}_{timestamp}"
                 self.agent_context.store_memory(error_key, error_metadata, ["error", tool_name])
+                self._flush_transcript()
 
             except Exception as nested_e:
                 logger.error(f"Failed to store error memory: {nested_e}")
@@ -308,22 +340,39 @@ class MemoryIntegrationHook(AgentHooks):
         except Exception:
             return None
 
+    def _flush_transcript(self) -> None:
+        """Persist the streamed transcript at the end of a run step."""
+        transcript = getattr(self.agent_context, "transcript", None)
+        if transcript is None:
+            return
+        try:
+            transcript.flush()
+        except OSError as e:
+            logger.warning(f"Failed to flush session transcript: {e}")
+
     async def _generate_session_transcript(self) -> None:
-        """Generate and save session transcript."""
+        """Flush the streamed session transcript, or write one from the session memories."""
         try:
-            # Get all session memories
+            transcript = getattr(self.agent_context, "transcript", None)
+            if transcript is not None and transcript.count:
+                transcript.flush()
+                logger.info(f"Session transcript updated: {transcript.path}")
+                return
+
+            # Nothing streamed (e.g. memories stored before the transcript
+            # was attached): build it from the session memories
             session_memories = self.agent_context.get_session_memories()
 
             if not session_memories:
                 logger.debug("No session memories to create transcript")
                 return
 
-            # Ensure logs/sessions directory exists
-            transcript_dir = "/Users/am/Code/Agency/logs/sessions"
-            os.makedirs(transcript_dir, exist_ok=True)
-
-            # Create transcript
-            transcript_path = create_session_transcript(session_memories, self.agent_context.session_id)
+            transcript_path = create_session_transcript(
+                session_memories,
+                self.agent_context.session_id,
+                directory=self.transcript_dir,
+                compress=self.compress_transcript,
+            )
             logger.info(f"Session transcript created: {transcript_path}")
 
         except Exception as e:
@@ -671,9 +720,21 @@ def filter_duplicates(context) -> None:
 
 
 # Factory functions to create hooks
-def create_memory_integration_hook(agent_context: Optional[AgentContext] = None):
+def create_memory_integration_hook(
+    agent_context: Optional[AgentContext] = None,
+    tool_memory_ttl_seconds: Optional[int] = None,
+    transcript_dir: Optional[str] = None,
+    compress_transcript: bool = False,
+    stream_transcript: bool = False,
+):
     """Create and return a MemoryIntegrationHook instance."""
-    return MemoryIntegrationHook(agent_context=agent_context)
+    return MemoryIntegrationHook(
+        agent_context=agent_context,
+        tool_memory_ttl_seconds=tool_memory_ttl_seconds,
+        transcript_dir=transcript_dir,
+        compress_transcript=compress_transcript,
+        stream_transcript=stream_transcript,
+    )
 
 
 def create_system_reminder_hook():
@@ -1,7 +1,9 @@
+import logging
 import os
 import sys
 import time
 from pathlib import Path
+from typing import Callable, List, Tuple
 
 import pytest
 from dotenv import load_dotenv
@@ -18,6 +20,87 @@ load_dotenv()
 os.makedirs("logs", exist_ok=True)
 
 
+# Benchmarks are marked benchmark(argname, sizes, full=[larger sizes]) and
+# are skipped unless --benchmarks asks for them
+BENCHMARK_SCALES = ("quick", "full")
+_benchmark_results = pytest.StashKey[List[Tuple[str, str]]]()
+benchmark_logger = logging.getLogger("benchmarks")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmarks",
+        choices=BENCHMARK_SCALES,
+        default=None,
+        help="Run benchmark tests: quick runs their small sizes, full adds the large ones",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize benchmarks over their sizes for the selected scale."""
+    marker = metafunc.definition.get_closest_marker("benchmark")
+    if marker is None or not marker.args:
+        return
+    argname, sizes = marker.args
+    sizes = list(sizes)
+    if metafunc.config.getoption("benchmarks") == "full":
+        sizes += marker.kwargs.get("full", [])
+    metafunc.parametrize(argname, sizes)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark (run with --benchmarks=quick or --benchmarks=full)")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(_benchmark_results, [])
+    if results:
+        terminalreporter.section("benchmark results")
+        for nodeid, message in results:
+            terminalreporter.write_line(f"{nodeid}: {message}")
+
+
+@pytest.fixture
+def benchmark_report(request) -> Callable[[str], None]:
+    """Record a benchmark result: logged, kept in the junit report and shown in the terminal summary."""
+    results = request.config.stash.setdefault(_benchmark_results, [])
+
+    def report(message: str) -> None:
+        benchmark_logger.info(f"{request.node.nodeid}: {message}")
+        request.node.user_properties.append(("benchmark", message))
+        results.append((request.node.nodeid, message))
+
+    return report
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_telemetry(tmp_path_factory):
+    """Send core.telemetry events to a temporary directory instead of the repo's logs/."""
+    try:
+        from core import telemetry
+    except Exception:
+        yield None
+        return
+
+    root = tmp_path_factory.mktemp("telemetry")
+    cwd = os.getcwd()
+    # SimpleTelemetry anchors its directories to the working directory
+    os.chdir(root)
+    try:
+        instance = telemetry.SimpleTelemetry()
+    finally:
+        os.chdir(cwd)
+    previous = telemetry._telemetry_instance
+    telemetry._telemetry_instance = instance
+    yield instance
+    telemetry._telemetry_instance = previous
+
+
 @pytest.fixture(autouse=True, scope="function")
 def cleanup_test_artifacts():
     """Global cleanup of test artifacts after each test."""
@@ -0,0 +1,183 @@
+"""
+Tests for the compact slot-based records behind the in-memory stores.
+
+Verifies that CompactRecord and SwarmRecord round-trip the public
+MemoryRecord and dict layouts, that tags and agent ids are interned, and
+reports resident bytes per memory against the previous layouts.
+"""
+
+import gc
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from agency_memory.compact_record import CompactRecord, SwarmRecord, intern_tags
+from agency_memory.memory import InMemoryStore
+from agency_memory.swarm_memory import MemoryPriority, SwarmMemoryStore
+from shared.models.memory import MemoryMetadata, MemoryRecord
+
+
+class TestCompactRecord:
+    """Test MemoryRecord round-tripping."""
+
+    def test_round_trip(self):
+        record = MemoryRecord(
+            key="k",
+            content={"a": 1},
+            tags=["x", "y"],
+            timestamp=datetime(2026, 1, 2, 3, 4, 5, 678901),
+            metadata=MemoryMetadata(agent_id="agent"),
+            embedding=[0.5, 0.25],
+        )
+
+        restored = CompactRecord.from_record(record).to_record()
+
+        assert restored == record
+        assert restored.metadata is not record.metadata
+
+    def test_default_metadata_is_not_stored(self):
+        compact = CompactRecord.from_record(MemoryRecord(key="k", content="v"))
+
+        assert compact.metadata is None
+        assert compact.to_record().metadata == MemoryMetadata()
+
+    def test_tags_are_interned(self):
+        first = intern_tags(["".join(["ta", "g"]), "tag", 1])
+        second = intern_tags(["".join(["t", "ag"])])
+
+        assert first == ("tag",)
+        assert first[0] is second[0]
+
+
+class TestSwarmRecord:
+    """Test the dict view of swarm records."""
+
+    def test_mapping_matches_legacy_dict(self):
+        store = SwarmMemoryStore()
+        store.store("k", "v", ["t"], agent_id="a", priority=MemoryPriority.HIGH)
+
+        memory = store.get_agent_memories("a")[0]
+
+        assert isinstance(memory, dict)
+        assert memory["namespaced_key"] == "a:k"
+        assert memory["priority"] == MemoryPriority.HIGH.value
+        assert memory["tags"] == ["t"]
+        assert isinstance(datetime.fromisoformat(memory["last_accessed"]), datetime)
+
+    def test_item_assignment_parses_timestamps(self):
+        record = SwarmRecord("k", "v", ("t",), "a", MemoryPriority.LOW, False, timestamp=0.0)
+        when = datetime(2026, 1, 1)
+
+        record["last_accessed"] = when.isoformat()
+
+        assert record.last_accessed == when.timestamp()
+        assert record["last_accessed"] == when.isoformat()
+        with pytest.raises(KeyError):
+            record["namespaced_key"] = "x"
+
+    def test_returned_dicts_are_copies(self):
+        store = SwarmMemoryStore()
+        store.store("k", "v", ["t"], agent_id="a", is_shared=True)
+
+        store.get_agent_memories("a")[0]["content"] = "changed"
+
+        assert store._memories["a:k"].content == "v"
+
+
+def _legacy_swarm_dict(i):
+    now = datetime.now().isoformat()
+    return {
+        "key": f"k{i}",
+        "namespaced_key": f"agent{i % 10}:k{i}",
+        "content": i,
+        "tags": [f"tag{i % 100}", "common"],
+        "agent_id": f"agent{i % 10}",
+        "priority": MemoryPriority.NORMAL.value,
+        "is_shared": False,
+        "timestamp": now,
+        "access_count": 0,
+        "last_accessed": now,
+    }
+
+
+def _measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build(count)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert kept is not None
+    return (after - before) / count
+
+
+def _fill_in_memory(count):
+    store = InMemoryStore()
+    for i in range(count):
+        store.store(f"k{i}", i, [f"tag{i % 100}", "common"])
+    return store
+
+
+def _legacy_in_memory(count):
+    return {
+        f"k{i}": MemoryRecord(
+            key=f"k{i}",
+            content=i,
+            tags=[f"tag{i % 100}", "common"],
+            metadata=MemoryMetadata(),
+        )
+        for i in range(count)
+    }
+
+
+def _fill_swarm(count):
+    store = SwarmMemoryStore(max_memories_per_agent=count)
+    for i in range(count):
+        store.store(f"k{i}", i, [f"tag{i % 100}", "common"], agent_id=f"agent{i % 10}")
+    return store
+
+
+def _compact_swarm(count):
+    records = {}
+    for i in range(count):
+        record = SwarmRecord(
+            key=f"k{i}",
+            content=i,
+            tags=intern_tags([f"tag{i % 100}", "common"]),
+            agent_id=f"agent{i % 10}",
+            priority=MemoryPriority.NORMAL,
+            is_shared=False,
+            timestamp=datetime.now().timestamp(),
+        )
+        records[record.namespaced_key] = record
+    return records
+
+
+def _legacy_swarm(count):
+    return {f"agent{i % 10}:k{i}": _legacy_swarm_dict(i) for i in range(count)}
+
+
+@pytest.mark.benchmark("size", [10_000], full=[1_000_000])
+def test_resident_bytes_per_memory(size, benchmark_report):
+    """
+    Report traced bytes per memory for each store against the old layouts.
+
+    Store figures include their indices; the other figures are the bare
+    records keyed as the store keys them.
+    """
+    in_memory = _measure(_fill_in_memory, size)
+    legacy_in_memory = _measure(_legacy_in_memory, size)
+    swarm = _measure(_fill_swarm, size)
+    swarm_records = _measure(_compact_swarm, size)
+    legacy_swarm = _measure(_legacy_swarm, size)
+
+    assert in_memory < legacy_in_memory
+    assert swarm_records < legacy_swarm
+    benchmark_report(
+        f"bytes/memory at {size}: InMemoryStore={in_memory:.0f} "
+        f"(MemoryRecord dict={legacy_in_memory:.0f}); SwarmMemoryStore={swarm:.0f}, "
+        f"records alone={swarm_records:.0f} (record dicts={legacy_swarm:.0f})"
+    )
@@ -0,0 +1,226 @@
+"""
+Tests for the persistent embedding cache.
+
+Verifies LRU eviction, isolation by provider/model, concurrent access from
+several processes, and that a warm VectorStore skips embedding calls for
+content it has already seen.
+"""
+
+import multiprocessing
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from agency_memory.embedding_cache import EmbeddingCache, calculate_content_hash, get_embedding_cache
+from agency_memory.memory_v2 import MemoryContent
+from agency_memory.vector_store import VectorStore
+
+
+class CountingEmbedder:
+    """Deterministic embedding function that records each call's batch size."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(self.dim)])
+        return vectors
+
+
+def make_store(cache: EmbeddingCache, embedder: CountingEmbedder) -> VectorStore:
+    store = VectorStore(embedding_cache=cache)
+    store._embedding_function = embedder
+    return store
+
+
+def memory(i: int):
+    return {"key": f"mem_{i}", "content": f"content {i}", "tags": ["t"]}
+
+
+def _write_entries(path: str, worker: int, count: int, start, results) -> None:
+    """Write count entries once every worker is ready; report how many were written or the error."""
+    cache = EmbeddingCache(path)
+    start.wait()
+    written = 0
+    try:
+        for i in range(count):
+            written += cache.put_many("test", "model", [(f"w{worker}_{i}", [float(worker), float(i)])])
+            cache.get_many("test", "model", [f"w{worker}_{i}"])
+    except sqlite3.Error as e:
+        results.put((worker, written, repr(e)))
+        return
+    finally:
+        cache.close()
+    results.put((worker, written, None))
+
+
+class TestEmbeddingCache:
+    """Test EmbeddingCache storage semantics."""
+
+    def test_round_trip(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        cache.put_many("openai", "small", [("h1", [0.5, -0.25]), ("h2", [1.0, 2.0])])
+
+        found = cache.get_many("openai", "small", ["h1", "h2", "h3"])
+
+        assert found == {"h1": [0.5, -0.25], "h2": [1.0, 2.0]}
+        assert cache.hits == 2
+        assert cache.misses == 1
+
+    def test_keyed_by_provider_and_model(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        cache.put_many("openai", "small", [("h1", [1.0])])
+
+        assert cache.get_many("openai", "large", ["h1"]) == {}
+        assert cache.get_many("sentence-transformers", "small", ["h1"]) == {}
+
+    def test_lru_eviction(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=3)
+        for i in range(3):
+            cache.put_many("p", "m", [(f"h{i}", [float(i)])])
+
+        # Touch h0 so h1 becomes the least recently used entry
+        cache.get_many("p", "m", ["h0"])
+        cache.put_many("p", "m", [("h3", [3.0])])
+
+        assert len(cache) == 3
+        assert set(cache.get_many("p", "m", ["h0", "h1", "h2", "h3"])) == {"h0", "h2", "h3"}
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_concurrent_processes(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        EmbeddingCache(path).close()
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_write_entries, args=(path, worker, 50, start, results))
+            for worker in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        reports = sorted(results.get(timeout=60) for _ in workers)
+        for worker in workers:
+            worker.join(timeout=60)
+
+        assert reports == [(worker, 50, None) for worker in range(4)]
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(EmbeddingCache(path)) == 200
+
+    def test_write_waits_for_lock_holder(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = EmbeddingCache(path, timeout=10)
+        holder = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        holder.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.2, lambda: holder.execute("COMMIT"))
+        release.start()
+
+        assert cache.put_many("p", "m", [("h", [1.0])]) == 1
+        release.join()
+        assert cache.get_many("p", "m", ["h"]) == {"h": [1.0]}
+
+    def test_write_failure_is_raised(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = EmbeddingCache(path, timeout=0.1)
+        holder = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        holder.execute("BEGIN IMMEDIATE")
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                cache.put_many("p", "m", [("h", [1.0])])
+        finally:
+            holder.execute("ROLLBACK")
+        assert len(cache) == 0
+
+    def test_content_hash_matches_memory_content(self):
+        content = MemoryContent(raw_content="same text", content_type="text", text_representation="same text")
+
+        assert content.content_hash == calculate_content_hash("same text")[:16]
+
+    def test_default_cache_can_be_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AGENCY_EMBEDDING_CACHE", "false")
+        assert get_embedding_cache(str(tmp_path / "cache.sqlite3")) is None
+
+        monkeypatch.setenv("AGENCY_EMBEDDING_CACHE", "true")
+        path = str(tmp_path / "cache.sqlite3")
+        assert get_embedding_cache(path) is get_embedding_cache(path)
+
+
+class TestVectorStoreCache:
+    """Test VectorStore integration with the embedding cache."""
+
+    def test_warm_restart_skips_embedding(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        memories = [memory(i) for i in range(20)]
+
+        cold_embedder = CountingEmbedder()
+        cold = make_store(EmbeddingCache(path), cold_embedder)
+        cold.add_memories((m["key"], m) for m in memories)
+        expected = cold.semantic_search("content 3", memories, top_k=5)
+
+        warm_embedder = CountingEmbedder()
+        warm = make_store(EmbeddingCache(path), warm_embedder)
+        warm.add_memories((m["key"], m) for m in memories)
+        actual = warm.semantic_search("content 3", memories, top_k=5)
+
+        assert cold_embedder.calls == [20, 1]
+        assert warm_embedder.calls == []
+        assert [r.memory["key"] for r in actual] == [r.memory["key"] for r in expected]
+        assert warm.get_stats()["embedding_cache"]["hits"] == 21
+
+    def test_only_misses_are_embedded(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        make_store(cache, CountingEmbedder()).add_memories((f"mem_{i}", memory(i)) for i in range(10))
+
+        embedder = CountingEmbedder()
+        store = make_store(cache, embedder)
+        store.add_memories((f"mem_{i}", memory(i)) for i in range(15))
+
+        assert embedder.calls == [5]
+        assert len(store._embeddings) == 15
+
+    def test_hit_miss_counters_reach_telemetry(self, tmp_path, monkeypatch):
+        events = []
+        monkeypatch.setattr("core.telemetry.emit", lambda event, data=None, level="info": events.append((event, data)))
+        store = make_store(EmbeddingCache(str(tmp_path / "cache.sqlite3")), CountingEmbedder())
+
+        # Counters accumulate across flushes instead of producing an event each
+        store.add_memories([("a", memory(0)), ("b", memory(1))])
+        store.add_memories([("c", memory(0))])
+        assert events == []
+
+        store.get_stats()
+        store.get_stats()
+
+        assert events == [
+            (
+                "embedding_cache",
+                {
+                    "provider": "custom",
+                    "model": "default",
+                    "hits": 1,
+                    "misses": 2,
+                    "total_hits": 1,
+                    "total_misses": 2,
+                    "evictions": 0,
+                },
+            )
+        ]
+
+    def test_telemetry_is_periodic(self, tmp_path, monkeypatch):
+        events = []
+        monkeypatch.setattr("core.telemetry.emit", lambda event, data=None, level="info": events.append(data))
+        monkeypatch.setattr("agency_memory.vector_store.CACHE_TELEMETRY_INTERVAL", 0.0)
+        store = make_store(EmbeddingCache(str(tmp_path / "cache.sqlite3")), CountingEmbedder())
+
+        store.add_memories([("a", memory(0))])
+        store.flush()
+        store.add_memories([("b", memory(0))])
+
+        assert [(e["hits"], e["misses"]) for e in events] == [(0, 1), (1, 0)]
@@ -0,0 +1,216 @@
+"""
+Tests for the in-process telemetry event bus.
+
+Verifies that events published from threads and coroutines reach the daily
+JSONL file through one batched writer, that files rotate by event date,
+that subscribers see redacted events, and that the orchestrator publishes
+through the bus. Includes a benchmark of caller latency against the
+per-event open/append path.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from tools.telemetry.bus import EventBus, get_event_bus
+from tools.telemetry.sanitize import redact_event
+
+
+def read_events(path: Path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus()
+    yield bus
+    bus.close()
+
+
+class TestEventBus:
+    """Test publishing, writing and subscribers."""
+
+    def test_threads_and_tasks_share_one_writer(self, bus, tmp_path):
+        def publish_from_thread(n):
+            for i in range(200):
+                bus.publish({"type": "heartbeat", "source": f"thread-{n}", "i": i}, directory=str(tmp_path))
+
+        async def publish_from_tasks():
+            async def task(n):
+                for i in range(200):
+                    bus.publish({"type": "heartbeat", "source": f"task-{n}", "i": i}, directory=str(tmp_path))
+                    await asyncio.sleep(0)
+            await asyncio.gather(*(task(n) for n in range(4)))
+
+        threads = [threading.Thread(target=publish_from_thread, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(publish_from_tasks())
+        for thread in threads:
+            thread.join()
+        assert bus.flush(timeout=5)
+
+        files = list(tmp_path.glob("events-*.jsonl"))
+        assert len(files) == 1
+        events = read_events(files[0])
+        assert len(events) == 1600
+        for source in {e["source"] for e in events}:
+            assert [e["i"] for e in events if e["source"] == source] == list(range(200))
+        assert all(e["ts"].endswith("Z") for e in events)
+        stats = bus.stats()
+        assert stats["written"] == 1600 and stats["dropped"] == 0
+        assert stats["batches"] < 1600
+        assert stats["destinations"] == 1
+
+    def test_rotates_daily_by_event_time(self, bus, tmp_path):
+        day = datetime(2026, 3, 1, 23, 59, 59, tzinfo=timezone.utc)
+        bus.publish({"type": "a"}, directory=str(tmp_path), ts=day)
+        bus.publish({"type": "b"}, directory=str(tmp_path), ts=day + timedelta(seconds=2))
+        bus.flush(timeout=5)
+
+        assert [e["type"] for e in read_events(tmp_path / "events-20260301.jsonl")] == ["a"]
+        assert [e["type"] for e in read_events(tmp_path / "events-20260302.jsonl")] == ["b"]
+        assert read_events(tmp_path / "events-20260302.jsonl")[0]["ts"] == "2026-03-02T00:00:01.000Z"
+
+    def test_reopens_deleted_file(self, bus, tmp_path):
+        bus.publish({"type": "first"}, directory=str(tmp_path))
+        bus.flush(timeout=5)
+        (path,) = tmp_path.glob("events-*.jsonl")
+        path.unlink()
+
+        bus.publish({"type": "second"}, directory=str(tmp_path))
+        bus.flush(timeout=5)
+        assert [e["type"] for e in read_events(path)] == ["second"]
+
+    def test_subscribers_receive_redacted_events(self, bus, tmp_path):
+        seen = []
+        heartbeats = []
+        bus.subscribe(seen.append)
+        bus.subscribe(heartbeats.append, event_types={"heartbeat"})
+        bus.subscribe(lambda event: 1 / 0)
+
+        event = {"type": "task_started", "api_key": "abc", "note": "sk-" + "a" * 20}
+        bus.publish(event, directory=str(tmp_path))
+        bus.publish({"type": "heartbeat"})
+        bus.flush(timeout=5)
+
+        assert event["api_key"] == "abc" and "ts" not in event
+        assert seen[0]["api_key"] == "[REDACTED]" and seen[0]["note"] == "[REDACTED]"
+        assert [e["type"] for e in seen] == ["task_started", "heartbeat"]
+        assert [e["type"] for e in heartbeats] == ["heartbeat"]
+        # Only the event with a directory was written
+        (path,) = tmp_path.glob("events-*.jsonl")
+        assert read_events(path) == [seen[0]]
+        assert bus.stats()["subscriber_errors"] == 2
+
+    def test_async_subscriber(self, bus):
+        async def consume():
+            token, queue = bus.subscribe_async(event_types={"task_finished"})
+            bus.publish({"type": "task_started"})
+            bus.publish({"type": "task_finished", "id": "t1"})
+            event = await asyncio.wait_for(queue.get(), timeout=5)
+            bus.unsubscribe(token)
+            return event, queue.qsize()
+
+        event, remaining = asyncio.run(consume())
+        assert event["id"] == "t1" and remaining == 0
+        assert bus.stats()["subscribers"] == 0
+
+    def test_full_queue_drops(self, tmp_path):
+        release = threading.Event()
+        bus = EventBus(max_queue=2)
+        bus.subscribe(lambda event: release.wait(5), event_types={"busy"})
+        bus.publish({"type": "busy"})
+        while bus.stats()["depth"]:
+            time.sleep(0.001)
+
+        results = [bus.publish({"type": "x", "i": i}, directory=str(tmp_path)) for i in range(4)]
+        assert results == [True, True, False, False]
+        assert not bus.flush(timeout=0.05)
+        release.set()
+        bus.close()
+        (path,) = tmp_path.glob("events-*.jsonl")
+        assert [e["i"] for e in read_events(path)] == [0, 1]
+        assert bus.stats()["dropped"] == 2
+        assert not bus.publish({"type": "after_close"})
+
+
+async def test_orchestrator_publishes_through_bus(tmp_path, monkeypatch):
+    from shared.agent_context import create_agent_context
+    from tools.orchestrator.scheduler import OrchestrationPolicy, TaskSpec, run_parallel
+
+    class Agent:
+        async def run(self, prompt, **params):
+            return {"ok": True}
+
+    def factory(ctx):
+        return Agent()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AGENCY_TELEMETRY_ENABLED", "1")
+    bus = get_event_bus()
+    finished = []
+    token = bus.subscribe(finished.append, event_types={"task_finished"})
+    try:
+        await run_parallel(create_agent_context(), [TaskSpec(agent_factory=factory, prompt="p", id="t1")],
+                           OrchestrationPolicy())
+        assert bus.flush(timeout=5)
+    finally:
+        bus.unsubscribe(token)
+
+    assert [(e["id"], e["status"]) for e in finished] == [("t1", "success")]
+    (path,) = (tmp_path / "logs" / "telemetry").glob("events-*.jsonl")
+    types = [e["type"] for e in read_events(path) if e["type"] != "heartbeat"]
+    assert types == ["orchestrator_started", "task_started", "task_finished", "orchestrator_finished"]
+
+
+def per_event_append(event, directory):
+    """The open/append-per-call path the bus replaces."""
+    os.makedirs(directory, exist_ok=True)
+    ts = datetime.now(timezone.utc)
+    event = redact_event(dict(event))
+    event["ts"] = ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    with open(os.path.join(directory, f"events-{ts:%Y%m%d}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+@pytest.mark.benchmark("count", [2_000], full=[50_000])
+def test_bus_vs_per_event_append(tmp_path, count, benchmark_report):
+    """
+    Compare per-event open/append with publishing to the bus.
+
+    Reports events/second (including the final flush) and caller-side
+    latency percentiles.
+    """
+    event = {"type": "heartbeat", "id": "task-1", "agent": "Agent", "attempt": 1, "pid": 1, "running_for_s": 1.5}
+    bus = EventBus(max_queue=count)
+    emitters = {
+        "per-event": lambda directory: per_event_append(event, directory),
+        "bus": lambda directory: bus.publish(event, directory=directory),
+    }
+    results = {}
+    for mode, emit in emitters.items():
+        directory = str(tmp_path / mode)
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(count):
+            t0 = time.perf_counter()
+            emit(directory)
+            latencies.append(time.perf_counter() - t0)
+        bus.flush()
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        results[mode] = (count / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)])
+        (path,) = Path(directory).glob("events-*.jsonl")
+        assert len(read_events(path)) == count
+    bus.close()
+
+    for mode, (rate, p50, p99) in results.items():
+        benchmark_report(f"{mode}: {rate:,.0f} events/s, caller p50 {p50 * 1e6:.1f}us, p99 {p99 * 1e6:.1f}us")
+    assert results["bus"][1] < results["per-event"][1]
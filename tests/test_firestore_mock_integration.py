@@ -62,6 +62,38 @@ class TestFirestoreMockIntegration:
 
             mock_collection.document = mock_document
 
+            # Mock batched writes: sets are applied on commit
+            def mock_batch():
+                mock_write_batch = MagicMock()
+                writes = []
+                mock_write_batch.set = lambda doc_ref, data: writes.append((doc_ref, data))
+
+                def mock_commit():
+                    for doc_ref, data in writes:
+                        doc_ref.set(data)
+
+                mock_write_batch.commit = mock_commit
+                return mock_write_batch
+
+            mock_client.batch = mock_batch
+
+            # Mock paginated queries: order_by / limit / start_after over a result source
+            def mock_paged_query(source, after=None, count=None):
+                paged_query = MagicMock()
+
+                def mock_paged_stream():
+                    results = source()
+                    if after is not None:
+                        ids = [doc.id for doc in results]
+                        results = results[ids.index(after.id) + 1:] if after.id in ids else []
+                    return results if count is None else results[:count]
+
+                paged_query.stream = mock_paged_stream
+                paged_query.order_by = lambda *args, **kwargs: mock_paged_query(source, after, count)
+                paged_query.limit = lambda n: mock_paged_query(source, after, n)
+                paged_query.start_after = lambda doc: mock_paged_query(source, doc, count)
+                return paged_query
+
             # Mock where queries
             def mock_where(field, op, value):
                 mock_query = MagicMock()
@@ -101,6 +133,7 @@ class TestFirestoreMockIntegration:
 
                 mock_query.stream = mock_stream
                 mock_query.limit = mock_limit
+                mock_query.order_by = lambda *args, **kwargs: mock_paged_query(mock_stream)
                 return mock_query
 
             mock_collection.where = mock_where
@@ -129,6 +162,7 @@ class TestFirestoreMockIntegration:
 
             mock_collection.stream = mock_stream_all
             mock_collection.limit = mock_limit
+            mock_collection.order_by = lambda *args, **kwargs: mock_paged_query(mock_stream_all)
 
             # Set environment variables
             with patch.dict(os.environ, {
@@ -157,8 +191,9 @@ class TestFirestoreMockIntegration:
         # Verify the collection is connected to our mock
         assert store._collection is not None
 
-        # Test CREATE operation
+        # Test CREATE operation (writes are buffered until flushed)
         store.store(test_key, test_content, test_tags)
+        store.flush()
 
         # Verify data was stored
         assert test_key in mock_storage
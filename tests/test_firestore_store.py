@@ -0,0 +1,301 @@
+"""
+Tests for FirestoreStore write-behind batching, paginated reads and the
+read-through cache.
+
+A small in-process fake client counts service round trips; the same
+ordering and durability checks also run against the Firestore emulator
+when FIRESTORE_EMULATOR_HOST is configured.
+"""
+
+import os
+import time
+import types
+import uuid
+from collections import Counter
+
+import pytest
+
+import agency_memory.firestore_store as firestore_store
+from agency_memory import FirestoreStore
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = dict(data)
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeDocumentRef:
+    def __init__(self, client, doc_id):
+        self._client = client
+        self.id = doc_id
+
+    def set(self, data):
+        self._client.calls["set"] += 1
+        self._client.docs[self.id] = dict(data)
+
+
+class FakeQuery:
+    def __init__(self, client, tags=None, limit=None, after=None):
+        self._client = client
+        self._tags = tags
+        self._limit = limit
+        self._after = after
+
+    def where(self, field, op, value):
+        assert (field, op) == ("tags", "array_contains_any")
+        assert len(value) <= 10
+        return FakeQuery(self._client, list(value), self._limit, self._after)
+
+    def order_by(self, field):
+        assert field == "__name__"
+        return self
+
+    def limit(self, count):
+        return FakeQuery(self._client, self._tags, count, self._after)
+
+    def start_after(self, snapshot):
+        return FakeQuery(self._client, self._tags, self._limit, snapshot.id)
+
+    def stream(self):
+        self._client.calls["stream"] += 1
+        results = []
+        for doc_id, data in sorted(self._client.docs.items()):
+            if self._after is not None and doc_id <= self._after:
+                continue
+            if self._tags is not None and not set(self._tags) & set(data.get("tags", [])):
+                continue
+            results.append(FakeSnapshot(doc_id, data))
+        return iter(results if self._limit is None else results[: self._limit])
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return FakeDocumentRef(self._client, doc_id)
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, doc_ref, data):
+        assert len(self._writes) < 500
+        self._writes.append((doc_ref.id, dict(data)))
+
+    def commit(self):
+        if self._client.fail_commits:
+            raise RuntimeError("service unavailable")
+        self._client.calls["commit"] += 1
+        for doc_id, data in self._writes:
+            self._client.docs[doc_id] = data
+
+
+class FakeClient:
+    def __init__(self):
+        self.docs = {}
+        self.calls = Counter()
+        self.fail_commits = False
+
+    def collection(self, name):
+        return FakeCollection(self)
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setenv("FRESH_USE_FIRESTORE", "true")
+    monkeypatch.setattr(firestore_store, "firestore", types.SimpleNamespace(Client=lambda: fake))
+    return fake
+
+
+def make_store(**kwargs):
+    kwargs.setdefault("flush_interval", 60.0)
+    store = FirestoreStore("memories", **kwargs)
+    assert store._fallback_store is None
+    return store
+
+
+def keys(result):
+    return [r.key for r in result.records]
+
+
+class TestWriteBehind:
+    """Test batched, buffered writes."""
+
+    def test_writes_commit_in_batches(self, client):
+        store = make_store(batch_size=10)
+
+        for i in range(25):
+            store.store(f"k{i:02d}", i, ["t"])
+        assert client.calls["commit"] == 2
+        assert len(client.docs) == 20
+
+        assert store.flush() == 5
+        assert client.calls["commit"] == 3
+        assert client.calls["set"] == 0
+        assert store.flush() == 0
+
+    def test_flush_latency_is_bounded(self, client):
+        store = make_store(batch_size=100, flush_interval=0.05)
+        store.store("k", "v", ["t"])
+
+        deadline = time.time() + 2.0
+        while "k" not in client.docs and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert "k" in client.docs
+        assert client.calls["commit"] == 1
+
+    def test_rewrites_coalesce(self, client):
+        store = make_store()
+        for i in range(5):
+            store.store("k", i, ["t"])
+
+        assert store.flush() == 1
+        assert client.docs["k"]["content"] == 4
+
+    def test_durable_after_flush(self, client):
+        store = make_store()
+        for i in range(30):
+            store.store(f"k{i:02d}", i, ["t"])
+        store.close()
+
+        reopened = make_store()
+
+        assert keys(reopened.get_all()) == [f"k{i:02d}" for i in reversed(range(30))]
+
+    def test_reads_see_buffered_writes(self, client):
+        store = make_store()
+        store.store("old", 1, ["a"])
+        store.flush()
+        store.store("new", 2, ["a"])
+        store.store("old", 3, ["b"])
+
+        assert keys(store.search(["a"])) == ["new"]
+        assert keys(store.search(["b"])) == ["old"]
+        assert keys(store.get_all()) == ["old", "new"]
+
+    def test_commit_failure_falls_back_without_losing_writes(self, client):
+        store = make_store()
+        store.store("k", "v", ["t"])
+        client.fail_commits = True
+
+        store.flush()
+
+        assert store._fallback_store is not None
+        assert keys(store.search(["t"])) == ["k"]
+
+
+class TestPaginatedReads:
+    """Test cursor-paginated reads."""
+
+    def test_get_all_reads_in_pages(self, client):
+        store = make_store(page_size=7)
+        for i in range(20):
+            store.store(f"k{i:02d}", i, ["t"])
+        store.flush()
+        client.calls.clear()
+
+        result = store.get_all()
+
+        assert result.total_count == 20
+        assert client.calls["stream"] == 3
+
+    def test_search_splits_large_tag_lists(self, client):
+        store = make_store()
+        for i in range(15):
+            store.store(f"k{i:02d}", i, [f"tag{i}"])
+        store.flush()
+
+        result = store.search([f"tag{i}" for i in range(15)])
+
+        assert sorted(keys(result)) == [f"k{i:02d}" for i in range(15)]
+
+
+class TestReadThroughCache:
+    """Test the local read cache and its invalidation."""
+
+    def test_repeated_reads_hit_cache(self, client):
+        store = make_store()
+        store.store("k", "v", ["a"])
+        store.flush()
+        client.calls.clear()
+
+        for _ in range(5):
+            assert keys(store.search(["a"])) == ["k"]
+
+        assert client.calls["stream"] == 1
+        assert store.stats["cache_hits"] == 4
+
+    def test_own_writes_invalidate_affected_reads(self, client):
+        store = make_store()
+        store.store("k1", 1, ["a"])
+        store.store("k2", 2, ["b"])
+        store.flush()
+        store.search(["a"])
+        store.search(["b"])
+        client.calls.clear()
+
+        store.store("k3", 3, ["a"])
+        store.flush()
+
+        assert keys(store.search(["b"])) == ["k2"]
+        assert client.calls["stream"] == 0
+        assert keys(store.search(["a"])) == ["k3", "k1"]
+        assert client.calls["stream"] == 1
+
+    def test_read_during_buffering_is_refreshed_after_flush(self, client):
+        store = make_store()
+        store.store("k", "v", ["a"])
+        assert keys(store.search(["a"])) == ["k"]
+
+        store.flush()
+
+        assert keys(store.search(["a"])) == ["k"]
+
+    def test_cache_is_bounded_and_expires(self, client):
+        store = make_store(cache_size=2, cache_ttl=0.05)
+        for tag in ["a", "b", "c"]:
+            store.search([tag])
+        assert len(store._cache) == 2
+
+        time.sleep(0.06)
+        client.calls.clear()
+        store.search(["c"])
+        assert client.calls["stream"] == 1
+
+
+@pytest.mark.integration
+class TestFirestoreEmulator:
+    """Ordering and durability against the local Firestore emulator."""
+
+    @pytest.fixture
+    def emulator_store(self, monkeypatch):
+        if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+            pytest.skip("FIRESTORE_EMULATOR_HOST not configured")
+        pytest.importorskip("google.cloud.firestore")
+        monkeypatch.setenv("FRESH_USE_FIRESTORE", "true")
+        store = FirestoreStore(f"write_behind_{uuid.uuid4().hex[:8]}", batch_size=100, page_size=40)
+        if store._fallback_store is not None:
+            pytest.skip("Firestore emulator not reachable")
+        return store
+
+    def test_batched_round_trips_and_ordering(self, emulator_store):
+        for i in range(250):
+            emulator_store.store(f"k{i:03d}", i, ["emulator"])
+        emulator_store.flush()
+
+        assert emulator_store.stats["commits"] == 3
+
+        reopened = FirestoreStore(emulator_store.collection_name, page_size=40)
+        result = reopened.search(["emulator"])
+
+        assert keys(result) == [f"k{i:03d}" for i in reversed(range(250))]
+        assert reopened.stats["page_reads"] == 7
@@ -18,6 +18,7 @@ sys.path.append("/Users/am/Code/Agency")
 from shared.system_hooks import MemoryIntegrationHook, create_memory_integration_hook
 from shared.agent_context import AgentContext, create_agent_context
 from agency_memory import Memory, InMemoryStore
+from agency_memory.session_transcript import read_transcript_index
 
 
 class MockTool:
@@ -420,6 +421,24 @@ class TestIntegrationScenarios:
                     # In CI environments, the method may fail silently due to filesystem restrictions
                     pytest.skip("Transcript generation skipped - likely due to filesystem restrictions in CI")
 
+    def test_transcript_streams_only_when_asked(self, agent_context, tmp_path):
+        """Test that a streaming transcript is attached only on request."""
+        MemoryIntegrationHook(agent_context=agent_context, transcript_dir=str(tmp_path))
+
+        assert agent_context.transcript is None
+
+    @pytest.mark.asyncio
+    async def test_streamed_transcript_flushed_per_step(self, agent_context, mock_context, mock_agent, mock_tool, tmp_path):
+        """Test that each run step is on disk before the session ends."""
+        hook = MemoryIntegrationHook(agent_context=agent_context, transcript_dir=str(tmp_path), stream_transcript=True)
+
+        await hook.on_start(mock_context, mock_agent)
+        await hook.on_tool_start(mock_context, mock_agent, mock_tool)
+
+        keys = [entry["key"] for entry in read_transcript_index(agent_context.transcript.path)]
+        assert keys[0].startswith("session_start_")
+        assert keys[1].startswith("tool_call_TestTool_")
+
     def test_memory_search_functionality(self, memory_hook):
         """Test that memory search works correctly with session tags."""
         # Store some memories
@@ -0,0 +1,196 @@
+"""
+Tests for fused hybrid retrieval in VectorStore.hybrid_search.
+
+Verifies that weighted fusion with early termination returns exactly what
+full-corpus scoring returns, that reciprocal-rank fusion works on the
+bounded candidate lists, and reports latency against the previous
+implementation.
+"""
+
+import random
+import time
+
+import pytest
+
+from agency_memory.vector_store import SimilarityResult, VectorStore
+
+VOCABULARY = [f"term{i}" for i in range(200)]
+
+
+def fake_embedder(dim: int = 16):
+    """Deterministic per-text embedding function for tests."""
+
+    def embed(texts):
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(dim)])
+        return vectors
+
+    return embed
+
+
+def make_store(backend: str = "python") -> VectorStore:
+    store = VectorStore(index_backend=backend)
+    store._embedding_function = fake_embedder()
+    return store
+
+
+def make_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "key": f"mem_{i}",
+            "content": " ".join(rng.choice(VOCABULARY) for _ in range(12)),
+            "tags": [rng.choice(VOCABULARY)],
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_hybrid_search(store: VectorStore, query, memories, top_k=10, semantic_weight=0.7):
+    """Previous implementation: rank the whole corpus on both signals, then merge."""
+    combined, memory_map = {}, {}
+    for result in store.semantic_search(query, memories, len(memories)):
+        key = result.memory.get("namespaced_key", result.memory.get("key", ""))
+        combined[key] = semantic_weight * result.similarity_score
+        memory_map[key] = result.memory
+    for result in store.keyword_search(query, memories, len(memories)):
+        key = result.memory.get("namespaced_key", result.memory.get("key", ""))
+        combined[key] = combined.get(key, 0.0) + (1.0 - semantic_weight) * result.similarity_score
+        memory_map.setdefault(key, result.memory)
+    results = [
+        SimilarityResult(memory=memory_map[key], similarity_score=score, search_type="hybrid")
+        for key, score in combined.items()
+        if score > 0
+    ]
+    results.sort(key=lambda x: x.similarity_score, reverse=True)
+    return results[:top_k]
+
+
+def keys(results):
+    return [r.memory["key"] for r in results]
+
+
+class TestWeightedFusion:
+    """Weighted fusion must reproduce full-corpus scoring."""
+
+    @pytest.mark.parametrize("backend", ["python", "matrix"])
+    @pytest.mark.parametrize("top_k", [1, 5, 25])
+    @pytest.mark.parametrize("semantic_weight", [0.0, 0.3, 0.7, 1.0])
+    def test_matches_full_scoring(self, backend, top_k, semantic_weight):
+        if backend == "matrix":
+            pytest.importorskip("numpy")
+        memories = make_corpus(400)
+        store = make_store(backend)
+
+        for query in ["term3 term17", "term150", "nothing matches"]:
+            expected = legacy_hybrid_search(store, query, memories, top_k, semantic_weight)
+            actual = store.hybrid_search(query, memories, top_k, semantic_weight)
+
+            assert [r.similarity_score for r in actual] == pytest.approx(
+                [r.similarity_score for r in expected], abs=1e-5
+            )
+            if semantic_weight > 0:
+                # Pure keyword scores tie a lot; equal scores may come back in
+                # a different order than the legacy semantic-first merge
+                assert keys(actual) == keys(expected)
+
+    def test_tiny_pool_still_exact(self):
+        memories = make_corpus(300)
+        store = make_store()
+
+        expected = legacy_hybrid_search(store, "term42 term7", memories, top_k=20, semantic_weight=0.3)
+        actual = store.hybrid_search("term42 term7", memories, top_k=20, semantic_weight=0.3, candidate_pool=2)
+
+        assert keys(actual) == keys(expected)
+
+    def test_early_termination_scores_few_memories(self, monkeypatch):
+        memories = make_corpus(2000)
+        store = make_store()
+        store.add_memories((m["key"], m) for m in memories)
+
+        random_access = []
+        original = store._semantic_score
+        monkeypatch.setattr(
+            store, "_semantic_score", lambda q, key: random_access.append(key) or original(q, key)
+        )
+        store.hybrid_search("term5", memories, top_k=5)
+
+        # Only a handful of keyword-side candidates need a semantic lookup
+        assert 0 < len(random_access) < 200
+
+    def test_keyword_only_when_no_embeddings(self):
+        store = VectorStore()
+        memories = [{"key": "a", "content": "alpha beta"}, {"key": "b", "content": "gamma"}]
+
+        results = store.hybrid_search("alpha", memories)
+
+        assert keys(results) == ["a"]
+        assert results[0].search_type == "keyword"
+
+
+class TestRankFusion:
+    """Test reciprocal-rank fusion."""
+
+    def test_rrf_rewards_agreement(self):
+        store = VectorStore()
+        store._embedding_function = lambda texts: [
+            [1.0, 0.0] if "alpha" in t or t == "query alpha" else [0.0, 1.0] for t in texts
+        ]
+        memories = [
+            {"key": "both", "content": "alpha"},
+            {"key": "semantic_only", "content": "alphabet soup alphas"},
+            {"key": "neither", "content": "zzz"},
+        ]
+
+        results = store.hybrid_search("query alpha", memories, top_k=3, fusion="rrf")
+
+        assert keys(results)[0] == "both"
+        assert all(r.search_type == "hybrid" for r in results)
+        assert all(0 < r.similarity_score < 1 for r in results)
+
+    def test_unknown_fusion_rejected(self):
+        with pytest.raises(ValueError):
+            make_store().hybrid_search("q", make_corpus(3), fusion="borda")
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_hybrid_search_latency(size, benchmark_report):
+    """
+    Report fused hybrid_search latency and result overlap against the
+    previous two-full-pass implementation.
+    """
+    pytest.importorskip("numpy")
+    memories = make_corpus(size)
+    store = make_store("matrix")
+    store.add_memories((m["key"], m) for m in memories)
+    queries = [f"term{i} term{i * 7 % 200}" for i in range(10)]
+
+    timings = {}
+    overlaps = {"weighted": [], "rrf": []}
+    for name, search in [
+        ("legacy", lambda q: legacy_hybrid_search(store, q, memories)),
+        ("weighted", lambda q: store.hybrid_search(q, memories)),
+        ("rrf", lambda q: store.hybrid_search(q, memories, fusion="rrf")),
+    ]:
+        start = time.perf_counter()
+        for query in queries:
+            search(query)
+        timings[name] = (time.perf_counter() - start) / len(queries) * 1000
+
+    for query in queries:
+        baseline = set(keys(legacy_hybrid_search(store, query, memories)))
+        overlaps["weighted"].append(len(baseline & set(keys(store.hybrid_search(query, memories)))) / len(baseline))
+        overlaps["rrf"].append(
+            len(baseline & set(keys(store.hybrid_search(query, memories, fusion="rrf")))) / len(baseline)
+        )
+
+    weighted_overlap = sum(overlaps["weighted"]) / len(queries)
+    rrf_overlap = sum(overlaps["rrf"]) / len(queries)
+    benchmark_report(
+        f"hybrid search: {size} memories, legacy={timings['legacy']:.1f}ms, "
+        f"weighted={timings['weighted']:.1f}ms (overlap {weighted_overlap:.2f}), "
+        f"rrf={timings['rrf']:.1f}ms (overlap {rrf_overlap:.2f})"
+    )
+    assert weighted_overlap == 1.0
@@ -0,0 +1,285 @@
+"""
+Tests for the incremental telemetry aggregator.
+
+Verifies that IncrementalAggregator.aggregate() equals a full aggregate()
+at every refresh while random, out-of-order and partially written events
+are appended across files and the window slides, that a checkpoint lets a
+new instance resume by reading only new lines, and that replaced,
+truncated or removed files and a window moving backwards fall back to a
+replay. Includes a benchmark of watch-mode CPU time per refresh.
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from tools.telemetry import aggregator, segment_index
+from tools.telemetry.aggregator import aggregate
+from tools.telemetry.incremental_aggregator import IncrementalAggregator
+from tools.telemetry.segment_index import drop_cached_index
+
+START = datetime(2026, 3, 1, 23, 30, tzinfo=timezone.utc)
+
+
+def ts(dt: datetime) -> str:
+    return dt.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+class Clock:
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(START)
+    monkeypatch.setattr(aggregator, "_iso_now", clock)
+    monkeypatch.setattr(segment_index, "CHECKPOINT_BYTES", 1024)
+    drop_cached_index()
+    yield clock
+    drop_cached_index()
+
+
+def random_event(rng: random.Random, dt: datetime):
+    typ = rng.choice(["task_started", "task_started", "heartbeat", "heartbeat", "heartbeat",
+                      "task_finished", "task_finished", "orchestrator_started", "note"])
+    ev = {"type": typ, "ts": ts(dt)}
+    if rng.random() < 0.9:
+        ev["agent"] = rng.choice(["Planner", "Coder", "Auditor", "", 7])
+    if typ != "note" and rng.random() < 0.95:
+        ev["id"] = rng.choice([f"t{rng.randint(0, 15)}", rng.randint(0, 3)])
+    if typ == "task_started" and rng.random() < 0.3:
+        ev["started_at"] = dt.timestamp() - rng.uniform(0, 5)
+    if typ == "task_finished":
+        ev["status"] = rng.choice(["success", "failed", "timeout", "SUCCESS", "cancelled"])
+        if rng.random() < 0.8:
+            ev["usage"] = {"total_tokens": rng.choice([rng.randint(1, 500), 1.5, None, "12"]),
+                           "total_usd": rng.choice([rng.random() / 100, 0, None])}
+            if rng.random() < 0.3:
+                ev["cost_usd"] = rng.random() / 10
+    if typ == "orchestrator_started":
+        choice = rng.random()
+        if choice < 0.6:
+            ev["max_concurrency"] = rng.randint(1, 8)
+        elif choice < 0.8:
+            ev["max_concurrency"] = "four"
+    if typ == "note" and rng.random() < 0.3:
+        # Naive timestamps are read as UTC
+        ev["ts"] = dt.replace(tzinfo=None).isoformat()
+    return ev
+
+
+class Writer:
+    """Appends events to daily files, sometimes leaving a line half-written."""
+
+    def __init__(self, directory: Path, rng: random.Random) -> None:
+        self.directory = directory
+        self.rng = rng
+        self.pending = {}
+        self.used = set()
+
+    def unique_dt(self, dt: datetime) -> datetime:
+        # Distinct timestamps: a full recompute orders cross-file ties by mtime
+        while dt in self.used:
+            dt += timedelta(microseconds=1)
+        self.used.add(dt)
+        return dt
+
+    def write(self, now: datetime, count: int) -> None:
+        lines = {}
+        for _ in range(count):
+            dt = self.unique_dt(now - timedelta(seconds=self.rng.uniform(0, 40)))
+            # Rotation is by write time, so the first minutes of a day still trickle into yesterday's file
+            day = now - timedelta(seconds=self.rng.choice([0, 0, 0, 120]))
+            name = f"events-{day:%Y%m%d}.jsonl"
+            line = json.dumps(random_event(self.rng, dt))
+            if self.rng.random() < 0.03:
+                line = line[: len(line) // 2] + "}"  # corrupt
+            lines.setdefault(name, []).append(line + "\n")
+        for name, chunk in lines.items():
+            text = self.pending.pop(name, "") + "".join(chunk)
+            if self.rng.random() < 0.3:
+                cut = len(text) - self.rng.randint(1, 30)
+                text, self.pending[name] = text[:cut], text[cut:]
+            with (self.directory / name).open("a", encoding="utf-8") as f:
+                f.write(text)
+
+
+def full(since: str, directory: Path):
+    return aggregate(since=since, telemetry_dir=str(directory))
+
+
+class TestEquivalence:
+    """Compare against a full recompute as events arrive and the window slides."""
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_full_recompute(self, tmp_path, clock, seed):
+        rng = random.Random(seed)
+        writer = Writer(tmp_path, rng)
+        since = rng.choice(["5m", "10m", "1h"])
+        checkpoint = tmp_path / "state.json"
+        inc = IncrementalAggregator(since=since, telemetry_dir=str(tmp_path), checkpoint_path=str(checkpoint),
+                                    bucket_seconds=rng.choice([1, 7, 60]), checkpoint_interval=0)
+
+        for step in range(60):
+            clock.now += timedelta(seconds=rng.uniform(0, 90))
+            writer.write(clock.now, rng.randint(0, 40))
+            assert inc.aggregate() == full(since, tmp_path), step
+            if rng.random() < 0.1:
+                # A restarted dashboard resumes from the checkpoint
+                inc = IncrementalAggregator(since=since, telemetry_dir=str(tmp_path), checkpoint_path=str(checkpoint),
+                                            bucket_seconds=inc.bucket_seconds, checkpoint_interval=0)
+                assert inc._files
+                assert inc.aggregate() == full(since, tmp_path), step
+
+    def test_retried_task_uses_latest_start(self, tmp_path, clock):
+        path = tmp_path / f"events-{START:%Y%m%d}.jsonl"
+        events = [
+            {"type": "orchestrator_started", "max_concurrency": 4, "ts": ts(START - timedelta(seconds=50))},
+            {"type": "task_started", "id": "a", "agent": "Coder", "ts": ts(START - timedelta(seconds=40))},
+            {"type": "heartbeat", "id": "a", "ts": ts(START - timedelta(seconds=30))},
+            {"type": "task_finished", "id": "a", "status": "failed", "ts": ts(START - timedelta(seconds=20))},
+            {"type": "task_started", "id": "a", "agent": "Coder", "ts": ts(START - timedelta(seconds=10))},
+            # Written late, but older than the retry: must not count for it
+            {"type": "heartbeat", "id": "a", "ts": ts(START - timedelta(seconds=35))},
+        ]
+        path.write_text("".join(json.dumps(e) + "\n" for e in events))
+        inc = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path))
+
+        summary = inc.aggregate()
+        assert summary == full("1h", tmp_path)
+        (running,) = summary["running_tasks"]
+        assert running["id"] == "a" and running["last_heartbeat_age_s"] is None
+        assert summary["resources"]["utilization"] == 0.25
+
+
+class TestCheckpoint:
+    """Test resuming from and recovering around the saved state."""
+
+    def test_resume_reads_only_new_lines(self, tmp_path, clock, monkeypatch):
+        writer = Writer(tmp_path, random.Random(1))
+        writer.rng.random = lambda: 0.5  # no partial or corrupt lines
+        checkpoint = tmp_path / "state.json"
+        writer.write(clock.now, 200)
+        first = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path), checkpoint_path=str(checkpoint))
+        first.aggregate()
+        first.close()
+        assert json.loads(checkpoint.read_text())["files"]
+
+        clock.now += timedelta(seconds=5)
+        writer.write(clock.now, 7)
+        applied = []
+        real_apply = IncrementalAggregator._apply_line
+
+        def spy(self, line, *args, **kwargs):
+            applied.append(line)
+            return real_apply(self, line, *args, **kwargs)
+
+        monkeypatch.setattr(IncrementalAggregator, "_apply_line", spy)
+        resumed = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path), checkpoint_path=str(checkpoint))
+        assert resumed.aggregate() == full("1h", tmp_path)
+        assert len(applied) == 7
+
+    def test_unusable_checkpoint_is_ignored(self, tmp_path, clock):
+        Writer(tmp_path, random.Random(2)).write(clock.now, 50)
+        checkpoint = tmp_path / "state.json"
+        for content in ("{broken", json.dumps({"version": 1, "since": "5m", "bucket_seconds": 60})):
+            checkpoint.write_text(content)
+            inc = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path), checkpoint_path=str(checkpoint))
+            assert inc.aggregate() == full("1h", tmp_path)
+
+    def test_replaced_truncated_and_removed_files(self, tmp_path, clock):
+        writer = Writer(tmp_path, random.Random(3))
+        writer.write(clock.now, 100)
+        inc = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path))
+        assert inc.aggregate() == full("1h", tmp_path)
+        path = max(tmp_path.glob("events-*.jsonl"), key=lambda p: p.stat().st_size)
+
+        # Same length, different first line
+        path.write_text(path.read_text().replace('"ts"', '"TS"', 1))
+        assert inc.aggregate() == full("1h", tmp_path)
+
+        path.write_text(path.read_text()[: path.stat().st_size // 3].rsplit("\n", 1)[0] + "\n")
+        assert inc.aggregate() == full("1h", tmp_path)
+
+        path.unlink()
+        assert inc.aggregate() == full("1h", tmp_path)
+
+    def test_window_moving_backwards_replays(self, tmp_path, clock):
+        writer = Writer(tmp_path, random.Random(4))
+        for _ in range(5):
+            clock.now += timedelta(minutes=3)
+            writer.write(clock.now, 30)
+        inc = IncrementalAggregator(since="5m", telemetry_dir=str(tmp_path))
+        assert inc.aggregate() == full("5m", tmp_path)
+        clock.now -= timedelta(minutes=6)
+        assert inc.aggregate() == full("5m", tmp_path)
+
+    def test_unterminated_event_counted_once(self, tmp_path, clock):
+        path = tmp_path / f"events-{START:%Y%m%d}.jsonl"
+        line = json.dumps({"type": "task_started", "id": "x", "ts": ts(START)})
+        path.write_text(line)
+        inc = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path))
+        assert inc.aggregate()["metrics"]["total_events"] == 1
+        with path.open("a") as f:
+            f.write("\n")
+        assert inc.aggregate() == full("1h", tmp_path)
+        assert inc.aggregate()["metrics"]["total_events"] == 1
+
+
+def fill_directory(directory: Path, target_bytes: int, days: int = 7) -> None:
+    """Random events spread evenly over `days` daily files."""
+    rng = random.Random(0)
+    sample = sum(len(json.dumps(random_event(rng, START))) + 1 for _ in range(1000)) / 1000
+    per_day = max(1, int(target_bytes / days / sample))
+    step = 86400 / per_day
+    for day in range(days):
+        end = START - timedelta(days=day)
+        with (directory / f"events-{end:%Y%m%d}.jsonl").open("w", encoding="utf-8") as f:
+            for i in range(per_day):
+                f.write(json.dumps(random_event(rng, end - timedelta(seconds=86400 - i * step))) + "\n")
+
+
+@pytest.mark.benchmark("size", [20 * 1024 * 1024], full=[1024 * 1024 * 1024])
+def test_watch_mode_cpu(tmp_path, clock, monkeypatch, size, benchmark_report):
+    """
+    Compare CPU time per 2-second dashboard refresh of a 1-hour window.
+
+    Between refreshes 50 events are appended.
+    """
+    monkeypatch.setattr(segment_index, "CHECKPOINT_BYTES", 64 * 1024)
+    fill_directory(tmp_path, size)
+    rng = random.Random(1)
+    path = tmp_path / f"events-{START:%Y%m%d}.jsonl"
+    inc = IncrementalAggregator(since="1h", telemetry_dir=str(tmp_path),
+                                checkpoint_path=str(tmp_path / "state.json"))
+    full("1h", tmp_path)  # build the segment indexes
+    inc.aggregate()
+
+    ticks = 10
+    cpu = {"full": 0.0, "incremental": 0.0}
+    for _ in range(ticks):
+        clock.now += timedelta(seconds=2)
+        with path.open("a", encoding="utf-8") as f:
+            for _ in range(50):
+                f.write(json.dumps(random_event(rng, clock.now - timedelta(seconds=rng.uniform(0, 2)))) + "\n")
+        start = time.process_time()
+        expected = full("1h", tmp_path)
+        cpu["full"] += time.process_time() - start
+        start = time.process_time()
+        summary = inc.aggregate()
+        cpu["incremental"] += time.process_time() - start
+        assert summary == expected
+
+    benchmark_report(
+        f"{size / 2**20:.0f} MiB: full {cpu['full'] / ticks * 1000:.1f}ms CPU/refresh, "
+        f"incremental {cpu['incremental'] / ticks * 1000:.1f}ms CPU/refresh"
+    )
+    assert cpu["incremental"] < cpu["full"]
@@ -0,0 +1,227 @@
+"""
+Tests for incremental learning consolidation.
+
+Verifies that LearningAggregates merge and subtract exactly, that
+IncrementalConsolidator and EnhancedMemoryStore.get_learning_patterns only
+process changed memories yet match a full recomputation after stores,
+updates and deletes, and that consolidation state survives a snapshot.
+"""
+
+import random
+from typing import Dict
+
+import pytest
+
+from agency_memory import EnhancedMemoryStore, Memory, VectorStore
+from agency_memory import consolidate_learnings as consolidate_source
+from agency_memory.learning import (
+    IncrementalConsolidator,
+    LearningAggregates,
+    consolidate_learnings,
+    memory_contribution,
+)
+from shared.type_definitions.json import JSONValue
+
+WORDS = ["Read", "Write", "Bash", "Grep", "success", "completed", "resolved", "permission",
+         "timeout", "missing", "git", "http", "error"]
+TAGS = ["tool", "tool_call", "error", "handoff", "agent", "notes", "session:a"]
+
+
+def make_store() -> EnhancedMemoryStore:
+    vector_store = VectorStore()
+    vector_store._embedding_function = None
+    return EnhancedMemoryStore(vector_store=vector_store)
+
+
+def mutate(store: EnhancedMemoryStore, rng: random.Random, steps: int) -> None:
+    for _ in range(steps):
+        if store._memories and rng.random() < 0.2:
+            store.delete(rng.choice(sorted(store._memories)))
+        else:
+            store.store(f"k{rng.randint(0, 60)}", " ".join(rng.sample(WORDS, 3)), rng.sample(TAGS, 2))
+
+
+def full(store: EnhancedMemoryStore) -> Dict[str, JSONValue]:
+    return without_time(consolidate_learnings(Memory(store).get_all()))
+
+
+def without_time(result: Dict[str, JSONValue]) -> Dict[str, JSONValue]:
+    result = dict(result)
+    result.pop("generated_at")
+    return result
+
+
+def memory(key, tags, timestamp="2026-01-05T10:00:00", content="text"):
+    return {"key": key, "content": content, "tags": tags, "timestamp": timestamp}
+
+
+class TestLearningAggregates:
+    """Test the mergeable counters."""
+
+    def test_merge_matches_single_pass(self):
+        rng = random.Random(3)
+        memories = [
+            memory(f"k{i}", rng.sample(TAGS, 2), f"2026-01-0{1 + i % 7}T{i % 24:02d}:00:00", rng.choice(WORDS))
+            for i in range(40)
+        ]
+        merged = LearningAggregates.from_memories(memories[:15]).merge(LearningAggregates.from_memories(memories[15:]))
+
+        assert without_time(merged.summarize()) == without_time(consolidate_learnings(memories))
+
+    def test_remove_restores_previous_counts(self):
+        aggregates = LearningAggregates.from_memories([memory("a", ["x", "y"])])
+        before = aggregates.to_dict()
+        extra = memory_contribution(memory("b", ["y", "z"], "2026-01-06T23:00:00", "error: boom"))
+        aggregates.add(extra)
+        aggregates.remove(extra)
+
+        assert aggregates.to_dict() == before
+        assert LearningAggregates.from_dict(before).to_dict() == before
+
+    def test_ties_do_not_depend_on_input_order(self):
+        memories = [
+            memory("a", ["beta"], "2026-01-06T14:00:00", "text"),
+            memory("b", ["alpha"], "2026-01-05T09:00:00", "error: x"),
+        ]
+        forward = without_time(consolidate_learnings(memories))
+
+        assert forward == without_time(consolidate_learnings(memories[::-1]))
+        assert forward["top_tags"][0]["tag"] == "alpha"
+        assert forward["patterns"]["peak_hour"] == 9
+        assert forward["patterns"]["peak_day"] == "Monday"
+
+
+class TestIncrementalConsolidator:
+    """Test consolidation from a store's change log."""
+
+    def test_matches_full_recomputation_through_updates_and_deletes(self):
+        rng = random.Random(7)
+        store = make_store()
+        consolidator = IncrementalConsolidator(store)
+        for _ in range(10):
+            mutate(store, rng, 25)
+            assert without_time(consolidator.consolidate()) == full(store)
+        assert len(consolidator) == len(store._memories)
+
+    def test_processes_only_changed_memories(self):
+        store = make_store()
+        for i in range(20):
+            store.store(f"k{i}", "Read completed", ["tool"])
+        consolidator = IncrementalConsolidator(store)
+
+        assert consolidator.update() == 20
+        assert consolidator.update() == 0
+        store.store("k3", "updated", ["notes"])
+        store.store("k3", "updated again", ["notes"])
+        store.delete("k4")
+        assert consolidator.update() == 2
+        assert without_time(consolidator.consolidate()) == full(store)
+
+    def test_compacted_change_log_triggers_rebuild(self):
+        store = make_store()
+        consolidator = IncrementalConsolidator(store)
+        store.store("keep", "kept", ["notes"])
+        consolidator.update()
+        for i in range(3000):
+            store.store(f"tmp{i}", "short lived", ["tool"])
+            store.delete(f"tmp{i}")
+
+        assert consolidator.high_water_mark < store._change_floor
+        assert without_time(consolidator.consolidate()) == full(store)
+        assert len(store._change_log) < 1100
+
+    def test_state_round_trip_resumes_from_mark(self):
+        rng = random.Random(11)
+        store = make_store()
+        mutate(store, rng, 50)
+        consolidator = IncrementalConsolidator(store)
+        consolidator.update()
+
+        resumed = IncrementalConsolidator.from_dict(store, consolidator.to_dict())
+        mutate(store, rng, 30)
+        assert without_time(resumed.consolidate()) == full(store)
+
+    def test_other_store_resets_state(self):
+        first = make_store()
+        first.store("a", "x", ["one"])
+        consolidator = IncrementalConsolidator(first)
+        consolidator.update()
+        state = consolidator.to_dict()
+
+        second = make_store()
+        second.store("b", "y", ["two"])
+        consolidator = IncrementalConsolidator.from_dict(second, state)
+        assert without_time(consolidator.consolidate()) == full(second)
+
+    def test_package_entry_point_uses_store_consolidator(self):
+        store = make_store()
+        store.store("a", "Read completed", ["tool"])
+        assert consolidate_source(store)["total_memories"] == 1
+        store.store("b", "Bash completed", ["tool"])
+        assert consolidate_source(Memory(store))["total_memories"] == 2
+        assert store.learning_consolidator is not None
+        assert "Total Memories: 2" in store.generate_learning_report("s")
+
+
+class TestIncrementalLearningPatterns:
+    """Test get_learning_patterns against a rebuilt pattern index."""
+
+    def test_matches_rebuild_through_updates_and_deletes(self):
+        rng = random.Random(5)
+        store = make_store()
+        for _ in range(8):
+            mutate(store, rng, 30)
+            incremental = store.get_learning_patterns(min_confidence=0.0)
+            store._pattern_index = None
+            assert incremental == store.get_learning_patterns(min_confidence=0.0)
+
+    def test_patterns_follow_deletes(self):
+        store = make_store()
+        for i in range(4):
+            store.store(f"r{i}", "Read completed", ["tool"])
+        patterns = store.get_learning_patterns(min_confidence=0.0)
+        assert [p["tool"] for p in patterns] == ["Read"]
+        assert [m["key"] for m in patterns[0]["evidence"]] == ["r3", "r2"]
+
+        store.delete("r3")
+        store.delete("r2")
+        assert store.get_learning_patterns(min_confidence=0.0) == []
+
+
+class TestSnapshotPersistence:
+    """Test consolidation state carried through snapshots."""
+
+    def test_restored_store_resumes_consolidation(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        rng = random.Random(13)
+        store = make_store()
+        mutate(store, rng, 60)
+        store.consolidate_learnings()
+        store.save_snapshot(path)
+
+        restored = make_store()
+        assert restored.load_snapshot(path)
+        assert restored.store_id == store.store_id
+        consolidator = restored.learning_consolidator
+        assert consolidator is not None
+        assert consolidator.update() == 0
+        assert restored.get_learning_patterns(0.0) == store.get_learning_patterns(0.0)
+
+        mutate(restored, rng, 20)
+        assert without_time(restored.consolidate_learnings()) == full(restored)
+
+    @pytest.mark.parametrize("section", ["changes", "learning"])
+    def test_snapshot_without_change_state_still_loads(self, tmp_path, section):
+        from agency_memory.snapshot import capture_store, write_snapshot
+
+        store = make_store()
+        store.store("a", "Read completed", ["tool"])
+        store.consolidate_learnings()
+        sections = capture_store(store)
+        del sections[section]
+        path = str(tmp_path / "memory.snap")
+        write_snapshot(path, sections)
+
+        restored = make_store()
+        assert restored.load_snapshot(path)
+        assert without_time(restored.consolidate_learnings()) == full(restored)
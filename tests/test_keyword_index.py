@@ -0,0 +1,197 @@
+"""
+Tests for the BM25 inverted keyword index behind VectorStore.keyword_search.
+
+Verifies BM25 term statistics under adds and removes, posting-list
+intersection, and that keyword/hybrid search read scores from the index
+instead of re-tokenizing the corpus on every query.
+"""
+
+import random
+import time
+
+import pytest
+
+from agency_memory.keyword_index import InvertedIndex, tokenize
+from agency_memory.vector_store import VectorStore
+
+
+def memory(key: str, content: str, tags=None):
+    return {"key": key, "content": content, "tags": tags or []}
+
+
+class TestInvertedIndex:
+    """Test InvertedIndex scoring and maintenance."""
+
+    def test_tokenize_strips_punctuation(self):
+        assert tokenize("Error: Timeout, retrying!") == ["error", "timeout", "retrying"]
+
+    def test_rare_terms_weigh_more(self):
+        index = InvertedIndex()
+        index.add("a", "database timeout error")
+        index.add("b", "database connection ok")
+        index.add("c", "database migration ok")
+
+        scores = index.score("database timeout")
+
+        assert set(scores) == {"a", "b", "c"}
+        assert scores["a"] > scores["b"] == pytest.approx(scores["c"])
+
+    def test_shorter_documents_score_higher(self):
+        index = InvertedIndex()
+        index.add("short", "cache miss")
+        index.add("long", "cache miss observed while warming the embedding store after restart")
+
+        scores = index.score("cache")
+
+        assert scores["short"] > scores["long"]
+
+    def test_remove_updates_postings_and_stats(self):
+        index = InvertedIndex()
+        index.add("a", "alpha beta")
+        index.add("b", "beta gamma")
+
+        assert index.remove("a")
+        assert not index.remove("a")
+
+        assert "a" not in index
+        assert index.document_frequency("alpha") == 0
+        assert index.document_frequency("beta") == 1
+        assert index.vocabulary_size == 2
+        assert set(index.score("alpha beta")) == {"b"}
+
+    def test_readding_replaces_text(self):
+        index = InvertedIndex()
+        index.add("a", "old words")
+        index.add("a", "new words")
+
+        assert index.score("old") == {}
+        assert set(index.score("new")) == {"a"}
+        assert len(index) == 1
+
+    def test_require_all_intersects_postings(self):
+        index = InvertedIndex()
+        index.add("a", "deploy failed timeout")
+        index.add("b", "deploy succeeded")
+        index.add("c", "timeout on login")
+
+        assert index.matching_keys(["deploy", "timeout"], require_all=True) == {"a"}
+        assert index.matching_keys(["deploy", "timeout"]) == {"a", "b", "c"}
+        assert set(index.score("deploy timeout", require_all=True)) == {"a"}
+
+    def test_candidates_restrict_scoring(self):
+        index = InvertedIndex()
+        for i in range(20):
+            index.add(f"k{i}", "shared term")
+
+        assert set(index.score("shared", candidates={"k1", "k2"})) == {"k1", "k2"}
+
+
+class TestVectorStoreKeywordSearch:
+    """Test VectorStore keyword and hybrid search on the inverted index."""
+
+    def test_scores_are_normalized(self):
+        store = VectorStore()
+        memories = [
+            memory("a", "flaky test retry"),
+            memory("b", "retry budget exhausted"),
+            memory("c", "unrelated"),
+        ]
+
+        results = store.keyword_search("flaky test retry", memories)
+
+        assert [r.memory["key"] for r in results] == ["a", "b"]
+        assert results[0].similarity_score == 1.0
+        assert 0.0 < results[1].similarity_score < 1.0
+        assert all(r.search_type == "keyword" for r in results)
+
+    def test_respects_memory_subset(self):
+        store = VectorStore()
+        memories = [memory(f"m{i}", "common words here") for i in range(10)]
+        for m in memories:
+            store.add_memory(m["key"], m)
+
+        results = store.keyword_search("common", memories[:3], top_k=10)
+
+        assert [r.memory["key"] for r in results] == ["m0", "m1", "m2"]
+
+    def test_require_all_terms(self):
+        store = VectorStore()
+        memories = [memory("a", "build failed"), memory("b", "build passed")]
+
+        results = store.keyword_search("build failed", memories, require_all_terms=True)
+
+        assert [r.memory["key"] for r in results] == ["a"]
+
+    def test_queries_do_not_retokenize_corpus(self, monkeypatch):
+        store = VectorStore()
+        memories = [memory(f"m{i}", f"note {i}") for i in range(50)]
+        for m in memories:
+            store.add_memory(m["key"], m)
+
+        calls = []
+        original = store._extract_searchable_text
+        monkeypatch.setattr(store, "_extract_searchable_text", lambda m: calls.append(m) or original(m))
+        store.keyword_search("note 7", memories)
+        store.hybrid_search("note 7", memories)
+
+        assert calls == []
+
+    def test_remove_memory_drops_postings(self):
+        store = VectorStore()
+        m = memory("gone", "ephemeral content")
+        store.add_memory("gone", m)
+        store.remove_memory("gone")
+
+        assert "gone" not in store._keyword_index
+        assert store.get_stats()["keyword_terms"] == 0
+
+    def test_hybrid_uses_index_scores(self):
+        store = VectorStore()
+        store._embedding_function = lambda texts: [[1.0, float(len(t) % 3)] for t in texts]
+        memories = [memory("a", "vector index tuning"), memory("b", "something else")]
+
+        results = store.hybrid_search("index tuning", memories, top_k=2)
+
+        assert results[0].memory["key"] == "a"
+        assert results[0].search_type == "hybrid"
+
+
+def _legacy_keyword_search(query, texts):
+    """Previous full-scan overlap scoring, for benchmark comparison."""
+    query_words = set(query.lower().split())
+    results = []
+    for key, text in texts.items():
+        overlap = query_words.intersection(text.lower().split())
+        if overlap:
+            results.append((key, len(overlap) / len(query_words)))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:10]
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_keyword_search_latency(size, benchmark_report):
+    """Report keyword_search latency against the previous full-corpus scan."""
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    memories = [
+        memory(f"m{i}", " ".join(rng.choice(vocabulary) for _ in range(20)))
+        for i in range(size)
+    ]
+    store = VectorStore()
+    for m in memories:
+        store.add_memory(m["key"], m)
+    texts = dict(store._memory_texts)
+    queries = [" ".join(rng.choice(vocabulary) for _ in range(3)) for _ in range(20)]
+
+    start = time.perf_counter()
+    for query in queries:
+        results = store.keyword_search(query, memories)
+    indexed = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    for query in queries:
+        _legacy_keyword_search(query, texts)
+    legacy = (time.perf_counter() - start) / len(queries)
+
+    assert results
+    benchmark_report(f"keyword search: {size} memories, index={indexed * 1000:.2f}ms, full scan={legacy * 1000:.2f}ms")
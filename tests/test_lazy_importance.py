@@ -0,0 +1,195 @@
+"""
+Tests for lazy time-decayed importance scoring in memory_v2.
+
+Verifies that importance derived from the stored log-domain terms matches
+AttentionMechanism.calculate_importance_score, that top-k ranking with a
+context matches a full recompute-and-sort while scoring relevance for few
+memories, and reports top-50 retrieval latency.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from agency_memory.memory_v2 import (
+    AttentionMechanism,
+    EnhancedInMemoryStore,
+    EnhancedMemoryRecord,
+    MemoryContent,
+    MemoryMetadata,
+    MemoryModality,
+    MemoryPriority,
+    MemoryType,
+)
+
+
+def make_record(key, rng, now, agent_id="a"):
+    accessed = now - timedelta(hours=rng.uniform(0, 200))
+    words = " ".join(f"w{rng.randrange(200)}" for _ in range(8))
+    content = MemoryContent(raw_content=words, content_type="str", text_representation=words)
+    if rng.random() < 0.5:
+        content.embeddings = {"text": [0.1, 0.2]}
+    return EnhancedMemoryRecord(
+        metadata=MemoryMetadata(
+            key=key,
+            agent_id=agent_id,
+            memory_type=MemoryType.EPISODIC,
+            modality=MemoryModality.TEXT,
+            priority=rng.choice(list(MemoryPriority)),
+            tags=["t"],
+            timestamp=accessed.isoformat(),
+            last_accessed=accessed.isoformat(),
+            access_count=rng.randrange(150),
+            importance_score=0.0,
+            is_shared=False,
+        ),
+        content=content,
+    )
+
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [make_record(f"m{i}", rng, now) for i in range(count)]
+
+
+def full_ranking(attention, memories, context=None):
+    """Previous approach: recompute every score, then sort."""
+    scored = [(m, attention.calculate_importance_score(m, context)) for m in memories]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+class TestDerivedImportance:
+    """Test O(1) and batch importance against the full calculation."""
+
+    def test_current_importance_matches_calculation(self):
+        attention = AttentionMechanism()
+        for memory in make_records(50):
+            attention.update_memory_importance(memory)
+            later = datetime.now() + timedelta(hours=5)
+
+            expected = attention.calculate_importance_score(memory)
+            assert memory.metadata.importance_score == pytest.approx(expected, abs=1e-6)
+            assert attention.current_importance(memory) == pytest.approx(expected, abs=1e-6)
+            assert attention.current_importance(memory, now=later) < expected
+
+    def test_batch_matches_single(self):
+        attention = AttentionMechanism()
+        memories = make_records(100)
+        now = datetime.now()
+
+        batch = attention.batch_importance(memories, now=now)
+
+        assert batch == pytest.approx([attention.current_importance(m, now=now) for m in memories])
+
+    def test_terms_are_computed_on_demand(self):
+        attention = AttentionMechanism()
+        memory = make_records(1)[0]
+        assert memory.metadata.importance_base is None
+
+        score = attention.current_importance(memory)
+
+        assert memory.metadata.importance_log_recency is not None
+        assert score == pytest.approx(attention.calculate_importance_score(memory), abs=1e-6)
+
+    def test_terms_survive_dict_round_trip(self):
+        attention = AttentionMechanism()
+        memory = make_records(1)[0]
+        attention.update_memory_importance(memory)
+
+        restored = EnhancedMemoryRecord.from_dict(memory.to_dict())
+
+        assert restored.metadata.importance_base == memory.metadata.importance_base
+        assert attention.current_importance(restored) == pytest.approx(
+            attention.current_importance(memory)
+        )
+
+
+class TestTopMemories:
+    """Test top-k ranking equivalence."""
+
+    @pytest.mark.parametrize("context", [None, "w1 w2 w3 w4 w5"])
+    def test_matches_full_ranking(self, context):
+        attention = AttentionMechanism()
+        memories = make_records(500)
+
+        top = attention.top_memories(memories, 50, current_context=context)
+        expected = full_ranking(attention, memories, context)[:50]
+
+        assert [m.metadata.key for m, _ in top] == [m.metadata.key for m, _ in expected]
+        assert [score for _, score in top] == pytest.approx([score for _, score in expected])
+
+    def test_relevance_only_scored_for_contenders(self, monkeypatch):
+        attention = AttentionMechanism()
+        memories = make_records(2000)
+        calls = []
+        similarity = attention._calculate_semantic_similarity
+        monkeypatch.setattr(
+            attention,
+            "_calculate_semantic_similarity",
+            lambda context, text: calls.append(text) or similarity(context, text),
+        )
+
+        attention.top_memories(memories, 10, current_context="w1 w2")
+
+        assert 0 < len(calls) < 1000
+
+    def test_min_importance_and_limit(self):
+        attention = AttentionMechanism()
+        memories = make_records(100)
+        now = datetime.now()
+        floor = sorted(attention.batch_importance(memories, now=now))[60]
+
+        top = attention.top_memories(memories, 100, min_importance=floor, now=now)
+
+        assert len(top) == 40
+        assert attention.top_memories(memories, 0) == []
+
+
+class TestStoreRanking:
+    """Test EnhancedInMemoryStore ranking by current importance."""
+
+    def test_search_ranks_by_current_importance(self):
+        store = EnhancedInMemoryStore()
+        memories = make_records(200)
+        for memory in memories:
+            store.store_memory(memory)
+
+        results = store.search_memories("a", tags=["t"], limit=20)
+        expected = full_ranking(store.attention_mechanism, memories)[:20]
+
+        assert [m.metadata.key for m in results] == [m.metadata.key for m, _ in expected]
+
+    def test_agent_memories_sorted_by_current_importance(self):
+        store = EnhancedInMemoryStore()
+        for memory in make_records(50):
+            store.store_memory(memory)
+
+        memories = store.get_agent_memories("a")
+        scores = store.attention_mechanism.batch_importance(memories)
+
+        assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_top50_latency(size, benchmark_report):
+    """Report top-50 retrieval latency against recomputing every score."""
+    attention = AttentionMechanism()
+    memories = make_records(size)
+    for memory in memories:
+        attention.update_memory_importance(memory)
+    context = "w1 w2 w3"
+
+    start = time.perf_counter()
+    top = attention.top_memories(memories, 50, current_context=context)
+    lazy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = full_ranking(attention, memories, context)[:50]
+    full = time.perf_counter() - start
+
+    assert [m.metadata.key for m, _ in top] == [m.metadata.key for m, _ in expected]
+    benchmark_report(f"top-50 importance: {size} memories, lazy={lazy * 1000:.1f}ms, recompute={full * 1000:.1f}ms")
@@ -0,0 +1,226 @@
+"""
+Tests for the asynchronous learning pipeline.
+
+Verifies that LearningPipeline batches queued items onto worker threads,
+applies its backpressure policies, and that flush() is a barrier; and that
+EnhancedMemoryStore.store hands embedding and learning trigger evaluation
+to the pipeline while searches and snapshots still see every write.
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore
+from agency_memory.learning_pipeline import LearningPipeline
+from agency_memory.vector_store import VectorStore
+
+
+class Recorder:
+    """Handler that records batches and can be held shut."""
+
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, items):
+        self.gate.wait(5)
+        self.threads.add(threading.get_ident())
+        self.batches.append(list(items))
+
+    @property
+    def items(self):
+        return [item for batch in self.batches for item in batch]
+
+
+class SlowEmbedder:
+    """Deterministic embedding function that records its calling threads."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.threads = set()
+
+    def __call__(self, texts):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(8)])
+        return vectors
+
+
+def make_store(embedder=None) -> EnhancedMemoryStore:
+    vector_store = VectorStore()
+    vector_store._embedding_function = embedder or SlowEmbedder()
+    vector_store._embedding_cache = None
+    return EnhancedMemoryStore(vector_store=vector_store)
+
+
+class TestLearningPipeline:
+    """Test queueing, batching and backpressure."""
+
+    def test_workers_process_batches_in_order(self):
+        recorder = Recorder()
+        recorder.gate.clear()
+        pipeline = LearningPipeline(recorder, batch_size=4).start()
+        for i in range(10):
+            assert pipeline.submit(i)
+        assert pipeline.metrics()["depth"] >= 9
+        recorder.gate.set()
+
+        assert pipeline.flush(timeout=5)
+        assert recorder.items == list(range(10))
+        assert max(len(batch) for batch in recorder.batches) <= 4
+        assert threading.get_ident() not in recorder.threads
+        metrics = pipeline.metrics()
+        assert metrics["processed"] == 10 and metrics["depth"] == 0
+        assert metrics["max_lag_seconds"] > 0
+        pipeline.stop()
+
+    def test_flush_times_out_while_blocked(self):
+        recorder = Recorder()
+        recorder.gate.clear()
+        pipeline = LearningPipeline(recorder).start()
+        pipeline.submit("x")
+
+        assert not pipeline.flush(timeout=0.05)
+        recorder.gate.set()
+        assert pipeline.flush(timeout=5)
+        pipeline.stop()
+
+    def test_drop_oldest_and_inline_policies(self):
+        recorder = Recorder()
+        recorder.gate.clear()
+        dropping = LearningPipeline(recorder, max_queue=2, backpressure="drop_oldest").start()
+        dropping.submit("busy")
+        while dropping.metrics()["in_flight"] == 0:
+            time.sleep(0.001)
+        for item in ("a", "b", "c"):
+            dropping.submit(item)
+        assert dropping.metrics()["dropped"] == 1
+        recorder.gate.set()
+        dropping.stop()
+        assert recorder.items == ["busy", "b", "c"]
+
+        release = threading.Event()
+        handled = []
+
+        def hold_first(items):
+            if "busy" in items:
+                release.wait(5)
+            handled.append((threading.get_ident(), list(items)))
+
+        inline = LearningPipeline(hold_first, max_queue=1, backpressure="inline").start()
+        inline.submit("busy")
+        while inline.metrics()["in_flight"] == 0:
+            time.sleep(0.001)
+        assert inline.submit("queued")
+        assert not inline.submit("overflow")
+        assert handled == [(threading.get_ident(), ["overflow"])]
+        release.set()
+        inline.stop()
+        assert inline.metrics()["inline"] == 1 and inline.metrics()["processed"] == 2
+
+    def test_blocking_submit_waits_for_room(self):
+        recorder = Recorder()
+        recorder.gate.clear()
+        pipeline = LearningPipeline(recorder, max_queue=1, batch_size=1).start()
+        pipeline.submit(0)
+        pipeline.submit(1)
+        threading.Timer(0.05, recorder.gate.set).start()
+
+        start = time.perf_counter()
+        pipeline.submit(2)
+        assert time.perf_counter() - start >= 0.04
+        pipeline.stop()
+        assert recorder.items == [0, 1, 2]
+
+    def test_not_started_runs_inline(self):
+        recorder = Recorder()
+        pipeline = LearningPipeline(recorder)
+
+        assert not pipeline.submit("x")
+        assert recorder.items == ["x"] and threading.get_ident() in recorder.threads
+        with pytest.raises(ValueError):
+            LearningPipeline(recorder, backpressure="sometimes")
+
+
+class TestStoreLearningPipeline:
+    """Test EnhancedMemoryStore with a learning pipeline."""
+
+    def test_store_returns_before_embedding(self):
+        embedder = SlowEmbedder(delay=0.2)
+        store = make_store(embedder)
+        store.start_learning_pipeline()
+
+        start = time.perf_counter()
+        store.store("k", "slow to embed", ["tool"])
+        assert time.perf_counter() - start < 0.1
+        assert store.search(["tool"]).total_count == 1
+
+        # Searches wait for the queued embedding instead of missing it
+        results = store.semantic_search("slow to embed", min_similarity=-1.0)
+        assert [m["key"] for m in results] == ["k"]
+        assert results[0]["search_type"] != "keyword"
+        # Only the query was embedded on the calling thread
+        assert len(embedder.threads) == 2
+        store.stop_learning_pipeline()
+
+    def test_triggers_match_synchronous_store(self):
+        items = [(f"k{i}", "resolved it" if i % 7 == 0 else f"note {i}", ["error"] if i % 7 == 0 else ["note"])
+                 for i in range(120)]
+        sync = make_store()
+        for item in items:
+            sync.store(*item)
+
+        background = make_store()
+        background.start_learning_pipeline(workers=2, batch_size=8)
+        for item in items:
+            background.store(*item)
+        assert background.flush_learning(timeout=5)
+
+        def triggers(store):
+            return sorted((t["trigger_key"], t["memory_count"]) for t in store.get_learning_triggers())
+
+        assert triggers(background) == triggers(sync)
+        assert background.get_learning_pipeline_stats()["processed"] == 120
+        background.stop_learning_pipeline()
+        assert background.get_learning_pipeline_stats() == {"running": False}
+
+    def test_deleted_before_processing_is_not_embedded(self):
+        embedder = SlowEmbedder()
+        store = make_store(embedder)
+        pipeline = store.start_learning_pipeline()
+        gate = threading.Event()
+        handler = pipeline.handler
+        pipeline.handler = lambda batch: (gate.wait(5), handler(batch))
+        store.store("gone", "short lived", ["tmp"])
+        store.store("kept", "stays", ["tmp"])
+        store.delete("gone")
+        gate.set()
+        store.flush_learning(timeout=5)
+
+        assert "gone" not in store.vector_store._embeddings
+        assert "gone" not in store.vector_store._memory_records
+        assert "kept" in store.vector_store._embeddings
+        store.stop_learning_pipeline()
+
+    def test_snapshot_waits_for_queued_writes(self, tmp_path):
+        store = make_store(SlowEmbedder(delay=0.01))
+        store.start_learning_pipeline()
+        for i in range(20):
+            store.store(f"k{i}", f"memory {i}", ["all"])
+        path = str(tmp_path / "memory.snap")
+        store.save_snapshot(path)
+        store.stop_learning_pipeline()
+
+        embedder = SlowEmbedder()
+        restored = make_store(embedder)
+        assert restored.load_snapshot(path)
+        restored.vector_store.flush()
+        assert embedder.threads == set()
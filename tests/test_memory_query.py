@@ -0,0 +1,262 @@
+"""
+Tests for structured memory queries pushed down to the stores.
+
+Verifies AND/OR/exclude tag filters, time windows, agent scoping, limits and
+cursor pagination across the indexed stores and the generic fallback, and
+that AgentContext.search_memories keeps its previous semantics.
+"""
+
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore
+from agency_memory.memory import InMemoryStore, Memory, MemoryStore
+from agency_memory.swarm_memory import SwarmMemory, SwarmMemoryStore
+from agency_memory.tag_index import TagIndex
+from agency_memory.vector_store import VectorStore
+from shared.agent_context import AgentContext
+from shared.models.memory import MemoryQuery
+
+BASE = datetime(2026, 1, 1)
+
+
+class FallbackStore(MemoryStore):
+    """Store without a native query, exercising MemoryStore.query."""
+
+    def __init__(self):
+        self._inner = InMemoryStore()
+
+    def store(self, key, content, tags):
+        self._inner.store(key, content, tags)
+
+    def search(self, tags):
+        return self._inner.search(tags)
+
+    def get_all(self):
+        return self._inner.get_all()
+
+
+def make_store(kind):
+    if kind == "memory":
+        return InMemoryStore()
+    if kind == "enhanced":
+        return EnhancedMemoryStore(vector_store=VectorStore())
+    if kind == "swarm":
+        return SwarmMemoryStore(max_memories_per_agent=10_000)
+    return FallbackStore()
+
+
+def fill(store, count=30):
+    """Store count memories tagged by residue; every 5th is an error."""
+    for i in range(count):
+        tags = ["session:s", f"mod3:{i % 3}"]
+        if i % 5 == 0:
+            tags.append("error")
+        store.store(f"k{i}", i, tags)
+    return store
+
+
+def keys(records):
+    return [r.key for r in records]
+
+
+STORE_KINDS = ["memory", "enhanced", "swarm", "fallback"]
+
+
+class TestStoreQuery:
+    """Test MemoryStore.query across backends."""
+
+    @pytest.mark.parametrize("kind", STORE_KINDS)
+    def test_tag_filters(self, kind):
+        store = fill(make_store(kind))
+        newest_first = [f"k{i}" for i in reversed(range(30))]
+
+        query = MemoryQuery(all_tags=["session:s", "mod3:0"], exclude_tags=["error"])
+        expected = [k for k in newest_first if int(k[1:]) % 3 == 0 and int(k[1:]) % 5 != 0]
+        assert keys(store.query(query)) == expected
+
+        query = MemoryQuery(any_tags=["mod3:1", "error"])
+        expected = [k for k in newest_first if int(k[1:]) % 3 == 1 or int(k[1:]) % 5 == 0]
+        assert keys(store.query(query)) == expected
+
+        assert keys(store.query(MemoryQuery())) == newest_first
+
+    @pytest.mark.parametrize("kind", STORE_KINDS)
+    def test_cursor_pages_cover_results_once(self, kind):
+        store = fill(make_store(kind))
+        query = MemoryQuery(all_tags=["session:s"], exclude_tags=["error"], limit=4)
+
+        seen = []
+        while True:
+            page = list(store.query(query))
+            seen.extend(keys(page))
+            if len(page) < 4:
+                break
+            query = query.next_page(page[-1])
+
+        assert seen == keys(store.query(MemoryQuery(exclude_tags=["error"])))
+
+    @pytest.mark.parametrize("kind", ["memory", "enhanced", "fallback"])
+    def test_cursor_survives_deleting_last_record(self, kind):
+        store = fill(make_store(kind))
+        first = list(store.query(MemoryQuery(limit=3)))
+        inner = store._inner if kind == "fallback" else store
+        inner.delete(first[-1].key)
+
+        second = list(store.query(MemoryQuery(limit=3).next_page(first[-1])))
+
+        assert keys(second) == ["k26", "k25", "k24"]
+
+    @pytest.mark.parametrize("kind", STORE_KINDS)
+    def test_time_window(self, kind):
+        store = fill(make_store(kind), count=5)
+        records = list(store.query(MemoryQuery()))
+        # Timestamps are wall-clock; pick bounds from the stored records
+        since, until = records[3].timestamp, records[1].timestamp
+
+        window = store.query(MemoryQuery(since=since, until=until))
+
+        assert keys(window) == keys(records[1:4])
+
+    def test_agent_scoping(self):
+        store = SwarmMemoryStore()
+        store.store("k", "mine", ["t"], agent_id="a")
+        store.store("k", "theirs", ["t"], agent_id="b")
+
+        assert [r.content for r in store.query(MemoryQuery(all_tags=["t"], agent_id="a"))] == ["mine"]
+        assert len(list(store.query(MemoryQuery(all_tags=["t"])))) == 2
+
+    def test_swarm_query_is_read_only(self):
+        store = SwarmMemoryStore()
+        store.store("k", "v", ["t"], agent_id="a")
+
+        list(store.query(MemoryQuery(all_tags=["t"])))
+
+        assert store._memories["a:k"]["access_count"] == 0
+
+    def test_invalid_cursor_rejected(self):
+        with pytest.raises(ValueError):
+            list(InMemoryStore().query(MemoryQuery(cursor="not a cursor")))
+
+    def test_query_is_lazy(self):
+        store = fill(InMemoryStore(), count=200)
+        calls = []
+        original = store._memories.__class__.__getitem__
+        memories = store._memories
+
+        class CountingDict(dict):
+            def __getitem__(self, key):
+                calls.append(key)
+                return original(self, key)
+
+        store._memories = CountingDict(memories)
+
+        assert keys(islice(store.query(MemoryQuery(all_tags=["session:s"])), 2)) == ["k199", "k198"]
+        assert len(calls) == 2
+
+
+class TestTagIndexQuery:
+    """Test TagIndex.iter_query bounds."""
+
+    def test_sparse_and_dense_paths_agree(self):
+        index = TagIndex()
+        for i in range(400):
+            tags = ["all"] + (["rare"] if i % 50 == 0 else [])
+            index.add(f"k{i}", tags, BASE + timedelta(seconds=i // 2))
+
+        since, until = BASE + timedelta(seconds=20), BASE + timedelta(seconds=150)
+        rare = list(index.iter_query(all_tags=["rare"], since=since, until=until))
+        dense = [k for k in index.iter_query(all_tags=["all"], since=since, until=until) if k in index.match(["rare"])]
+
+        assert rare == dense == ["k300", "k250", "k200", "k150", "k100", "k50"]
+
+    def test_cursor_on_equal_timestamps(self):
+        index = TagIndex()
+        for key in ["a", "b", "c"]:
+            index.add(key, ["t"], BASE)
+
+        assert list(index.iter_query(after=(BASE, "a"))) == ["b", "c"]
+        assert list(index.iter_query(after=(BASE, "gone"))) == []
+
+
+class TestAgentContextQuery:
+    """Test AgentContext search on top of the query pushdown."""
+
+    def test_search_memories_semantics(self):
+        context = AgentContext(session_id="s1")
+        other = AgentContext(memory=context.memory, session_id="s2")
+        context.store_memory("ok", "ran", ["tool"])
+        context.store_memory("bad", "failed", ["tool", "error"])
+        context.store_memory("note", "n", ["note"])
+        other.store_memory("elsewhere", "x", ["tool"])
+
+        assert [m["key"] for m in context.search_memories(["tool"])] == ["ok"]
+        assert [m["key"] for m in context.search_memories(["tool", "error"])] == ["bad"]
+        assert [m["key"] for m in context.search_memories([])] == ["note", "bad", "ok"]
+        assert {m["key"] for m in context.search_memories(["tool"], include_session=False)} == {"ok", "elsewhere"}
+        assert [m["key"] for m in context.search_memories([], limit=1)] == ["note"]
+        assert context.search_memories([], limit=0) == []
+        assert context.search_memories([], limit=-1) == []
+
+    def test_query_memories_pages_dicts(self):
+        context = AgentContext(session_id="s1")
+        for i in range(5):
+            context.store_memory(f"k{i}", i, ["step"])
+
+        query = context.build_memory_query(["step"], limit=2)
+        first = list(context.query_memories(query))
+        second = list(context.query_memories(query.next_page(first[-1])))
+
+        assert [m["key"] for m in first + second] == ["k4", "k3", "k2", "k1"]
+
+    def test_swarm_memory_query_defaults_to_own_agent(self):
+        store = SwarmMemoryStore()
+        mine = SwarmMemory(store=store, agent_id="a")
+        SwarmMemory(store=store, agent_id="b").store("k", "theirs", ["t"])
+        mine.store("k", "mine", ["t"])
+
+        results = list(mine.query(MemoryQuery(all_tags=["t"])))
+
+        assert [m["content"] for m in results] == ["mine"]
+        assert results[0]["agent_id"] == "a"
+
+    def test_plain_memory_uses_store_query(self):
+        memory = Memory(FallbackStore())
+        memory.store("k", "v", ["t"])
+
+        assert [m["key"] for m in memory.query(MemoryQuery(any_tags=["t"]))] == ["k"]
+
+
+def legacy_search_memories(context, tags):
+    """Previous implementation: scan the whole session, filter and sort."""
+    candidates = context.memory.search([f"session:{context.session_id}"])
+    results = [m for m in candidates if set(tags).issubset(m.get("tags", []))]
+    results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+    return results
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_session_query_latency(size, benchmark_report):
+    """
+    Report "newest 20 tool memories" latency in a large session against the
+    previous materialize-and-filter implementation.
+    """
+    context = AgentContext(session_id="bench")
+    for i in range(size):
+        context.store_memory(f"k{i}", i, ["tool" if i % 10 == 0 else "note"])
+
+    start = time.perf_counter()
+    for _ in range(20):
+        pushed = context.search_memories(["tool"], limit=20)
+    pushed_ms = (time.perf_counter() - start) / 20 * 1000
+
+    start = time.perf_counter()
+    for _ in range(3):
+        legacy = legacy_search_memories(context, ["tool"])[:20]
+    legacy_ms = (time.perf_counter() - start) / 3 * 1000
+
+    assert [m["key"] for m in pushed] == [m["key"] for m in legacy]
+    benchmark_report(f"session query: {size} memories, pushdown={pushed_ms:.2f}ms, legacy={legacy_ms:.1f}ms")
@@ -0,0 +1,264 @@
+"""
+Tests for memory store snapshots and warm restore.
+
+Verifies that EnhancedMemoryStore snapshots round-trip records, embeddings,
+IVF lists and learning triggers without re-embedding, that damaged snapshots
+are rejected without touching the store, and that the background scheduler
+only rewrites snapshots when the store changed.
+"""
+
+import os
+import random
+import time
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore, create_enhanced_memory_store
+from agency_memory.snapshot import SnapshotError, SnapshotReader, SnapshotScheduler, write_snapshot
+from agency_memory.vector_store import VectorStore
+
+
+class CountingEmbedder:
+    """Deterministic embedding function that counts embedded texts."""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+        self.embedded = 0
+
+    def __call__(self, texts):
+        self.embedded += len(texts)
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(self.dim)])
+        return vectors
+
+
+def make_store(backend="python", embedder=None, **options) -> EnhancedMemoryStore:
+    vector_store = VectorStore(index_backend=backend, index_options=options or None)
+    vector_store._embedding_function = embedder or CountingEmbedder()
+    return EnhancedMemoryStore(vector_store=vector_store)
+
+
+def fill(store, count):
+    store.store_batch(
+        (f"k{i}", f"memory {i} about topic {i % 7}", [f"t{i % 5}", "all"]) for i in range(count)
+    )
+
+
+def semantic_keys(store, query="memory 3 about topic 3"):
+    return [m["key"] for m in store.semantic_search(query, top_k=5, min_similarity=-1.0)]
+
+
+class TestSnapshotFile:
+    """Test the snapshot container format."""
+
+    def test_sections_round_trip_aligned(self, tmp_path):
+        path = str(tmp_path / "s.snap")
+        write_snapshot(path, {"a": b'{"x": 1}', "b": bytes(range(7))})
+
+        reader = SnapshotReader(path)
+        assert reader.sections == ["a", "b"]
+        assert reader.json("a") == {"x": 1}
+        assert all(offset % 64 == 0 for offset, _ in reader._sections.values())
+
+    @pytest.mark.parametrize("damage", ["truncate", "flip", "garbage", "empty", "version"])
+    def test_damaged_files_rejected(self, tmp_path, damage):
+        path = str(tmp_path / "s.snap")
+        write_snapshot(path, {"a": b'{"x": 1}', "b": bytes(1000)})
+        data = bytearray(open(path, "rb").read())
+        if damage == "truncate":
+            data = data[:-10]
+        elif damage == "flip":
+            data[-5] ^= 0xFF
+        elif damage == "garbage":
+            data = bytearray(b"not a snapshot at all" * 10)
+        elif damage == "empty":
+            data = bytearray()
+        else:
+            data[8] = 99
+        with open(path, "wb") as f:
+            f.write(data)
+
+        with pytest.raises(SnapshotError):
+            SnapshotReader(path)
+
+
+class TestWarmRestore:
+    """Test EnhancedMemoryStore save/load."""
+
+    @pytest.mark.parametrize("backend", ["python", "matrix"])
+    def test_restore_reuses_embeddings(self, tmp_path, backend):
+        if backend == "matrix":
+            pytest.importorskip("numpy")
+        path = str(tmp_path / "memory.snap")
+        original = make_store(backend)
+        fill(original, 60)
+        original.save_snapshot(path)
+
+        embedder = CountingEmbedder()
+        restored = make_store(backend, embedder)
+        assert restored.load_snapshot(path)
+        restored.vector_store.flush()
+
+        assert embedder.embedded == 0
+        assert restored.search(["t2"]).total_count == 12
+        assert restored.get_learning_triggers() == original.get_learning_triggers()
+        assert semantic_keys(restored) == semantic_keys(original)
+        assert restored._tag_index.query(["t2"], limit=5) == original._tag_index.query(["t2"], limit=5)
+        assert restored.vector_store._keyword_index.score("topic 3") == pytest.approx(
+            original.vector_store._keyword_index.score("topic 3")
+        )
+
+    def test_matrix_rows_are_memory_mapped(self, tmp_path):
+        pytest.importorskip("numpy")
+        path = str(tmp_path / "memory.snap")
+        original = make_store("matrix")
+        fill(original, 20)
+        original.save_snapshot(path)
+
+        restored = make_store("matrix")
+        restored.load_snapshot(path)
+        matrix = restored.vector_store._embeddings
+
+        assert not matrix._matrix.flags.owndata
+        restored.store("extra", "new memory", ["all"])
+        restored.delete("k0")
+        assert semantic_keys(restored, "new memory")[0] == "extra"
+        # Writes never reach the snapshot file
+        assert SnapshotReader(path).json("keys")[0] == "k0"
+
+    def test_ivf_lists_restored_without_training(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        path = str(tmp_path / "memory.snap")
+        original = make_store("ivf", n_lists=4, n_probe=2, exact_threshold=50)
+        fill(original, 200)
+        original.vector_store.flush()
+        original.save_snapshot(path)
+
+        restored = make_store("ivf", n_lists=4, n_probe=2, exact_threshold=50)
+        restored.vector_store._embeddings.train = lambda: pytest.fail("retrained")
+        restored.load_snapshot(path)
+        index = restored.vector_store._embeddings
+
+        assert index.is_trained
+        assert np.allclose(index._centroids, original.vector_store._embeddings._centroids)
+        assert semantic_keys(restored) == semantic_keys(original)
+
+    def test_unembedded_and_foreign_model_memories_are_requeued(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        original = make_store()
+        fill(original, 10)
+        original.store("late", "queued but never embedded", ["all"])
+        assert "late" in original.vector_store._pending_texts
+        original.save_snapshot(path)
+
+        embedder = CountingEmbedder()
+        restored = make_store(embedder=embedder)
+        restored.load_snapshot(path)
+        restored.vector_store.flush()
+        assert embedder.embedded == 1
+
+        embedder = CountingEmbedder()
+        other_model = make_store(embedder=embedder)
+        other_model.vector_store._embedding_model_name = "another-model"
+        other_model.load_snapshot(path)
+        other_model.vector_store.flush()
+        assert embedder.embedded == 11
+
+    def test_corrupted_snapshot_leaves_store_untouched(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        original = make_store()
+        fill(original, 10)
+        original.save_snapshot(path)
+        with open(path, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"\xff\xff\xff")
+
+        store = make_store()
+        assert not store.load_snapshot(path)
+        assert not store.load_snapshot(str(tmp_path / "missing.snap"))
+        assert store.get_all().total_count == 0
+        assert len(store.vector_store._memory_records) == 0
+
+    def test_load_requires_empty_store(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        store = make_store()
+        fill(store, 3)
+        store.save_snapshot(path)
+
+        with pytest.raises(ValueError):
+            store.load_snapshot(path)
+
+
+class TestSnapshotScheduler:
+    """Test background snapshot writing."""
+
+    def test_writes_only_after_changes(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        store = make_store()
+        scheduler = SnapshotScheduler(store, path, interval_seconds=60)
+
+        assert scheduler.snapshot_now()
+        assert not scheduler.snapshot_now()
+        store.store("k", "v", ["t"])
+        assert scheduler.snapshot_now()
+        assert scheduler.snapshots_written == 2
+
+    def test_background_thread_and_final_snapshot(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        store = make_store()
+        scheduler = store.start_snapshots(path, interval_seconds=0.01)
+        fill(store, 5)
+        deadline = time.time() + 5
+        while not os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.01)
+        store.store("last", "written on stop", ["all"])
+        scheduler.stop()
+
+        restored = make_store()
+        assert restored.load_snapshot(path)
+        assert restored.search(["all"]).total_count == 6
+
+    def test_factory_restores_from_snapshot(self, tmp_path):
+        path = str(tmp_path / "memory.snap")
+        store = make_store()
+        fill(store, 4)
+        store.save_snapshot(path)
+
+        restored = create_enhanced_memory_store(embedding_provider=None, snapshot_path=path)
+        assert restored.search(["all"]).total_count == 4
+
+
+@pytest.mark.benchmark("size", [2_000], full=[100_000])
+def test_warm_restore_vs_cold_rebuild(tmp_path, size, benchmark_report):
+    """
+    Compare restoring a snapshot with rebuilding the store from its records.
+
+    The fake embedder is far cheaper than a real model, so the measured
+    speedup understates the production gain.
+    """
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "memory.snap")
+    original = make_store("matrix")
+    fill(original, size)
+    original.vector_store.flush()
+    original.save_snapshot(path)
+
+    start = time.perf_counter()
+    cold = make_store("matrix")
+    fill(cold, size)
+    cold.vector_store.flush()
+    cold_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm = make_store("matrix")
+    assert warm.load_snapshot(path)
+    warm_seconds = time.perf_counter() - start
+
+    assert len(warm.vector_store._embeddings) == size
+    assert warm_seconds < cold_seconds
+    benchmark_report(
+        f"{size} memories: cold rebuild {cold_seconds:.3f}s, warm restore {warm_seconds:.3f}s "
+        f"({os.path.getsize(path) / 1e6:.1f} MB snapshot)"
+    )
@@ -0,0 +1,207 @@
+"""
+Tests for MinHash/LSH candidate generation in SemanticMemoryClusterer.
+
+Verifies band selection and incremental index maintenance, that LSH
+clustering agrees with the exhaustive pairwise scan within a configurable
+tolerance, and reports clustering time for both.
+"""
+
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import combinations
+
+import pytest
+
+from agency_memory.memory_v2 import (
+    EnhancedInMemoryStore,
+    EnhancedMemoryRecord,
+    MemoryContent,
+    MemoryMetadata,
+    MemoryModality,
+    MemoryPriority,
+    MemoryType,
+    SemanticMemoryClusterer,
+)
+from agency_memory.minhash_lsh import MinHashLSH, choose_bands
+
+# Largest fraction of memory pairs whose co-clustering may differ from the
+# exhaustive scan
+CLUSTER_TOLERANCE = float(os.getenv("AGENCY_LSH_CLUSTER_TOLERANCE", "0.01"))
+
+
+def make_record(key, text, tags, timestamp, agent_id="a"):
+    return EnhancedMemoryRecord(
+        metadata=MemoryMetadata(
+            key=key,
+            agent_id=agent_id,
+            memory_type=MemoryType.EPISODIC,
+            modality=MemoryModality.TEXT,
+            priority=MemoryPriority.LOW,
+            tags=tags,
+            timestamp=timestamp.isoformat(),
+            last_accessed=timestamp.isoformat(),
+            access_count=0,
+            importance_score=0.0,
+            is_shared=False,
+        ),
+        content=MemoryContent(raw_content=text, content_type="str", text_representation=text),
+    )
+
+
+def synthetic_memories(count, seed=0):
+    """Memories drawn from topics, each with its own words, tags and time."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    topics = []
+    for t in range(max(1, count // 20)):
+        topics.append(
+            (
+                [f"topic{t}word{i}" for i in range(12)],
+                [f"tag{t}", f"tag{t % 7}x"],
+                start + timedelta(hours=rng.randrange(2000)),
+            )
+        )
+    noise = [f"noise{i}" for i in range(5000)]
+    memories = []
+    for i in range(count):
+        words, tags, when = rng.choice(topics)
+        text = " ".join(rng.sample(words, 9) + rng.sample(noise, 3))
+        memory_tags = tags if rng.random() < 0.8 else [tags[0], f"extra{i % 50}"]
+        memories.append(
+            make_record(f"m{i}", text, memory_tags, when + timedelta(minutes=rng.randrange(600)))
+        )
+    return memories
+
+
+def co_clustered(clusters):
+    pairs = set()
+    for cluster in clusters:
+        keys = sorted(m.metadata.key for m in cluster)
+        pairs.update(combinations(keys, 2))
+    return pairs
+
+
+def disagreement(clusters, reference, count):
+    return len(co_clustered(clusters) ^ co_clustered(reference)) / (count * (count - 1) / 2)
+
+
+class TestMinHashLSH:
+    """Test the LSH index itself."""
+
+    def test_choose_bands_meets_recall(self):
+        bands, rows = choose_bands(0.625, 64, 0.95)
+
+        assert bands * rows <= 64
+        assert 1 - (1 - 0.625 ** rows) ** bands >= 0.95
+        # One more row per band would miss the recall target
+        assert 1 - (1 - 0.625 ** (rows + 1)) ** (64 // (rows + 1)) < 0.95
+
+    def test_similar_sets_collide_and_disjoint_sets_do_not(self):
+        index = MinHashLSH(threshold=0.6)
+        base = [f"w{i}" for i in range(20)]
+        index.add("a", base)
+        index.add("b", base[:18] + ["x", "y"])
+        index.add("c", [f"z{i}" for i in range(20)])
+
+        assert index.candidates("a") == {"b"}
+        assert index.candidates("c") == set()
+
+    def test_remove_and_readd(self):
+        index = MinHashLSH(threshold=0.6)
+        index.add("a", ["x", "y", "z"])
+        index.add("b", ["x", "y", "z"])
+        index.remove("b")
+
+        assert index.candidates("a") == set()
+        assert all(bucket for buckets in index._buckets for bucket in buckets.values())
+
+        index.add("b", ["x", "y", "z"])
+        index.add("a", ["p", "q"])
+        assert "a" not in index.candidates("b")
+        assert len(index) == 2
+
+    def test_empty_token_sets_are_not_indexed(self):
+        index = MinHashLSH()
+        index.add("a", [])
+
+        assert "a" not in index and index.candidates("a") == set()
+
+
+class TestLSHClustering:
+    """Test LSH clustering against the exhaustive scan."""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_exhaustive_within_tolerance(self, seed):
+        memories = synthetic_memories(400, seed=seed)
+        exhaustive = SemanticMemoryClusterer(use_lsh=False).cluster_memories(memories)
+
+        clusters = SemanticMemoryClusterer().cluster_memories(memories)
+
+        assert sum(len(c) for c in clusters) == len(memories)
+        assert any(len(c) > 3 for c in exhaustive)
+        assert disagreement(clusters, exhaustive, len(memories)) <= CLUSTER_TOLERANCE
+
+    def test_low_threshold_falls_back_to_exhaustive(self):
+        clusterer = SemanticMemoryClusterer(similarity_threshold=0.2)
+
+        assert not clusterer.use_lsh
+
+    def test_duplicate_keys_fall_back_to_exhaustive(self):
+        when = datetime(2026, 1, 1)
+        memories = [make_record("k", "same words here", ["t"], when) for _ in range(3)]
+
+        clusters = SemanticMemoryClusterer().cluster_memories(memories)
+
+        assert [len(c) for c in clusters] == [3]
+
+    def test_store_maintains_signatures(self):
+        store = EnhancedInMemoryStore()
+        memories = synthetic_memories(60)
+        for memory in memories:
+            store.store_memory(memory)
+
+        assert len(store.clusterer._indexed) == 60
+
+        store.remove_memory("a", "m0")
+        assert "a:m0" not in store.clusterer._indexed
+        assert "a:m0" not in store.clusterer._content_lsh
+
+    def test_edited_memory_is_reindexed(self):
+        clusterer = SemanticMemoryClusterer()
+        when = datetime(2026, 1, 1)
+        a = make_record("a", "alpha beta gamma delta", ["t1"], when)
+        b = make_record("b", "one two three four", ["t2"], when)
+        assert len(clusterer.cluster_memories([a, b])) == 2
+
+        b.content.text_representation = "alpha beta gamma delta"
+        b.metadata.tags = ["t1"]
+
+        assert len(clusterer.cluster_memories([a, b])) == 1
+
+
+@pytest.mark.benchmark("size", [2_000], full=[5_000])
+def test_clustering_latency(size, benchmark_report):
+    """Report LSH clustering time against the exhaustive pairwise scan."""
+    memories = synthetic_memories(size)
+
+    start = time.perf_counter()
+    clusterer = SemanticMemoryClusterer()
+    for memory in memories:
+        clusterer.index_memory(memory)
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusters = clusterer.cluster_memories(memories)
+    lsh = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exhaustive = SemanticMemoryClusterer(use_lsh=False).cluster_memories(memories)
+    full = time.perf_counter() - start
+
+    assert disagreement(clusters, exhaustive, size) <= CLUSTER_TOLERANCE
+    benchmark_report(
+        f"clustering: {size} memories, signatures={indexed:.2f}s, "
+        f"lsh={lsh:.2f}s, exhaustive={full:.2f}s"
+    )
@@ -0,0 +1,269 @@
+"""
+Tests for heap-based incremental memory pruning.
+
+Verifies RetentionQueue ordering under rescoring and removal, that
+SwarmMemoryStore and EnhancedInMemoryStore prune the same memories the
+full sort selects, that memories which must be kept don't hide prunable
+ones behind them, that automatic pruning backs off while nothing can be
+pruned, and reports p99 store latency at the pruning threshold.
+"""
+
+import random
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+import pytest
+
+from agency_memory.memory_v2 import (
+    EnhancedInMemoryStore,
+    EnhancedMemoryRecord,
+    MemoryContent,
+    MemoryMetadata,
+    MemoryModality,
+    MemoryType,
+)
+from agency_memory.memory_v2 import MemoryPriority as V2Priority
+from agency_memory.retention_queue import RetentionQueue
+from agency_memory.swarm_memory import MemoryPriority, SwarmMemoryStore
+
+
+def age(memories, days=1):
+    """Move last_accessed back so the memories become prunable."""
+    past = (datetime.now() - timedelta(days=days)).isoformat()
+    for memory in memories:
+        if isinstance(memory, Mapping):
+            memory["last_accessed"] = past
+        else:
+            memory.metadata.last_accessed = past
+
+
+def make_record(key, agent_id="a", priority=V2Priority.LOW):
+    now = datetime.now().isoformat()
+    return EnhancedMemoryRecord(
+        metadata=MemoryMetadata(
+            key=key,
+            agent_id=agent_id,
+            memory_type=MemoryType.EPISODIC,
+            modality=MemoryModality.TEXT,
+            priority=priority,
+            tags=["t"],
+            timestamp=now,
+            last_accessed=now,
+            access_count=0,
+            importance_score=0.0,
+            is_shared=False,
+        ),
+        content=MemoryContent(raw_content=key, content_type="str", text_representation=key),
+    )
+
+
+class TestRetentionQueue:
+    """Test RetentionQueue semantics."""
+
+    def test_pops_lowest_first_with_stable_ties(self):
+        queue = RetentionQueue()
+        for key, score in [("a", 3), ("b", 1), ("c", 1), ("d", 2)]:
+            queue.push(key, score)
+
+        assert queue.pop_lowest(3) == [(1, "b"), (1, "c"), (2, "d")]
+        assert len(queue) == 1 and "a" in queue
+
+    def test_rescore_and_discard(self):
+        queue = RetentionQueue()
+        for i in range(5):
+            queue.push(f"k{i}", i)
+        queue.push("k0", 10)
+        queue.discard("k1")
+        queue.discard("missing")
+
+        assert queue.score_of("k0") == 10
+        assert [key for _, key in queue.pop_lowest(10)] == ["k2", "k3", "k4", "k0"]
+        assert len(queue) == 0
+
+    def test_matches_sorted_reference(self):
+        rng = random.Random(7)
+        queue, scores = RetentionQueue(), {}
+        for _ in range(5000):
+            key = f"k{rng.randrange(300)}"
+            if rng.random() < 0.2:
+                queue.discard(key)
+                scores.pop(key, None)
+            else:
+                score = (rng.randrange(4), rng.randrange(20))
+                queue.push(key, score)
+                scores[key] = score
+
+        expected = sorted(scores.items(), key=lambda item: item[1])[:50]
+
+        assert [score for score, _ in queue.pop_lowest(50)] == [score for _, score in expected]
+
+    def test_stale_entries_are_compacted(self):
+        queue = RetentionQueue()
+        for i in range(10_000):
+            queue.push("hot", i)
+
+        assert len(queue._heap) <= 2 * len(queue) + 64
+
+
+class TestSwarmPruning:
+    """Test SwarmMemoryStore pruning through the retention queue."""
+
+    def sorted_victims(self, store, agent_id, target_count):
+        """Sort everything, take the first excess memories that may be pruned."""
+        memories = [m for k, m in store._memories.items() if m["agent_id"] == agent_id]
+        memories.sort(key=lambda m: (m["priority"], m["access_count"], m["timestamp"]))
+        cutoff = datetime.now() - timedelta(hours=1)
+        prunable = [
+            f"{agent_id}:{m['key']}"
+            for m in memories
+            if m["priority"] < MemoryPriority.HIGH
+            and datetime.fromisoformat(m["last_accessed"]) < cutoff
+        ]
+        return set(prunable[: len(memories) - target_count])
+
+    def test_prunes_same_memories_as_full_sort(self):
+        rng = random.Random(3)
+        store = SwarmMemoryStore(max_memories_per_agent=1000)
+        priorities = list(MemoryPriority)
+        for i in range(200):
+            store.store(f"k{i}", i, [f"t{i % 4}"], agent_id="a", priority=rng.choice(priorities))
+        for _ in range(50):
+            store.search([f"t{rng.randrange(4)}"], agent_id="a")
+        store.flush_access_stats()
+        age(rng.sample(list(store._memories.values()), 150))
+        expected = self.sorted_victims(store, "a", 120)
+
+        pruned = store.prune_memories("a", target_count=120)
+
+        assert pruned == len(expected)
+        assert expected.isdisjoint(store._memories)
+        assert len(store._agent_namespaces["a"]) == 200 - pruned
+
+    def test_accessed_memories_survive(self):
+        store = SwarmMemoryStore(max_memories_per_agent=1000)
+        for i in range(10):
+            store.store(f"k{i}", i, [f"t{i}"], agent_id="a", priority=MemoryPriority.LOW)
+        store.search(["t0"], agent_id="a")
+        age(store._memories.values())
+
+        store.prune_memories("a", target_count=5)
+
+        assert "a:k0" in store._memories
+        assert sorted(store._memories) == ["a:k0", "a:k6", "a:k7", "a:k8", "a:k9"]
+
+    def test_automatic_pruning_backs_off(self, monkeypatch):
+        store = SwarmMemoryStore(max_memories_per_agent=100)
+        calls = []
+        prune = store.prune_memories
+        monkeypatch.setattr(store, "prune_memories", lambda *args: calls.append(args) or prune(*args))
+
+        # Freshly stored memories are recently accessed and can't be pruned
+        for i in range(200):
+            store.store(f"k{i}", i, ["t"], agent_id="a", priority=MemoryPriority.LOW)
+
+        assert len(calls) == 1
+        assert len(store._agent_namespaces["a"]) == 200
+
+        # Once they age, an explicit prune still runs and clears the back-off
+        age(store._memories.values())
+        assert prune("a") == 130
+        assert "a" not in store._prune_retry_at
+
+    def test_kept_memories_do_not_hide_prunable_ones(self):
+        store = SwarmMemoryStore(max_memories_per_agent=10)
+        for i in range(5):
+            store.store(f"low{i}", i, [f"l{i}"], agent_id="a", priority=MemoryPriority.LOW)
+            store.search([f"l{i}"], agent_id="a")
+        for i in range(2):
+            store.store(f"normal{i}", i, ["n"], agent_id="a", priority=MemoryPriority.NORMAL)
+        store.flush_access_stats()
+        age([store._memories["a:normal0"], store._memories["a:normal1"]])
+
+        # The recently accessed LOW memories sort first but must be kept;
+        # the old NORMAL ones behind them are still pruned
+        for i in range(20):
+            store.store(f"new{i}", i, ["x"], agent_id="a")
+
+        assert "a:normal0" not in store._memories and "a:normal1" not in store._memories
+        assert len(store._agent_namespaces["a"]) == 25
+        assert all(f"a:low{i}" in store._memories for i in range(5))
+
+
+class TestEnhancedPruning:
+    """Test EnhancedInMemoryStore pruning through the retention queue."""
+
+    def test_prunes_least_important_first(self):
+        store = EnhancedInMemoryStore(max_memories_per_agent=1000)
+        for i in range(20):
+            store.store_memory(make_record(f"k{i}"))
+        for i in range(0, 20, 2):
+            store.retrieve_memory("a", f"k{i}")
+        age(store._memories.values(), days=2)
+
+        pruned = store._prune_agent_memories("a", target_ratio=0.01)
+
+        assert pruned == 10
+        assert sorted(store._memories) == sorted(f"a:k{i}" for i in range(0, 20, 2))
+
+    def test_high_priority_and_recent_memories_are_kept(self):
+        store = EnhancedInMemoryStore(max_memories_per_agent=1000)
+        store.store_memory(make_record("critical", priority=V2Priority.CRITICAL))
+        for i in range(5):
+            store.store_memory(make_record(f"k{i}"))
+        age(store._memories.values(), days=2)
+        store.store_memory(make_record("fresh"))
+
+        store._prune_agent_memories("a", target_ratio=0.001)
+
+        assert sorted(store._memories) == ["a:critical", "a:fresh"]
+        assert len(store._retention["a"]) == 2
+
+    def test_kept_memories_do_not_hide_prunable_ones(self):
+        store = EnhancedInMemoryStore(max_memories_per_agent=10)
+        for i in range(5):
+            store.store_memory(make_record(f"low{i}"))
+        old = [make_record(f"normal{i}", priority=V2Priority.NORMAL) for i in range(2)]
+        for record in old:
+            store.store_memory(record)
+        age([store._memories[f"a:normal{i}"] for i in range(2)], days=2)
+
+        for i in range(20):
+            store.store_memory(make_record(f"new{i}"))
+
+        assert "a:normal0" not in store._memories and "a:normal1" not in store._memories
+        assert len(store._agent_indices["a"]) == 25
+
+    def test_automatic_pruning_backs_off(self):
+        store = EnhancedInMemoryStore(max_memories_per_agent=50)
+        for i in range(100):
+            store.store_memory(make_record(f"k{i}"))
+
+        assert len(store._agent_indices["a"]) == 100
+        assert store._prune_retry_at["a"] > datetime.now()
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_store_latency_at_threshold(size, benchmark_report):
+    """
+    Report p99 SwarmMemoryStore.store latency once an agent sits at its
+    pruning threshold, with old memories aging out as new ones arrive.
+    """
+    store = SwarmMemoryStore(max_memories_per_agent=size)
+    threshold = int(size * 0.8)
+    for i in range(threshold - 1):
+        store.store(f"warm{i}", i, ["t"], agent_id="a", priority=MemoryPriority.LOW)
+    age(store._memories.values())
+
+    latencies = []
+    for i in range(2000):
+        start = time.perf_counter()
+        store.store(f"new{i}", i, ["t"], agent_id="a", priority=MemoryPriority.LOW)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+
+    assert len(store._agent_namespaces["a"]) < threshold
+    benchmark_report(f"swarm store at threshold: {size} memories/agent, p50={p50:.3f}ms, p99={p99:.3f}ms")
@@ -0,0 +1,143 @@
+"""
+Tests for streaming session transcripts.
+
+Verifies that SessionTranscriptWriter buffers entries until flushed,
+that its offset index supports range reads of plain and gzip transcripts,
+that create_session_transcript honors a configurable directory, and that
+AgentContext streams stored memories into an attached transcript.
+"""
+
+import os
+
+import pytest
+
+from agency_memory import InMemoryStore, Memory
+from agency_memory.memory import create_session_transcript
+from agency_memory.session_transcript import (
+    SESSIONS_DIR_ENV,
+    SessionTranscriptWriter,
+    format_transcript_entry,
+    read_transcript,
+    read_transcript_entries,
+    read_transcript_index,
+)
+from pattern_intelligence.extractors.session_extractor import SessionPatternExtractor
+from shared.agent_context import AgentContext
+
+
+def memory(i):
+    return {
+        "key": f"k{i}",
+        "content": f"content {i} ✓" if i % 2 else {"step": i},
+        "tags": ["tool", f"t{i % 3}"],
+        "timestamp": f"2026-01-01T00:00:{i % 60:02d}",
+    }
+
+
+class TestSessionTranscriptWriter:
+    """Test appending, buffering and indexing."""
+
+    def test_buffers_until_flush(self, tmp_path):
+        writer = SessionTranscriptWriter("s", directory=str(tmp_path))
+        writer.append(memory(1))
+
+        assert not os.path.exists(writer.path)
+
+        writer.flush()
+        text = read_transcript(writer.path)
+        assert text.startswith("# Session Transcript: s\n")
+        assert "### 1. k1" in text and "content 1 ✓" in text
+
+    def test_flushes_when_buffer_fills(self, tmp_path):
+        writer = SessionTranscriptWriter("s", directory=str(tmp_path), buffer_size=500)
+        while not os.path.exists(writer.path):
+            writer.append(memory(writer.count))
+        flushed = writer.count
+        writer.append(memory(writer.count))
+
+        assert 1 < flushed < 20
+        assert len(read_transcript_index(writer.path)) == flushed
+
+    def test_flushes_when_buffer_ages(self, tmp_path):
+        writer = SessionTranscriptWriter("s", directory=str(tmp_path), flush_interval=0)
+        writer.append(memory(1))
+
+        assert [entry["key"] for entry in read_transcript_index(writer.path)] == ["k1"]
+
+    def test_close_records_total_when_streamed(self, tmp_path):
+        with SessionTranscriptWriter("s", directory=str(tmp_path)) as writer:
+            writer.append(memory(1))
+            writer.append(memory(2))
+
+        assert read_transcript(writer.path).endswith("**Total Memories:** 2\n")
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_index_supports_range_reads(self, tmp_path, compress):
+        with SessionTranscriptWriter("s", directory=str(tmp_path), compress=compress, buffer_size=300) as writer:
+            for i in range(1, 51):
+                writer.append(memory(i))
+
+        assert writer.path.endswith(".md.gz" if compress else ".md")
+        index = read_transcript_index(writer.path)
+        assert [entry["key"] for entry in index] == [f"k{i}" for i in range(1, 51)]
+        assert read_transcript_entries(writer.path, 10, 13) == [
+            format_transcript_entry(i, memory(i)) for i in (11, 12, 13)
+        ]
+        assert "".join(read_transcript_entries(writer.path)) in read_transcript(writer.path)
+
+    def test_close_without_entries_writes_placeholder(self, tmp_path):
+        with SessionTranscriptWriter("empty", directory=str(tmp_path)) as writer:
+            pass
+
+        assert "No memories recorded for this session" in read_transcript(writer.path)
+        assert read_transcript_index(writer.path) == []
+        with pytest.raises(ValueError):
+            writer.append(memory(1))
+
+    def test_cached_index_follows_appends_and_rewrites(self, tmp_path):
+        writer = SessionTranscriptWriter("s", directory=str(tmp_path))
+        writer.append(memory(1))
+        writer.flush()
+        assert read_transcript_entries(writer.path) == [format_transcript_entry(1, memory(1))]
+
+        writer.append(memory(2))
+        writer.flush()
+        assert [entry["key"] for entry in read_transcript_index(writer.path)] == ["k1", "k2"]
+
+        os.remove(writer.index_path)
+        with SessionTranscriptWriter("s", path=writer.path) as rewritten:
+            rewritten.append(memory(3))
+        assert [entry["key"] for entry in read_transcript_index(writer.path)] == ["k3"]
+
+
+class TestCreateSessionTranscript:
+    """Test the one-shot transcript API."""
+
+    def test_directory_and_env(self, tmp_path, monkeypatch):
+        path = create_session_transcript([memory(1), memory(2)], "one", directory=str(tmp_path / "a"))
+        assert os.path.dirname(path) == str(tmp_path / "a")
+        assert "**Total Memories:** 2" in read_transcript(path)
+
+        monkeypatch.setenv(SESSIONS_DIR_ENV, str(tmp_path / "b"))
+        path = create_session_transcript([memory(1)], "two", compress=True)
+        assert os.path.dirname(path) == str(tmp_path / "b")
+        assert len(read_transcript_entries(path)) == 1
+
+
+class TestStreamingSession:
+    """Test streaming from AgentContext to transcript readers."""
+
+    def test_agent_context_streams_stored_memories(self, tmp_path):
+        context = AgentContext(memory=Memory(InMemoryStore()), session_id="live")
+        writer = context.attach_transcript(str(tmp_path), compress=True)
+        context.store_memory("tool_call_Read", {"tool": "Read("}, ["tool"])
+        context.store_memory("note", "successfully completed", ["note"])
+        writer.flush()
+
+        index = read_transcript_index(writer.path)
+        assert [entry["key"] for entry in index] == ["tool_call_Read", "note"]
+        assert "session:live" in index[0]["tags"]
+
+        extractor = SessionPatternExtractor(sessions_dir=str(tmp_path))
+        session = extractor._parse_session_file(extractor._find_session_files(days_back=1)[0])
+        assert session["success"] and session["tools_used"] == ["Read"]
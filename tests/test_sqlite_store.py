@@ -0,0 +1,221 @@
+"""
+Tests for the durable SQLite memory store.
+
+Verifies persistence across reopen, tag/time/cursor queries, FTS5 text
+search, concurrent writers on per-thread connections, that a process killed
+mid-batch leaves only committed memories behind, and reports write
+throughput.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from agency_memory import InMemoryStore, SQLiteStore, create_memory_store
+from agency_memory.firestore_store import FirestoreStore
+from shared.models.memory import MemoryQuery
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "memory.sqlite3")
+
+
+def keys(records):
+    return [r.key for r in records]
+
+
+class TestSQLiteStore:
+    """Test SQLiteStore behaviour."""
+
+    def test_persists_across_reopen(self, db_path):
+        store = SQLiteStore(db_path)
+        store.store("k1", {"tool": "read", "ok": True}, ["tool", "session:1"])
+        store.store("k2", "plain text", ["note"])
+        store.close()
+
+        reopened = SQLiteStore(db_path)
+        record = reopened.get("k1")
+
+        assert record.content == {"tool": "read", "ok": True}
+        assert record.tags == ["tool", "session:1"]
+        assert keys(reopened.get_all().records) == ["k2", "k1"]
+
+    def test_tag_search_and_overwrite(self, db_path):
+        store = SQLiteStore(db_path)
+        store.store("k1", 1, ["a", "b"])
+        store.store("k2", 2, ["b"])
+        store.store("k3", 3, ["c"])
+        store.store("k1", 10, ["c"])
+
+        assert keys(store.search(["b"]).records) == ["k2"]
+        assert keys(store.search(["b", "c"]).records) == ["k1", "k3", "k2"]
+        assert keys(store.search(["c"], limit=1).records) == ["k1"]
+        assert store.search([]).total_count == 0
+        assert len(store) == 3
+
+    def test_query_matches_in_memory_store(self, db_path):
+        store, reference = SQLiteStore(db_path), InMemoryStore()
+        for i in range(40):
+            tags = ["session:s", f"mod3:{i % 3}"] + (["error"] if i % 5 == 0 else [])
+            store.store(f"k{i}", i, tags)
+            reference.store(f"k{i}", i, tags)
+
+        for query in [
+            MemoryQuery(all_tags=["session:s", "mod3:1"], exclude_tags=["error"]),
+            MemoryQuery(any_tags=["mod3:2", "error"], limit=5),
+            MemoryQuery(exclude_tags=["mod3:0"]),
+        ]:
+            assert keys(store.query(query)) == keys(reference.query(query))
+
+    def test_cursor_pagination_and_delete(self, db_path):
+        store = SQLiteStore(db_path)
+        store.store_batch((f"k{i}", i, ["t"]) for i in range(10))
+        newest_first = keys(store.get_all().records)
+
+        first = list(store.query(MemoryQuery(all_tags=["t"], limit=4)))
+        assert store.delete(first[-1].key)
+        assert not store.delete(first[-1].key)
+        second = list(store.query(MemoryQuery(all_tags=["t"], limit=4).next_page(first[-1])))
+
+        assert keys(first) + keys(second) == newest_first[:8]
+
+    def test_time_window(self, db_path):
+        store = SQLiteStore(db_path)
+        store.store("old", 1, ["t"])
+        time.sleep(0.01)
+        middle = datetime.now()
+        store.store("new", 2, ["t"])
+
+        assert keys(store.query(MemoryQuery(since=middle))) == ["new"]
+        assert keys(store.query(MemoryQuery(until=middle))) == ["old"]
+        assert keys(store.query(MemoryQuery(since=middle + timedelta(days=1)))) == []
+
+        # Aware bounds name the same instant in any zone
+        for offset in (-5, 0, 9):
+            aware = middle.astimezone(timezone(timedelta(hours=offset)))
+            assert keys(store.query(MemoryQuery(since=aware))) == ["new"]
+            assert keys(store.query(MemoryQuery(until=aware))) == ["old"]
+
+    def test_full_text_search(self, db_path):
+        store = SQLiteStore(db_path)
+        store.store("k1", "database connection timeout while deploying", ["error"])
+        store.store("k2", "deployment finished", ["deploy"])
+        store.store("k3", {"message": "timeout in cache warmup"}, ["error"])
+
+        assert set(keys(store.text_search("timeout").records)) == {"k1", "k3"}
+        assert keys(store.text_search("database timeout").records) == ["k1"]
+        # Quotes and FTS operators in user input are treated as plain words
+        assert store.text_search('timeout" OR "x').total_count == 0
+        assert store.delete("k1")
+        assert keys(store.text_search("database").records) == []
+
+    def test_concurrent_writers(self, db_path):
+        store = SQLiteStore(db_path)
+        errors = []
+
+        def writer(worker):
+            try:
+                for i in range(50):
+                    store.store(f"w{worker}-{i}", i, [f"worker:{worker}"])
+            except Exception as e:  # pragma: no cover - surfaced by the assert
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(store) == 200
+        assert store.search(["worker:3"]).total_count == 50
+
+
+class TestCrashRecovery:
+    """A killed process must leave only committed memories."""
+
+    def test_kill_mid_batch(self, db_path):
+        script = textwrap.dedent(
+            f"""
+            import os
+            from agency_memory.sqlite_store import SQLiteStore
+
+            store = SQLiteStore({db_path!r})
+            store.store_batch((f"committed{{i}}", i, ["ok"]) for i in range(100))
+
+            def doomed():
+                for i in range(100):
+                    if i == 50:
+                        os._exit(1)  # die without rollback, mid-transaction
+                    yield f"lost{{i}}", i, ["lost"]
+
+            store.store_batch(doomed())
+            """
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True)
+        assert result.returncode == 1, result.stderr.decode()
+
+        store = SQLiteStore(db_path)
+
+        assert len(store) == 100
+        assert store.search(["lost"]).total_count == 0
+        assert store.search(["ok"]).total_count == 100
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        conn.close()
+
+
+class TestBackendFactory:
+    """Test create_memory_store backend selection."""
+
+    def test_selects_backend(self, db_path, monkeypatch):
+        monkeypatch.setenv("AGENCY_MEMORY_DB_PATH", db_path)
+        monkeypatch.delenv("FRESH_USE_FIRESTORE", raising=False)
+
+        assert isinstance(create_memory_store("sqlite"), SQLiteStore)
+        assert isinstance(create_memory_store("firestore"), FirestoreStore)
+        assert isinstance(create_memory_store(), InMemoryStore)
+
+        monkeypatch.setenv("AGENCY_MEMORY_BACKEND", "sqlite")
+        assert create_memory_store().path == db_path
+
+        with pytest.raises(ValueError):
+            create_memory_store("redis")
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_write_throughput(size, tmp_path, benchmark_report):
+    """Report batched vs per-memory write throughput and query latency."""
+    store = SQLiteStore(str(tmp_path / "bench.sqlite3"))
+
+    start = time.perf_counter()
+    store.store_batch((f"b{i}", f"note {i}", ["session:bench", f"tool:{i % 20}"]) for i in range(size))
+    batch_rate = size / (time.perf_counter() - start)
+
+    single = min(size, 1000)
+    start = time.perf_counter()
+    for i in range(single):
+        store.store(f"s{i}", f"note {i}", ["session:bench"])
+    single_rate = single / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        recent = list(store.query(MemoryQuery(all_tags=["session:bench", "tool:7"], limit=10)))
+    query_ms = (time.perf_counter() - start) / 20 * 1000
+
+    assert len(recent) == 10
+    assert len(store) == size + single
+    benchmark_report(
+        f"sqlite store: batch={batch_rate:,.0f}/s, single={single_rate:,.0f}/s, "
+        f"newest 10 by tags={query_ms:.2f}ms ({size} memories)"
+    )
@@ -0,0 +1,134 @@
+"""
+Tests for deferred access-statistics accounting in SwarmMemoryStore.
+
+Verifies that search() buffers hits instead of mutating stored records,
+that buffered hits are merged before pruning and summaries read them, and
+reports search throughput against the previous eager accounting.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from agency_memory import swarm_memory
+from agency_memory.swarm_memory import MemoryPriority, SwarmMemory, SwarmMemoryStore
+
+
+def age(store, hours=2):
+    past = (datetime.now() - timedelta(hours=hours)).isoformat()
+    for memory in store._memories.values():
+        memory["last_accessed"] = past
+
+
+class TestDeferredAccessStats:
+    """Test buffering and merging of search hits."""
+
+    def test_search_buffers_hits(self):
+        store = SwarmMemoryStore()
+        store.store("k", "content", ["t"], agent_id="a")
+        store.search(["t"], agent_id="a")
+        store.search(["t"], agent_id="a")
+
+        assert store._memories["a:k"]["access_count"] == 0
+        assert store.flush_access_stats() == 1
+        assert store._memories["a:k"]["access_count"] == 2
+        assert store.flush_access_stats() == 0
+
+    def test_shared_hits_credit_the_owner(self):
+        store = SwarmMemoryStore()
+        store.store("k", "content", ["t"], agent_id="a", is_shared=True)
+        store.search(["t"], agent_id="b")
+        age(store)
+
+        store.flush_access_stats()
+
+        memory = store._memories["a:k"]
+        assert memory["access_count"] == 1
+        assert datetime.fromisoformat(memory["last_accessed"]) > datetime.now() - timedelta(minutes=1)
+
+    def test_search_results_are_unchanged(self):
+        store = SwarmMemoryStore()
+        store.store("low", "l", ["t"], agent_id="a", priority=MemoryPriority.LOW)
+        store.store("high", "h", ["t"], agent_id="a", priority=MemoryPriority.HIGH)
+        store.store("other", "o", ["t"], agent_id="b", is_shared=True)
+
+        result = store.search(["t"], agent_id="a")
+
+        assert {r.key for r in result.records} == {"low", "high", "other"}
+        assert result.records[0].key == _legacy_search(store, ["t"], "a")[0].key
+
+    def test_pruning_sees_buffered_accesses(self):
+        store = SwarmMemoryStore(max_memories_per_agent=1000)
+        for i in range(10):
+            store.store(f"k{i}", i, [f"t{i}"], agent_id="a", priority=MemoryPriority.LOW)
+        age(store)
+        # Accessed after aging: recent again, so it must survive pruning
+        store.search(["t0"], agent_id="a")
+
+        store.prune_memories("a", target_count=5)
+
+        assert "a:k0" in store._memories
+        assert len(store._agent_namespaces["a"]) == 5
+
+    def test_summary_sees_buffered_accesses(self):
+        memory = SwarmMemory(agent_id="a")
+        memory.store("k", "content", ["t"])
+        memory.search(["t"])
+
+        assert memory.get_summary()["avg_access_count"] == 1
+
+    def test_replaced_record_starts_clean(self):
+        store = SwarmMemoryStore()
+        store.store("k", "old", ["t"], agent_id="a")
+        store.search(["t"], agent_id="a")
+        store.store("k", "new", ["t"], agent_id="a")
+
+        store.flush_access_stats()
+
+        assert store._memories["a:k"]["access_count"] == 0
+
+    def test_log_flushes_when_full(self, monkeypatch):
+        monkeypatch.setattr(swarm_memory, "ACCESS_LOG_FLUSH_SIZE", 3)
+        store = SwarmMemoryStore()
+        store.store("k", "content", ["t"], agent_id="a")
+        for _ in range(3):
+            store.search(["t"], agent_id="a")
+
+        assert store._access_log == []
+        assert store._memories["a:k"]["access_count"] == 3
+
+
+def _legacy_search(store, tags, agent_id):
+    """Previous search path: eager accounting and a copy per hit."""
+    matches = []
+    for namespaced_key in store._tag_index.match(tags) & store._agent_namespaces[agent_id]:
+        memory = store._memories[namespaced_key]
+        memory["access_count"] = int(memory["access_count"]) + 1
+        memory["last_accessed"] = datetime.now().isoformat()
+        store._retention[agent_id].push(namespaced_key, store._retention_score(memory))
+        matches.append((memory.copy(), memory))
+    matches.sort(key=lambda m: (-m[0]["priority"], m[0]["timestamp"]), reverse=True)
+    return [store._to_record(record) for _, record in matches]
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_search_throughput(size, benchmark_report):
+    """Report search() throughput against the previous eager accounting."""
+    store = SwarmMemoryStore(max_memories_per_agent=size * 2)
+    for i in range(size):
+        store.store(f"k{i}", i, [f"t{i % 100}"], agent_id="a")
+    queries = [[f"t{i % 100}"] for i in range(200)]
+
+    start = time.perf_counter()
+    for tags in queries:
+        result = store.search(tags, agent_id="a", include_shared=False)
+    deferred = len(queries) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for tags in queries:
+        _legacy_search(store, tags, "a")
+    eager = len(queries) / (time.perf_counter() - start)
+
+    assert result.total_count == size // 100
+    benchmark_report(f"swarm search: {size} memories, deferred={deferred:.0f} q/s, eager={eager:.0f} q/s")
@@ -110,6 +110,7 @@ class TestSwarmMemoryStore:
 
         # Search should increment access count
         store.search(["tag"], agent_id="agent_a")
+        store.flush_access_stats()
         assert memory["access_count"] == 1
 
     def test_memory_pruning(self):
@@ -0,0 +1,189 @@
+"""
+Tests for the shared tag inverted index and the stores built on it.
+
+Verifies any/all tag semantics, newest-first ordering (including the
+limited "most recent N" path), and that store, delete and prune keep the
+index consistent in InMemoryStore, EnhancedMemoryStore and SwarmMemoryStore.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore
+from agency_memory.memory import InMemoryStore
+from agency_memory.swarm_memory import MemoryPriority, SwarmMemory, SwarmMemoryStore
+from agency_memory.tag_index import TagIndex
+from agency_memory.vector_store import VectorStore
+
+BASE = datetime(2026, 1, 1)
+
+
+def build_index(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    index = TagIndex()
+    entries = {}
+    for i in range(count):
+        tags = rng.sample(["a", "b", "c", "d", "e"], rng.randint(1, 3))
+        timestamp = BASE + timedelta(seconds=rng.randint(0, count // 2))
+        index.add(f"k{i}", tags, timestamp)
+        entries[f"k{i}"] = (tags, timestamp, i)
+    return index, entries
+
+
+def reference(entries, tags, match_all=False):
+    """Linear scan + stable sort, like the stores did before indexing."""
+    wanted = set(tags)
+    matches = [
+        key for key, (key_tags, _, _) in entries.items()
+        if (wanted <= set(key_tags) if match_all else wanted & set(key_tags))
+    ]
+    matches.sort(key=lambda key: entries[key][1], reverse=True)
+    return matches
+
+
+class TestTagIndex:
+    """Test TagIndex semantics."""
+
+    @pytest.mark.parametrize("match_all", [False, True])
+    @pytest.mark.parametrize("tags", [["a"], ["a", "b"], ["e", "c", "d"], ["missing"]])
+    def test_matches_linear_scan(self, tags, match_all):
+        index, entries = build_index(500)
+
+        assert index.query(tags, match_all=match_all) == reference(entries, tags, match_all)
+
+    @pytest.mark.parametrize("limit", [1, 5, 50, 1000])
+    @pytest.mark.parametrize("tags", [["a"], ["a", "b", "c"], ["d"]])
+    def test_limit_returns_newest_prefix(self, tags, limit):
+        index, entries = build_index(500)
+
+        assert index.query(tags, limit=limit) == reference(entries, tags)[:limit]
+
+    def test_equal_timestamps_keep_insertion_order(self):
+        index = TagIndex()
+        for key in ["x", "y", "z"]:
+            index.add(key, ["t"], BASE)
+
+        assert index.query(["t"]) == ["x", "y", "z"]
+        assert index.newest(limit=2) == ["x", "y"]
+
+    def test_remove_and_replace(self):
+        index = TagIndex()
+        index.add("k1", ["a", "b"], BASE)
+        index.add("k2", ["b"], BASE + timedelta(seconds=1))
+        index.add("k1", ["c"], BASE + timedelta(seconds=2))
+
+        assert index.match(["a"]) == set()
+        assert index.query(["b", "c"]) == ["k1", "k2"]
+
+        assert index.remove("k2")
+        assert not index.remove("k2")
+        assert index.match(["b"]) == set()
+        assert index.newest() == ["k1"]
+        assert len(index) == 1
+
+
+class TestInMemoryStoreIndex:
+    """Test InMemoryStore tag queries through the index."""
+
+    def test_search_all_tags_and_limit(self):
+        store = InMemoryStore()
+        store.store("k1", "one", ["session:1", "tool:read"])
+        store.store("k2", "two", ["session:1", "tool:write"])
+        store.store("k3", "three", ["session:2", "tool:read"])
+
+        both = store.search(["session:1", "tool:read"], match_all=True)
+        assert [r.key for r in both.records] == ["k1"]
+
+        newest = store.search(["tool:read", "tool:write"], limit=2)
+        assert [r.key for r in newest.records] == ["k3", "k2"]
+
+    def test_delete_removes_from_index(self):
+        store = InMemoryStore()
+        store.store("k1", "one", ["x"])
+
+        assert store.delete("k1")
+        assert not store.delete("k1")
+        assert store.search(["x"]).total_count == 0
+        assert store.get_all().total_count == 0
+
+
+class TestEnhancedMemoryStoreIndex:
+    """Test EnhancedMemoryStore tag queries through the index."""
+
+    def test_search_and_delete(self):
+        store = EnhancedMemoryStore(vector_store=VectorStore())
+        store.store("k1", "one", ["a", "b"])
+        store.store("k2", "two", ["b"])
+
+        assert {r.key for r in store.search(["b"]).records} == {"k1", "k2"}
+        assert [r.key for r in store.search(["a", "b"], match_all=True).records] == ["k1"]
+
+        assert store.delete("k1")
+        assert [r.key for r in store.search(["a", "b"]).records] == ["k2"]
+        assert "k1" not in store.vector_store._memory_records
+
+
+class TestSwarmMemoryStoreIndex:
+    """Test SwarmMemoryStore tag queries through the index."""
+
+    def test_agent_scoping(self):
+        store = SwarmMemoryStore()
+        store.store("k", "mine", ["t"], agent_id="a")
+        store.store("k", "theirs", ["t"], agent_id="b")
+
+        records = store.search(["t"], agent_id="a", include_shared=False).records
+        assert [r.content for r in records] == ["mine"]
+
+    def test_shared_memories_found_by_tag(self):
+        swarm = SwarmMemory(agent_id="owner")
+        swarm.store("fact", "shared fact", ["knowledge"])
+        swarm.share_memory("fact")
+
+        records = swarm._store.search(["knowledge"], agent_id="other").records
+
+        assert [r.content for r in records] == ["shared fact"]
+
+    def test_prune_keeps_index_consistent(self):
+        store = SwarmMemoryStore(max_memories_per_agent=100, pruning_threshold=1.0)
+        for i in range(50):
+            store.store(f"k{i}", i, ["bulk"], agent_id="a", priority=MemoryPriority.LOW)
+        # Make every memory eligible for pruning
+        for memory in store._memories.values():
+            memory["last_accessed"] = (datetime.now() - timedelta(days=1)).isoformat()
+
+        pruned = store.prune_memories("a", target_count=10)
+
+        assert pruned == 40
+        assert store._tag_index.match(["bulk"]) == set(store._memories)
+        assert store.search(["bulk"], agent_id="a").total_count == 10
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_tag_query_scales_with_results(size, benchmark_report):
+    """
+    Report tag query latency for a rare tag as the store grows.
+
+    Every memory carries a session tag; one in a thousand also carries a
+    rare tool tag.
+    """
+    store = InMemoryStore()
+    for i in range(size):
+        tags = ["session:current", f"tool:{'rare' if i % 1000 == 0 else 'common'}"]
+        store.store(f"k{i}", i, tags)
+
+    start = time.perf_counter()
+    for _ in range(50):
+        rare = store.search(["tool:rare"])
+    rare_ms = (time.perf_counter() - start) / 50 * 1000
+
+    start = time.perf_counter()
+    for _ in range(50):
+        recent = store.search(["session:current"], limit=10)
+    recent_ms = (time.perf_counter() - start) / 50 * 1000
+
+    assert rare.total_count == size // 1000
+    assert recent.total_count == 10
+    benchmark_report(f"tag index: {size} memories, rare tag={rare_ms:.3f}ms, newest 10 of all={recent_ms:.3f}ms")
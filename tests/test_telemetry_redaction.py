@@ -0,0 +1,167 @@
+"""
+Tests for telemetry redaction.
+
+Verifies that redact_event produces exactly what the previous
+deepcopy-and-walk implementation produced, on random typical events and on
+adversarial strings built from overlapping and near-miss secrets, and that
+it only copies the containers it changes. Includes microbenchmarks of both
+implementations on typical and adversarial payloads.
+"""
+
+import copy
+import random
+import string
+import time
+from typing import Any
+
+import pytest
+
+from tools.telemetry import sanitize
+from tools.telemetry.sanitize import redact_event
+
+LEGACY_KEYS = {"api_key", "apikey", "authorization", "auth", "token", "access_token", "refresh_token",
+               "secret", "client_secret", "password", "passwd"}
+
+
+def legacy_redact_event(event):
+    """The deepcopy-based implementation redact_event replaced."""
+    if not isinstance(event, dict):
+        return event
+    safe = copy.deepcopy(event)
+
+    def redact_str(s):
+        for pat in sanitize._SECRET_VALUE_PATTERNS:
+            s = pat.sub("[REDACTED]", s)
+        return s
+
+    def walk(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return {k: "[REDACTED]" if k.lower() in LEGACY_KEYS else walk(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [walk(v) for v in obj]
+        if isinstance(obj, str):
+            return redact_str(obj)
+        return obj
+
+    return walk(safe)
+
+
+FRAGMENTS = ["sk-", "ghp_", "xoxb-", "xoxq-", "xox", "AIza", "-", "_", "task-", "ask-", " ", "/", "[REDACTED]"]
+ALNUM = string.ascii_letters + string.digits
+
+
+def adversarial_string(rng: random.Random) -> str:
+    """Concatenated secret prefixes and alphanumeric runs near the match thresholds."""
+    parts = []
+    for _ in range(rng.randint(1, 8)):
+        parts.append(rng.choice(FRAGMENTS))
+        parts.append("".join(rng.choice(ALNUM + "-_") for _ in range(rng.choice([0, 5, 9, 10, 11, 14, 15, 19, 20, 30]))))
+    return "".join(parts)
+
+
+def typical_string(rng: random.Random) -> str:
+    return rng.choice([
+        "heartbeat", "task_finished", "success", "Agent", f"task-{rng.randint(0, 10**13)}",
+        "Read completed in 0.2s", "timeout", "x" * rng.randint(0, 40), adversarial_string(rng),
+    ])
+
+
+def random_value(rng: random.Random, depth: int = 0, make_str=typical_string) -> Any:
+    choice = rng.random()
+    if depth < 3 and choice < 0.15:
+        return {random_key(rng): random_value(rng, depth + 1, make_str) for _ in range(rng.randint(0, 4))}
+    if depth < 3 and choice < 0.25:
+        return [random_value(rng, depth + 1, make_str) for _ in range(rng.randint(0, 4))]
+    if choice < 0.35:
+        return rng.choice([None, True, 3, 2.5, (1, "sk-" + "a" * 12)])
+    return make_str(rng)
+
+
+def random_key(rng: random.Random) -> str:
+    return rng.choice(["type", "id", "agent", "usage", "errors", "data", "Token", "API_KEY", "password",
+                       "auth", "Authorization", "author", "tokens", "secret_name", "note"])
+
+
+def random_event(rng: random.Random, make_str=typical_string):
+    return {random_key(rng): random_value(rng, 0, make_str) for _ in range(rng.randint(1, 8))}
+
+
+class TestEquivalence:
+    """Compare against the previous implementation."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_events(self, seed):
+        rng = random.Random(seed)
+        for _ in range(400):
+            event = random_event(rng)
+            before = copy.deepcopy(event)
+            assert redact_event(event) == legacy_redact_event(event)
+            assert event == before
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_adversarial_strings(self, seed):
+        rng = random.Random(100 + seed)
+        for _ in range(2000):
+            text = adversarial_string(rng)
+            assert redact_event({"note": text}) == legacy_redact_event({"note": text}), text
+
+    def test_overlapping_patterns_resolve_in_pattern_order(self):
+        text = "AIzask-" + "a" * 20
+        assert redact_event({"note": text})["note"] == "AIza[REDACTED]"
+        # A single alternation would redact the GitHub token as one match
+        text = "ghp_" + "b" * 20 + "sk-" + "c" * 10
+        assert redact_event({"note": text})["note"] == "[REDACTED][REDACTED]"
+
+    def test_non_dict_returned_unchanged(self):
+        assert redact_event(["sk-" + "a" * 12]) == ["sk-" + "a" * 12]  # type: ignore[arg-type]
+
+
+class TestCopyOnWrite:
+    """Test that only changed containers are copied."""
+
+    def test_unchanged_containers_are_shared(self):
+        clean = {"usage": {"total_tokens": 10}, "errors": ["timeout"]}
+        dirty = {"usage": {"total_tokens": 10}, "headers": {"Authorization": "Bearer x"}, "errors": ["timeout"]}
+
+        redacted = redact_event(clean)
+        assert redacted == clean and redacted is not clean
+        assert redacted["usage"] is clean["usage"] and redacted["errors"] is clean["errors"]
+
+        redacted = redact_event(dirty)
+        assert redacted["headers"] == {"Authorization": "[REDACTED]"}
+        assert dirty["headers"] == {"Authorization": "Bearer x"}
+        assert redacted["usage"] is dirty["usage"]
+
+    def test_non_string_keys_are_not_sensitive(self):
+        assert redact_event({"data": {1: "sk-" + "a" * 12}}) == {"data": {1: "[REDACTED]"}}
+
+
+@pytest.mark.benchmark("count", [2_000], full=[50_000])
+@pytest.mark.parametrize("payload", ["typical", "adversarial"])
+def test_redaction_throughput(count, payload, benchmark_report):
+    """
+    Compare events/second of the previous and current redaction.
+
+    "typical" events are heartbeat and task events without secrets;
+    "adversarial" ones are nested and full of near-miss secret prefixes.
+    """
+    rng = random.Random(1)
+    if payload == "typical":
+        events = [
+            {"type": "heartbeat", "run_id": None, "id": f"task-{i}", "agent": "Agent", "attempt": 1,
+             "pid": 4242, "running_for_s": i / 10, "usage": {"total_tokens": 100}, "errors": None}
+            for i in range(count)
+        ]
+    else:
+        events = [random_event(rng, adversarial_string) for _ in range(count)]
+
+    results = {}
+    for name, redact in (("deepcopy", legacy_redact_event), ("compiled", redact_event)):
+        start = time.perf_counter()
+        for event in events:
+            redact(event)
+        results[name] = count / (time.perf_counter() - start)
+
+    for name, rate in results.items():
+        benchmark_report(f"{payload} {name}: {rate:,.0f} events/s")
+    assert results["compiled"] > results["deepcopy"]
@@ -0,0 +1,259 @@
+"""
+Tests for time-indexed telemetry segments.
+
+Verifies that list_events returns exactly what a full scan returns while
+skipping old files and seeking inside large ones, that the sidecar index
+heals when missing, corrupt, stale or describing a replaced file, that
+partial trailing lines are left for later, and that concurrent writers
+keep the index consistent. Includes a benchmark of a 1-hour query over a
+multi-day retention directory.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from tools.telemetry import aggregator, segment_index
+from tools.telemetry.aggregator import _parse_iso, list_events
+from tools.telemetry.bus import EventBus
+from tools.telemetry.segment_index import drop_cached_index, index_path, refresh_index, window_start
+
+NOW = datetime.now(timezone.utc)
+
+
+def ts(dt: datetime) -> str:
+    return dt.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def write_day(directory: Path, day: datetime, count: int, jitter_s: float = 0.0, rng=None, file_day=None) -> Path:
+    """Events spread over the hour before `day`, optionally slightly out of order."""
+    rng = rng or random.Random(0)
+    path = directory / f"events-{file_day or day:%Y%m%d}.jsonl"
+    with path.open("a", encoding="utf-8") as f:
+        for i in range(count):
+            dt = day - timedelta(seconds=3600 * (count - i) / count) + timedelta(seconds=rng.uniform(-jitter_s, jitter_s))
+            f.write(json.dumps({"type": "heartbeat", "id": f"t{i % 7}", "i": i, "ts": ts(dt)}) + "\n")
+    return path
+
+
+def full_scan(directory: Path, since_dt: datetime, limit: int = 200):
+    """What list_events returned before the index existed."""
+    events = []
+    for fp in sorted(directory.glob("events-*.jsonl"), key=lambda p: p.stat().st_mtime):
+        for line in fp.read_text().splitlines():
+            try:
+                ev = json.loads(line)
+            except Exception:
+                continue
+            dt = _parse_iso(ev.get("ts", "")) if isinstance(ev.get("ts"), str) else None
+            if dt is None:
+                continue
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            if dt >= since_dt:
+                events.append((dt, ev))
+    events.sort(key=lambda pair: pair[0])
+    return [ev for _, ev in events][-limit:]
+
+
+@pytest.fixture(autouse=True)
+def small_checkpoints(monkeypatch):
+    # Windows are measured from NOW, so list_events and full_scan agree on their start
+    monkeypatch.setattr(aggregator, "_iso_now", lambda: NOW)
+    monkeypatch.setattr(segment_index, "CHECKPOINT_BYTES", 512)
+    drop_cached_index()
+    yield
+    drop_cached_index()
+
+
+class TestWindowSeek:
+    """Test skipping and seeking against a full scan."""
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_matches_full_scan_with_out_of_order_writes(self, tmp_path, seed):
+        rng = random.Random(seed)
+        path = write_day(tmp_path, NOW, 600, jitter_s=30, rng=rng)
+        with path.open("a") as f:
+            f.write("not json\n")
+            f.write(json.dumps({"type": "no_ts"}) + "\n")
+            f.write(json.dumps({"type": "naive", "ts": (NOW - timedelta(minutes=1)).replace(tzinfo=None).isoformat()}) + "\n")
+
+        for minutes in (1, 5, 17, 30, 59, 90):
+            since_dt = NOW - timedelta(minutes=minutes)
+            expected = full_scan(tmp_path, since_dt, limit=1000)
+            assert list_events(since=f"{minutes}m", limit=1000, telemetry_dir=str(tmp_path)) == expected
+
+        index = refresh_index(path)
+        assert index is not None and len(index.checkpoints) > 10
+        assert window_start(path, NOW - timedelta(minutes=5)) > path.stat().st_size // 2
+
+    def test_old_files_are_skipped(self, tmp_path, monkeypatch):
+        old = write_day(tmp_path, NOW - timedelta(days=3), 200)
+        write_day(tmp_path, NOW, 50)
+        assert window_start(old, NOW - timedelta(hours=1)) is None
+
+        opened = []
+        real_open = Path.open
+
+        def spy(self, mode="r", *args, **kwargs):
+            if self.suffix == ".jsonl" and "b" in mode:
+                opened.append(self.name)
+            return real_open(self, mode, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "open", spy)
+        assert len(list_events(since="2h", limit=1000, telemetry_dir=str(tmp_path))) == 50
+        # The old file's index says it is out of the window, so only its newer sibling is read for events
+        assert opened.count(old.name) == 1
+
+    def test_enterprise_aggregator_uses_index(self, tmp_path):
+        from tools.telemetry.aggregator_enterprise import _load_events_since
+
+        write_day(tmp_path, NOW - timedelta(days=2), 100)
+        write_day(tmp_path, NOW, 100)
+        since_dt = NOW - timedelta(minutes=10)
+        loaded = [e["i"] for e in _load_events_since(str(tmp_path), since_dt)]
+        assert loaded == [e["i"] for e in full_scan(tmp_path, since_dt, limit=1000)]
+
+
+class TestSelfHealing:
+    """Test that missing, stale and wrong sidecars are repaired."""
+
+    def test_missing_and_corrupt_sidecar_rebuilt(self, tmp_path):
+        path = write_day(tmp_path, NOW, 100)
+        refresh_index(path)
+        expected = refresh_index(path).to_dict()
+
+        index_path(path).unlink()
+        drop_cached_index()
+        assert refresh_index(path).to_dict() == expected
+        assert index_path(path).exists()
+
+        index_path(path).write_text("{broken")
+        drop_cached_index()
+        assert refresh_index(path).to_dict() == expected
+
+    def test_stale_sidecar_extended(self, tmp_path):
+        path = write_day(tmp_path, NOW - timedelta(minutes=30), 100, file_day=NOW)
+        before = refresh_index(path)
+        drop_cached_index()
+        write_day(tmp_path, NOW, 100)
+
+        after = refresh_index(path)
+        assert after.size == path.stat().st_size > before.size
+        assert after.checkpoints[:len(before.checkpoints)] == before.checkpoints
+        drop_cached_index()
+        fresh = segment_index.SegmentIndex(512)
+        with path.open("rb") as f:
+            fresh.extend(f, path.stat().st_size)
+        assert after.max_ts == fresh.max_ts and after.min_ts == fresh.min_ts
+
+    def test_replaced_or_truncated_file_rebuilt(self, tmp_path):
+        path = write_day(tmp_path, NOW, 100)
+        assert list_events(since="2h", limit=1000, telemetry_dir=str(tmp_path))
+
+        path.unlink()
+        write_day(tmp_path, NOW - timedelta(days=1), 20, file_day=NOW)
+        assert list_events(since="2h", limit=1000, telemetry_dir=str(tmp_path)) == []
+
+        path.write_text("")
+        write_day(tmp_path, NOW, 30, rng=random.Random(9))
+        assert len(list_events(since="2h", limit=1000, telemetry_dir=str(tmp_path))) == 30
+        assert json.loads(index_path(path).read_text())["size"] == path.stat().st_size
+
+
+class TestPartialLines:
+    """Test a writer caught mid-line."""
+
+    def test_partial_trailing_line_left_for_later(self, tmp_path):
+        path = write_day(tmp_path, NOW - timedelta(minutes=5), 20, file_day=NOW)
+        line = json.dumps({"type": "late", "ts": ts(NOW)}) + "\n"
+        with path.open("a") as f:
+            f.write(line[:15])
+
+        index = refresh_index(path)
+        assert index.size == path.stat().st_size - 15
+        assert [e["type"] for e in list_events(since="1m", telemetry_dir=str(tmp_path))] == []
+
+        with path.open("a") as f:
+            f.write(line[15:])
+        assert [e["type"] for e in list_events(since="1m", telemetry_dir=str(tmp_path))] == ["late"]
+        assert refresh_index(path).size == path.stat().st_size
+
+    def test_unterminated_last_line_still_read(self, tmp_path):
+        path = tmp_path / f"events-{NOW:%Y%m%d}.jsonl"
+        path.write_text(json.dumps({"type": "old", "ts": ts(NOW - timedelta(days=1))}) + "\n"
+                        + json.dumps({"type": "new", "ts": ts(NOW)}))
+        assert [e["type"] for e in list_events(since="1h", telemetry_dir=str(tmp_path))] == ["new"]
+
+
+def test_concurrent_writers_and_readers(tmp_path):
+    buses = [EventBus() for _ in range(3)]
+    stop = threading.Event()
+    errors = []
+
+    def write(bus, n):
+        for i in range(400):
+            bus.publish({"type": "heartbeat", "writer": n, "i": i, "pad": "x" * random.randint(0, 80)},
+                        directory=str(tmp_path))
+            if i % 50 == 0:
+                time.sleep(0.001)
+
+    def read():
+        while not stop.is_set():
+            try:
+                list_events(since="5m", limit=10_000, telemetry_dir=str(tmp_path))
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(bus, n)) for n, bus in enumerate(buses) for _ in range(2)]
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    for bus in buses:
+        bus.close()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    since_dt = NOW - timedelta(minutes=5)
+    events = list_events(since="5m", limit=10_000, telemetry_dir=str(tmp_path))
+    assert len(events) == 2400
+    assert events == full_scan(tmp_path, since_dt, limit=10_000)
+    (path,) = tmp_path.glob("events-*.jsonl")
+    drop_cached_index()
+    assert refresh_index(path).size == path.stat().st_size
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.benchmark("days", [7], full=[30])
+def test_one_hour_query_over_retention(tmp_path, monkeypatch, days, benchmark_report):
+    """
+    Compare a 1-hour list_events against a full scan of the retention period.
+
+    Each day holds 5k events.
+    """
+    monkeypatch.setattr(segment_index, "CHECKPOINT_BYTES", 64 * 1024)
+    for day in range(days):
+        write_day(tmp_path, NOW - timedelta(days=day), 5_000)
+    since_dt = NOW - timedelta(hours=1)
+
+    start = time.perf_counter()
+    expected = full_scan(tmp_path, since_dt, limit=200)
+    scan_s = time.perf_counter() - start
+
+    list_events(since="1h", telemetry_dir=str(tmp_path))  # builds the indexes
+    start = time.perf_counter()
+    events = list_events(since="1h", telemetry_dir=str(tmp_path))
+    indexed_s = time.perf_counter() - start
+
+    benchmark_report(f"{days} days: full scan {scan_s * 1000:.1f}ms, indexed {indexed_s * 1000:.1f}ms")
+    assert events == expected
+    assert indexed_s < scan_s
@@ -0,0 +1,181 @@
+"""
+Tests for the buffered telemetry sink.
+
+Verifies that buffered SimpleTelemetry events reach the run file through a
+single background-flushed handle, that overflow drops or blocks as
+configured, and that queued events survive interpreter exit and SIGTERM.
+Includes a benchmark of events/second and caller latency against the
+per-event open/write path.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core.telemetry import BufferedJSONLSink, SimpleTelemetry
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def read_events(tel: SimpleTelemetry):
+    if not tel.current_file.exists():
+        return []
+    return [json.loads(line) for line in tel.current_file.read_text().splitlines() if line.strip()]
+
+
+class TestBufferedSink:
+    """Test the sink on its own."""
+
+    def test_flushes_by_size_and_time(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        by_size = BufferedJSONLSink(path, flush_bytes=10, flush_interval=60)
+        by_size.write('{"a": 1}\n')
+        by_size.write('{"a": 2}\n')
+        deadline = time.time() + 5
+        while by_size.stats()["written"] < 2 and time.time() < deadline:
+            time.sleep(0.005)
+        assert path.read_text().count("\n") == 2
+        by_size.close()
+
+        timed_path = tmp_path / "timed.jsonl"
+        by_time = BufferedJSONLSink(timed_path, flush_interval=0.02)
+        by_time.write('{"b": 1}\n')
+        deadline = time.time() + 5
+        while not timed_path.exists() and time.time() < deadline:
+            time.sleep(0.005)
+        assert timed_path.read_text() == '{"b": 1}\n'
+        assert os.stat(timed_path).st_mode & 0o777 == 0o600
+        by_time.close()
+
+    def test_drop_policy_counts_dropped_lines(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        sink = BufferedJSONLSink(path, max_queue=2, flush_interval=60, overflow="drop")
+        results = [sink.write(f'{{"i": {i}}}\n') for i in range(5)]
+
+        assert results == [True, True, False, False, False]
+        assert sink.flush(timeout=5)
+        assert [json.loads(line)["i"] for line in path.read_text().splitlines()] == [0, 1]
+        assert sink.stats()["dropped"] == 3
+        sink.close()
+        assert not sink.write("{}\n")
+
+    def test_block_policy_keeps_every_line(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        sink = BufferedJSONLSink(path, max_queue=2, flush_interval=60, overflow="block")
+        assert all(sink.write(f'{{"i": {i}}}\n') for i in range(50))
+
+        sink.close()
+        assert [json.loads(line)["i"] for line in path.read_text().splitlines()] == list(range(50))
+        assert sink.stats()["dropped"] == 0
+
+    def test_reopens_deleted_file(self, tmp_path):
+        path = tmp_path / "events" / "run.jsonl"
+        sink = BufferedJSONLSink(path)
+        sink.write('{"n": 1}\n')
+        sink.flush(timeout=5)
+        path.unlink()
+        path.parent.rmdir()
+
+        sink.write('{"n": 2}\n')
+        sink.flush(timeout=5)
+        assert path.read_text() == '{"n": 2}\n'
+        sink.close()
+
+
+class TestBufferedTelemetry:
+    """Test SimpleTelemetry in buffered mode."""
+
+    def test_events_buffered_until_flush_or_query(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        tel = SimpleTelemetry(buffered=True, flush_interval=60)
+        tel.log("first", {"k": 1})
+
+        assert read_events(tel) == []
+        assert [e["event"] for e in tel.query(event_filter="first")] == ["first"]
+        tel.log("second", {}, level="error")
+        tel.flush()
+        assert [e["event"] for e in read_events(tel)] == ["first", "second"]
+        assert tel.get_metrics()["errors"] == 1
+        tel.close()
+
+    def test_unsafe_path_reported(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        tel = SimpleTelemetry(buffered=True)
+        tel.current_file = Path("..") / "evil" / "run_hack.jsonl"
+
+        tel.log("should_not_write", {})
+        tel.flush(timeout=5)
+        assert "Unsafe telemetry path" in capsys.readouterr().err
+        assert not (tmp_path.parent / "evil").exists()
+        assert tel.sink_stats()["failed"] == 1
+        tel.close()
+
+    def test_invalid_overflow_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ValueError):
+            SimpleTelemetry(buffered=True, overflow="sometimes")
+
+
+SCRIPT = """
+import os, signal, sys
+from core.telemetry import SimpleTelemetry
+tel = SimpleTelemetry(buffered=True, flush_interval=60)
+for i in range(3):
+    tel.log("queued", {"i": i})
+print(tel.current_file, flush=True)
+if sys.argv[1] == "signal":
+    os.kill(os.getpid(), signal.SIGTERM)
+    signal.pause()
+"""
+
+
+@pytest.mark.parametrize("ending", ["exit", "signal"])
+def test_queued_events_flushed_on_shutdown(tmp_path, ending):
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, ending], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    if ending == "signal":
+        assert result.returncode == -signal.SIGTERM
+    else:
+        assert result.returncode == 0, result.stderr
+    run_file = Path(result.stdout.strip().splitlines()[-1])
+    events = [json.loads(line) for line in run_file.read_text().splitlines()]
+    assert [e["data"]["i"] for e in events if e["event"] == "queued"] == [0, 1, 2]
+
+
+@pytest.mark.benchmark("count", [2_000], full=[50_000])
+def test_buffered_vs_per_event_writes(tmp_path, monkeypatch, count, benchmark_report):
+    """
+    Compare per-event open/write with the buffered sink.
+
+    Reports events/second (including the final flush) and caller-side
+    latency percentiles.
+    """
+    monkeypatch.chdir(tmp_path)
+    results = {}
+    for mode in ("per-event", "buffered"):
+        tel = SimpleTelemetry(buffered=mode == "buffered", overflow="block", max_queue=count)
+        tel.current_file = tel.events_dir / f"run_bench_{mode}.jsonl"
+        latencies = []
+        start = time.perf_counter()
+        for i in range(count):
+            t0 = time.perf_counter()
+            tel.log("tool_call", {"tool": "Read", "i": i, "ok": True})
+            latencies.append(time.perf_counter() - t0)
+        tel.flush()
+        elapsed = time.perf_counter() - start
+        tel.close()
+        latencies.sort()
+        results[mode] = (count / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)])
+        assert len(read_events(tel)) == count
+
+    for mode, (rate, p50, p99) in results.items():
+        benchmark_report(f"{mode}: {rate:,.0f} events/s, caller p50 {p50 * 1e6:.1f}us, p99 {p99 * 1e6:.1f}us")
+    assert results["buffered"][1] < results["per-event"][1]
@@ -0,0 +1,293 @@
+"""
+Tests for TTL expiry through the hierarchical timing wheel.
+
+Uses a fake clock to verify that keys expire in deadline order across
+cascades and long jumps, that the in-memory stores hide expired memories
+from reads before reclaiming them, and that reclamation leaves every
+secondary index consistent.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore
+from agency_memory.memory import InMemoryStore, Memory
+from agency_memory.swarm_memory import MemoryPriority, SwarmMemory, SwarmMemoryStore
+from agency_memory.timing_wheel import TimingWheel
+from agency_memory.vector_store import VectorStore
+from shared.agent_context import AgentContext
+from shared.models.memory import MemoryQuery
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestTimingWheel:
+    """Test scheduling and expiry order."""
+
+    def test_expires_in_deadline_order(self):
+        clock = FakeClock()
+        wheel = TimingWheel(clock=clock)
+        wheel.schedule("late", clock.now + 30)
+        wheel.schedule("early", clock.now + 5.5)
+        wheel.schedule("middle", clock.now + 5.7)
+
+        assert wheel.advance() == []
+        clock.advance(5.6)
+        assert wheel.advance() == ["early"]
+        clock.advance(100)
+        assert wheel.advance() == ["middle", "late"]
+        assert len(wheel) == 0
+
+    def test_cascades_from_higher_levels_and_overflow(self):
+        clock = FakeClock()
+        wheel = TimingWheel(wheel_size=4, levels=2, clock=clock)
+        # Level 1 covers 16 ticks here; 100 seconds lands in overflow
+        deadlines = {"a": 3, "b": 9, "c": 15, "d": 40, "e": 100}
+        for key, offset in deadlines.items():
+            wheel.schedule(key, clock.now + offset)
+
+        expired = []
+        for _ in range(120):
+            clock.advance(1)
+            for key in wheel.advance():
+                expired.append((key, clock.now))
+
+        assert [key for key, _ in expired] == list(deadlines)
+        start = clock.now - 120
+        assert all(at - start == deadlines[key] for key, at in expired)
+
+    def test_matches_reference_under_random_operations(self):
+        rng = random.Random(7)
+        clock = FakeClock()
+        wheel = TimingWheel(tick_seconds=0.5, wheel_size=8, levels=3, clock=clock)
+        reference = {}
+        for _ in range(3000):
+            roll = rng.random()
+            key = f"k{rng.randrange(100)}"
+            if roll < 0.5:
+                deadline = clock.now + rng.choice([rng.uniform(-1, 3), rng.uniform(0, 300), rng.uniform(0, 10_000)])
+                wheel.schedule(key, deadline)
+                reference[key] = deadline
+            elif roll < 0.6:
+                assert wheel.cancel(key) == (key in reference)
+                reference.pop(key, None)
+            else:
+                clock.advance(rng.choice([rng.uniform(0, 2), rng.uniform(0, 100), rng.uniform(0, 5000)]))
+                due = sorted((deadline, k) for k, deadline in reference.items() if deadline <= clock.now)
+                assert wheel.advance() == [k for _, k in due]
+                for _, k in due:
+                    del reference[k]
+        assert len(wheel) == len(reference)
+
+    def test_rescheduling_replaces_deadline(self):
+        clock = FakeClock()
+        wheel = TimingWheel(clock=clock)
+        wheel.schedule("k", clock.now + 1)
+        wheel.schedule("k", clock.now + 10)
+
+        clock.advance(5)
+        assert wheel.advance() == []
+        assert not wheel.is_expired("k")
+        assert wheel.deadline_of("k") == clock.now + 5
+
+
+class TestInMemoryStoreExpiry:
+    """Test TTL handling in InMemoryStore."""
+
+    def test_reads_hide_expired_before_reclamation(self):
+        clock = FakeClock()
+        store = InMemoryStore(clock=clock)
+        store.store("short", 1, ["t"], ttl_seconds=10)
+        store.store("keep", 2, ["t"])
+        clock.advance(11)
+
+        assert [r.key for r in store.search(["t"]).records] == ["keep"]
+        assert [r.key for r in store.search(["t"], limit=1).records] == ["keep"]
+        assert store.get("short") is None
+        assert [r.key for r in store.get_all().records] == ["keep"]
+        assert [r.key for r in store.query(MemoryQuery(any_tags=["t"]))] == ["keep"]
+        # Still resident until reclaimed
+        assert "short" in store._memories
+
+    def test_bulk_reclamation_clears_indexes(self):
+        clock = FakeClock()
+        store = InMemoryStore(clock=clock)
+        for i in range(500):
+            store.store(f"k{i}", i, [f"t{i % 5}", "all"], ttl_seconds=1 + i % 50)
+        store.store("forever", 0, ["all"])
+        clock.advance(25)
+
+        assert store.expire_memories() == 250
+        assert len(store._memories) == 251
+        assert len(store._tag_index) == 251
+        assert len(store._expiry) == 250
+        assert store.search(["all"]).total_count == 251
+
+    def test_writes_reclaim_and_restoring_clears_ttl(self):
+        clock = FakeClock()
+        store = InMemoryStore(clock=clock)
+        store.store("k", "old", ["t"], ttl_seconds=5)
+        store.store("k", "new", ["t"])
+        store.store("gone", "x", ["t"], ttl_seconds=5)
+        clock.advance(6)
+
+        store.store("other", "y", ["u"])
+
+        assert store.get("k").content == "new"
+        assert "gone" not in store._memories and "gone" not in store._tag_index
+        assert store.get("k").ttl_seconds is None
+
+    def test_memory_passes_ttl_only_when_set(self):
+        clock = FakeClock()
+        memory = Memory(InMemoryStore(clock=clock))
+        memory.store("k", "v", ["t"], ttl_seconds=1)
+        clock.advance(2)
+
+        assert memory.search(["t"]) == []
+
+
+class TestSwarmStoreExpiry:
+    """Test TTL handling in SwarmMemoryStore."""
+
+    def test_reads_hide_expired_before_reclamation(self):
+        clock = FakeClock()
+        store = SwarmMemoryStore(clock=clock)
+        store.store("tmp", 1, ["t"], agent_id="a", is_shared=True, ttl_seconds=10)
+        store.store("keep", 2, ["t"], agent_id="a")
+        clock.advance(10)
+
+        assert [r.key for r in store.search(["t"], agent_id="a").records] == ["keep"]
+        assert store.search(["t"], agent_id="b").records == []
+        assert [r.key for r in store.get_all().records] == ["keep"]
+        assert [m["key"] for m in store.get_agent_memories("a")] == ["keep"]
+        assert store.get_shared_memories() == []
+        assert "a:tmp" in store._memories
+
+    def test_reclamation_clears_every_index(self):
+        clock = FakeClock()
+        store = SwarmMemoryStore(clock=clock)
+        store.store("tmp", 1, ["t"], agent_id="a", is_shared=True, ttl_seconds=5)
+        store.store("keep", 2, ["t"], agent_id="a", ttl_seconds=50)
+        store.search(["t"], agent_id="a")
+        clock.advance(6)
+
+        assert store.expire_memories() == 1
+
+        assert set(store._memories) == {"a:keep"}
+        assert store._agent_namespaces["a"] == {"a:keep"}
+        assert "a:tmp" not in store._tag_index
+        assert "a:tmp" not in store._retention["a"]
+        assert store._shared_knowledge == {} and len(store._shared_tag_index) == 0
+        assert store._memories["a:keep"].access_count == 1
+
+    def test_expired_memories_do_not_count_toward_pruning(self):
+        clock = FakeClock()
+        store = SwarmMemoryStore(max_memories_per_agent=100, clock=clock)
+        for i in range(20):
+            store.store(f"k{i}", i, ["t"], agent_id="a", priority=MemoryPriority.LOW, ttl_seconds=1)
+        clock.advance(2)
+
+        assert store.prune_memories("a", target_count=5) == 0
+        assert store._agent_namespaces["a"] == set()
+
+    def test_swarm_memory_and_agent_context_pass_ttl(self):
+        clock = FakeClock()
+        memory = SwarmMemory(store=SwarmMemoryStore(clock=clock), agent_id="a")
+        context = AgentContext(memory=memory, session_id="s")
+        context.store_memory("tool_call", {"x": 1}, ["tool"], ttl_seconds=3)
+        memory.store("note", "kept", ["tool"])
+        clock.advance(4)
+
+        assert [m["key"] for m in memory.search(["tool"])] == ["note"]
+
+    def test_invalid_ttl_rejected(self):
+        with pytest.raises(ValueError):
+            SwarmMemoryStore().store("k", "v", ["t"], ttl_seconds=0)
+
+
+class TestEnhancedStoreExpiry:
+    """Test TTL handling in EnhancedMemoryStore."""
+
+    def make_store(self, clock):
+        return EnhancedMemoryStore(vector_store=VectorStore(), clock=clock)
+
+    def test_reads_hide_expired_before_reclamation(self):
+        clock = FakeClock()
+        store = self.make_store(clock)
+        store.store("short", "alpha", ["t"], ttl_seconds=10)
+        store.store("keep", "beta", ["t"])
+        clock.advance(11)
+
+        assert [r.key for r in store.search(["t"]).records] == ["keep"]
+        assert [r.key for r in store.search(["t"], limit=1).records] == ["keep"]
+        assert [r.key for r in store.get_all().records] == ["keep"]
+        assert [r.key for r in store.query(MemoryQuery(any_tags=["t"]))] == ["keep"]
+        assert store.semantic_search("alpha", min_similarity=0.0) == []
+        assert "short" in store._memories
+
+    def test_reclamation_clears_indexes_and_logs_deletions(self):
+        clock = FakeClock()
+        store = self.make_store(clock)
+        store.store_batch([(f"k{i}", f"value {i}", ["t"]) for i in range(4)], ttl_seconds=5)
+        store.store("keep", "kept", ["t"])
+        revision, _, _ = store.changes_since(0)
+        clock.advance(6)
+
+        assert store.expire_memories() == 4
+        assert set(store._memories) == {"keep"}
+        assert len(store._tag_index) == 1
+        assert set(store.vector_store._memory_texts) == {"keep"}
+        _, reset, changes = store.changes_since(revision)
+        assert not reset and sorted(changes) == [(f"k{i}", None) for i in range(4)]
+
+    def test_writes_reclaim_and_ttl_round_trips(self):
+        clock = FakeClock()
+        store = self.make_store(clock)
+        store.store("gone", "x", ["t"], ttl_seconds=5)
+        assert store.get_all().records[0].ttl_seconds == 5
+        clock.advance(6)
+
+        store.store("other", "y", ["u"])
+
+        assert "gone" not in store._memories and "gone" not in store._tag_index
+        with pytest.raises(ValueError):
+            store.store("k", "v", ["t"], ttl_seconds=0)
+
+    def test_agent_context_passes_ttl(self):
+        clock = FakeClock()
+        context = AgentContext(memory=Memory(self.make_store(clock)), session_id="s")
+        context.store_memory("tool_call", {"x": 1}, ["tool"], ttl_seconds=3)
+        context.store_memory("note", "kept", ["tool"])
+        clock.advance(4)
+
+        assert [m["key"] for m in context.search_memories(["tool"])] == ["note"]
+
+    def test_hook_tool_memories_expire(self):
+        pytest.importorskip("agents")
+        from shared.system_hooks import MemoryIntegrationHook
+
+        class Tool:
+            name = "Read"
+
+        clock = FakeClock()
+        context = AgentContext(memory=Memory(self.make_store(clock)), session_id="s")
+        hook = MemoryIntegrationHook(agent_context=context, tool_memory_ttl_seconds=5)
+        asyncio.run(hook.on_start(None, None))
+        asyncio.run(hook.on_tool_start(None, None, Tool()))
+        asyncio.run(hook.on_tool_end(None, None, Tool(), "file contents"))
+
+        assert len(context.search_memories(["tool"], include_session=False)) == 2
+        clock.advance(6)
+        assert context.search_memories(["tool"], include_session=False) == []
+        assert len(context.search_memories(["session", "start"])) == 1
@@ -0,0 +1,298 @@
+"""
+Tests for the NumPy-backed VectorStore index.
+
+Verifies that the matrix backend ranks exactly like the pure-Python cosine
+loop, that appends/deletes keep the key <-> row mapping stable, and that the
+IVF backend reaches its recall targets against brute force.
+"""
+
+import random
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agency_memory.vector_index import EmbeddingMatrix, IVFIndex, top_k_indices
+from agency_memory.vector_store import VectorStore
+
+DIM = 16
+
+
+def fake_embedder(dim: int = DIM):
+    """Deterministic per-text embedding function for tests."""
+
+    def embed(texts):
+        vectors = []
+        for text in texts:
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(dim)])
+        return vectors
+
+    return embed
+
+
+def make_store(backend: str) -> VectorStore:
+    store = VectorStore(index_backend=backend)
+    store._embedding_function = fake_embedder()
+    return store
+
+
+def make_memories(count: int):
+    return [
+        {"key": f"mem_{i}", "content": f"memory number {i} about topic {i % 7}", "tags": [f"t{i % 5}"]}
+        for i in range(count)
+    ]
+
+
+class TestEmbeddingMatrix:
+    """Test EmbeddingMatrix storage semantics."""
+
+    def test_rows_are_normalized(self):
+        matrix = EmbeddingMatrix()
+        matrix.add("a", [3.0, 4.0])
+
+        assert matrix.dim == 2
+        assert matrix["a"] == pytest.approx([0.6, 0.8])
+
+    def test_append_and_delete_keep_rows_stable(self):
+        matrix = EmbeddingMatrix(initial_capacity=2)
+        rows = {key: matrix.add(key, [float(i + 1), 1.0]) for i, key in enumerate("abcde")}
+
+        matrix.remove("b")
+        assert "b" not in matrix
+        assert len(matrix) == 4
+        for key in "acde":
+            assert matrix.row_of(key) == rows[key]
+
+        # Deleted rows are recycled instead of growing the matrix
+        assert matrix.add("f", [1.0, 0.0]) == rows["b"]
+
+    def test_dimension_mismatch_rejected(self):
+        matrix = EmbeddingMatrix()
+        matrix.add("a", [1.0, 0.0])
+
+        with pytest.raises(ValueError):
+            matrix.add("b", [1.0, 0.0, 0.0])
+
+    def test_search_skips_deleted_rows(self):
+        matrix = EmbeddingMatrix()
+        matrix.add("a", [1.0, 0.0])
+        matrix.add("b", [0.0, 1.0])
+        matrix.add("c", [1.0, 1.0])
+        matrix.remove("a")
+
+        results = matrix.search([1.0, 0.0], top_k=5)
+        assert [key for key, _ in results] == ["c", "b"]
+
+    def test_from_rows_accepts_constructor_options(self):
+        vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        matrix = EmbeddingMatrix.from_rows(["a", "b"], vectors, dim=2, initial_capacity=64)
+
+        assert matrix.dim == 2
+        assert matrix.search([0.0, 1.0], top_k=1)[0][0] == "b"
+
+    def test_top_k_breaks_ties_by_position(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1], dtype=np.float32)
+
+        assert top_k_indices(scores, 3).tolist() == [1, 3, 0]
+        assert top_k_indices(scores, 10).tolist() == [1, 3, 0, 2, 4]
+
+
+class TestMatrixBackend:
+    """Test VectorStore semantic search on the matrix backend."""
+
+    def test_ranking_matches_python_backend(self):
+        memories = make_memories(300)
+        python_store = make_store("python")
+        matrix_store = make_store("matrix")
+
+        for query in ["topic 3", "memory number 42", "unrelated words"]:
+            expected = python_store.semantic_search(query, memories, top_k=25)
+            actual = matrix_store.semantic_search(query, memories, top_k=25)
+
+            assert [r.memory["key"] for r in actual] == [r.memory["key"] for r in expected]
+            for got, want in zip(actual, expected):
+                assert got.similarity_score == pytest.approx(want.similarity_score, abs=1e-5)
+                assert got.search_type == "semantic"
+
+    def test_search_respects_memory_subset(self):
+        memories = make_memories(50)
+        store = make_store("matrix")
+        for memory in memories:
+            store.add_memory(memory["key"], memory)
+
+        subset = memories[10:20]
+        results = store.semantic_search("topic 1", subset, top_k=50)
+
+        assert {r.memory["key"] for r in results} == {m["key"] for m in subset}
+
+    def test_remove_memory(self):
+        store = make_store("matrix")
+        memory = {"key": "a", "content": "content", "tags": []}
+        store.add_memory("a", memory)
+        store.flush()
+        assert "a" in store._embeddings
+
+        store.remove_memory("a")
+
+        assert "a" not in store._embeddings
+        assert store.get_stats()["memories_with_embeddings"] == 0
+
+    def test_stats_report_backend(self):
+        assert make_store("matrix").get_stats()["index_backend"] == "matrix"
+        assert make_store("python").get_stats()["index_backend"] == "python"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            VectorStore(index_backend="faiss")
+
+
+def clustered_corpus(size: int, dim: int = 32, clusters: int = 50, seed: int = 0):
+    """Synthetic corpus of noisy points around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim))
+    labels = rng.integers(clusters, size=size)
+    vectors = centres[labels] + 0.3 * rng.standard_normal((size, dim))
+    queries = centres[rng.integers(clusters, size=50)] + 0.3 * rng.standard_normal((50, dim))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def recall_at_k(index: IVFIndex, exact: EmbeddingMatrix, queries, k: int = 10) -> float:
+    hits = 0
+    for query in queries:
+        truth = {key for key, _ in exact.search(query, top_k=k)}
+        found = {key for key, _ in index.search(query, top_k=k)}
+        hits += len(truth & found)
+    return hits / (k * len(queries))
+
+
+def build_indexes(vectors, **ivf_options):
+    index = IVFIndex(**ivf_options)
+    exact = EmbeddingMatrix()
+    for i, vector in enumerate(vectors):
+        index.add(f"mem_{i}", vector)
+        exact.add(f"mem_{i}", vector)
+    return index, exact
+
+
+class TestIVFIndex:
+    """Test the approximate IVF backend."""
+
+    def test_exact_below_threshold(self):
+        vectors, queries = clustered_corpus(200)
+        index, exact = build_indexes(vectors, exact_threshold=1000)
+
+        assert not index.is_trained
+        assert recall_at_k(index, exact, queries) == 1.0
+
+    def test_recall_against_brute_force(self):
+        vectors, queries = clustered_corpus(5000)
+        index, exact = build_indexes(vectors, exact_threshold=1000, n_lists=50, n_probe=8)
+
+        assert index.is_trained
+        assert recall_at_k(index, exact, queries) >= 0.9
+
+    def test_more_probes_never_lower_recall(self):
+        vectors, queries = clustered_corpus(4000)
+        index, exact = build_indexes(vectors, exact_threshold=500, n_lists=64, n_probe=1)
+        low = recall_at_k(index, exact, queries)
+        index.n_probe = 16
+        high = recall_at_k(index, exact, queries)
+
+        assert high >= low
+        index.n_probe = 64
+        assert recall_at_k(index, exact, queries) == 1.0
+
+    def test_incremental_insert_and_delete(self):
+        vectors, _ = clustered_corpus(3000)
+        index, _ = build_indexes(vectors, exact_threshold=1000, n_lists=20, n_probe=20)
+
+        index.remove("mem_5")
+        index.add("new", vectors[5])
+
+        results = index.search(vectors[5], top_k=1)
+        assert results[0][0] == "new"
+        assert "mem_5" not in index
+        assert sum(len(rows) for rows in index._lists) == len(index)
+
+    def test_persistence_round_trip(self, tmp_path):
+        vectors, queries = clustered_corpus(2000)
+        index, _ = build_indexes(vectors, exact_threshold=500, n_lists=20, n_probe=4)
+        index.remove("mem_0")
+        path = str(tmp_path / "memories" / "vectors.ivf.npz")
+
+        index.save(path)
+        restored = IVFIndex.load(path)
+
+        assert len(restored) == len(index)
+        assert restored.is_trained
+        assert "mem_0" not in restored
+        for query in queries[:10]:
+            assert restored.search(query, top_k=5) == pytest.approx(index.search(query, top_k=5))
+
+    def test_vector_store_ivf_backend(self, tmp_path):
+        path = str(tmp_path / "vectors.npz")
+        options = {"exact_threshold": 100, "n_lists": 8, "n_probe": 8}
+        store = VectorStore(index_backend="ivf", index_options=options, index_path=path)
+        store._embedding_function = fake_embedder()
+        memories = make_memories(400)
+        store.add_memories((m["key"], m) for m in memories)
+
+        exact = make_store("python").semantic_search("topic 2", memories, top_k=10)
+        approx = store.semantic_search("topic 2", memories, top_k=10)
+        assert [r.memory["key"] for r in approx] == [r.memory["key"] for r in exact]
+        assert store.get_stats()["index_trained"] is True
+
+        assert store.save_index() == path
+        warm = VectorStore(index_backend="ivf", index_options=options, index_path=path)
+        assert len(warm._embeddings) == 400
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000, 1_000_000])
+def test_matrix_search_throughput(size, benchmark_report):
+    """Report semantic_search throughput for the matrix backend."""
+    dim = 64
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((size, dim)).astype(np.float32)
+
+    matrix = EmbeddingMatrix(dim=dim, initial_capacity=size)
+    for i in range(size):
+        matrix.add(f"mem_{i}", vectors[i])
+
+    queries = rng.standard_normal((20, dim)).astype(np.float32)
+    start = time.perf_counter()
+    for query in queries:
+        results = matrix.search(query, top_k=10)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 10
+    benchmark_report(f"matrix backend: {size} memories, {len(queries) / elapsed:.1f} queries/s")
+
+    if size <= 10_000:
+        # Compare against the pure-Python cosine loop on the same corpus
+        store = VectorStore()
+        as_lists = vectors.tolist()
+        start = time.perf_counter()
+        for vec in as_lists[:size]:
+            store._cosine_similarity(queries[0].tolist(), vec)
+        python_elapsed = time.perf_counter() - start
+        benchmark_report(f"python backend: {size} memories, {1 / python_elapsed:.1f} queries/s")
+
+
+@pytest.mark.benchmark("size", [10_000], full=[100_000])
+def test_ivf_query_latency(size, benchmark_report):
+    """Report IVF recall@10 and p50/p99 query latency on a clustered corpus."""
+    vectors, queries = clustered_corpus(size, dim=64, clusters=200)
+    index, exact = build_indexes(vectors, exact_threshold=1000, n_probe=8)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, top_k=10)
+        latencies.append(time.perf_counter() - start)
+
+    p50, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 99])
+    recall = recall_at_k(index, exact, queries)
+    benchmark_report(f"ivf backend: {size} memories, recall@10={recall:.3f}, p50={p50:.2f}ms, p99={p99:.2f}ms")
+    assert recall >= 0.8
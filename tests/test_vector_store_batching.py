@@ -0,0 +1,164 @@
+"""
+Tests for VectorStore micro-batched embedding generation.
+
+Verifies that writes are grouped into batched embedding calls and that
+searches issued right after a write still see it (read-your-writes).
+"""
+
+import random
+import time
+
+import pytest
+
+from agency_memory.enhanced_memory_store import EnhancedMemoryStore
+from agency_memory.vector_store import VectorStore
+
+
+class CountingEmbedder:
+    """Deterministic embedding function that records each call's batch size."""
+
+    def __init__(self, dim: int = 8, fail_on: str = ""):
+        self.dim = dim
+        self.fail_on = fail_on
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        vectors = []
+        for text in texts:
+            if self.fail_on and self.fail_on in text:
+                raise RuntimeError("embedding backend rejected input")
+            rng = random.Random(text)
+            vectors.append([rng.uniform(-1.0, 1.0) for _ in range(self.dim)])
+        return vectors
+
+
+def make_store(embedder, **kwargs) -> VectorStore:
+    store = VectorStore(**kwargs)
+    store._embedding_function = embedder
+    return store
+
+
+def memory(i: int):
+    return {"key": f"mem_{i}", "content": f"content {i}", "tags": ["t"]}
+
+
+class TestMicroBatching:
+    """Test size/latency flush policy of add_memory."""
+
+    def test_size_triggered_flush(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=4, max_batch_latency_ms=60_000)
+
+        for i in range(10):
+            store.add_memory(f"mem_{i}", memory(i))
+
+        assert embedder.calls == [4, 4]
+        assert len(store._embeddings) == 8
+        assert len(store._pending_texts) == 2
+
+    def test_latency_triggered_flush(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=100, max_batch_latency_ms=1)
+
+        store.add_memory("mem_0", memory(0))
+        time.sleep(0.01)
+        store.add_memory("mem_1", memory(1))
+
+        assert embedder.calls == [2]
+        assert len(store._pending_texts) == 0
+
+    def test_read_your_writes(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=100, max_batch_latency_ms=60_000)
+        memories = [memory(i) for i in range(5)]
+        for m in memories:
+            store.add_memory(m["key"], m)
+
+        results = store.semantic_search("content 3", memories, top_k=5)
+
+        assert len(results) == 5
+        # One batch for the five writes, one call for the query
+        assert sorted(embedder.calls) == [1, 5]
+
+    def test_missing_memories_embedded_in_one_batch(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=64)
+        memories = [memory(i) for i in range(50)]
+
+        results = store.semantic_search("content", memories, top_k=3)
+
+        assert len(results) == 3
+        assert embedder.calls == [1, 50]
+
+    def test_failed_batch_retries_individually(self):
+        embedder = CountingEmbedder(fail_on="content 2")
+        store = make_store(embedder)
+
+        store.add_memories([(f"mem_{i}", memory(i)) for i in range(4)])
+
+        assert "mem_2" not in store._embeddings
+        assert {"mem_0", "mem_1", "mem_3"} <= set(store._embeddings)
+
+    def test_removed_memory_not_embedded(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=100, max_batch_latency_ms=60_000)
+        store.add_memory("mem_0", memory(0))
+        store.remove_memory("mem_0")
+
+        store.flush()
+
+        assert "mem_0" not in store._embeddings
+        assert embedder.calls == []
+
+
+class TestBulkIngest:
+    """Test bulk-add paths."""
+
+    def test_bulk_ingest_is_batch_bound(self):
+        embedder = CountingEmbedder()
+        store = make_store(embedder, embedding_batch_size=256)
+
+        added = store.add_memories((f"mem_{i}", memory(i)) for i in range(10_000))
+
+        assert added == 10_000
+        assert len(store._embeddings) == 10_000
+        assert len(embedder.calls) == 40
+        assert store.get_stats()["embedding_calls"] == 40
+
+    def test_enhanced_store_batch(self):
+        embedder = CountingEmbedder()
+        vector_store = make_store(embedder, embedding_batch_size=32)
+        store = EnhancedMemoryStore(vector_store=vector_store)
+
+        stored = store.store_batch((f"k{i}", f"value {i}", ["bulk"]) for i in range(100))
+
+        assert stored == 100
+        assert store.search(["bulk"]).total_count == 100
+        assert embedder.calls == [32, 32, 32, 4]
+
+    def test_optimize_counts_embeddings_gained(self):
+        vector_store = make_store(None)
+        store = EnhancedMemoryStore(vector_store=vector_store)
+        store.store_batch((f"k{i}", f"value {i}", ["bulk"]) for i in range(4))
+        vector_store._embedding_function = CountingEmbedder(fail_on="value 2")
+
+        stats = store.optimize_vector_store()
+
+        assert stats["memories_processed"] == 4
+        assert stats["embeddings_generated"] == 3
+
+    @pytest.mark.parametrize("backend", ["python", "matrix"])
+    def test_batched_results_match_unbatched(self, backend):
+        pytest.importorskip("numpy")
+        memories = [memory(i) for i in range(40)]
+        batched = make_store(CountingEmbedder(), index_backend=backend, embedding_batch_size=16)
+        single = make_store(CountingEmbedder(), index_backend=backend, embedding_batch_size=1)
+        for m in memories:
+            batched.add_memory(m["key"], m)
+            single.add_memory(m["key"], m)
+
+        expected = single.semantic_search("content 7", memories, top_k=10)
+        actual = batched.semantic_search("content 7", memories, top_k=10)
+
+        assert [r.memory["key"] for r in actual] == [r.memory["key"] for r in expected]
@@ -8,7 +8,7 @@ from typing import Any, Dict, List, Optional, Union, cast
 from shared.type_definitions.json import JSONValue
 from shared.models.telemetry import TelemetryMetrics
 
-from tools.telemetry.aggregator import aggregate
+from tools.telemetry.incremental_aggregator import IncrementalAggregator
 
 ENV_DIR = "AGENCY_TELEMETRY_DIR"
 DEFAULT_TELEMETRY_DIR = os.path.join(os.getcwd(), "logs", "telemetry")
@@ -92,8 +92,16 @@ def main() -> None:
 
     interval = _parse_refresh(args.refresh)
 
+    # Follows the event files across refreshes and resumes from its checkpoint on restart
+    telemetry_dir = _telemetry_dir()
+    aggregator = IncrementalAggregator(
+        since=args.since,
+        telemetry_dir=telemetry_dir,
+        checkpoint_path=IncrementalAggregator.default_checkpoint_path(args.since, telemetry_dir),
+    )
+
     def once() -> None:
-        summary = aggregate(since=args.since, telemetry_dir=_telemetry_dir())
+        summary = aggregator.aggregate()
         if args.format == "json":
             # Convert TelemetryMetrics to dict for JSON serialization
             summary_dict = summary.model_dump()
@@ -111,8 +119,13 @@ def main() -> None:
                 _t.sleep(interval)
         except KeyboardInterrupt:
             return
+        finally:
+            aggregator.close()
     else:
-        once()
+        try:
+            once()
+        finally:
+            aggregator.close()
 
 
 if __name__ == "__main__":
@@ -2,17 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import dataclasses
-import json
 import os
 import time
 import contextlib
 import uuid
-from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Literal, Optional, cast
 from shared.type_definitions.json import JSONValue
 from shared.models.orchestrator import ExecutionMetrics
 
 from shared.agent_context import AgentContext  # type: ignore
+from tools.telemetry.bus import get_event_bus
 
 
 BackoffType = Literal["fixed", "exp"]
@@ -26,7 +25,10 @@ def _telemetry_enabled() -> bool:
 
 
 def _telemetry_emit(event: Dict[str, JSONValue]) -> None:
-    """Append a JSONL telemetry event. Fail-safe and non-blocking best-effort.
+    """Publish a telemetry event to the shared event bus. Fail-safe and non-blocking.
+
+    The bus redacts the event and appends it to logs/telemetry/events-YYYYMMDD.jsonl
+    (relative to CWD) from its own thread, and hands it to in-process subscribers.
 
     Event schema (subset):
       {"ts": ISO8601Z, "type": "task_started"|"task_finished", "id": str,
@@ -36,23 +38,9 @@ def _telemetry_emit(event: Dict[str, JSONValue]) -> None:
     if not _telemetry_enabled():
         return
     try:
-        # Compute path logs/telemetry/events-YYYYMMDD.jsonl relative to CWD
-        base = os.path.join(os.getcwd(), "logs", "telemetry")
-        os.makedirs(base, exist_ok=True)
-        ts = datetime.now(timezone.utc)
-        fname = os.path.join(base, f"events-{ts:%Y%m%d}.jsonl")
-        event = dict(event)
-        # Sanitize before writing
-        try:
-            from tools.telemetry.sanitize import redact_event  # type: ignore
-            event = redact_event(event)
-        except Exception:
-            pass
-        event["ts"] = ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
-        with open(fname, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        get_event_bus().publish(event, directory=os.path.join(os.getcwd(), "logs", "telemetry"))
     except Exception:
-        # Swallow all I/O errors per spec
+        # Swallow all errors per spec
         return
 
 
@@ -4,7 +4,7 @@ Telemetry System - Production-Grade Event Logging and Analysis
 This module provides comprehensive telemetry capabilities extracted from
 the enterprise infrastructure branch. Key features:
 
-- Fail-safe JSONL event logging
+- Fail-safe JSONL event logging through a batched in-process event bus
 - Automatic secret sanitization
 - Real-time event aggregation and analysis
 - Cost tracking and resource monitoring
@@ -21,16 +21,25 @@ Usage:
     # Get dashboard metrics
     dashboard = aggregate(since="1h")
 
+    # Refresh the same metrics repeatedly, reading only new events
+    follower = IncrementalAggregator(since="1h")
+    dashboard = follower.aggregate()
+
     # List recent events with filtering
     events = list_events(since="15m", grep="error")
+
+    # Consume orchestrator events in-process
+    token = get_event_bus().subscribe(on_event, event_types={"task_finished"})
 """
 
 from .sanitize import redact_event
 from .aggregator import aggregate, list_events
+from .incremental_aggregator import IncrementalAggregator
+from .bus import EventBus, get_event_bus
 
 # Import enterprise aggregator as well for advanced features
 try:
     from .aggregator_enterprise import aggregate as aggregate_enterprise
-    __all__ = ["redact_event", "aggregate", "list_events", "aggregate_enterprise"]
+    __all__ = ["redact_event", "aggregate", "list_events", "IncrementalAggregator", "EventBus", "get_event_bus", "aggregate_enterprise"]
 except ImportError:
-    __all__ = ["redact_event", "aggregate", "list_events"]
\ No newline at end of file
+    __all__ = ["redact_event", "aggregate", "list_events", "IncrementalAggregator", "EventBus", "get_event_bus"]
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Minimal telemetry aggregator to power `agency.py dashboard` and `tail`.
 
-- Reads JSONL events from logs/telemetry/events-*.jsonl
+- Reads JSONL events from logs/telemetry/events-*.jsonl, using each file's
+  sidecar time index to skip files and seek past events outside the window
 - Provides list_events() for raw event tailing
 - Provides aggregate() for a summary used by the text dashboard
 
@@ -24,6 +25,8 @@ from shared.models.telemetry import (
     SystemHealth, EventType, EventSeverity
 )
 
+from .segment_index import window_start
+
 
 # ------------------------
 # Helpers (also used by enhanced_aggregator)
@@ -91,8 +94,13 @@ def _load_events(since_dt: datetime, telemetry_dir: Optional[str] = None, limit:
     events: List[Dict[str, JSONValue]] = []
 
     for fp in _iter_event_files(base):
+        # Skip files with nothing in the window and seek past older events
+        start = window_start(fp, since_dt)
+        if start is None:
+            continue
         try:
-            with fp.open("r", encoding="utf-8") as f:
+            with fp.open("rb") as f:
+                f.seek(start)
                 for line in f:
                     line = line.strip()
                     if not line:
@@ -269,6 +277,40 @@ def aggregate(since: str = "1h", telemetry_dir: Optional[str] = None) -> Telemet
                 except Exception:
                     pass
 
+    return _summarize(
+        since, since_dt, now,
+        total_events=total_events,
+        tasks_started=tasks_started,
+        tasks_finished=tasks_finished,
+        recent_results=recent_results,
+        agents_active=agents_active,
+        tasks=tasks,
+        max_concurrency=max_concurrency,
+        total_tokens=total_tokens,
+        total_usd=total_usd,
+    )
+
+
+def _summarize(
+    since: str,
+    since_dt: datetime,
+    now: datetime,
+    total_events: int,
+    tasks_started: int,
+    tasks_finished: int,
+    recent_results: Dict[str, int],
+    agents_active: List[str],
+    tasks: Dict[str, Dict[str, Any]],
+    max_concurrency: Optional[int],
+    total_tokens: int,
+    total_usd: float,
+) -> TelemetryMetrics:
+    """Build the dashboard summary from counters over the window's events.
+
+    Shared by aggregate() and IncrementalAggregator so both produce the same
+    output. tasks maps task id to its latest start (agent, started_dt,
+    last_hb_dt, finished), in order of first start within the window.
+    """
     # Derive running tasks (not finished)
     running_tasks: List[Dict[str, JSONValue]] = []
     for t in tasks.values():
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Optional, cast
 from shared.type_definitions.json import JSONValue
 
+from .segment_index import window_start
+
 # Public type alias for compatibility with prior stub
 Event = Dict[str, JSONValue]
 
@@ -89,8 +91,12 @@ def _iter_event_files(dir_path: str) -> Iterable[str]:
 
 def _load_events_since(dir_path: str, since_dt: datetime) -> Iterable[Dict[str, JSONValue]]:
     for fp in _iter_event_files(dir_path):
+        start = window_start(fp, since_dt)
+        if start is None:
+            continue
         try:
-            with open(fp, "r", encoding="utf-8") as f:
+            with open(fp, "rb") as f:
+                f.seek(start)
                 for line in f:
                     line = line.strip()
                     if not line:
@@ -0,0 +1,344 @@
+"""In-process telemetry event bus.
+
+The orchestrator used to open, append to and close the daily
+events-YYYYMMDD.jsonl file (after a full redaction pass) on every
+_telemetry_emit call, on the event loop, once per heartbeat of every running
+task. EventBus.publish() instead stamps the event, puts it on a bounded
+queue and returns. A single dispatcher thread then:
+
+- redacts queued events off the caller's thread
+- hands them to subscribers (callbacks, or asyncio queues for consumers
+  running on an event loop)
+- appends them in batches to one long-lived handle per destination
+  directory, rotating to the next day's file as event timestamps cross
+  midnight UTC
+
+publish() never blocks and never raises: when the queue is full the event
+is dropped and counted in stats(). flush() is a barrier for tests and
+shutdown; the shared bus is flushed at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import IO, Callable, Collection, Deque, Dict, List, Optional, Tuple
+
+from shared.type_definitions.json import JSONValue
+
+from .sanitize import redact_event
+from .segment_index import CHECKPOINT_BYTES, refresh_index
+
+Event = Dict[str, JSONValue]
+Subscriber = Callable[[Event], None]
+
+# (sequence, event, timestamp, destination directory or None)
+_Queued = Tuple[int, Event, datetime, Optional[str]]
+
+
+def _format_ts(ts: datetime) -> str:
+    return ts.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class _DailyJSONLWriter:
+    """
+    Appends to <directory>/events-YYYYMMDD.jsonl through one open handle.
+
+    The file's time index is brought up to date every CHECKPOINT_BYTES
+    written and when the file is closed or rotated.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.day: Optional[str] = None
+        self._path: Optional[str] = None
+        self._file: Optional[IO[str]] = None
+        self._unindexed = 0
+
+    def write(self, day: str, lines: List[str]) -> None:
+        # Reopen after rotation, or if the file was removed under us
+        if day != self.day or self._path is None or not os.path.exists(self._path):
+            self._open(day)
+        assert self._file is not None
+        data = "".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        self._unindexed += len(data)
+        if self._unindexed >= CHECKPOINT_BYTES:
+            self._index()
+
+    def _index(self) -> None:
+        self._unindexed = 0
+        if self._path is not None:
+            refresh_index(self._path)
+
+    def _open(self, day: str) -> None:
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"events-{day}.jsonl")
+        self._file = open(self._path, "a", encoding="utf-8")
+        self.day = day
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+            if self._unindexed:
+                self._index()
+
+
+class EventBus:
+    """
+    Thread- and asyncio-safe publisher for telemetry events.
+
+    Events are redacted, delivered to subscribers and written in the order
+    they were published. Subscriber callbacks run on the dispatcher thread
+    and must be quick; an exception in one is counted and otherwise ignored.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10_000,
+        redact: Optional[Callable[[Event], Event]] = redact_event,
+        name: str = "telemetry-bus",
+    ) -> None:
+        """
+        Initialize EventBus.
+
+        Args:
+            max_queue: Queued events before publish() starts dropping
+            redact: Applied to every event before delivery (None disables)
+            name: Dispatcher thread name
+        """
+        self.max_queue = max(1, max_queue)
+        self.redact = redact
+        self.name = name
+        self._queue: Deque[_Queued] = deque()
+        self._condition = threading.Condition()
+        self._next_sequence = 0
+        self._handled = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._subscribers: Dict[int, Tuple[Subscriber, Optional[frozenset]]] = {}
+        self._next_token = 0
+        self._writers: Dict[str, _DailyJSONLWriter] = {}
+        self._published = 0
+        self._written = 0
+        self._batches = 0
+        self._dropped = 0
+        self._failed = 0
+        self._subscriber_errors = 0
+
+    def publish(self, event: Event, directory: Optional[str] = None, ts: Optional[datetime] = None) -> bool:
+        """
+        Queue one event.
+
+        The event is shallow-copied and stamped with "ts" (UTC, millisecond
+        ISO-8601 with a Z suffix) at publish time.
+
+        Args:
+            event: Event fields
+            directory: Directory of the daily JSONL files to append to
+                (None delivers to subscribers only)
+            ts: Event time (defaults to now)
+
+        Returns:
+            False if the event was dropped
+        """
+        ts = ts or datetime.now(timezone.utc)
+        with self._condition:
+            if self._closed:
+                return False
+            self._ensure_started()
+            if len(self._queue) >= self.max_queue:
+                self._dropped += 1
+                return False
+            self._queue.append((self._next_sequence, dict(event), ts, directory))
+            self._next_sequence += 1
+            self._published += 1
+            if len(self._queue) == 1:
+                self._condition.notify_all()
+        return True
+
+    def subscribe(self, callback: Subscriber, event_types: Optional[Collection[str]] = None) -> int:
+        """
+        Call callback with every redacted event (or only those whose "type" is in event_types).
+
+        Returns:
+            Token for unsubscribe()
+        """
+        with self._condition:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = (callback, frozenset(event_types) if event_types is not None else None)
+        return token
+
+    def subscribe_async(
+        self, event_types: Optional[Collection[str]] = None, maxsize: int = 1000
+    ) -> Tuple[int, "asyncio.Queue[Event]"]:
+        """
+        Deliver events into an asyncio.Queue on the running event loop.
+
+        Events that arrive while the queue is full are dropped and counted
+        as subscriber errors. Must be called from a coroutine.
+
+        Returns:
+            (token for unsubscribe(), queue)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+
+        def put(event: Event) -> None:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                with self._condition:
+                    self._subscriber_errors += 1
+
+        def deliver(event: Event) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(put, event)
+
+        return self.subscribe(deliver, event_types), queue
+
+    def unsubscribe(self, token: int) -> None:
+        with self._condition:
+            self._subscribers.pop(token, None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every event published before this call has been delivered.
+
+        Returns:
+            True if the barrier was reached, False on timeout
+        """
+        with self._condition:
+            barrier = self._next_sequence
+            if self._thread is None or self._thread is threading.current_thread():
+                return self._handled >= barrier
+            return self._condition.wait_for(lambda: self._handled >= barrier, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Deliver queued events, stop the dispatcher and close every file."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        for writer in list(self._writers.values()):
+            writer.close()
+        self._writers.clear()
+
+    def stats(self) -> Dict[str, JSONValue]:
+        """Queue depth and delivery counters."""
+        with self._condition:
+            return {
+                "running": self._thread is not None,
+                "depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "subscribers": len(self._subscribers),
+                "destinations": len(self._writers),
+                "published": self._published,
+                "written": self._written,
+                "batches": self._batches,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "subscriber_errors": self._subscriber_errors,
+            }
+
+    def _ensure_started(self) -> None:
+        # Called with the condition held
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked child: the parent's dispatcher, handles and queued events are not ours
+            self._pid = pid
+            self._thread = None
+            self._writers = {}
+            self._queue.clear()
+            self._handled = self._next_sequence
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                subscribers = list(self._subscribers.values())
+            self._dispatch(batch, subscribers)
+            with self._condition:
+                self._handled = batch[-1][0] + 1
+                self._condition.notify_all()
+
+    def _dispatch(self, batch: List[_Queued], subscribers: List[Tuple[Subscriber, Optional[frozenset]]]) -> None:
+        # Lines per (directory, day), in publish order
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        failed = 0
+        subscriber_errors = 0
+        for _, event, ts, directory in batch:
+            try:
+                if self.redact is not None:
+                    event = self.redact(event)
+                event["ts"] = _format_ts(ts)
+                if directory is not None:
+                    groups.setdefault((directory, f"{ts:%Y%m%d}"), []).append(
+                        json.dumps(event, ensure_ascii=False) + "\n"
+                    )
+            except Exception:
+                failed += 1
+                continue
+            for callback, event_types in subscribers:
+                if event_types is not None and event.get("type") not in event_types:
+                    continue
+                try:
+                    callback(event)
+                except Exception:
+                    subscriber_errors += 1
+
+        written = 0
+        for (directory, day), lines in groups.items():
+            writer = self._writers.get(directory)
+            if writer is None:
+                writer = self._writers[directory] = _DailyJSONLWriter(directory)
+            try:
+                writer.write(day, lines)
+                written += len(lines)
+            except Exception:
+                writer.close()
+                failed += len(lines)
+
+        with self._condition:
+            self._written += written
+            self._batches += len(groups)
+            self._failed += failed
+            self._subscriber_errors += subscriber_errors
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Get the process-wide event bus, flushed and closed at exit."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = EventBus()
+            atexit.register(_bus.close)
+        return _bus
@@ -0,0 +1,544 @@
+"""Tail-following telemetry aggregator for the watch-mode dashboard.
+
+aggregate() re-reads and re-parses every event in its window on each call;
+`agency dashboard --watch` calls it every couple of seconds. An
+IncrementalAggregator instead remembers how far it has read each
+events-*.jsonl file and only parses lines appended since. The state it
+keeps is mergeable:
+
+- per-minute buckets of event, start, finish, result and token counts,
+  plus each agent's first appearance in the bucket
+- per task, its starts within the window, and its newest heartbeat and
+  finish
+- the window's orchestrator_started and cost-bearing events, which are
+  replayed in order because the result depends on it
+
+Buckets older than the window are dropped as it slides; the bucket that
+straddles its start is re-counted per event. aggregate() returns exactly
+what tools.telemetry.aggregator.aggregate() would at the same instant.
+Events are ordered by timestamp, then file name, then position. A full
+recompute orders cross-file timestamp ties by file modification time, which
+is the same order for daily files.
+
+The state is checkpointed to a JSON file (at most every
+checkpoint_interval seconds, and on close()), so a restarted dashboard
+resumes from its offsets instead of replaying the window. A file that
+shrank, was replaced or disappeared, or a window that moved backwards,
+resets the state and replays.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from shared.models.telemetry import TelemetryMetrics
+from shared.type_definitions.json import JSONValue
+
+from . import aggregator
+from .segment_index import _HEAD_BYTES, _head_digest, window_start
+
+STATE_VERSION = 1
+
+# (timestamp, file name, byte offset): the order events are applied in
+Key = Tuple[float, str, int]
+
+_RESULT_STATUSES = ("success", "failed", "timeout")
+
+
+class _TaskStateJSON(TypedDict):
+    """_TaskState as stored in a checkpoint; keys are lists, datetimes ISO strings."""
+
+    # [key, started_at, agent]
+    starts: List[List[Any]]
+    # [key, heartbeat_at]
+    heartbeat: Optional[List[Any]]
+    finish: Optional[List[Any]]
+
+
+class CheckpointState(TypedDict):
+    """IncrementalAggregator state as returned by to_dict()."""
+
+    version: int
+    since: str
+    bucket_seconds: int
+    horizon: Optional[float]
+    # file name -> [bytes consumed, head digest]
+    files: Dict[str, List[Any]]
+    # bucket index -> [[key, agent, type, status, tokens], ...]
+    buckets: Dict[str, List[List[Any]]]
+    tasks: Dict[str, _TaskStateJSON]
+    # [key, ts, has max_concurrency, max_concurrency]
+    orchestrators: List[List[Any]]
+    # [key, cost]
+    costs: List[List[Any]]
+
+
+def _dt_to_json(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() if dt is not None else None
+
+
+def _dt_from_json(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class _Bucket:
+    """Events of one time bucket: per-event records and their totals."""
+
+    def __init__(self) -> None:
+        # (key, agent, type, status, tokens), sorted by key
+        self.records: List[Tuple[Key, Optional[str], Optional[str], str, int]] = []
+        self.events = 0
+        self.started = 0
+        self.finished = 0
+        self.results: Counter[str] = Counter()
+        self.tokens = 0
+        self.agents: Dict[str, Key] = {}
+
+    def add(self, record: Tuple[Key, Optional[str], Optional[str], str, int]) -> None:
+        insort(self.records, record)
+        key, agent, typ, status, tokens = record
+        self.events += 1
+        if typ == "task_started":
+            self.started += 1
+        elif typ == "task_finished":
+            self.finished += 1
+            if status in _RESULT_STATUSES:
+                self.results[status] += 1
+            self.tokens += tokens
+        if agent is not None and (agent not in self.agents or key < self.agents[agent]):
+            self.agents[agent] = key
+
+
+class _TaskState:
+    """What the window's events say about one task id."""
+
+    def __init__(self) -> None:
+        # (key, started_dt, agent) of each start, sorted by key
+        self.starts: List[Tuple[Key, datetime, Any]] = []
+        self.heartbeat: Optional[Tuple[Key, datetime]] = None
+        self.finish: Optional[Key] = None
+
+    def to_json(self) -> _TaskStateJSON:
+        return {
+            "starts": [[list(key), _dt_to_json(dt), agent] for key, dt, agent in self.starts],
+            "heartbeat": [list(self.heartbeat[0]), _dt_to_json(self.heartbeat[1])] if self.heartbeat else None,
+            "finish": list(self.finish) if self.finish else None,
+        }
+
+    @classmethod
+    def from_json(cls, data: _TaskStateJSON) -> "_TaskState":
+        state = cls()
+        state.starts = [(tuple(key), _dt_from_json(dt), agent) for key, dt, agent in data["starts"]]  # type: ignore[misc]
+        if data["heartbeat"]:
+            state.heartbeat = (tuple(data["heartbeat"][0]), _dt_from_json(data["heartbeat"][1]))  # type: ignore[assignment]
+        if data["finish"]:
+            state.finish = tuple(data["finish"])  # type: ignore[assignment]
+        return state
+
+
+class IncrementalAggregator:
+    """
+    Stateful equivalent of aggregate(since, telemetry_dir).
+
+    Not thread-safe; give each dashboard its own instance.
+    """
+
+    def __init__(
+        self,
+        since: str = "1h",
+        telemetry_dir: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        bucket_seconds: int = 60,
+        checkpoint_interval: float = 30.0,
+    ) -> None:
+        """
+        Initialize IncrementalAggregator.
+
+        Args:
+            since: Time window (e.g., '15m', '1h', '24h', '7d')
+            telemetry_dir: Optional override directory for telemetry
+            checkpoint_path: State file to resume from and save to (None disables)
+            bucket_seconds: Width of the time buckets counts are kept in
+            checkpoint_interval: Least seconds between checkpoint writes
+        """
+        self.since = since
+        self.telemetry_dir = telemetry_dir
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = 0.0
+        self._dirty = False
+        self._reset()
+        if self.checkpoint_path is not None:
+            self._load_checkpoint()
+
+    @staticmethod
+    def default_checkpoint_path(since: str, telemetry_dir: Optional[str] = None) -> str:
+        """Checkpoint file for a window, next to the events it summarizes."""
+        name = re.sub(r"[^0-9A-Za-z]+", "_", since.strip().lower()) or "default"
+        return str(aggregator._telemetry_dir(telemetry_dir) / f"aggregate-{name}.state.json")
+
+    def _reset(self) -> None:
+        # Earliest timestamp the state is complete from
+        self._horizon: Optional[float] = None
+        # File name -> [offset read up to, digest of its first bytes]
+        self._files: Dict[str, List[Any]] = {}
+        self._buckets: Dict[int, _Bucket] = {}
+        self._tasks: Dict[str, _TaskState] = {}
+        # (key, ts, has max_concurrency, numeric max_concurrency or None)
+        self._orchestrators: List[Tuple[Key, str, bool, Any]] = []
+        # (key, cost)
+        self._costs: List[Tuple[Key, float]] = []
+        self._dirty = True
+
+    # ------------------------
+    # Public API
+    # ------------------------
+
+    def aggregate(self) -> TelemetryMetrics:
+        """Summary of the window ending now; same output as aggregate()."""
+        since_dt = aggregator._parse_since(self.since)
+        since_ts = since_dt.timestamp()
+        if self._horizon is not None and since_ts < self._horizon:
+            # The window moved backwards past what was kept
+            self._reset()
+        self._horizon = since_ts if self._horizon is None else max(self._horizon, since_ts)
+        self._read_new(since_dt)
+        self._expire(since_ts)
+        now = aggregator._iso_now()
+        summary = self._summarize(since_dt, since_ts, now)
+        self.maybe_checkpoint()
+        return summary
+
+    def maybe_checkpoint(self) -> None:
+        """Save the state if it changed and checkpoint_interval has passed."""
+        if self.checkpoint_path is None or not self._dirty:
+            return
+        if time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+            return
+        self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Save the state to checkpoint_path now."""
+        if self.checkpoint_path is None:
+            return
+        target = self.checkpoint_path
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, separators=(",", ":"))
+            os.replace(tmp, target)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        self._last_checkpoint = time.monotonic()
+        self._dirty = False
+
+    def close(self) -> None:
+        """Write a final checkpoint."""
+        if self._dirty:
+            self.checkpoint()
+
+    def to_dict(self) -> CheckpointState:
+        return {
+            "version": STATE_VERSION,
+            "since": self.since,
+            "bucket_seconds": self.bucket_seconds,
+            "horizon": self._horizon,
+            "files": {name: list(state) for name, state in self._files.items()},
+            "buckets": {
+                str(index): [[list(key), agent, typ, status, tokens] for key, agent, typ, status, tokens in bucket.records]
+                for index, bucket in self._buckets.items()
+            },
+            "tasks": {tid: state.to_json() for tid, state in self._tasks.items()},
+            "orchestrators": [[list(key), ts, has_mc, mc] for key, ts, has_mc, mc in self._orchestrators],
+            "costs": [[list(key), cost] for key, cost in self._costs],
+        }
+
+    def from_dict(self, data: CheckpointState) -> None:
+        """Restore state saved by to_dict() for the same window and bucket width."""
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported state version {data.get('version')!r}")
+        if data["since"] != self.since or data["bucket_seconds"] != self.bucket_seconds:
+            raise ValueError("state was saved for a different window")
+        self._reset()
+        self._horizon = data["horizon"]
+        self._files = {name: list(state) for name, state in data["files"].items()}
+        for index, records in data["buckets"].items():
+            bucket = self._buckets[int(index)] = _Bucket()
+            for key, agent, typ, status, tokens in records:
+                bucket.add((tuple(key), agent, typ, status, tokens))  # type: ignore[arg-type]
+        self._tasks = {tid: _TaskState.from_json(state) for tid, state in data["tasks"].items()}
+        self._orchestrators = [(tuple(key), ts, has_mc, mc) for key, ts, has_mc, mc in data["orchestrators"]]  # type: ignore[misc]
+        self._costs = [(tuple(key), cost) for key, cost in data["costs"]]  # type: ignore[misc]
+        self._dirty = False
+
+    # ------------------------
+    # Reading
+    # ------------------------
+
+    def _load_checkpoint(self) -> None:
+        assert self.checkpoint_path is not None
+        try:
+            with self.checkpoint_path.open("r", encoding="utf-8") as f:
+                self.from_dict(json.load(f))
+        except Exception:
+            self._reset()
+
+    def _read_new(self, since_dt: datetime) -> None:
+        base = aggregator._telemetry_dir(self.telemetry_dir)
+        present = {fp.name: fp for fp in aggregator._iter_event_files(base)}
+        # A file was removed: its events have left a full recompute too
+        intact = all(name in present for name in self._files)
+        if intact:
+            intact = all(self._read_file(present[name], since_dt) for name in sorted(present))
+        if not intact:
+            self._reset()
+            self._horizon = since_dt.timestamp()
+            for name in sorted(present):
+                self._read_file(present[name], since_dt)
+
+    def _read_file(self, fp: Path, since_dt: datetime) -> bool:
+        """Apply the lines appended to fp; False if it no longer matches the state."""
+        name = fp.name
+        state = self._files.get(name)
+        try:
+            with fp.open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if state is not None:
+                    offset, head = state
+                    if size < offset or (offset and _head_digest(f, offset) != head):
+                        # Replaced or truncated
+                        return False
+                    if size == offset:
+                        return True
+                else:
+                    start = window_start(fp, since_dt)
+                    offset = size if start is None else start
+                f.seek(offset)
+                data = f.read(size - offset)
+
+                consumed = 0
+                while consumed < len(data):
+                    newline = data.find(b"\n", consumed)
+                    if newline == -1:
+                        # Unterminated tail: take it only once it is a whole event
+                        if self._apply_line(data[consumed:], name, offset + consumed, complete=False):
+                            consumed = len(data)
+                        break
+                    self._apply_line(data[consumed:newline], name, offset + consumed)
+                    consumed = newline + 1
+                end = offset + consumed
+                if state is None or state[0] < _HEAD_BYTES:
+                    head = _head_digest(f, end)
+        except OSError:
+            return True
+        self._files[name] = [end, head]
+        self._dirty = True
+        return True
+
+    def _apply_line(self, line: bytes, name: str, offset: int, complete: bool = True) -> bool:
+        line = line.strip()
+        if not line:
+            return complete
+        try:
+            ev = json.loads(line)
+        except Exception:
+            return complete
+        if not isinstance(ev, dict):
+            return complete
+        ts = ev.get("ts")
+        if not isinstance(ts, str):
+            return True
+        dt = aggregator._parse_iso(ts)
+        if dt is None:
+            return True
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        event_ts = dt.timestamp()
+        if self._horizon is not None and event_ts < self._horizon:
+            return True
+        self._apply_event(ev, (event_ts, name, offset), ts)
+        return True
+
+    def _apply_event(self, ev: Dict[str, JSONValue], key: Key, ts: str) -> None:
+        """Record one event, mirroring the per-event logic of aggregate()."""
+        typ = ev.get("type")
+        agent = ev.get("agent")
+        tokens = 0
+        status = ""
+
+        if typ == "orchestrator_started":
+            mc = ev.get("max_concurrency")
+            insort(self._orchestrators, (key, ts, "max_concurrency" in ev, mc if isinstance(mc, (int, float)) else None))
+
+        elif typ == "task_started":
+            tid = str(ev.get("id")) if ev.get("id") is not None else None
+            if tid:
+                started_at = ev.get("started_at")
+                dt = None
+                if isinstance(started_at, (int, float)):
+                    try:
+                        dt = datetime.fromtimestamp(float(started_at), tz=timezone.utc)
+                    except Exception:
+                        dt = None
+                if dt is None:
+                    dt = aggregator._parse_iso(ts)
+                insort(self._task(tid).starts, (key, dt, agent))
+
+        elif typ == "heartbeat":
+            tid = str(ev.get("id")) if ev.get("id") is not None else None
+            if tid:
+                task = self._task(tid)
+                if task.heartbeat is None or key > task.heartbeat[0]:
+                    task.heartbeat = (key, aggregator._parse_iso(ts))  # type: ignore[assignment]
+
+        elif typ == "task_finished":
+            status = str(ev.get("status", "")).lower()
+            tid = str(ev.get("id")) if ev.get("id") is not None else None
+            if tid:
+                task = self._task(tid)
+                if task.finish is None or key > task.finish:
+                    task.finish = key
+            usage = ev.get("usage")
+            if isinstance(usage, dict):
+                value = usage.get("total_tokens")
+                try:
+                    if value is not None and isinstance(value, (int, float)):
+                        tokens = int(value)
+                except Exception:
+                    pass
+                cost = usage.get("total_usd") or ev.get("cost_usd")
+                try:
+                    if cost is not None and isinstance(cost, (int, float)):
+                        insort(self._costs, (key, float(cost)))
+                except Exception:
+                    pass
+
+        record = (key, agent if agent and isinstance(agent, str) else None, typ if isinstance(typ, str) else None, status, tokens)
+        index = int(key[0] // self.bucket_seconds)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = _Bucket()
+        bucket.add(record)
+        self._dirty = True
+
+    def _task(self, tid: str) -> _TaskState:
+        task = self._tasks.get(tid)
+        if task is None:
+            task = self._tasks[tid] = _TaskState()
+        return task
+
+    def _expire(self, since_ts: float) -> None:
+        """Drop state only events before the window start contributed to."""
+        first = int(since_ts // self.bucket_seconds)
+        for index in [index for index in self._buckets if index < first]:
+            del self._buckets[index]
+            self._dirty = True
+        floor: Key = (since_ts, "", -1)
+        for tid in list(self._tasks):
+            task = self._tasks[tid]
+            cut = bisect_left(task.starts, (floor,))
+            if cut:
+                del task.starts[:cut]
+                self._dirty = True
+            newest = max(
+                [k for k in (task.heartbeat[0] if task.heartbeat else None, task.finish) if k is not None],
+                default=None,
+            )
+            if not task.starts and (newest is None or newest < floor):
+                del self._tasks[tid]
+                self._dirty = True
+        for entries in (self._orchestrators, self._costs):
+            cut = bisect_left(entries, (floor,))
+            if cut:
+                del entries[:cut]
+                self._dirty = True
+
+    # ------------------------
+    # Output
+    # ------------------------
+
+    def _summarize(self, since_dt: datetime, since_ts: float, now: datetime) -> TelemetryMetrics:
+        total_events = 0
+        tasks_started = 0
+        tasks_finished = 0
+        results: Counter[str] = Counter()
+        total_tokens = 0
+        first_seen: Dict[str, Key] = {}
+        first = int(since_ts // self.bucket_seconds)
+        for index, bucket in self._buckets.items():
+            if index == first:
+                # Straddles the window start: count only the events inside it
+                cut = bisect_left(bucket.records, ((since_ts, "", -1),))
+                partial = _Bucket()
+                for record in bucket.records[cut:]:
+                    partial.add(record)
+                bucket = partial
+            total_events += bucket.events
+            tasks_started += bucket.started
+            tasks_finished += bucket.finished
+            results.update(bucket.results)
+            total_tokens += bucket.tokens
+            for agent, key in bucket.agents.items():
+                if agent not in first_seen or key < first_seen[agent]:
+                    first_seen[agent] = key
+        agents_active = sorted(first_seen, key=first_seen.__getitem__)
+        recent_results = {status: results[status] for status in _RESULT_STATUSES}
+
+        # Replay the window's orchestrator starts in order
+        max_concurrency: Optional[int] = None
+        latest_orchestrator_ts: Optional[datetime] = None
+        for _, ts, has_mc, mc in self._orchestrators:
+            dt = aggregator._parse_iso(ts)
+            if dt and (latest_orchestrator_ts is None or dt > latest_orchestrator_ts):
+                latest_orchestrator_ts = dt
+                mc_val = mc if has_mc else max_concurrency or 0
+                max_concurrency = int(mc_val) if isinstance(mc_val, (int, float)) else max_concurrency
+
+        total_usd = 0.0
+        for _, cost in self._costs:
+            total_usd += cost
+
+        # Each task as its latest start left it, in order of first start
+        tasks: Dict[str, Dict[str, Any]] = {}
+        for tid, task in sorted(
+            ((tid, task) for tid, task in self._tasks.items() if task.starts),
+            key=lambda item: item[1].starts[0][0],
+        ):
+            key, started_dt, agent = task.starts[-1]
+            heartbeat = task.heartbeat if task.heartbeat and task.heartbeat[0] > key else None
+            tasks[tid] = {
+                "id": tid,
+                "agent": agent or "-",
+                "started_dt": started_dt or now,
+                "last_hb_dt": (heartbeat[1] or now) if heartbeat else None,
+                "finished": task.finish is not None and task.finish > key,
+            }
+
+        return aggregator._summarize(
+            self.since, since_dt, now,
+            total_events=total_events,
+            tasks_started=tasks_started,
+            tasks_finished=tasks_finished,
+            recent_results=recent_results,
+            agents_active=agents_active,
+            tasks=tasks,
+            max_concurrency=max_concurrency,
+            total_tokens=total_tokens,
+            total_usd=total_usd,
+        )
+
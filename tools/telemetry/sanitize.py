@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import copy
 import re
-from typing import Any, Dict, cast
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, cast
 from shared.type_definitions.json import JSONValue
 from shared.models.telemetry import TelemetryEvent
 
-# Patterns for secret-like values
+# Patterns for secret-like values, applied in this order
 _SECRET_VALUE_PATTERNS = [
     re.compile(r"sk-[A-Za-z0-9]{10,}"),        # OpenAI-style keys
     re.compile(r"ghp_[A-Za-z0-9]{20,}"),       # GitHub PAT (min 20 chars)
@@ -14,8 +14,15 @@ _SECRET_VALUE_PATTERNS = [
     re.compile(r"AIza[0-9A-Za-z\-_]{15,}"),    # Google API key
 ]
 
+# Literal prefix of each pattern above, and the shortest string any of them matches
+_SECRET_PREFIXES = ("sk-", "ghp_", "xox", "AIza")
+_MIN_SECRET_LENGTH = 13
+
+# All patterns in one alternation, to find out in a single scan whether a string needs redacting
+_ANY_SECRET = re.compile("|".join(f"(?:{pat.pattern})" for pat in _SECRET_VALUE_PATTERNS))
+
 # Keys that should always be redacted when present
-_SENSITIVE_KEYS = {
+_SENSITIVE_KEYS = frozenset({
     "api_key",
     "apikey",
     "authorization",
@@ -27,25 +34,65 @@ _SENSITIVE_KEYS = {
     "client_secret",
     "password",
     "passwd",
-}
+})
 
 _REPLACEMENT = "[REDACTED]"
 
 
+@lru_cache(maxsize=4096)
+def _is_sensitive_key(key: str) -> bool:
+    return key.lower() in _SENSITIVE_KEYS
+
+
 def _redact_str(s: str) -> str:
+    """Mask secret-like substrings, returning s itself when there are none."""
+    # Cheap rejections first: too short, or no pattern prefix anywhere
+    if len(s) < _MIN_SECRET_LENGTH or not any(prefix in s for prefix in _SECRET_PREFIXES):
+        return s
+    if _ANY_SECRET.search(s) is None:
+        return s
+    # Substitute pattern by pattern, as overlapping matches (an "sk-" key
+    # inside an "AIza" one) must resolve exactly as they always have
     out = s
-    for pat in _SECRET_VALUE_PATTERNS:
-        out = pat.sub(_REPLACEMENT, out)
+    for prefix, pat in zip(_SECRET_PREFIXES, _SECRET_VALUE_PATTERNS):
+        if prefix in out:
+            out = pat.sub(_REPLACEMENT, out)
     return out
 
 
+def _redact_dict(obj: Dict[Any, Any]) -> Dict[Any, Any]:
+    new: Optional[Dict[Any, Any]] = None
+    for k, v in obj.items():
+        if isinstance(k, str) and _is_sensitive_key(k):
+            value: Any = _REPLACEMENT
+        else:
+            value = _redact_any(v)
+        if value is not v:
+            if new is None:
+                new = dict(obj)
+            new[k] = value
+    return obj if new is None else new
+
+
+def _redact_list(obj: List[Any]) -> List[Any]:
+    new: Optional[List[Any]] = None
+    for i, v in enumerate(obj):
+        value = _redact_any(v)
+        if value is not v:
+            if new is None:
+                new = list(obj)
+            new[i] = value
+    return obj if new is None else new
+
+
 def _redact_any(val: Any) -> Any:
+    """Redact val, copying only the containers on the path to a change."""
     if isinstance(val, str):
         return _redact_str(val)
     if isinstance(val, dict):
-        return {k: _redact_any(v) for k, v in val.items()}
+        return _redact_dict(val)
     if isinstance(val, list):
-        return [_redact_any(v) for v in val]
+        return _redact_list(val)
     return val
 
 
@@ -57,28 +104,16 @@ def redact_event(event: Dict[str, JSONValue]) -> Dict[str, JSONValue]:
     - For string values, mask known secret-like patterns (OpenAI, GH PAT, Slack, Google)
     - Keep structure intact; avoid removing non-secret fields
 
+    The result is a new top-level dict; nested containers are copied only
+    when something inside them was redacted, so unchanged ones are shared
+    with the input. Treat both as read-only.
+
     Note: Still accepts Dict for backward compatibility, but can work with TelemetryEvent
     """
     if not isinstance(event, dict):
         return event
-    safe = copy.deepcopy(event)
-
-    def _walk(obj: Any) -> Any:
-        if isinstance(obj, dict):
-            new: Dict[str, JSONValue] = {}
-            for k, v in obj.items():
-                if k.lower() in _SENSITIVE_KEYS:
-                    new[k] = _REPLACEMENT
-                else:
-                    new[k] = _walk(v)
-            return new
-        if isinstance(obj, list):
-            return [_walk(v) for v in obj]
-        if isinstance(obj, str):
-            return _redact_str(obj)
-        return obj
-
-    return _walk(safe)
+    redacted = _redact_dict(event)
+    return dict(event) if redacted is event else redacted
 
 
 def redact_telemetry_event(event: TelemetryEvent) -> TelemetryEvent:
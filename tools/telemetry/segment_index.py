@@ -0,0 +1,297 @@
+"""Sidecar time indexes for telemetry JSONL files.
+
+Readers used to parse every line of every events-*.jsonl file and only then
+drop events older than the requested window, so a 1-hour query paid for the
+whole retention period. Each events file now has a sidecar
+<name>.jsonl.idx recording:
+
+- how many bytes of the file it covers (always whole lines)
+- a fingerprint of the file's first bytes
+- the smallest and largest event timestamp
+- periodic checkpoints of (largest timestamp before offset, offset)
+
+Readers skip files whose newest event is older than the window and
+binary-search the checkpoints for the first offset that can hold an event
+inside it. Checkpoints store the running maximum rather than the timestamp
+at the offset, so the search stays exact when concurrent writers append
+slightly out of order.
+
+The index is self-healing: whoever opens it (the event bus writer after a
+batch, or a reader) indexes any bytes appended since, and rebuilds it if the
+file shrank, was replaced, or the sidecar is missing or unreadable. Updates
+are written to a temporary file and renamed into place, so concurrent
+writers and readers never see a torn index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from shared.type_definitions.json import JSONValue
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Bytes between checkpoints: a reader scans at most this much before its window
+CHECKPOINT_BYTES = 64 * 1024
+
+# Bytes hashed to recognise a replaced file
+_HEAD_BYTES = 512
+
+PathLike = Union[str, Path]
+
+
+def index_path(path: PathLike) -> Path:
+    return Path(f"{path}{INDEX_SUFFIX}")
+
+
+def event_timestamp(line: bytes) -> Optional[float]:
+    """POSIX timestamp of a JSONL event line's "ts" (naive times are UTC), or None."""
+    try:
+        ev = json.loads(line)
+    except Exception:
+        return None
+    if not isinstance(ev, dict):
+        return None
+    ts = ev.get("ts")
+    if not isinstance(ts, str):
+        return None
+    try:
+        if ts.endswith("Z"):
+            ts = ts[:-1] + "+00:00"
+        dt = datetime.fromisoformat(ts)
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _head_digest(f, size: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(min(size, _HEAD_BYTES))).hexdigest()
+
+
+class SegmentIndex:
+    """Time index of the first `size` bytes of one events file."""
+
+    def __init__(self, checkpoint_bytes: int) -> None:
+        self.checkpoint_bytes = max(1, checkpoint_bytes)
+        self.size = 0
+        self.head = ""
+        self.min_ts: Optional[float] = None
+        self.max_ts: Optional[float] = None
+        # (largest timestamp before offset, offset); both non-decreasing
+        self.checkpoints: List[Tuple[float, int]] = []
+        self._last_checkpoint = 0
+
+    def extend(self, f, file_size: int) -> bool:
+        """
+        Index the complete lines between self.size and file_size.
+
+        Args:
+            f: The events file, opened in binary mode
+            file_size: Current size of the file
+
+        Returns:
+            True if anything was added
+        """
+        if file_size <= self.size:
+            return False
+        start = self.size
+        f.seek(start)
+        offset = start
+        while offset < file_size:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                # Partial trailing line: a writer is mid-append
+                break
+            if offset - self._last_checkpoint >= self.checkpoint_bytes and self.max_ts is not None:
+                self.checkpoints.append((self.max_ts, offset))
+                self._last_checkpoint = offset
+            ts = event_timestamp(line)
+            if ts is not None:
+                self.min_ts = ts if self.min_ts is None else min(self.min_ts, ts)
+                self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+            offset += len(line)
+        if offset == start:
+            return False
+        if start < _HEAD_BYTES:
+            self.head = _head_digest(f, offset)
+        self.size = offset
+        return True
+
+    def seek_offset(self, since_ts: float) -> Optional[int]:
+        """
+        Offset to start reading at for events at or after since_ts.
+
+        Returns:
+            None if no indexed event is that recent; every event before the
+            returned offset is older than since_ts
+        """
+        if self.max_ts is None or self.max_ts < since_ts:
+            return None
+        position = bisect_left(self.checkpoints, (since_ts,))
+        return self.checkpoints[position - 1][1] if position else 0
+
+    def matches(self, f, file_size: int) -> bool:
+        """Whether this index still describes the start of the file."""
+        if self.size == 0:
+            return True
+        if file_size < self.size:
+            return False
+        f.seek(self.size - 1)
+        if f.read(1) != b"\n":
+            return False
+        return _head_digest(f, self.size) == self.head
+
+    def copy(self) -> "SegmentIndex":
+        other = SegmentIndex(self.checkpoint_bytes)
+        other.size = self.size
+        other.head = self.head
+        other.min_ts = self.min_ts
+        other.max_ts = self.max_ts
+        other.checkpoints = list(self.checkpoints)
+        other._last_checkpoint = self._last_checkpoint
+        return other
+
+    def to_dict(self) -> Dict[str, JSONValue]:
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "head": self.head,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "checkpoint_bytes": self.checkpoint_bytes,
+            "last_checkpoint": self._last_checkpoint,
+            "checkpoints": [[ts, offset] for ts, offset in self.checkpoints],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, JSONValue]) -> "SegmentIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported index version {data.get('version')!r}")
+        index = cls(int(data["checkpoint_bytes"]))  # type: ignore[arg-type]
+        index.size = int(data["size"])  # type: ignore[arg-type]
+        index.head = str(data["head"])
+        index.min_ts = None if data["min_ts"] is None else float(data["min_ts"])  # type: ignore[arg-type]
+        index.max_ts = None if data["max_ts"] is None else float(data["max_ts"])  # type: ignore[arg-type]
+        index._last_checkpoint = int(data["last_checkpoint"])  # type: ignore[arg-type]
+        index.checkpoints = [(float(ts), int(offset)) for ts, offset in data["checkpoints"]]  # type: ignore[union-attr, misc]
+        return index
+
+
+# In-process copies, so readers only parse a sidecar written by someone else
+_cache: Dict[str, SegmentIndex] = {}
+_cache_lock = threading.Lock()
+
+
+def _read_sidecar(path: Path) -> Optional[SegmentIndex]:
+    try:
+        with index_path(path).open("r", encoding="utf-8") as f:
+            return SegmentIndex.from_dict(json.load(f))
+    except Exception:
+        return None
+
+
+def _write_sidecar(path: Path, index: SegmentIndex) -> None:
+    target = index_path(path)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError:
+        # Read-only directory: the in-process copy still works
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def refresh_index(path: PathLike, checkpoint_bytes: Optional[int] = None, persist: bool = True) -> Optional[SegmentIndex]:
+    """
+    Bring the index of an events file up to date and return it.
+
+    Uses the in-process copy or the sidecar when they still match the file,
+    indexes any lines appended since, and rebuilds from scratch otherwise.
+
+    Args:
+        path: events-*.jsonl file
+        checkpoint_bytes: Checkpoint spacing for a rebuilt index (default CHECKPOINT_BYTES)
+        persist: Write the sidecar back when the index changed
+
+    Returns:
+        None if the file cannot be read
+    """
+    path = Path(path)
+    key = str(path)
+    try:
+        with path.open("rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            with _cache_lock:
+                cached = _cache.get(key)
+            candidates = [cached] if cached is not None else []
+            sidecar = _read_sidecar(path) if cached is None or cached.size < file_size else None
+            if sidecar is not None:
+                candidates.append(sidecar)
+            # Prefer whichever valid copy covers the most
+            index = None
+            for candidate in sorted(candidates, key=lambda c: c.size, reverse=True):
+                if candidate.matches(f, file_size):
+                    index = candidate
+                    break
+            rebuilt = index is None
+            if index is None:
+                index = SegmentIndex(checkpoint_bytes or CHECKPOINT_BYTES)
+            elif index is cached:
+                # Never extend the shared copy in place: other threads may be searching it
+                index = index.copy()
+            changed = index.extend(f, file_size)
+    except OSError:
+        return None
+    with _cache_lock:
+        current = _cache.get(key)
+        if current is None or rebuilt or current.size <= index.size:
+            _cache[key] = index
+    if persist and (changed or rebuilt):
+        _write_sidecar(path, index)
+    return index
+
+
+def window_start(path: PathLike, since: datetime) -> Optional[int]:
+    """
+    Byte offset to start reading an events file at for events at or after since.
+
+    Returns:
+        None when the file holds no event that recent, or cannot be read
+    """
+    index = refresh_index(path)
+    if index is None:
+        return None
+    since_ts = since.timestamp()
+    offset = index.seek_offset(since_ts)
+    if offset is None:
+        # Lines after the indexed range are still being written: read them
+        try:
+            if os.path.getsize(path) > index.size:
+                return index.size
+        except OSError:
+            return None
+    return offset
+
+
+def drop_cached_index(path: Optional[PathLike] = None) -> None:
+    """Forget in-process copies (all of them when path is None)."""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(str(Path(path)), None)